@@ -1,5 +1,6 @@
 """Base agent class and shared types for the trading agent framework."""
 
+import asyncio
 import logging
 import time
 from dataclasses import dataclass, field
@@ -8,10 +9,16 @@ from typing import Any
 
 from app.agents.event_bus import AgentEvent, event_bus
 from app.models.db import execute_insert
+from app.services.kis_result import KisResult
 from app.services.mcp_client import mcp_manager
+from app.services.metrics import AGENT_RUN_SECONDS
+from app.services.tracing import Trace, span, start_trace
 
 logger = logging.getLogger(__name__)
 
+# checkpoint()를 지나지 못하는 await(예: 멈춘 HTTP 호출)는 데드라인 + 유예 후 강제 취소
+HARD_DEADLINE_GRACE_SEC = 30.0
+
 
 class AgentRole(str, Enum):
     MONITOR = "monitor"
@@ -29,6 +36,14 @@ class AgentStatus(str, Enum):
     DISABLED = "disabled"
 
 
+class AgentCancelled(Exception):
+    """Raised at a checkpoint when a run must stop (reason: timeout, preempted, shutdown...)."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
 @dataclass
 class AgentContext:
     """Context passed to an agent on execution."""
@@ -47,6 +62,7 @@ class AgentResult:
     data: dict[str, Any] = field(default_factory=dict)
     events_emitted: list[str] = field(default_factory=list)
     error: str | None = None
+    run_id: int | None = None  # agent_logs.id — trace: /api/agents/{id}/runs/{run_id}/trace
 
 
 class BaseAgent:
@@ -59,19 +75,28 @@ class BaseAgent:
     name: str = ""
     role: AgentRole = AgentRole.MONITOR
     allowed_tools: list[str] = []
+    # Run control: a run of a higher-priority agent pauses preemptible agents at their next checkpoint
+    priority: int = 0
+    preemptible: bool = False
+    timeout_sec: float = 300.0
 
     def __init__(self):
         self.status: AgentStatus = AgentStatus.IDLE
         self.config: dict[str, Any] = {}
         self.last_run: str | None = None
         self._events_emitted: list[str] = []
+        self._cancel_reason: str | None = None
+        self._deadline: float | None = None
+        self._pauses = 0
+        self._resume = asyncio.Event()
+        self._resume.set()
 
     async def execute(self, context: AgentContext) -> AgentResult:
         """Main execution method. Override in subclasses."""
         raise NotImplementedError
 
     async def run(self, context: AgentContext) -> AgentResult:
-        """Wrapper that handles status, logging, and error isolation."""
+        """Wrapper that handles status, logging, deadlines, and error isolation."""
         if self.status == AgentStatus.DISABLED:
             return AgentResult(
                 success=False, summary="Agent is disabled", error="disabled"
@@ -79,7 +104,11 @@ class BaseAgent:
 
         self.status = AgentStatus.RUNNING
         self._events_emitted = []
+        self._cancel_reason = None
+        timeout = self.run_timeout()
         start = time.monotonic()
+        self._deadline = start + timeout
+        trace: Trace | None = None
 
         await self.emit_event("agent.started", {
             "trigger": context.trigger,
@@ -87,14 +116,20 @@ class BaseAgent:
             "role": self.role.value,
         })
 
+        # 협조적 데드라인은 checkpoint()에서, 응답 없는 await는 유예 후 강제 취소
+        hard_deadline = asyncio.timeout(timeout + HARD_DEADLINE_GRACE_SEC)
         try:
-            result = await self.execute(context)
+            async with hard_deadline:
+                with start_trace(f"{self.agent_id}.run", agent_id=self.agent_id, trigger=context.trigger) as trace:
+                    result = await self.execute(context)
             result.events_emitted = self._events_emitted
             self.status = AgentStatus.IDLE
             elapsed = int((time.monotonic() - start) * 1000)
             self.last_run = time.strftime("%Y-%m-%dT%H:%M:%S")
+            AGENT_RUN_SECONDS.observe(
+                time.monotonic() - start, agent=self.agent_id, outcome="ok" if result.success else "failed")
 
-            await self._log_execution(elapsed, result)
+            result.run_id = await self._log_execution(elapsed, result, trace)
             await self.emit_event("agent.completed", {
                 "agent_name": self.name,
                 "role": self.role.value,
@@ -106,16 +141,29 @@ class BaseAgent:
             )
             return result
 
+        except AgentCancelled as e:
+            return await self._finish_cancelled(e.reason, start, trace)
+
+        except asyncio.CancelledError:
+            if self._cancel_reason is None:
+                self.status = AgentStatus.IDLE
+                raise  # 외부(호출자) 취소는 그대로 전파
+            asyncio.current_task().uncancel()
+            return await self._finish_cancelled(self._cancel_reason, start, trace)
+
         except Exception as e:
+            if isinstance(e, TimeoutError) and hard_deadline.expired():
+                return await self._finish_cancelled("timeout", start, trace)
             self.status = AgentStatus.ERROR
             elapsed = int((time.monotonic() - start) * 1000)
+            AGENT_RUN_SECONDS.observe(time.monotonic() - start, agent=self.agent_id, outcome="error")
             error_result = AgentResult(
                 success=False,
                 summary=f"Agent error: {str(e)}",
                 error=str(e),
                 events_emitted=self._events_emitted,
             )
-            await self._log_execution(elapsed, error_result)
+            error_result.run_id = await self._log_execution(elapsed, error_result, trace)
             await self.emit_event("agent.failed", {
                 "agent_name": self.name,
                 "role": self.role.value,
@@ -125,11 +173,76 @@ class BaseAgent:
             logger.error(f"Agent {self.agent_id} error: {e}", exc_info=True)
             return error_result
 
-    async def call_mcp_tool(self, tool_name: str, params: dict) -> str:
-        """Call an MCP tool through the shared MCPClientManager.
+    async def _finish_cancelled(self, reason: str, start: float, trace: Trace | None) -> AgentResult:
+        """Log a run stopped by its deadline, preemption timeout, or shutdown."""
+        self.status = AgentStatus.IDLE
+        elapsed = int((time.monotonic() - start) * 1000)
+        AGENT_RUN_SECONDS.observe(time.monotonic() - start, agent=self.agent_id, outcome=reason)
+        result = AgentResult(
+            success=False,
+            summary=f"Agent {reason} after {elapsed}ms",
+            error=reason,
+            events_emitted=self._events_emitted,
+        )
+        action = "timeout" if reason == "timeout" else "cancelled"
+        result.run_id = await self._log_execution(elapsed, result, trace, action=action)
+        await self.emit_event("agent.cancelled", {
+            "agent_name": self.name,
+            "role": self.role.value,
+            "reason": reason,
+            "duration_ms": elapsed,
+        })
+        logger.warning(f"Agent {self.agent_id} {reason} after {elapsed}ms")
+        return result
+
+    # ------------------------------------------------------------------
+    # Run control (AgentEngine)
+    # ------------------------------------------------------------------
 
-        Enforces tool isolation: only allowed_tools can be called.
-        """
+    def run_timeout(self) -> float:
+        """Per-run deadline in seconds (config "timeout_sec" overrides the class default)."""
+        try:
+            return float(self.config.get("timeout_sec", self.timeout_sec))
+        except (TypeError, ValueError):
+            return float(self.timeout_sec)
+
+    def request_cancel(self, reason: str = "cancelled") -> None:
+        """Ask the running execute() to stop at its next checkpoint."""
+        self._cancel_reason = reason
+
+    def pause(self) -> None:
+        """Preempt: the next checkpoint waits until every pause() is matched by resume()."""
+        self._pauses += 1
+        self._resume.clear()
+
+    def resume(self) -> None:
+        self._pauses = max(0, self._pauses - 1)
+        if self._pauses == 0:
+            self._resume.set()
+
+    async def checkpoint(self) -> None:
+        """Cooperative cancellation/preemption point — call between stages of long runs."""
+        if not self._resume.is_set():
+            paused_at = time.monotonic()
+            remaining = (self._deadline - paused_at) if self._deadline else None
+            with span("preempted"):
+                try:
+                    await asyncio.wait_for(self._resume.wait(), timeout=remaining)
+                except TimeoutError:
+                    raise AgentCancelled("timeout") from None
+            waited = int((time.monotonic() - paused_at) * 1000)
+            await self.record_action("preempted", f"Paused {waited}ms for a higher-priority run", waited)
+        if self._cancel_reason:
+            raise AgentCancelled(self._cancel_reason)
+        if self._deadline and time.monotonic() > self._deadline:
+            raise AgentCancelled("timeout")
+
+    async def record_action(self, action: str, summary: str, duration_ms: int = 0) -> None:
+        """Log a non-execution entry (queued/joined/preempted) to agent_logs."""
+        await self._log_execution(duration_ms, AgentResult(summary=summary), action=action)
+
+    def _check_tool_allowed(self, tool_name: str) -> None:
+        """Enforce tool isolation: only allowed_tools can be called."""
         # Extract the base tool name (e.g. "domestic_stock" from "domestic_stock.inquire_balance")
         base_tool = tool_name.split(".")[0] if "." in tool_name else tool_name
         if self.allowed_tools and base_tool not in self.allowed_tools:
@@ -137,8 +250,17 @@ class BaseAgent:
                 f"Agent {self.agent_id} not allowed to call tool {tool_name}. "
                 f"Allowed: {self.allowed_tools}"
             )
+
+    async def call_mcp_tool(self, tool_name: str, params: dict) -> str:
+        """Call an MCP tool through the shared MCPClientManager (text result)."""
+        self._check_tool_allowed(tool_name)
         return await mcp_manager.call_tool(tool_name, params)
 
+    async def call_mcp_tool_result(self, tool_name: str, params: dict) -> KisResult:
+        """Call an MCP tool and return its structured result (parsed tables, KIS status)."""
+        self._check_tool_allowed(tool_name)
+        return await mcp_manager.call_tool_result(tool_name, params)
+
     async def emit_event(self, event_type: str, data: dict) -> None:
         """Publish an event to the event bus."""
         event = AgentEvent(
@@ -149,12 +271,14 @@ class BaseAgent:
         self._events_emitted.append(event_type)
         await event_bus.publish(event)
 
-    async def _log_execution(self, duration_ms: int, result: AgentResult) -> None:
-        """Persist execution log to database."""
+    async def _log_execution(
+        self, duration_ms: int, result: AgentResult, trace: Trace | None = None, action: str = "execute",
+    ) -> int | None:
+        """Persist execution log (and its trace spans) to database. Returns the agent_logs id."""
         import json
 
         try:
-            await execute_insert(
+            log_id = await execute_insert(
                 """INSERT INTO agent_logs
                    (agent_id, agent_role, action, duration_ms, success,
                     result_summary, error_message, events_emitted_json)
@@ -162,7 +286,7 @@ class BaseAgent:
                 (
                     self.agent_id,
                     self.role.value,
-                    "execute",
+                    action,
                     duration_ms,
                     1 if result.success else 0,
                     result.summary[:500],
@@ -172,6 +296,28 @@ class BaseAgent:
             )
         except Exception as e:
             logger.error(f"Failed to log agent execution: {e}")
+            return None
+
+        if trace is not None:
+            try:
+                data = trace.to_dict()
+                await execute_insert(
+                    """INSERT OR REPLACE INTO agent_run_traces
+                       (log_id, agent_id, trace_id, started_at, duration_ms, span_count, spans_json)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        log_id,
+                        self.agent_id,
+                        data["trace_id"],
+                        data["started_at"],
+                        data["duration_ms"],
+                        len(data["spans"]),
+                        json.dumps(data["spans"], ensure_ascii=False, default=str),
+                    ),
+                )
+            except Exception as e:
+                logger.error(f"Failed to save agent trace: {e}")
+        return log_id
 
     def to_dict(self) -> dict:
         """Serialize agent state for API responses."""
@@ -183,4 +329,6 @@ class BaseAgent:
             "last_run": self.last_run,
             "config": self.config,
             "allowed_tools": self.allowed_tools,
+            "priority": self.priority,
+            "timeout_sec": self.run_timeout(),
         }
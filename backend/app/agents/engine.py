@@ -1,14 +1,31 @@
 """Agent engine that orchestrates agent lifecycle and event routing."""
 
+import asyncio
+import functools
 import logging
-from typing import Any
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Coroutine, Iterator
 
-from app.agents.base import AgentContext, AgentResult, AgentStatus, BaseAgent
+from app.agents.base import HARD_DEADLINE_GRACE_SEC, AgentContext, AgentResult, AgentStatus, BaseAgent
 from app.agents.event_bus import AgentEvent, event_bus
 from app.services.runtime_settings import runtime_settings
 
 logger = logging.getLogger(__name__)
 
+# 종료 시 진행 중인 실행이 checkpoint에서 멈추길 기다리는 시간
+SHUTDOWN_GRACE_SEC = 10.0
+
+
+@dataclass
+class _Flight:
+    """In-flight run of one agent, plus at most one queued follow-up run."""
+
+    task: asyncio.Task
+    context: AgentContext
+    follow_up: asyncio.Future | None = None
+    follow_up_context: AgentContext | None = None
+
 
 class AgentEngine:
     """Orchestrates agent registration, lifecycle, and event routing."""
@@ -16,6 +33,7 @@ class AgentEngine:
     def __init__(self):
         self.agents: dict[str, BaseAgent] = {}
         self._started = False
+        self._flights: dict[str, _Flight] = {}
 
     def register(self, agent: BaseAgent) -> None:
         """Register an agent with the engine."""
@@ -40,8 +58,9 @@ class AgentEngine:
         # Wire event subscriptions from agents
         for agent in self.agents.values():
             if hasattr(agent, "subscribed_events"):
+                handler = self._event_handler(agent)
                 for evt_type in agent.subscribed_events:
-                    event_bus.subscribe(evt_type, agent.handle_event)
+                    event_bus.subscribe(evt_type, handler)
                     logger.info(
                         f"Agent {agent.agent_id} subscribed to {evt_type}"
                     )
@@ -54,6 +73,18 @@ class AgentEngine:
 
     async def stop(self) -> None:
         """Gracefully shut down all agents."""
+        flights = list(self._flights.items())
+        for agent_id, flight in flights:
+            self.agents[agent_id].request_cancel("shutdown")
+            if flight.follow_up is not None and not flight.follow_up.done():
+                flight.follow_up.cancel()
+            flight.follow_up = None
+        if flights:
+            tasks = [flight.task for _, flight in flights]
+            _, pending = await asyncio.wait(tasks, timeout=SHUTDOWN_GRACE_SEC)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
         for agent in self.agents.values():
             if agent.status == AgentStatus.RUNNING:
                 logger.warning(f"Agent {agent.agent_id} still running during shutdown")
@@ -66,7 +97,12 @@ class AgentEngine:
         agent_id: str,
         context: AgentContext | None = None,
     ) -> AgentResult:
-        """Execute a single agent by ID."""
+        """Execute a single agent by ID (single-flight).
+
+        A trigger that arrives while the agent is running joins the in-flight run when its params
+        match; otherwise it queues one follow-up run that all later triggers share.
+        The run itself is shielded — a caller giving up (e.g. HTTP disconnect) does not cancel it.
+        """
         agent = self.agents.get(agent_id)
         if not agent:
             return AgentResult(
@@ -78,7 +114,98 @@ class AgentEngine:
         if context is None:
             context = AgentContext(trigger="manual")
 
-        return await agent.run(context)
+        flight = self._flights.get(agent_id)
+        if flight is None:
+            return await asyncio.shield(self._start(agent, context))
+
+        if flight.follow_up is None and context.params == flight.context.params:
+            await agent.record_action("joined", f"{context.trigger} trigger joined the in-flight run")
+            return await asyncio.shield(flight.task)
+
+        flight.follow_up_context = context  # 최신 트리거의 params로 실행
+        if flight.follow_up is None:
+            flight.follow_up = waiter = asyncio.get_running_loop().create_future()
+            await agent.record_action("queued", f"{context.trigger} trigger queued a follow-up run")
+        else:
+            waiter = flight.follow_up
+            await agent.record_action("joined", f"{context.trigger} trigger joined the queued follow-up run")
+        return await asyncio.shield(waiter)
+
+    def _start(self, agent: BaseAgent, context: AgentContext) -> asyncio.Task:
+        task = asyncio.create_task(self._execute(agent, context), name=f"agent:{agent.agent_id}")
+        self._flights[agent.agent_id] = _Flight(task=task, context=context)
+        task.add_done_callback(lambda t: self._on_finished(agent, t))
+        return task
+
+    @contextmanager
+    def _preempting(self, agent: BaseAgent) -> Iterator[None]:
+        """Pause lower-priority preemptible runs while ``agent`` works."""
+        paused = [
+            self.agents[agent_id] for agent_id in self._flights
+            if agent_id != agent.agent_id
+            and self.agents[agent_id].preemptible
+            and self.agents[agent_id].priority < agent.priority
+        ]
+        for other in paused:
+            logger.info(f"Agent {agent.agent_id} preempts {other.agent_id}")
+            other.pause()
+        try:
+            yield
+        finally:
+            for other in paused:
+                other.resume()
+
+    async def _execute(self, agent: BaseAgent, context: AgentContext) -> AgentResult:
+        """Run one agent, pausing lower-priority preemptible runs for its duration."""
+        with self._preempting(agent):
+            return await agent.run(context)
+
+    def _event_handler(self, agent: BaseAgent) -> Callable[[AgentEvent], Coroutine]:
+        """Wrap ``agent.handle_event`` with the same preemption and deadline as a run.
+
+        리스크 매니저/주문 실행기는 대부분의 일을 이벤트 핸들러에서 하므로, 우선순위가
+        높은 핸들러도 스캔을 일시정지시키고 응답 없는 핸들러는 run 과 같은 하드 데드라인에서 끊는다.
+        """
+        @functools.wraps(agent.handle_event)
+        async def handle(event: AgentEvent) -> None:
+            timeout = agent.run_timeout() + HARD_DEADLINE_GRACE_SEC
+            with self._preempting(agent):
+                try:
+                    async with asyncio.timeout(timeout):
+                        await agent.handle_event(event)
+                except TimeoutError:
+                    logger.warning(f"Agent {agent.agent_id} handler for {event.event_type} timed out after {timeout:g}s")
+                    await agent.record_action("timeout", f"{event.event_type} handler exceeded {timeout:g}s",
+                                              int(timeout * 1000))
+
+        return handle
+
+    def _on_finished(self, agent: BaseAgent, task: asyncio.Task) -> None:
+        """Release the flight and start the queued follow-up run, if any."""
+        flight = self._flights.get(agent.agent_id)
+        if flight is None or flight.task is not task:
+            return
+        del self._flights[agent.agent_id]
+        if flight.follow_up is None or flight.follow_up.done():
+            return
+
+        waiter = flight.follow_up
+        next_task = self._start(agent, flight.follow_up_context or flight.context)
+
+        def _deliver(done: asyncio.Task) -> None:
+            if waiter.done():
+                return
+            if done.cancelled():
+                waiter.cancel()
+            elif done.exception() is not None:
+                waiter.set_exception(done.exception())
+            else:
+                waiter.set_result(done.result())
+
+        next_task.add_done_callback(_deliver)
+
+    def is_agent_running(self, agent_id: str) -> bool:
+        return agent_id in self._flights
 
     def get_agent(self, agent_id: str) -> BaseAgent | None:
         return self.agents.get(agent_id)
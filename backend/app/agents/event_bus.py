@@ -3,12 +3,14 @@
 import asyncio
 import json
 import logging
+import time
 from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Callable, Coroutine
 
 from app.models.db import execute_insert
+from app.services.metrics import EVENT_BUS_IN_FLIGHT, EVENT_BUS_PENDING_PERSIST, EVENT_HANDLER_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +38,7 @@ class EventBus:
         self._global_listeners: list[Callable] = []
         self._history: deque[AgentEvent] = deque(maxlen=max_history)
         self._lock = asyncio.Lock()
+        self._persist_tasks: set[asyncio.Task] = set()
 
     def subscribe(
         self,
@@ -60,30 +63,53 @@ class EventBus:
             self._history.append(event)
 
         # Fire-and-forget DB persistence
-        asyncio.create_task(self._persist_event(event))
+        EVENT_BUS_PENDING_PERSIST.inc()
+        task = asyncio.create_task(self._persist_event(event))
+        self._persist_tasks.add(task)
+        task.add_done_callback(self._persist_tasks.discard)
 
         logger.info(
             f"Event: {event.event_type} from {event.agent_id} | "
             f"data keys: {list(event.data.keys())}"
         )
 
-        # Notify type-specific subscribers
-        handlers = self._subscribers.get(event.event_type, [])
-        for handler in handlers:
-            try:
-                await handler(event)
-            except Exception as e:
-                logger.error(
-                    f"Event handler error for {event.event_type}: {e}",
-                    exc_info=True,
-                )
-
-        # Notify global listeners (WebSocket push, etc.)
-        for listener in self._global_listeners:
-            try:
-                await listener(event)
-            except Exception as e:
+        EVENT_BUS_IN_FLIGHT.inc()
+        try:
+            # Notify type-specific subscribers
+            handlers = self._subscribers.get(event.event_type, [])
+            for handler in handlers:
+                await self._dispatch(handler, event)
+
+            # Notify global listeners (WebSocket push, etc.)
+            for listener in self._global_listeners:
+                await self._dispatch(listener, event, is_global=True)
+        finally:
+            EVENT_BUS_IN_FLIGHT.dec()
+
+    @staticmethod
+    async def _dispatch(handler: Callable, event: AgentEvent, is_global: bool = False) -> None:
+        """Run one handler, logging (not raising) its errors and recording its latency."""
+        started = time.perf_counter()
+        ok = True
+        try:
+            await handler(event)
+        except Exception as e:
+            ok = False
+            if is_global:
                 logger.error(f"Global listener error: {e}", exc_info=True)
+            else:
+                logger.error(f"Event handler error for {event.event_type}: {e}", exc_info=True)
+        EVENT_HANDLER_SECONDS.observe(
+            time.perf_counter() - started,
+            event_type=event.event_type,
+            handler=getattr(handler, "__qualname__", type(handler).__name__),
+            outcome="ok" if ok else "error",
+        )
+
+    async def drain(self) -> None:
+        """Wait for in-flight event persistence (종료 시 DB 닫기 전, 테스트 루프 종료 전)."""
+        while self._persist_tasks:
+            await asyncio.gather(*self._persist_tasks)
 
     async def _persist_event(self, event: AgentEvent) -> None:
         """Persist event to DB. Errors are suppressed to avoid blocking event delivery."""
@@ -99,6 +125,8 @@ class EventBus:
             )
         except Exception as e:
             logger.warning(f"Failed to persist event {event.event_type}: {e}")
+        finally:
+            EVENT_BUS_PENDING_PERSIST.dec()
 
     def get_history(self, limit: int = 100, event_type: str | None = None) -> list[dict]:
         """Return recent events as dicts, optionally filtered by type."""
@@ -12,8 +12,14 @@ from app.agents.signal_critic import signal_critic
 from app.models.confidence import check_hard_gate
 from app.models.signal import compute_rr_score
 from app.models.composite_score import compute_composite_score
-from app.models.db import execute_insert, execute_query, load_risk_config
+from app.config import settings
+from app.models.db import execute_insert, execute_query
 from app.services.dart_client import dart_client
+from app.services.news_service import fetch_news_batch
+from app.services.risk_config_service import risk_config_service
+from app.services.tick_feed import tick_feed
+from app.services.tracing import span
+from app.services.universe_snapshot import universe_snapshot
 from app.services.market_service import (
     get_batch_charts,
     get_fluctuation_rank,
@@ -24,10 +30,6 @@ from app.services.market_service import (
 
 logger = logging.getLogger(__name__)
 
-# 후보군 최대 종목 수 기본값 (Stage 2 차트 수집 대상)
-DEFAULT_MAX_CANDIDATES = 25
-DEFAULT_MAX_EXPERT_STOCKS = 10
-
 
 def compute_atr_stop_loss_pct(atr: float, price: float, multiplier: float) -> float:
     """ATR 기반 동적 손절율 계산. 반환값은 음수(%)."""
@@ -74,13 +76,26 @@ class MarketScannerAgent(BaseAgent):
     name = "마켓 스캐너"
     role = AgentRole.SCANNER
     allowed_tools = ["domestic_stock"]
+    # 전문가 패널 × 최대 10종목 — 길어질 수 있어 리스크 실행에 양보
+    priority = 0
+    preemptible = True
+    timeout_sec = 1800.0
 
     async def execute(self, context: AgentContext) -> AgentResult:
         """KOSPI200 스크리닝 → 기술적 지표 계산 → 전문가 팀 분석 → 신호 생성."""
-        self._risk_config = await load_risk_config()
+        self._risk_config = await risk_config_service.get()
 
         # Stage 1: KOSPI200 스크리닝
-        candidates = await self._stage1_screening()
+        with span("stage1.screening") as stage:
+            candidates = await self._stage1_screening()
+            if stage is not None:
+                stage.set(candidates=len(candidates))
+        if settings.tick_feed_enabled:
+            try:
+                await tick_feed.set_candidates(c["stock_code"] for c in candidates)
+            except Exception as e:
+                # 실시간 구독 실패는 스캔 결과에 영향 없음 — 재접속 시 watchlist 로 일괄 등록
+                logger.warning(f"Tick feed candidate update failed: {e}")
         if not candidates:
             return AgentResult(
                 success=False,
@@ -89,7 +104,11 @@ class MarketScannerAgent(BaseAgent):
             )
 
         # Stage 2: 차트 수집 + 지표 계산
-        enriched = await self._stage2_enrich(candidates)
+        await self.checkpoint()
+        with span("stage2.charts") as stage:
+            enriched = await self._stage2_enrich(candidates)
+            if stage is not None:
+                stage.set(enriched=len(enriched))
         if not enriched:
             return AgentResult(
                 success=False,
@@ -98,6 +117,7 @@ class MarketScannerAgent(BaseAgent):
             )
 
         # Stage 3 + 4: 전문가 팀 분석 및 신호 생성
+        await self.checkpoint()
         portfolio = await shared_state.get_portfolio()
         portfolio_context = {
             "cash_pct": (
@@ -109,10 +129,21 @@ class MarketScannerAgent(BaseAgent):
             "held_codes": [p.get("stock_code") for p in portfolio.positions],
         }
 
-        max_expert = int(self._risk_config.get("max_expert_stocks", DEFAULT_MAX_EXPERT_STOCKS))
+        max_expert = self._risk_config.max_expert_stocks
+        targets = enriched[:max_expert]  # 설정된 수만큼 전문가 분석
+
+        # 뉴스는 대상 종목 전체를 한 번에 수집/분류 → 종목별 분석은 캐시 사용
+        try:
+            with span("news.batch", targets=len(targets)):
+                await fetch_news_batch([(s.get("stock_name", ""), s["stock_code"]) for s in targets])
+        except Exception as e:
+            logger.warning(f"News batch prefetch failed: {e}")
+
         saved_signals = []
-        for stock_data in enriched[:max_expert]:  # 설정된 수만큼 전문가 분석
-            signal = await self._analyze_stock(stock_data, portfolio_context)
+        for stock_data in targets:
+            await self.checkpoint()  # 종목 단위로 데드라인/선점 확인
+            with span("analyze_stock", stock_code=stock_data["stock_code"]):
+                signal = await self._analyze_stock(stock_data, portfolio_context)
             if signal:
                 saved_signals.append(signal)
 
@@ -123,6 +154,33 @@ class MarketScannerAgent(BaseAgent):
         )
 
     async def _stage1_screening(self) -> list[dict[str, Any]]:
+        """stage1_mode 에 따라 전 종목 스냅샷 점수 또는 순위 API 교차 필터링."""
+        if self._risk_config.stage1_mode == "universe":
+            candidates = await self._stage1_universe()
+            if candidates:
+                return candidates
+            logger.warning("Stage 1: 유니버스 스냅샷 결과 없음 → 순위 API 방식으로 대체")
+        return await self._stage1_rank_screening()
+
+    async def _stage1_universe(self) -> list[dict[str, Any]]:
+        """KOSPI200 전 종목을 스냅샷(멀티시세/실시간 체결)으로 갱신 후 공식대로 점수화."""
+        config = self._risk_config
+        try:
+            kospi200_codes = await get_kospi200_components()
+            if not kospi200_codes:
+                return []
+            refreshed = await universe_snapshot.refresh(kospi200_codes, config.stage1_max_quote_age_sec)
+            candidates = universe_snapshot.rank(config.stage1_score_formula, kospi200_codes, config.max_candidates)
+        except Exception as e:
+            logger.error(f"Stage 1 universe screening failed: {e}")
+            return []
+        logger.info(
+            f"Stage 1: 유니버스 {len(kospi200_codes)}개 (시세 갱신 {refreshed['quotes']}, "
+            f"기준선 {refreshed['baselines']}) → 상위 {len(candidates)}개 선별"
+        )
+        return candidates
+
+    async def _stage1_rank_screening(self) -> list[dict[str, Any]]:
         """거래량/등락률 TOP50을 KOSPI200과 교차 필터링.
 
         Note: fastmcp SSE 클라이언트가 단일 세션에서 동시 호출을 지원하지 않아
@@ -181,7 +239,7 @@ class MarketScannerAgent(BaseAgent):
                 }
             scores[code]["score"] += (50 - rank)
 
-        max_candidates = int(self._risk_config.get("max_candidates", DEFAULT_MAX_CANDIDATES))
+        max_candidates = self._risk_config.max_candidates
         logger.info(f"Stage 1: 후보군 {len(scores)}개 종목 추출 (상위 {max_candidates}개 선별)")
         return sorted(scores.values(), key=lambda x: x["score"], reverse=True)[:max_candidates]
 
@@ -240,23 +298,26 @@ class MarketScannerAgent(BaseAgent):
         }
 
         # --- Stage 2.6: Fetch DART fundamentals ---
-        dart_result = await dart_client.fetch(stock_code, current_price=current_price)
+        with span("stage2.6.dart"):
+            dart_result = await dart_client.fetch(stock_code, current_price=current_price)
         dart_financials = dart_result.get("financials")
         confidence_grades.update(dart_result.get("confidence_grades", {}))
 
         # --- Stage 2.65: Fetch foreign/institutional trend ---
         from app.services.market_service import get_investor_trend
-        investor_trend = await get_investor_trend(stock_code)
+        with span("stage2.65.investor_trend"):
+            investor_trend = await get_investor_trend(stock_code)
         data_package["investor_trend"] = investor_trend
         metadata["investor_trend"] = investor_trend
 
         # --- Stage 2.66: Fetch insider trades ---
-        insider_trades = await dart_client.fetch_insider_trades(stock_code)
+        with span("stage2.66.insider_trades"):
+            insider_trades = await dart_client.fetch_insider_trades(stock_code)
         data_package["insider_trades"] = insider_trades
         metadata["insider_trades"] = insider_trades[:3]
 
         # --- Stage 2.7: Hard gate check ---
-        dart_per_required = self._risk_config.get("dart_per_required", "true").lower() != "false"
+        dart_per_required = self._risk_config.dart_per_required
         gate_passed, failed_fields = check_hard_gate(confidence_grades, dart_per_required=dart_per_required)
         if not gate_passed:
             await self._reject_signal_confidence(stock_info, confidence_grades, failed_fields)
@@ -269,8 +330,8 @@ class MarketScannerAgent(BaseAgent):
         stoch = indicators.get("stochastic") or {}
         stoch_k = stoch.get("k")
         vol_change_5d = indicators.get("volume_change_5d_pct")
-        overbought_threshold = float(self._risk_config.get("overbought_stoch_k", "80"))
-        vol_collapse_threshold = float(self._risk_config.get("vol_collapse_pct", "-50"))
+        overbought_threshold = self._risk_config.overbought_stoch_k
+        vol_collapse_threshold = self._risk_config.vol_collapse_pct
 
         if (
             stoch_k is not None
@@ -296,13 +357,16 @@ class MarketScannerAgent(BaseAgent):
             }
 
         # Stage 3: 전문가 병렬 분석
-        expert_analyses = await run_expert_panel(data_package, dart_financials=dart_financials)
+        await self.checkpoint()
+        with span("stage3.expert_panel"):
+            expert_analyses = await run_expert_panel(data_package, dart_financials=dart_financials)
         if not expert_analyses:
             return None
 
         # Fetch peer comparison data
         from app.services.peer_service import get_sector_peers
-        peer_data = await get_sector_peers(stock_code, max_peers=3)
+        with span("peers"):
+            peer_data = await get_sector_peers(stock_code, max_peers=3)
         data_package["peer_comparison"] = peer_data
         metadata["peer_comparison"] = {
             "sector": peer_data.get("sector"),
@@ -311,7 +375,8 @@ class MarketScannerAgent(BaseAgent):
 
         # DCF valuation
         from app.services.valuation_service import get_or_compute_dcf
-        dcf_result = await get_or_compute_dcf(stock_code, dart_client)
+        with span("dcf"):
+            dcf_result = await get_or_compute_dcf(stock_code, dart_client)
         if dcf_result and dcf_result.get("fair_value"):
             data_package["dcf_valuation"] = dcf_result
             metadata["dcf_valuation"] = {
@@ -325,11 +390,13 @@ class MarketScannerAgent(BaseAgent):
         metadata["news_summary"] = data_package.get("news_summary", {})
 
         # --- Stage 4: Chief Analyst debate ---
-        signal_analysis = await run_chief_debate(
-            stock_info, expert_analyses, portfolio_context,
-            dart_financials=dart_financials,
-            critic_feedback=None,
-        )
+        await self.checkpoint()
+        with span("stage4.chief_debate"):
+            signal_analysis = await run_chief_debate(
+                stock_info, expert_analyses, portfolio_context,
+                dart_financials=dart_financials,
+                critic_feedback=None,
+            )
         if not signal_analysis:
             logger.warning(f"Chief debate returned None for {stock_code}")
             return None
@@ -351,25 +418,28 @@ class MarketScannerAgent(BaseAgent):
         )
 
         # --- Stage 5: Critic review ---
-        critic_passed, critic_feedback = await signal_critic.review(
-            signal_analysis, expert_analyses, confidence_grades
-        )
+        with span("stage5.critic"):
+            critic_passed, critic_feedback = await signal_critic.review(
+                signal_analysis, expert_analyses, confidence_grades
+            )
 
         if not critic_passed:
             # One revision attempt — re-run Chief with critique injected
             logger.info(f"Critic failed for {stock_code}, requesting revision...")
-            signal_analysis = await run_chief_debate(
-                stock_info, expert_analyses, portfolio_context,
-                dart_financials=dart_financials,
-                critic_feedback=critic_feedback,
-            )
+            with span("stage4.chief_debate", revision=True):
+                signal_analysis = await run_chief_debate(
+                    stock_info, expert_analyses, portfolio_context,
+                    dart_financials=dart_financials,
+                    critic_feedback=critic_feedback,
+                )
             if signal_analysis:
                 signal_analysis.rr_score = compute_rr_score(
                     signal_analysis.bull, signal_analysis.base, signal_analysis.bear
                 )
-                critic_passed, critic_feedback = await signal_critic.review(
-                    signal_analysis, expert_analyses, confidence_grades
-                )
+                with span("stage5.critic", revision=True):
+                    critic_passed, critic_feedback = await signal_critic.review(
+                        signal_analysis, expert_analyses, confidence_grades
+                    )
 
         if not critic_passed or not signal_analysis:
             # Final rejection
@@ -396,15 +466,15 @@ class MarketScannerAgent(BaseAgent):
 
         # --- Stage 4.5: Multi-factor composite score ---
         factor_weights = {
-            "rr_ratio": float(self._risk_config.get("weight_rr_ratio", "0.25")),
-            "expert_consensus": float(self._risk_config.get("weight_expert_consensus", "0.25")),
-            "fundamental": float(self._risk_config.get("weight_fundamental", "0.20")),
-            "technical": float(self._risk_config.get("weight_technical", "0.20")),
-            "institutional": float(self._risk_config.get("weight_institutional", "0.10")),
+            "rr_ratio": self._risk_config.weight_rr_ratio,
+            "expert_consensus": self._risk_config.weight_expert_consensus,
+            "fundamental": self._risk_config.weight_fundamental,
+            "technical": self._risk_config.weight_technical,
+            "institutional": self._risk_config.weight_institutional,
         }
         composite_score = compute_composite_score(
             rr_score=signal_analysis.rr_score,
-            calibration_ceiling=float(self._risk_config.get("calibration_ceiling", "2.0")),
+            calibration_ceiling=self._risk_config.calibration_ceiling,
             expert_analyses=expert_analyses,
             dart_financials=dart_financials,
             technicals=indicators,
@@ -416,8 +486,7 @@ class MarketScannerAgent(BaseAgent):
         # --- Stage 5.5: Investment horizon + ATR-based stop-loss ---
         investment_horizon = determine_investment_horizon(indicators, dart_financials)
         atr_14 = indicators.get("atr_14")
-        multiplier_key = f"atr_stop_loss_multiplier_{investment_horizon}"
-        atr_multiplier = float(self._risk_config.get(multiplier_key, "2.0"))
+        atr_multiplier = self._risk_config.multiplier_for(investment_horizon)
         atr_stop_loss_pct = (
             compute_atr_stop_loss_pct(atr_14, current_price, atr_multiplier)
             if atr_14 and current_price > 0
@@ -476,6 +545,11 @@ class MarketScannerAgent(BaseAgent):
                        updated_at = datetime('now')""",
                 (stock_code, atr_stop_loss_pct, atr_14, atr_multiplier, investment_horizon),
             )
+            await self.emit_event("risk.thresholds_updated", {
+                "stock_code": stock_code,
+                "stop_loss_pct": atr_stop_loss_pct,
+                "source": "scanner",
+            })
 
         # Save signal snapshot for history tracking
         from app.services.signal_history_service import save_signal_snapshot
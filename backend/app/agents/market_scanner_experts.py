@@ -11,6 +11,7 @@ import anthropic
 
 from app.config import settings
 from app.models.signal import SignalAnalysis, Scenario, compute_rr_score
+from app.services.metrics import observe_claude
 from app.services.runtime_settings import runtime_settings
 
 logger = logging.getLogger(__name__)
@@ -89,11 +90,11 @@ async def _call_expert(
 
     error_msg = "API error"
     try:
-        response = await client.messages.create(
+        response = await observe_claude(persona, client.messages.create(
             model=model,
             max_tokens=max_tokens,
             messages=[{"role": "user", "content": prompt}],
-        )
+        ))
         text = "".join(b.text for b in response.content if hasattr(b, "text"))
         result = _parse_json_response(text)
         if result:
@@ -163,11 +164,11 @@ DART 재무 데이터:
 
         client = _get_claude_client()
         model, _ = _get_model()
-        response = await client.messages.create(
+        response = await observe_claude("기본적분석가", client.messages.create(
             model=model,
             max_tokens=500,
             messages=[{"role": "user", "content": prompt}],
-        )
+        ))
         text = "".join(b.text for b in response.content if hasattr(b, "text"))
         result = _parse_json_response(text)
         if result:
@@ -207,7 +208,8 @@ JSON으로만 응답:
 
         model, max_tokens = _get_model()
         client = _get_claude_client()
-        resp = await client.messages.create(model=model, max_tokens=max_tokens, messages=[{"role": "user", "content": prompt}])
+        resp = await observe_claude("뉴스/매크로 분석가", client.messages.create(
+            model=model, max_tokens=max_tokens, messages=[{"role": "user", "content": prompt}]))
         parsed = _parse_json_response(resp.content[0].text)
         return parsed or {"persona": "뉴스/매크로 분석가", "view": "neutral", "key_signals": [], "confidence": 0.3, "concern": "분석 실패"}
 
@@ -304,12 +306,12 @@ async def run_chief_debate(
 ```"""
 
     try:
-        response = await client.messages.create(
+        response = await observe_claude("chief_analyst", client.messages.create(
             model=model,
             max_tokens=2048,
             system="You are a financial analyst. Always end your response with a JSON code block wrapped in ```json ... ```. Keep analysis brief and focus on the final JSON output.",
             messages=[{"role": "user", "content": prompt}],
-        )
+        ))
         text = "".join(b.text for b in response.content if hasattr(b, "text"))
         raw = _parse_json_response(text)
         if not raw:
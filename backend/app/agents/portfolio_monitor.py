@@ -1,11 +1,13 @@
 """Portfolio Monitor Agent — tracks positions, balances, and P/L."""
 
-import json
 import logging
 
 from app.agents.base import AgentContext, AgentResult, AgentRole, BaseAgent
 from app.agents.state import PortfolioCache, shared_state
-from app.models.db import execute_insert, execute_query
+from app.config import settings
+from app.models.db import execute_query
+from app.services import portfolio_service
+from app.services.risk_config_service import risk_config_service
 
 logger = logging.getLogger(__name__)
 
@@ -15,13 +17,15 @@ class PortfolioMonitorAgent(BaseAgent):
     name = "포트폴리오 모니터"
     role = AgentRole.MONITOR
     allowed_tools = ["domestic_stock"]
+    priority = 10
+    timeout_sec = 120.0
 
     async def execute(self, context: AgentContext) -> AgentResult:
         """Fetch portfolio balance and positions, save snapshot, emit event."""
 
         # 1. Fetch balance from MCP
         try:
-            balance_raw = await self.call_mcp_tool(
+            balance = await self.call_mcp_tool_result(
                 "domestic_stock",
                 {
                     "api_type": "inquire_balance",
@@ -49,75 +53,45 @@ class PortfolioMonitorAgent(BaseAgent):
         cash_balance = 0.0
         total_pnl = 0.0
 
-        try:
-            raw_data = json.loads(balance_raw) if isinstance(balance_raw, str) else balance_raw
-
-            # MCP response wraps KIS data: {"ok": true, "data": {"data": "JSON_STRING", ...}}
-            data = raw_data
-            if isinstance(data, dict) and "data" in data:
-                inner = data["data"]
-                if isinstance(inner, dict) and "data" in inner:
-                    # Double-wrapped: parse the inner JSON string
-                    inner_data = inner["data"]
-                    if isinstance(inner_data, str):
-                        data = json.loads(inner_data)
-                    else:
-                        data = inner_data
-                elif isinstance(inner, str):
-                    data = json.loads(inner)
-                else:
-                    data = inner
+        # Detect MCP-level errors (e.g. timeout, subprocess failure, KIS rejection)
+        if not balance.ok:
+            logger.warning("MCP returned error for inquire_balance: %s", balance.error)
+            return AgentResult(
+                success=False,
+                summary=f"KIS API 호출 실패: {balance.error}",
+                error=balance.error,
+            )
 
-            # Detect MCP-level errors (e.g. timeout, subprocess failure)
-            if isinstance(data, dict) and data.get("success") is False:
-                error_msg = data.get("error", "unknown MCP error")
-                logger.warning("MCP returned error for inquire_balance: %s", error_msg)
-                return AgentResult(
-                    success=False,
-                    summary=f"KIS API 호출 실패: {error_msg}",
-                    error=error_msg,
+        try:
+            # KIS balance response: output1 = holdings, output2 = account summary
+            for item in balance.records("output1") or balance.records("output"):
+                pos = self._parse_position(item)
+                if pos:
+                    positions.append(pos)
+
+            summary = balance.first("output2")
+            if summary:
+                def _f(key: str) -> float:
+                    """Convert KIS string field to float (returns 0.0 for '0' or missing)."""
+                    return float(summary.get(key) or 0)
+
+                total_value = _f("tot_evlu_amt")
+                # nxdy_excc_amt(익일정산금액) reflects today's unsettled buy/sell;
+                # dnca_tot_amt is settled-only and lags by T+2.
+                cash_balance = (
+                    _f("nxdy_excc_amt")
+                    or _f("dnca_tot_amt")
+                    or _f("prvs_rcdl_excc_amt")
                 )
-
-            # Parse KIS balance response structure
-            if isinstance(data, list):
-                for item in data:
-                    pos = self._parse_position(item)
-                    if pos:
-                        positions.append(pos)
-            elif isinstance(data, dict):
-                if "output1" in data:
-                    items = data["output1"]
-                    if isinstance(items, list):
-                        for item in items:
-                            pos = self._parse_position(item)
-                            if pos:
-                                positions.append(pos)
-                if "output2" in data:
-                    summary = data["output2"]
-                    if isinstance(summary, list) and summary:
-                        summary = summary[0]
-                    if isinstance(summary, dict):
-                        def _f(key: str) -> float:
-                            """Convert KIS string field to float (returns 0.0 for '0' or missing)."""
-                            return float(summary.get(key) or 0)
-
-                        total_value = _f("tot_evlu_amt")
-                        # nxdy_excc_amt(익일정산금액) reflects today's unsettled buy/sell;
-                        # dnca_tot_amt is settled-only and lags by T+2.
-                        cash_balance = (
-                            _f("nxdy_excc_amt")
-                            or _f("dnca_tot_amt")
-                            or _f("prvs_rcdl_excc_amt")
-                        )
-                        total_pnl = _f("evlu_pfls_smtl_amt")
-                        logger.info(
-                            "KIS output2 — tot_evlu_amt=%s nxdy_excc_amt=%s dnca_tot_amt=%s",
-                            summary.get("tot_evlu_amt"),
-                            summary.get("nxdy_excc_amt"),
-                            summary.get("dnca_tot_amt"),
-                        )
-        except (json.JSONDecodeError, TypeError, ValueError) as e:
-            logger.warning(f"Balance parse partial failure: {e}, raw: {str(balance_raw)[:500]}")
+                total_pnl = _f("evlu_pfls_smtl_amt")
+                logger.info(
+                    "KIS output2 — tot_evlu_amt=%s nxdy_excc_amt=%s dnca_tot_amt=%s",
+                    summary.get("tot_evlu_amt"),
+                    summary.get("nxdy_excc_amt"),
+                    summary.get("dnca_tot_amt"),
+                )
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Balance parse partial failure: {e}, outputs: {list(balance.outputs)}")
 
         # Fallback to last *valid* snapshot when KIS API returns garbage (parse failure → all zeros)
         if total_value == 0 and cash_balance == 0 and not positions:
@@ -150,44 +124,20 @@ class PortfolioMonitorAgent(BaseAgent):
 
         total_pnl_pct = (total_pnl / (total_value - total_pnl) * 100) if (total_value - total_pnl) > 0 else 0.0
 
-        # 3. Save snapshot to DB
-        snapshot_id = await execute_insert(
-            """INSERT INTO portfolio_snapshots
-               (total_value, cash_balance, total_pnl, total_pnl_pct, positions_json)
-               VALUES (?, ?, ?, ?, ?)""",
-            (total_value, cash_balance, total_pnl, round(total_pnl_pct, 2), json.dumps(positions, ensure_ascii=False)),
+        # 3. Save snapshot + positions to DB (single transaction)
+        snapshot_id = await portfolio_service.save_snapshot(
+            total_value,
+            cash_balance,
+            total_pnl,
+            round(total_pnl_pct, 2),
+            positions,
+            compact=settings.position_storage != "legacy",
         )
 
-        # Save individual positions
-        for pos in positions:
-            await execute_insert(
-                """INSERT INTO positions
-                   (snapshot_id, stock_code, stock_name, quantity, avg_buy_price,
-                    current_price, market_value, unrealized_pnl, unrealized_pnl_pct)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    snapshot_id,
-                    pos.get("stock_code", ""),
-                    pos.get("stock_name", ""),
-                    pos.get("quantity", 0),
-                    pos.get("avg_buy_price", 0),
-                    pos.get("current_price", 0),
-                    pos.get("market_value", 0),
-                    pos.get("unrealized_pnl", 0),
-                    pos.get("unrealized_pnl_pct", 0),
-                ),
-            )
-
         # Auto-set initial capital on first run
-        existing_ic = await execute_query(
-            "SELECT value FROM risk_config WHERE key = 'initial_capital'",
-            fetch_one=True,
-        )
-        if not existing_ic and cash_balance > 0:
-            await execute_query(
-                "INSERT INTO risk_config (key, value) VALUES ('initial_capital', ?) "
-                "ON CONFLICT(key) DO NOTHING",
-                (str(cash_balance),),
+        if not (await risk_config_service.get()).initial_capital and cash_balance > 0:
+            await risk_config_service.update(
+                {"initial_capital": cash_balance}, source=self.agent_id, only_missing=True
             )
             logger.info(f"Initial capital set: {cash_balance:,.0f}")
 
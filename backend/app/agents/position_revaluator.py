@@ -6,7 +6,9 @@ import logging
 from app.agents.base import AgentContext, AgentResult, AgentRole, BaseAgent
 from app.agents.market_scanner_indicators import compute_all_indicators
 from app.agents.state import shared_state
-from app.models.db import execute_insert, execute_query, load_risk_config
+from app.models.db import execute_insert, execute_query
+from app.models.risk_config import RiskConfig
+from app.services.risk_config_service import risk_config_service
 from app.services.market_service import get_batch_charts, parse_ohlcv_from_chart
 
 logger = logging.getLogger(__name__)
@@ -17,11 +19,13 @@ class PositionRevaluatorAgent(BaseAgent):
     name = "포지션 재평가"
     role = AgentRole.MONITOR
     allowed_tools = ["domestic_stock"]
+    priority = 5
+    timeout_sec = 600.0
 
     async def execute(self, context: AgentContext) -> AgentResult:
         """Re-evaluate all held positions: health check + trailing stop."""
-        risk_config = await load_risk_config()
-        if risk_config.get("position_reeval_enabled", "true").lower() == "false":
+        risk_config = await risk_config_service.get()
+        if not risk_config.position_reeval_enabled:
             return AgentResult(success=True, summary="재평가 비활성화 상태")
 
         portfolio = await shared_state.get_portfolio()
@@ -30,6 +34,7 @@ class PositionRevaluatorAgent(BaseAgent):
 
         results = []
         for pos in portfolio.positions:
+            await self.checkpoint()
             eval_result = await self._revaluate_position(pos, risk_config)
             if eval_result:
                 results.append(eval_result)
@@ -44,7 +49,7 @@ class PositionRevaluatorAgent(BaseAgent):
         )
 
     async def _revaluate_position(
-        self, pos: dict, risk_config: dict
+        self, pos: dict, risk_config: RiskConfig
     ) -> dict | None:
         """Re-evaluate a single position."""
         stock_code = pos.get("stock_code", "")
@@ -165,7 +170,7 @@ class PositionRevaluatorAgent(BaseAgent):
         stock_code: str,
         indicators: dict,
         current_price: float,
-        risk_config: dict,
+        risk_config: RiskConfig,
     ) -> float | None:
         """Trailing stop: tighten stop-loss if ATR suggests tighter level."""
         row = await execute_query(
@@ -181,8 +186,7 @@ class PositionRevaluatorAgent(BaseAgent):
             return None
 
         horizon = row.get("investment_horizon", "short")
-        multiplier_key = f"atr_stop_loss_multiplier_{horizon}"
-        multiplier = float(risk_config.get(multiplier_key, "2.0"))
+        multiplier = risk_config.multiplier_for(horizon)
         new_stop_pct = -round((atr * multiplier) / current_price * 100, 2)
 
         old_stop = float(row.get("stop_loss_pct", -3.0))
@@ -198,6 +202,11 @@ class PositionRevaluatorAgent(BaseAgent):
             logger.info(
                 f"Trailing stop tightened: {stock_code} {old_stop}% → {new_stop_pct}%"
             )
+            await self.emit_event("risk.thresholds_updated", {
+                "stock_code": stock_code,
+                "stop_loss_pct": new_stop_pct,
+                "source": "reeval",
+            })
             return new_stop_pct
 
         return None
@@ -9,6 +9,8 @@ import anthropic
 from app.agents.base import AgentContext, AgentResult, AgentRole, BaseAgent
 from app.config import settings
 from app.models.db import execute_insert, execute_query
+from app.services import portfolio_service
+from app.services.metrics import observe_claude
 from app.services.runtime_settings import runtime_settings
 
 logger = logging.getLogger(__name__)
@@ -19,6 +21,7 @@ class ReportGeneratorAgent(BaseAgent):
     name = "리포트 생성기"
     role = AgentRole.REPORTER
     allowed_tools = ["domestic_stock"]
+    timeout_sec = 600.0
 
     async def execute(self, context: AgentContext) -> AgentResult:
         """Generate a performance report for the given period."""
@@ -36,7 +39,7 @@ class ReportGeneratorAgent(BaseAgent):
         # 1. Gather data for the report
         data = await self._gather_report_data(period_start, period_end)
 
-        if not data.get("snapshots") and not data.get("orders"):
+        if not data.get("snapshot_count") and not data.get("orders"):
             return AgentResult(
                 success=True,
                 summary=f"{report_type} 리포트: 해당 기간 데이터 없음",
@@ -90,18 +93,8 @@ class ReportGeneratorAgent(BaseAgent):
 
         win_rate = 0.0
 
-        # Max drawdown from snapshot series
-        max_drawdown_pct = 0.0
-        if len(snapshots) >= 2:
-            peak = snapshots[0].get("total_value", 0)
-            for snap in snapshots[1:]:
-                val = snap.get("total_value", 0)
-                if val > peak:
-                    peak = val
-                elif peak > 0:
-                    dd = (peak - val) / peak * 100
-                    if dd > max_drawdown_pct:
-                        max_drawdown_pct = dd
+        # Max drawdown from value rollups (or a raw snapshot series)
+        max_drawdown_pct = portfolio_service.max_drawdown_pct(data.get("value_rollups") or snapshots)
 
         # Signal approval rate
         approved = sum(1 for s in signals if s.get("status") in ("approved", "executed"))
@@ -155,14 +148,10 @@ class ReportGeneratorAgent(BaseAgent):
         """Collect all relevant data for the report period."""
         data: dict = {}
 
-        # Portfolio snapshots
-        snapshots = await execute_query(
-            """SELECT * FROM portfolio_snapshots
-               WHERE date(timestamp) >= date(?) AND date(timestamp) <= date(?)
-               ORDER BY timestamp""",
-            (period_start, period_end),
-        )
-        data["snapshots"] = snapshots or []
+        # Portfolio value — hourly rollups instead of raw snapshots
+        rollups = await portfolio_service.get_value_rollups(start=period_start, end=period_end)
+        data["value_rollups"] = rollups or []
+        data["snapshot_count"] = sum(r["snapshot_count"] for r in rollups or [])
 
         # Latest snapshot
         latest = await execute_query(
@@ -176,7 +165,7 @@ class ReportGeneratorAgent(BaseAgent):
         # Orders
         orders = await execute_query(
             """SELECT * FROM orders
-               WHERE date(timestamp) >= date(?) AND date(timestamp) <= date(?)
+               WHERE timestamp >= date(?) AND timestamp < date(?, '+1 day')
                ORDER BY timestamp""",
             (period_start, period_end),
         )
@@ -187,7 +176,7 @@ class ReportGeneratorAgent(BaseAgent):
         # Signals
         signals = await execute_query(
             """SELECT * FROM signals
-               WHERE date(timestamp) >= date(?) AND date(timestamp) <= date(?)
+               WHERE timestamp >= date(?) AND timestamp < date(?, '+1 day')
                ORDER BY timestamp""",
             (period_start, period_end),
         )
@@ -200,7 +189,7 @@ class ReportGeneratorAgent(BaseAgent):
                       SUM(CASE WHEN success=1 THEN 1 ELSE 0 END) as success_count,
                       AVG(duration_ms) as avg_duration
                FROM agent_logs
-               WHERE date(timestamp) >= date(?) AND date(timestamp) <= date(?)
+               WHERE timestamp >= date(?) AND timestamp < date(?, '+1 day')
                GROUP BY agent_id""",
             (period_start, period_end),
         )
@@ -219,7 +208,7 @@ class ReportGeneratorAgent(BaseAgent):
         summary = {
             "기간": f"{period_start} ~ {period_end}",
             "유형": "일일" if report_type == "daily" else "주간",
-            "포트폴리오_스냅샷_수": len(data.get("snapshots", [])),
+            "포트폴리오_스냅샷_수": data.get("snapshot_count", 0),
             "최근_총자산": data.get("latest_snapshot", {}).get("total_value", 0),
             "최근_현금": data.get("latest_snapshot", {}).get("cash_balance", 0),
             "최근_손익": data.get("latest_pnl", 0),
@@ -275,11 +264,11 @@ class ReportGeneratorAgent(BaseAgent):
 
         try:
             client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
-            response = await client.messages.create(
+            response = await observe_claude("report_generator", client.messages.create(
                 model=model,
                 max_tokens=min(max_tokens, 4096),
                 messages=[{"role": "user", "content": prompt}],
-            )
+            ))
 
             text = ""
             for block in response.content:
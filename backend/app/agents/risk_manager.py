@@ -5,7 +5,10 @@ import logging
 from app.agents.base import AgentContext, AgentResult, AgentRole, BaseAgent
 from app.agents.event_bus import AgentEvent
 from app.agents.state import shared_state
+from app.agents.trigger_book import trigger_book
 from app.models.db import execute_query
+from app.models.risk_config import RiskConfig
+from app.services.risk_config_service import risk_config_service
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +18,14 @@ class RiskManagerAgent(BaseAgent):
     name = "리스크 관리자"
     role = AgentRole.RISK
     allowed_tools = ["domestic_stock"]
+    priority = 10
+    timeout_sec = 120.0
 
     # Events this agent subscribes to
-    subscribed_events = ["portfolio.updated", "signal.generated", "order.filled", "order.failed"]
+    subscribed_events = [
+        "portfolio.updated", "signal.generated", "order.filled", "order.failed",
+        "risk.thresholds_updated",
+    ]
 
     def __init__(self) -> None:
         super().__init__()
@@ -31,13 +39,18 @@ class RiskManagerAgent(BaseAgent):
         if not portfolio.positions:
             return AgentResult(success=True, summary="포지션 없음, 리스크 체크 스킵")
 
-        risk_config = await self._load_risk_config()
+        risk_config = await risk_config_service.get()
         alerts = await self._check_position_thresholds(portfolio.positions, risk_config)
 
         return AgentResult(
             success=True,
             summary=f"리스크 체크 완료. 알림: {len(alerts)}건",
-            data={"alerts": alerts, "risk_config": risk_config},
+            data={
+                "alerts": alerts,
+                "risk_config": risk_config.to_dict(),
+                "triggers": trigger_book.snapshot(),
+                "trigger_latency": trigger_book.latency_stats(),
+            },
         )
 
     async def handle_event(self, event: AgentEvent) -> None:
@@ -48,6 +61,8 @@ class RiskManagerAgent(BaseAgent):
             await self._on_signal_generated(event)
         elif event.event_type in ("order.filled", "order.failed"):
             self._on_order_completed(event)
+        elif event.event_type == "risk.thresholds_updated":
+            await self._on_thresholds_updated(event)
 
     def _on_order_completed(self, event: AgentEvent) -> None:
         """Clear duplicate prevention cache when an order completes (filled or failed)."""
@@ -63,84 +78,78 @@ class RiskManagerAgent(BaseAgent):
         if not positions:
             return
 
-        risk_config = await self._load_risk_config()
-        await self._check_position_thresholds(positions, risk_config)
-
-    async def _get_stock_thresholds(
-        self, stock_code: str, global_stop: float, global_tp: float
-    ) -> tuple[float, float]:
-        """Get per-stock stop-loss/take-profit, falling back to global."""
-        row = await execute_query(
-            "SELECT stop_loss_pct, take_profit_pct FROM stock_stop_loss_overrides WHERE stock_code = ?",
-            (stock_code,),
-            fetch_one=True,
-        )
-        if row:
-            sl = float(row["stop_loss_pct"]) if row.get("stop_loss_pct") is not None else global_stop
-            tp = float(row["take_profit_pct"]) if row.get("take_profit_pct") is not None else global_tp
-            return sl, tp
-        return global_stop, global_tp
+        await self._check_position_thresholds(positions, risk_config_service.current)
+
+    async def _on_thresholds_updated(self, event: AgentEvent) -> None:
+        """Reload a stock's override so only its triggers are recomputed.
+
+        이미 발동한 트리거는 새 임계값에서도 가격이 여전히 넘어서 있으면 그대로 둔다 —
+        매도 주문이 진행 중일 수 있으므로 재무장은 order.filled/order.failed 에 맡긴다.
+        """
+        stock_code = event.data.get("stock_code")
+        await trigger_book.load_overrides(stock_code)
+        if not stock_code:
+            return
+        armed = [kind for kind in ("stop_loss", "take_profit") if (stock_code, kind) in self._emitted_risk_events]
+        if not armed:
+            return
+        portfolio = await shared_state.get_portfolio()
+        pos = next((p for p in portfolio.positions if p.get("stock_code") == stock_code), None)
+        if pos is None:
+            return
+        crossed = trigger_book.check(stock_code, float(pos.get("current_price", 0) or 0))
+        for kind in armed:
+            if crossed is None or crossed.kind != kind:
+                self._emitted_risk_events.discard((stock_code, kind))
 
     async def _check_position_thresholds(
-        self, positions: list[dict], risk_config: dict
+        self, positions: list[dict], risk_config: RiskConfig
     ) -> list[dict]:
-        """Check positions against per-stock or global risk thresholds."""
-        global_stop = float(risk_config.get("stop_loss_pct", -3.0))
-        global_tp = float(risk_config.get("take_profit_pct", 5.0))
-        alerts = []
+        """Check positions against the trigger book (per-stock or global thresholds)."""
+        trigger_book.set_global_thresholds(risk_config.stop_loss_pct, risk_config.take_profit_pct)
+        if not trigger_book.overrides_loaded:
+            await trigger_book.load_overrides()
+        trigger_book.sync_positions(positions)
 
+        alerts = []
         for pos in positions:
-            pnl_pct = pos.get("unrealized_pnl_pct", 0)
             stock_code = pos.get("stock_code", "")
-            stock_name = pos.get("stock_name", "")
-
-            effective_stop, effective_tp = await self._get_stock_thresholds(
-                stock_code, global_stop, global_tp
-            )
+            trigger = trigger_book.check(stock_code, float(pos.get("current_price", 0) or 0))
+            if trigger is None:
+                continue
 
-            if pnl_pct <= effective_stop:
-                event_key = (stock_code, "stop_loss")
-                if event_key in self._emitted_risk_events:
-                    logger.debug(
-                        f"STOP-LOSS already emitted for {stock_name}({stock_code}), skipping"
-                    )
-                    continue
-                alert = {
-                    "type": "stop_loss",
-                    "stock_code": stock_code,
-                    "stock_name": stock_name,
-                    "pnl_pct": pnl_pct,
-                    "threshold": effective_stop,
-                    "quantity": pos.get("quantity", 0),
-                }
-                alerts.append(alert)
-                self._emitted_risk_events.add(event_key)
+            triggered_at = trigger_book.now()
+            stock_name = pos.get("stock_name", "")
+            pnl_pct = pos.get("unrealized_pnl_pct", 0)
+            event_key = (stock_code, trigger.kind)
+            if event_key in self._emitted_risk_events:
+                logger.debug(
+                    f"{trigger.kind} already emitted for {stock_name}({stock_code}), skipping"
+                )
+                continue
+
+            alert = {
+                "type": trigger.kind,
+                "stock_code": stock_code,
+                "stock_name": stock_name,
+                "pnl_pct": pnl_pct,
+                "threshold": trigger.threshold_pct,
+                "trigger_price": round(trigger.price, 2),
+                "quantity": pos.get("quantity", 0),
+                "triggered_at": triggered_at,
+            }
+            alerts.append(alert)
+            self._emitted_risk_events.add(event_key)
+            if trigger.kind == "stop_loss":
                 logger.warning(
                     f"STOP-LOSS: {stock_name}({stock_code}) at {pnl_pct:.2f}% "
-                    f"(threshold: {effective_stop}%)"
+                    f"(threshold: {trigger.threshold_pct}%)"
                 )
                 await self.emit_event("risk.stop_loss", alert)
-
-            elif pnl_pct >= effective_tp:
-                event_key = (stock_code, "take_profit")
-                if event_key in self._emitted_risk_events:
-                    logger.debug(
-                        f"TAKE-PROFIT already emitted for {stock_name}({stock_code}), skipping"
-                    )
-                    continue
-                alert = {
-                    "type": "take_profit",
-                    "stock_code": stock_code,
-                    "stock_name": stock_name,
-                    "pnl_pct": pnl_pct,
-                    "threshold": effective_tp,
-                    "quantity": pos.get("quantity", 0),
-                }
-                alerts.append(alert)
-                self._emitted_risk_events.add(event_key)
+            else:
                 logger.info(
                     f"TAKE-PROFIT: {stock_name}({stock_code}) at {pnl_pct:.2f}% "
-                    f"(threshold: {effective_tp}%)"
+                    f"(threshold: {trigger.threshold_pct}%)"
                 )
                 await self.emit_event("risk.take_profit", alert)
 
@@ -154,8 +163,8 @@ class RiskManagerAgent(BaseAgent):
             if signal.get("stock_code"):
                 signals = [signal]
 
-        risk_config = await self._load_risk_config()
-        approval_mode = risk_config.get("signal_approval_mode", "auto")
+        risk_config = risk_config_service.current
+        approval_mode = risk_config.signal_approval_mode
         portfolio = await shared_state.get_portfolio()
 
         for signal in signals:
@@ -199,115 +208,119 @@ class RiskManagerAgent(BaseAgent):
                     )
 
     async def _validate_signal(
-        self, signal: dict, risk_config: dict, portfolio
+        self, signal: dict, risk_config: RiskConfig, portfolio
     ) -> str | None:
         """Validate a signal against risk rules. Returns rejection reason or None."""
         direction = signal.get("direction", "")
         stock_code = signal.get("stock_code", "")
 
-        # --- Composite score gate ---
-        confidence = signal.get("confidence")
-        if confidence is not None:
-            min_composite = float(risk_config.get("min_composite_score", "15"))
-            composite_pct = confidence * 100  # confidence is 0–1, threshold is 0–100
-            if composite_pct < min_composite:
-                return f"복합 점수 미달 ({composite_pct:.1f}% < {min_composite:.0f}%)"
-
-        # --- NEW: Critic result gate ---
-        critic_result = signal.get("critic_result")
-        if critic_result is not None and critic_result != "pass":
-            return f"Critic 검증 미통과 ({critic_result})"
-
-        # Check max positions (for buy signals only)
-        if direction == "buy":
-            max_positions = int(risk_config.get("max_positions", 5))
-            current_count = len(portfolio.positions)
-            # Check if we already hold this stock
-            already_held = any(
-                p.get("stock_code") == stock_code for p in portfolio.positions
-            )
-            if not already_held and current_count >= max_positions:
-                return f"최대 포지션 수 초과 ({current_count}/{max_positions})"
-
-            # Check concentration limit
-            max_weight = float(risk_config.get("max_position_weight_pct", 20.0))
-            if portfolio.total_value > 0:
-                # Estimate position value (rough: use confidence as weight proxy)
-                for pos in portfolio.positions:
-                    if pos.get("stock_code") == stock_code:
-                        weight = pos.get("market_value", 0) / portfolio.total_value * 100
-                        if weight >= max_weight:
-                            return f"종목 비중 한도 초과 ({weight:.1f}% >= {max_weight}%)"
-
-            # Check daily loss limit
-            max_daily_loss = float(risk_config.get("max_daily_loss", 500000))
-            if portfolio.total_pnl < -max_daily_loss:
-                return f"일일 손실 한도 초과 ({portfolio.total_pnl:,.0f}원)"
-
-            # Sector concentration gate (buy only)
-            if portfolio:
-                try:
-                    from app.models.db import execute_query as _eq
-                    row = await _eq("SELECT sector FROM kospi200_components WHERE stock_code = ?", (signal.get("stock_code"),))
-                    if row and row[0].get("sector"):
-                        signal_sector = row[0]["sector"]
-                        total_val = portfolio.total_value
-                        if total_val > 0:
-                            sector_weight = 0
-                            for pos in portfolio.positions:
-                                pos_row = await _eq("SELECT sector FROM kospi200_components WHERE stock_code = ?", (pos.get("stock_code"),))
-                                if pos_row and pos_row[0].get("sector") == signal_sector:
-                                    sector_weight += (pos.get("market_value", 0) or 0)
-                            sector_pct = sector_weight / total_val * 100
-                            sector_max = float(risk_config.get("sector_max_pct", 40.0))
-                            if sector_pct > sector_max:
-                                return f"섹터 집중도 초과: {signal_sector} ({sector_pct:.0f}% > {sector_max:.0f}%)"
-                except Exception:
-                    pass  # Graceful degradation if sector data unavailable
-
-        # --- SELL-specific gates ---
-        elif direction == "sell":
-            # Must hold the stock to sell it
-            held = any(
-                p.get("stock_code") == stock_code for p in portfolio.positions
-            )
-            if not held:
-                return f"미보유 종목 매도 불가 ({stock_code})"
-
-            # Optional: minimum hold time check
-            min_hold = int(risk_config.get("min_hold_minutes", 0))
-            if min_hold > 0:
-                try:
-                    from app.models.db import execute_query as _eq
-                    row = await _eq(
-                        "SELECT MIN(timestamp) as first_buy FROM orders "
-                        "WHERE stock_code = ? AND side = 'buy' AND status = 'filled'",
-                        (stock_code,),
-                    )
-                    if row and row[0].get("first_buy"):
-                        from datetime import datetime, timezone
-                        first_buy = datetime.fromisoformat(row[0]["first_buy"])
-                        elapsed = (datetime.now(timezone.utc) - first_buy).total_seconds() / 60
-                        if elapsed < min_hold:
-                            return f"최소 보유 시간 미달 ({elapsed:.0f}분 < {min_hold}분)"
-                except Exception:
-                    pass  # Graceful degradation
+        sector_of: dict[str, str] = {}
+        if direction == "buy" and portfolio:
+            try:
+                codes = [stock_code] + [p.get("stock_code") for p in portfolio.positions]
+                placeholders = ",".join("?" * len(codes))
+                rows = await execute_query(
+                    f"SELECT stock_code, sector FROM kospi200_components WHERE stock_code IN ({placeholders})",
+                    tuple(codes),
+                )
+                sector_of = {r["stock_code"]: r["sector"] for r in rows or [] if r.get("sector")}
+            except Exception:
+                pass  # Graceful degradation if sector data unavailable
+
+        reason = check_signal_limits(signal, risk_config, portfolio, sector_of)
+        if reason:
+            return reason
+
+        # Optional: minimum hold time check (sell only)
+        min_hold = risk_config.min_hold_minutes
+        if direction == "sell" and min_hold > 0:
+            try:
+                row = await execute_query(
+                    "SELECT MIN(timestamp) as first_buy FROM orders "
+                    "WHERE stock_code = ? AND side = 'buy' AND status = 'filled'",
+                    (stock_code,),
+                )
+                if row and row[0].get("first_buy"):
+                    from datetime import datetime, timezone
+                    first_buy = datetime.fromisoformat(row[0]["first_buy"])
+                    elapsed = (datetime.now(timezone.utc) - first_buy).total_seconds() / 60
+                    if elapsed < min_hold:
+                        return f"최소 보유 시간 미달 ({elapsed:.0f}분 < {min_hold}분)"
+            except Exception:
+                pass  # Graceful degradation
 
         return None
 
-    async def _load_risk_config(self) -> dict:
-        """Load risk configuration from database."""
-        try:
-            rows = await execute_query("SELECT key, value FROM risk_config")
-            return {row["key"]: row["value"] for row in rows} if rows else {}
-        except Exception as e:
-            logger.error(f"Failed to load risk config: {e}")
-            return {
-                "stop_loss_pct": "-3.0",
-                "take_profit_pct": "5.0",
-                "max_positions": "5",
-                "max_position_weight_pct": "20.0",
-                "max_daily_loss": "500000",
-                "signal_approval_mode": "auto",
-                "min_composite_score": "15",
-            }
+
+def check_signal_limits(
+    signal: dict, risk_config: RiskConfig, portfolio, sector_of: dict[str, str] | None = None
+) -> str | None:
+    """Synchronous signal gates (no I/O) — shared by the risk manager and the backtester.
+
+    portfolio: positions / total_value / total_pnl 을 가진 객체 (PortfolioCache).
+    sector_of: {stock_code: sector}. 신호 종목의 섹터를 모르면 섹터 집중도 검사는 건너뛴다.
+    """
+    direction = signal.get("direction", "")
+    stock_code = signal.get("stock_code", "")
+
+    # --- Composite score gate ---
+    confidence = signal.get("confidence")
+    if confidence is not None:
+        min_composite = risk_config.min_composite_score
+        composite_pct = confidence * 100  # confidence is 0–1, threshold is 0–100
+        if composite_pct < min_composite:
+            return f"복합 점수 미달 ({composite_pct:.1f}% < {min_composite:.0f}%)"
+
+    # --- Critic result gate ---
+    critic_result = signal.get("critic_result")
+    if critic_result is not None and critic_result != "pass":
+        return f"Critic 검증 미통과 ({critic_result})"
+
+    # Check max positions (for buy signals only)
+    if direction == "buy":
+        max_positions = risk_config.max_positions
+        current_count = len(portfolio.positions)
+        # Check if we already hold this stock
+        already_held = any(
+            p.get("stock_code") == stock_code for p in portfolio.positions
+        )
+        if not already_held and current_count >= max_positions:
+            return f"최대 포지션 수 초과 ({current_count}/{max_positions})"
+
+        # Check concentration limit
+        max_weight = risk_config.max_position_weight_pct
+        if portfolio.total_value > 0:
+            for pos in portfolio.positions:
+                if pos.get("stock_code") == stock_code:
+                    weight = pos.get("market_value", 0) / portfolio.total_value * 100
+                    if weight >= max_weight:
+                        return f"종목 비중 한도 초과 ({weight:.1f}% >= {max_weight}%)"
+
+        # Check daily loss limit
+        max_daily_loss = risk_config.max_daily_loss
+        if portfolio.total_pnl < -max_daily_loss:
+            return f"일일 손실 한도 초과 ({portfolio.total_pnl:,.0f}원)"
+
+        # Sector concentration gate (buy only)
+        signal_sector = (sector_of or {}).get(stock_code)
+        if signal_sector and portfolio.total_value > 0:
+            sector_weight = sum(
+                pos.get("market_value", 0) or 0
+                for pos in portfolio.positions
+                if sector_of.get(pos.get("stock_code")) == signal_sector
+            )
+            sector_pct = sector_weight / portfolio.total_value * 100
+            sector_max = risk_config.sector_max_pct
+            if sector_pct > sector_max:
+                return f"섹터 집중도 초과: {signal_sector} ({sector_pct:.0f}% > {sector_max:.0f}%)"
+
+    # --- SELL-specific gates ---
+    elif direction == "sell":
+        # Must hold the stock to sell it
+        held = any(
+            p.get("stock_code") == stock_code for p in portfolio.positions
+        )
+        if not held:
+            return f"미보유 종목 매도 불가 ({stock_code})"
+
+    return None
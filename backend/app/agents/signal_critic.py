@@ -14,8 +14,10 @@ import logging
 
 from app.config import settings
 from app.models.confidence import CRITICAL_FIELDS
-from app.models.db import execute_insert, load_risk_config
+from app.models.db import execute_insert
 from app.models.signal import SignalAnalysis, compute_rr_score
+from app.services.metrics import observe_claude
+from app.services.risk_config_service import risk_config_service
 
 logger = logging.getLogger(__name__)
 
@@ -38,13 +40,13 @@ class SignalCriticAgent:
         Programmatic checks run first (no Claude call).
         Qualitative checks run only if programmatic pass.
         """
-        self._risk_config = await load_risk_config()
+        self._risk_config = await risk_config_service.get()
         passed, feedback = self._check_programmatic(signal_analysis, confidence_grades)
         if not passed:
             return False, feedback
 
-        check_dissent = self._risk_config.get("critic_check_dissent", "true").lower() != "false"
-        check_variant = self._risk_config.get("critic_check_variant", "true").lower() != "false"
+        check_dissent = self._risk_config.critic_check_dissent
+        check_variant = self._risk_config.critic_check_variant
 
         if not check_dissent and not check_variant:
             return True, None  # Both qualitative checks disabled
@@ -155,11 +157,11 @@ class SignalCriticAgent:
   {", ".join(json_fields)}
 }}"""
 
-            response = await client.messages.create(
+            response = await observe_claude("signal_critic", client.messages.create(
                 model=settings.claude_model,
                 max_tokens=300,
                 messages=[{"role": "user", "content": prompt}],
-            )
+            ))
 
             text = response.content[0].text.strip()
             # Extract JSON
@@ -4,8 +4,9 @@ import logging
 
 from app.agents.base import AgentContext, AgentResult, AgentRole, BaseAgent
 from app.agents.event_bus import AgentEvent
-from app.models.db import load_risk_config
+from app.agents.trigger_book import trigger_book
 from app.services.order_service import check_buyable, check_sellable, place_order
+from app.services.risk_config_service import risk_config_service
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,8 @@ class TradingExecutorAgent(BaseAgent):
     name = "매매 실행기"
     role = AgentRole.EXECUTOR
     allowed_tools = ["domestic_stock"]
+    priority = 10
+    timeout_sec = 120.0
 
     # Events this agent subscribes to
     subscribed_events = ["signal.approved", "risk.stop_loss", "risk.take_profit", "reeval.sell_recommended"]
@@ -90,8 +93,7 @@ class TradingExecutorAgent(BaseAgent):
                 return
 
             # Buy up to configured max or max available
-            risk_config = await load_risk_config()
-            configured_max = int(risk_config.get("max_buy_qty", 10))
+            configured_max = risk_config_service.current.max_buy_qty
             quantity = min(max_qty, configured_max)
 
             result = await place_order(
@@ -132,8 +134,13 @@ class TradingExecutorAgent(BaseAgent):
         signal_id: int | None = None,
         reason: str = "",
         quantity: int | None = None,
+        triggered_at: float | None = None,
     ) -> None:
-        """Execute a sell order."""
+        """Execute a sell order.
+
+        triggered_at: trigger_book.now() of a stop-loss/take-profit trigger,
+        used to record trigger-to-order latency.
+        """
         try:
             if quantity is None:
                 # Check how many shares we can sell
@@ -163,6 +170,11 @@ class TradingExecutorAgent(BaseAgent):
                 reason=reason,
             )
 
+            latency_ms = None
+            if triggered_at is not None:
+                latency_ms = round(trigger_book.record_latency(triggered_at), 2)
+                logger.info(f"Trigger-to-order latency for {stock_code}: {latency_ms}ms")
+
             event_type = "order.filled" if result["success"] else "order.failed"
             await self.emit_event(event_type, {
                 "stock_code": stock_code,
@@ -172,6 +184,7 @@ class TradingExecutorAgent(BaseAgent):
                 "order_id": result.get("order_id"),
                 "status": result.get("status"),
                 "error": result.get("error"),
+                "trigger_latency_ms": latency_ms,
             })
 
         except Exception as e:
@@ -200,6 +213,7 @@ class TradingExecutorAgent(BaseAgent):
             stock_name=stock_name,
             quantity=quantity,
             reason=f"손절매: {pnl_pct:.2f}% 손실",
+            triggered_at=event.data.get("triggered_at"),
         )
 
     async def _execute_take_profit(self, event: AgentEvent) -> None:
@@ -219,6 +233,7 @@ class TradingExecutorAgent(BaseAgent):
             stock_name=stock_name,
             quantity=quantity,
             reason=f"익절매: {pnl_pct:.2f}% 수익",
+            triggered_at=event.data.get("triggered_at"),
         )
 
     async def _execute_reeval_sell(self, event: AgentEvent) -> None:
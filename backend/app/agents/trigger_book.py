@@ -0,0 +1,205 @@
+"""Price-indexed stop-loss / take-profit trigger book for the risk manager.
+
+종목별 손절가/익절가를 평균매입가와 유효 임계값(종목 override 또는 전역 설정)
+으로 미리 계산해 정렬된 리스트로 보관한다. 가격이 들어오면 해당 종목의 가장
+가까운 트리거(손절은 가장 높은 손절가, 익절은 가장 낮은 익절가)만 비교하므로
+O(1)이며, 트리거는 override·체결·재평가로 값이 바뀔 때만 다시 계산한다.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.models.db import execute_query
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class Trigger:
+    """A single price level that fires a risk event."""
+
+    price: float
+    kind: str = field(compare=False)  # "stop_loss" | "take_profit"
+    threshold_pct: float = field(compare=False)
+
+
+@dataclass
+class SymbolTriggers:
+    stock_code: str
+    stock_name: str
+    quantity: int
+    avg_buy_price: float
+    stops: list[Trigger] = field(default_factory=list)  # 높은 가격순 (가까운 손절가 먼저)
+    targets: list[Trigger] = field(default_factory=list)  # 낮은 가격순 (가까운 익절가 먼저)
+
+    def add(self, trigger: Trigger) -> None:
+        if trigger.kind == "stop_loss":
+            # bisect 는 오름차순 기준이므로 음수 가격으로 내림차순 유지
+            keys = [-t.price for t in self.stops]
+            self.stops.insert(bisect.bisect_right(keys, -trigger.price), trigger)
+        else:
+            bisect.insort(self.targets, trigger)
+
+
+class TriggerBook:
+    """Per-symbol stop/take-profit levels with O(1) price checks."""
+
+    def __init__(self, latency_window: int = 200):
+        self._symbols: dict[str, SymbolTriggers] = {}
+        self._overrides: dict[str, tuple[float | None, float | None]] = {}
+        self._overrides_loaded = False
+        self.global_stop_pct = -3.0
+        self.global_tp_pct = 5.0
+        self.recomputes = 0
+        self._latencies_ms: deque[float] = deque(maxlen=latency_window)
+
+    # ── thresholds ──
+
+    async def load_overrides(self, stock_code: str | None = None) -> None:
+        """(Re)load per-stock overrides — all rows, or one stock after a change."""
+        if stock_code is None:
+            rows = await execute_query(
+                "SELECT stock_code, stop_loss_pct, take_profit_pct FROM stock_stop_loss_overrides"
+            )
+            self._overrides = {
+                r["stock_code"]: (r.get("stop_loss_pct"), r.get("take_profit_pct"))
+                for r in rows or []
+            }
+            self._overrides_loaded = True
+            for code in list(self._symbols):
+                self._recompute(code)
+            return
+
+        row = await execute_query(
+            "SELECT stop_loss_pct, take_profit_pct FROM stock_stop_loss_overrides WHERE stock_code = ?",
+            (stock_code,),
+            fetch_one=True,
+        )
+        if row:
+            self._overrides[stock_code] = (row.get("stop_loss_pct"), row.get("take_profit_pct"))
+        else:
+            self._overrides.pop(stock_code, None)
+        if stock_code in self._symbols:
+            self._recompute(stock_code)
+
+    @property
+    def overrides_loaded(self) -> bool:
+        return self._overrides_loaded
+
+    def set_global_thresholds(self, stop_pct: float, tp_pct: float) -> None:
+        if (stop_pct, tp_pct) == (self.global_stop_pct, self.global_tp_pct):
+            return
+        self.global_stop_pct, self.global_tp_pct = stop_pct, tp_pct
+        for code in list(self._symbols):
+            self._recompute(code)
+
+    def effective_thresholds(self, stock_code: str) -> tuple[float, float]:
+        sl, tp = self._overrides.get(stock_code, (None, None))
+        return (
+            float(sl) if sl is not None else self.global_stop_pct,
+            float(tp) if tp is not None else self.global_tp_pct,
+        )
+
+    # ── positions ──
+
+    def sync_positions(self, positions: list[dict]) -> None:
+        """Apply a portfolio snapshot; only changed positions are recomputed."""
+        seen = set()
+        for pos in positions:
+            code = pos.get("stock_code", "")
+            if not code:
+                continue
+            seen.add(code)
+            self.set_position(
+                code,
+                pos.get("stock_name", ""),
+                int(pos.get("quantity", 0) or 0),
+                float(pos.get("avg_buy_price", 0) or 0),
+            )
+        for code in list(self._symbols):
+            if code not in seen:
+                del self._symbols[code]
+
+    def set_position(self, stock_code: str, stock_name: str, quantity: int, avg_buy_price: float) -> None:
+        entry = self._symbols.get(stock_code)
+        if entry and entry.quantity == quantity and entry.avg_buy_price == avg_buy_price:
+            return
+        if quantity <= 0 or avg_buy_price <= 0:
+            self._symbols.pop(stock_code, None)
+            return
+        self._symbols[stock_code] = SymbolTriggers(stock_code, stock_name, quantity, avg_buy_price)
+        self._recompute(stock_code)
+
+    def _recompute(self, stock_code: str) -> None:
+        entry = self._symbols[stock_code]
+        stop_pct, tp_pct = self.effective_thresholds(stock_code)
+        entry.stops.clear()
+        entry.targets.clear()
+        entry.add(Trigger(entry.avg_buy_price * (1 + stop_pct / 100), "stop_loss", stop_pct))
+        entry.add(Trigger(entry.avg_buy_price * (1 + tp_pct / 100), "take_profit", tp_pct))
+        self.recomputes += 1
+
+    # ── checks ──
+
+    def check(self, stock_code: str, price: float) -> Trigger | None:
+        """Return the trigger crossed by ``price``, if any."""
+        entry = self._symbols.get(stock_code)
+        if entry is None or price <= 0:
+            return None
+        if entry.stops and price <= entry.stops[0].price:
+            return entry.stops[0]
+        if entry.targets and price >= entry.targets[0].price:
+            return entry.targets[0]
+        return None
+
+    def get(self, stock_code: str) -> SymbolTriggers | None:
+        return self._symbols.get(stock_code)
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "stock_code": e.stock_code,
+                "stock_name": e.stock_name,
+                "quantity": e.quantity,
+                "avg_buy_price": e.avg_buy_price,
+                "stop_loss_price": round(e.stops[0].price, 2) if e.stops else None,
+                "stop_loss_pct": e.stops[0].threshold_pct if e.stops else None,
+                "take_profit_price": round(e.targets[0].price, 2) if e.targets else None,
+                "take_profit_pct": e.targets[0].threshold_pct if e.targets else None,
+            }
+            for e in sorted(self._symbols.values(), key=lambda e: e.stock_code)
+        ]
+
+    # ── latency ──
+
+    @staticmethod
+    def now() -> float:
+        return time.perf_counter()
+
+    def record_latency(self, triggered_at: float) -> float:
+        """Record trigger-to-order latency (ms) from a ``now()`` timestamp."""
+        ms = (time.perf_counter() - triggered_at) * 1000
+        self._latencies_ms.append(ms)
+        return ms
+
+    def latency_stats(self) -> dict[str, Any]:
+        if not self._latencies_ms:
+            return {"count": 0}
+        data = sorted(self._latencies_ms)
+        n = len(data)
+        return {
+            "count": n,
+            "p50_ms": round(data[n // 2], 2),
+            "p95_ms": round(data[min(n - 1, int(n * 0.95))], 2),
+            "max_ms": round(data[-1], 2),
+            "last_ms": round(self._latencies_ms[-1], 2),
+        }
+
+
+# Singleton
+trigger_book = TriggerBook()
@@ -6,9 +6,24 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     anthropic_api_key: str = ""
     mcp_server_url: str = "http://localhost:3001/sse"
+    mcp_pool_size: int = 3
     claude_model: str = "claude-sonnet-4-5-20250929"
     claude_max_tokens: int = 4096
     dart_api_key: str | None = None
+    # Chat sessions: LRU memory tier size, idle eviction, prompt budget before compaction
+    chat_session_cache_size: int = 64
+    chat_session_idle_minutes: int = 30
+    chat_context_token_budget: int = 20000
+    memo_render_workers: int = 2
+    # "compact": position rows only on quantity/avg-price change + narrow price series;
+    # "legacy": positions_json + one positions row per holding per snapshot
+    position_storage: str = "compact"
+    # Realtime KIS tick feed (H0STCNT0) for intraday bars / stage-1 snapshot — paper app key
+    tick_feed_enabled: bool = False
+    kis_paper_app_key: str = ""
+    kis_paper_app_secret: str = ""
+    kis_url_rest_paper: str = "https://openapivts.koreainvestment.com:29443"
+    kis_url_ws_paper: str = "ws://ops.koreainvestment.com:31000"
 
     model_config = {"env_file": os.getenv("ENV_FILE", ".env"), "env_file_encoding": "utf-8", "extra": "ignore"}
 
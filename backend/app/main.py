@@ -4,6 +4,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.config import settings as app_settings
 from app.routers import agents, calendar, chat, dashboard, health, memos, peers, reports, research, settings, signals, tasks, watchlist, ws
 from app.services.dart_client import dart_client
 from app.services.mcp_client import mcp_manager
@@ -27,6 +28,8 @@ async def _init_agents():
     from app.agents.risk_manager import RiskManagerAgent
     from app.agents.report_generator import ReportGeneratorAgent
     from app.agents.trading_executor import TradingExecutorAgent
+    from app.services.risk_config_service import CONFIG_UPDATED_EVENT, risk_config_service
+    from app.services.risk_snapshot_service import risk_snapshot_service
     from app.services.ws_manager import ws_manager
 
     # Register agents
@@ -40,6 +43,20 @@ async def _init_agents():
     # Wire WebSocket manager to receive all events
     event_bus.subscribe_all(ws_manager.on_agent_event)
 
+    # Typed risk_config: load once, reload only when a writer publishes a change
+    await risk_config_service.reload()
+    event_bus.subscribe(CONFIG_UPDATED_EVENT, risk_config_service.on_config_updated)
+
+    # Refresh cached risk snapshot in the background when holdings change
+    event_bus.subscribe("portfolio.updated", risk_snapshot_service.on_portfolio_updated)
+
+    # Realtime ticks for held codes + stage-1 candidates → intraday bars / universe snapshot / quote streams
+    if app_settings.tick_feed_enabled:
+        from app.services.tick_feed import tick_feed
+        event_bus.subscribe("portfolio.updated", tick_feed.on_portfolio_updated)
+        tick_feed.quote_listeners.append(ws_manager.on_tick)
+        tick_feed.start()
+
     # Start engine (wires event subscriptions)
     await agent_engine.start()
 
@@ -93,13 +110,25 @@ async def lifespan(app: FastAPI):
     # Shutdown in reverse order
     from app.services.scheduler import trading_scheduler
     from app.agents.engine import agent_engine
+    from app.agents.event_bus import event_bus
+    from app.services.ws_manager import ws_manager
 
     logger.info("Shutting down scheduler...")
     await trading_scheduler.stop()
     logger.info("Shutting down agent engine...")
     await agent_engine.stop()
+    if app_settings.tick_feed_enabled:
+        from app.services.tick_feed import tick_feed
+        logger.info("Stopping tick feed...")
+        await tick_feed.stop()
+    logger.info("Closing WebSocket clients...")
+    await ws_manager.shutdown()
+    logger.info("Flushing event persistence...")
+    await event_bus.drain()
     logger.info("Disconnecting from MCP server...")
     await mcp_manager.disconnect()
+    from app.services.memo_service import memo_renderer
+    memo_renderer.shutdown()
 
 
 app = FastAPI(
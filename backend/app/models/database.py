@@ -77,6 +77,17 @@ CREATE TABLE IF NOT EXISTS agent_logs (
     events_emitted_json TEXT DEFAULT '[]'
 );
 
+-- 에이전트 실행별 트레이스 스팬 (log_id = agent_logs.id)
+CREATE TABLE IF NOT EXISTS agent_run_traces (
+    log_id INTEGER PRIMARY KEY,
+    agent_id TEXT NOT NULL,
+    trace_id TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    duration_ms REAL NOT NULL DEFAULT 0,
+    span_count INTEGER NOT NULL DEFAULT 0,
+    spans_json TEXT NOT NULL DEFAULT '[]'
+);
+
 CREATE TABLE IF NOT EXISTS watchlist (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     stock_code TEXT NOT NULL UNIQUE,
@@ -127,6 +138,42 @@ CREATE INDEX IF NOT EXISTS idx_agent_logs_agent ON agent_logs(agent_id);
 CREATE INDEX IF NOT EXISTS idx_agent_logs_timestamp ON agent_logs(timestamp);
 CREATE INDEX IF NOT EXISTS idx_snapshots_timestamp ON portfolio_snapshots(timestamp);
 
+-- Compact position storage: a lot row is written only when quantity/avg price
+-- changes (open until closed_snapshot_id is set); prices are a narrow series
+-- written only when the price moves. current_positions is the latest holding
+-- set, replaced in the same transaction as each snapshot.
+CREATE TABLE IF NOT EXISTS position_lots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stock_code TEXT NOT NULL,
+    stock_name TEXT NOT NULL DEFAULT '',
+    quantity INTEGER NOT NULL,
+    avg_buy_price REAL NOT NULL,
+    opened_snapshot_id INTEGER NOT NULL,
+    closed_snapshot_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_position_lots_code ON position_lots(stock_code, opened_snapshot_id);
+CREATE INDEX IF NOT EXISTS idx_position_lots_open ON position_lots(closed_snapshot_id);
+
+CREATE TABLE IF NOT EXISTS position_prices (
+    stock_code TEXT NOT NULL,
+    snapshot_id INTEGER NOT NULL,
+    current_price REAL NOT NULL,
+    PRIMARY KEY (stock_code, snapshot_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_position_prices_snapshot ON position_prices(snapshot_id);
+
+CREATE TABLE IF NOT EXISTS current_positions (
+    stock_code TEXT PRIMARY KEY,
+    snapshot_id INTEGER NOT NULL,
+    stock_name TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    avg_buy_price REAL NOT NULL,
+    current_price REAL NOT NULL,
+    market_value REAL NOT NULL,
+    unrealized_pnl REAL NOT NULL,
+    unrealized_pnl_pct REAL NOT NULL
+);
+
 CREATE TABLE IF NOT EXISTS kospi200_components (
     stock_code TEXT PRIMARY KEY,
     stock_name TEXT NOT NULL,
@@ -209,6 +256,7 @@ CREATE TABLE IF NOT EXISTS news_cache (
     cached_at TEXT DEFAULT (datetime('now'))
 );
 CREATE INDEX IF NOT EXISTS idx_news_stock ON news_cache(stock_code);
+CREATE INDEX IF NOT EXISTS idx_news_cached_at ON news_cache(cached_at);
 
 CREATE TABLE IF NOT EXISTS signal_snapshots (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -223,6 +271,7 @@ CREATE TABLE IF NOT EXISTS signal_snapshots (
     dart_fundamentals_json TEXT
 );
 CREATE INDEX IF NOT EXISTS idx_snapshot_stock ON signal_snapshots(stock_code);
+CREATE INDEX IF NOT EXISTS idx_signal_snapshots_date ON signal_snapshots(snapshot_date);
 
 -- Phase 3: Advanced Analysis
 CREATE TABLE IF NOT EXISTS valuation_cache (
@@ -240,8 +289,11 @@ CREATE TABLE IF NOT EXISTS portfolio_risk_snapshots (
     var_99 REAL,
     portfolio_beta REAL,
     sector_breakdown_json TEXT,
-    correlation_matrix_json TEXT
+    correlation_matrix_json TEXT,
+    fingerprint TEXT,
+    result_json TEXT
 );
+CREATE INDEX IF NOT EXISTS idx_risk_snapshots_date ON portfolio_risk_snapshots(snapshot_date);
 
 -- Phase 4: Exports
 CREATE TABLE IF NOT EXISTS memo_exports (
@@ -249,8 +301,12 @@ CREATE TABLE IF NOT EXISTS memo_exports (
     signal_id INTEGER REFERENCES signals(id),
     format TEXT DEFAULT 'html',
     file_path TEXT,
-    created_at TEXT DEFAULT (datetime('now'))
+    created_at TEXT DEFAULT (datetime('now')),
+    content_hash TEXT,
+    size_bytes INTEGER,
+    render_ms REAL
 );
+CREATE INDEX IF NOT EXISTS idx_memo_exports_signal ON memo_exports(signal_id, format);
 
 -- Phase 5: Per-stock dynamic stop-loss
 CREATE TABLE IF NOT EXISTS stock_stop_loss_overrides (
@@ -275,8 +331,209 @@ CREATE TABLE IF NOT EXISTS position_evaluations (
     new_stop_loss_pct REAL
 );
 CREATE INDEX IF NOT EXISTS idx_position_eval_stock ON position_evaluations(stock_code);
+
+-- Rollups: maintained incrementally by triggers as rows are inserted.
+-- max_dd_pct is the drawdown within the bucket (peak measured from the bucket's
+-- first snapshot), so the exact drawdown over any range can be derived from
+-- bucket high/low/max_dd_pct without reading raw snapshots.
+CREATE TABLE IF NOT EXISTS portfolio_rollup_hourly (
+    bucket TEXT PRIMARY KEY,
+    first_ts TEXT NOT NULL,
+    last_ts TEXT NOT NULL,
+    open_value REAL NOT NULL,
+    high_value REAL NOT NULL,
+    low_value REAL NOT NULL,
+    close_value REAL NOT NULL,
+    close_cash REAL,
+    close_pnl REAL,
+    close_pnl_pct REAL,
+    snapshot_count INTEGER NOT NULL DEFAULT 0,
+    max_dd_pct REAL NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS portfolio_rollup_daily (
+    bucket TEXT PRIMARY KEY,
+    first_ts TEXT NOT NULL,
+    last_ts TEXT NOT NULL,
+    open_value REAL NOT NULL,
+    high_value REAL NOT NULL,
+    low_value REAL NOT NULL,
+    close_value REAL NOT NULL,
+    close_cash REAL,
+    close_pnl REAL,
+    close_pnl_pct REAL,
+    snapshot_count INTEGER NOT NULL DEFAULT 0,
+    max_dd_pct REAL NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS order_rollup_daily (
+    bucket TEXT NOT NULL,
+    side TEXT NOT NULL,
+    status TEXT NOT NULL,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    filled_value REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, side, status)
+);
+
+CREATE TABLE IF NOT EXISTS chat_sessions (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    updated_at TEXT NOT NULL DEFAULT (datetime('now')),
+    summary TEXT,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    turn_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_updated ON chat_sessions(updated_at);
+
+CREATE TABLE IF NOT EXISTS chat_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL CHECK(role IN ('user', 'assistant')),
+    content_json TEXT NOT NULL,
+    tokens INTEGER NOT NULL DEFAULT 0,
+    compacted INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages(session_id, compacted, id);
+
+CREATE TRIGGER IF NOT EXISTS trg_snapshots_rollup_hourly
+AFTER INSERT ON portfolio_snapshots WHEN NEW.total_value > 0
+BEGIN
+    INSERT INTO portfolio_rollup_hourly
+        (bucket, first_ts, last_ts, open_value, high_value, low_value, close_value,
+         close_cash, close_pnl, close_pnl_pct, snapshot_count, max_dd_pct)
+    VALUES (substr(NEW.timestamp, 1, 13) || ':00:00', NEW.timestamp, NEW.timestamp,
+            NEW.total_value, NEW.total_value, NEW.total_value, NEW.total_value,
+            NEW.cash_balance, NEW.total_pnl, NEW.total_pnl_pct, 1, 0)
+    ON CONFLICT(bucket) DO UPDATE SET
+        max_dd_pct = MAX(max_dd_pct, (high_value - excluded.close_value) / high_value * 100),
+        high_value = MAX(high_value, excluded.high_value),
+        low_value = MIN(low_value, excluded.low_value),
+        open_value = CASE WHEN excluded.first_ts < first_ts THEN excluded.open_value ELSE open_value END,
+        first_ts = MIN(first_ts, excluded.first_ts),
+        close_value = CASE WHEN excluded.last_ts >= last_ts THEN excluded.close_value ELSE close_value END,
+        close_cash = CASE WHEN excluded.last_ts >= last_ts THEN excluded.close_cash ELSE close_cash END,
+        close_pnl = CASE WHEN excluded.last_ts >= last_ts THEN excluded.close_pnl ELSE close_pnl END,
+        close_pnl_pct = CASE WHEN excluded.last_ts >= last_ts THEN excluded.close_pnl_pct ELSE close_pnl_pct END,
+        last_ts = MAX(last_ts, excluded.last_ts),
+        snapshot_count = snapshot_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_snapshots_rollup_daily
+AFTER INSERT ON portfolio_snapshots WHEN NEW.total_value > 0
+BEGIN
+    INSERT INTO portfolio_rollup_daily
+        (bucket, first_ts, last_ts, open_value, high_value, low_value, close_value,
+         close_cash, close_pnl, close_pnl_pct, snapshot_count, max_dd_pct)
+    VALUES (substr(NEW.timestamp, 1, 10), NEW.timestamp, NEW.timestamp,
+            NEW.total_value, NEW.total_value, NEW.total_value, NEW.total_value,
+            NEW.cash_balance, NEW.total_pnl, NEW.total_pnl_pct, 1, 0)
+    ON CONFLICT(bucket) DO UPDATE SET
+        max_dd_pct = MAX(max_dd_pct, (high_value - excluded.close_value) / high_value * 100),
+        high_value = MAX(high_value, excluded.high_value),
+        low_value = MIN(low_value, excluded.low_value),
+        open_value = CASE WHEN excluded.first_ts < first_ts THEN excluded.open_value ELSE open_value END,
+        first_ts = MIN(first_ts, excluded.first_ts),
+        close_value = CASE WHEN excluded.last_ts >= last_ts THEN excluded.close_value ELSE close_value END,
+        close_cash = CASE WHEN excluded.last_ts >= last_ts THEN excluded.close_cash ELSE close_cash END,
+        close_pnl = CASE WHEN excluded.last_ts >= last_ts THEN excluded.close_pnl ELSE close_pnl END,
+        close_pnl_pct = CASE WHEN excluded.last_ts >= last_ts THEN excluded.close_pnl_pct ELSE close_pnl_pct END,
+        last_ts = MAX(last_ts, excluded.last_ts),
+        snapshot_count = snapshot_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_orders_rollup_insert
+AFTER INSERT ON orders
+BEGIN
+    INSERT INTO order_rollup_daily (bucket, side, status, order_count, filled_value)
+    VALUES (substr(NEW.timestamp, 1, 10), NEW.side, NEW.status, 1,
+            CASE WHEN NEW.status = 'filled'
+                 THEN COALESCE(NEW.fill_price, NEW.price, 0) * COALESCE(NEW.fill_quantity, NEW.quantity, 0)
+                 ELSE 0 END)
+    ON CONFLICT(bucket, side, status) DO UPDATE SET
+        order_count = order_count + 1,
+        filled_value = filled_value + excluded.filled_value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_orders_rollup_update
+AFTER UPDATE OF timestamp, side, status, price, quantity, fill_price, fill_quantity ON orders
+BEGIN
+    UPDATE order_rollup_daily SET
+        order_count = order_count - 1,
+        filled_value = filled_value - CASE WHEN OLD.status = 'filled'
+            THEN COALESCE(OLD.fill_price, OLD.price, 0) * COALESCE(OLD.fill_quantity, OLD.quantity, 0)
+            ELSE 0 END
+    WHERE bucket = substr(OLD.timestamp, 1, 10) AND side = OLD.side AND status = OLD.status;
+    INSERT INTO order_rollup_daily (bucket, side, status, order_count, filled_value)
+    VALUES (substr(NEW.timestamp, 1, 10), NEW.side, NEW.status, 1,
+            CASE WHEN NEW.status = 'filled'
+                 THEN COALESCE(NEW.fill_price, NEW.price, 0) * COALESCE(NEW.fill_quantity, NEW.quantity, 0)
+                 ELSE 0 END)
+    ON CONFLICT(bucket, side, status) DO UPDATE SET
+        order_count = order_count + 1,
+        filled_value = filled_value + excluded.filled_value;
+END;
+"""
+
+# Rebuild rollups from raw rows (existing databases, or after a table rebuild).
+# Window functions replay the same per-bucket running peak the triggers keep.
+_SNAPSHOT_ROLLUP_REBUILD = """
+DELETE FROM {table};
+INSERT INTO {table}
+    (bucket, first_ts, last_ts, open_value, high_value, low_value, close_value,
+     close_cash, close_pnl, close_pnl_pct, snapshot_count, max_dd_pct)
+SELECT bucket, MIN(timestamp), MAX(timestamp),
+       MAX(CASE WHEN rn_first = 1 THEN total_value END),
+       MAX(total_value), MIN(total_value),
+       MAX(CASE WHEN rn_last = 1 THEN total_value END),
+       MAX(CASE WHEN rn_last = 1 THEN cash_balance END),
+       MAX(CASE WHEN rn_last = 1 THEN total_pnl END),
+       MAX(CASE WHEN rn_last = 1 THEN total_pnl_pct END),
+       COUNT(*),
+       MAX((run_peak - total_value) / run_peak * 100)
+FROM (
+    SELECT {bucket_expr} AS bucket, timestamp, total_value, cash_balance, total_pnl, total_pnl_pct,
+           ROW_NUMBER() OVER (PARTITION BY {bucket_expr} ORDER BY timestamp, id) AS rn_first,
+           ROW_NUMBER() OVER (PARTITION BY {bucket_expr} ORDER BY timestamp DESC, id DESC) AS rn_last,
+           MAX(total_value) OVER (PARTITION BY {bucket_expr} ORDER BY timestamp, id
+                                  ROWS UNBOUNDED PRECEDING) AS run_peak
+    FROM portfolio_snapshots
+    WHERE total_value > 0
+)
+GROUP BY bucket;
 """
 
+_ORDER_ROLLUP_REBUILD = """
+DELETE FROM order_rollup_daily;
+INSERT INTO order_rollup_daily (bucket, side, status, order_count, filled_value)
+SELECT substr(timestamp, 1, 10), side, status, COUNT(*),
+       SUM(CASE WHEN status = 'filled'
+                THEN COALESCE(fill_price, price, 0) * COALESCE(fill_quantity, quantity, 0)
+                ELSE 0 END)
+FROM orders
+GROUP BY substr(timestamp, 1, 10), side, status;
+"""
+
+# rollup table → (원본에 롤업 대상 행이 있는지 확인하는 SELECT, 재생성 SQL).
+# 백필은 테이블별로 "롤업이 비었고 원본은 있음" 일 때만 실행한다.
+_SNAPSHOT_SOURCE = "SELECT 1 FROM portfolio_snapshots WHERE total_value > 0"
+ROLLUP_BACKFILLS = {
+    "portfolio_rollup_hourly": (
+        _SNAPSHOT_SOURCE,
+        _SNAPSHOT_ROLLUP_REBUILD.format(
+            table="portfolio_rollup_hourly", bucket_expr="substr(timestamp, 1, 13) || ':00:00'"
+        ),
+    ),
+    "portfolio_rollup_daily": (
+        _SNAPSHOT_SOURCE,
+        _SNAPSHOT_ROLLUP_REBUILD.format(table="portfolio_rollup_daily", bucket_expr="substr(timestamp, 1, 10)"),
+    ),
+    "order_rollup_daily": ("SELECT 1 FROM orders", _ORDER_ROLLUP_REBUILD),
+}
+
+ROLLUP_REBUILD_SQL = "".join(rebuild for _, rebuild in ROLLUP_BACKFILLS.values())
+
 # Default risk configuration values
 DEFAULT_RISK_CONFIG = {
     "stop_loss_pct": "-3.0",
@@ -5,7 +5,9 @@ from pathlib import Path
 
 import aiosqlite
 
-from app.models.database import DEFAULT_RISK_CONFIG, DEFAULT_TASKS, SCHEMA_SQL
+from app.models.database import DEFAULT_RISK_CONFIG, DEFAULT_TASKS, ROLLUP_BACKFILLS, SCHEMA_SQL
+from app.services.metrics import DB_QUERY_SECONDS, sql_statement_label
+from app.services.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -21,12 +23,31 @@ async def get_db() -> aiosqlite.Connection:
     return db
 
 
+async def _ensure_incremental_auto_vacuum(db: aiosqlite.Connection) -> None:
+    """Switch to incremental auto_vacuum for retention (one-time full VACUUM).
+
+    Runs at startup before anything else holds the DB; if the VACUUM can't
+    run (locked/busy), log and retry on the next startup.
+    """
+    cursor = await db.execute("PRAGMA auto_vacuum")
+    (mode,) = await cursor.fetchone()
+    if mode == 2:
+        return
+    try:
+        await db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        await db.execute("VACUUM")
+        logger.info("Database switched to incremental auto_vacuum")
+    except aiosqlite.Error as e:
+        logger.warning(f"auto_vacuum conversion skipped, will retry on next startup: {e}")
+
+
 async def init_database() -> None:
     """Create tables and seed default data on first run."""
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
     db = await get_db()
     try:
+        await _ensure_incremental_auto_vacuum(db)
         await db.executescript(SCHEMA_SQL)
 
         # --- Migration guards for existing databases ---
@@ -42,6 +63,11 @@ async def init_database() -> None:
             "ALTER TABLE signals ADD COLUMN confidence_grades_json TEXT",
             "ALTER TABLE signals ADD COLUMN investment_horizon TEXT",
             "ALTER TABLE signals ADD COLUMN atr_stop_loss_pct REAL",
+            "ALTER TABLE portfolio_risk_snapshots ADD COLUMN fingerprint TEXT",
+            "ALTER TABLE portfolio_risk_snapshots ADD COLUMN result_json TEXT",
+            "ALTER TABLE memo_exports ADD COLUMN content_hash TEXT",
+            "ALTER TABLE memo_exports ADD COLUMN size_bytes INTEGER",
+            "ALTER TABLE memo_exports ADD COLUMN render_ms REAL",
         ]
         for stmt in _ALTER_STATEMENTS:
             try:
@@ -101,14 +127,46 @@ async def init_database() -> None:
                     if orders_row and "signals_old" in (orders_row[0] or ""):
                         logger.info("Fixing orders FK reference from signals_old → signals...")
                         await db.execute("ALTER TABLE orders RENAME TO _orders_tmp")
-                        await db.executescript(SCHEMA)  # recreates orders with correct FK
+                        await db.executescript(SCHEMA_SQL)  # recreates orders with correct FK
                         await db.execute("INSERT INTO orders SELECT * FROM _orders_tmp")
                         await db.execute("DROP TABLE _orders_tmp")
+                        # rollup triggers followed the rename and were dropped with it
+                        await db.executescript(SCHEMA_SQL)
                     await db.execute("DROP TABLE signals_old")
                     logger.info("Signals table migration complete.")
         except Exception as e:
             logger.warning(f"Signals CHECK migration skipped: {e}")
 
+        # --- Backfill rollup tables for databases created before rollups existed ---
+        for table, (source_rows, rebuild_sql) in ROLLUP_BACKFILLS.items():
+            cursor = await db.execute(
+                f"SELECT NOT EXISTS (SELECT 1 FROM {table}) AND EXISTS ({source_rows})"
+            )
+            (needs_backfill,) = await cursor.fetchone()
+            if needs_backfill:
+                logger.info(f"Backfilling {table}...")
+                await db.executescript(rebuild_sql)
+
+        # --- Seed current_positions / open lots from the legacy positions table ---
+        cursor = await db.execute(
+            """SELECT NOT EXISTS (SELECT 1 FROM current_positions)
+                      AND NOT EXISTS (SELECT 1 FROM position_lots)"""
+        )
+        (needs_seed,) = await cursor.fetchone()
+        if needs_seed:
+            await db.execute(
+                """INSERT OR REPLACE INTO current_positions
+                   (stock_code, snapshot_id, stock_name, quantity, avg_buy_price,
+                    current_price, market_value, unrealized_pnl, unrealized_pnl_pct)
+                   SELECT stock_code, snapshot_id, stock_name, quantity, avg_buy_price,
+                          current_price, market_value, unrealized_pnl, unrealized_pnl_pct
+                   FROM positions WHERE snapshot_id = (SELECT MAX(id) FROM portfolio_snapshots)"""
+            )
+            await db.execute(
+                """INSERT INTO position_lots (stock_code, stock_name, quantity, avg_buy_price, opened_snapshot_id)
+                   SELECT stock_code, stock_name, quantity, avg_buy_price, snapshot_id FROM current_positions"""
+            )
+
         # Seed default risk config
         for key, value in DEFAULT_RISK_CONFIG.items():
             await db.execute(
@@ -141,30 +199,34 @@ async def execute_query(
     query: str, params: tuple = (), fetch_one: bool = False
 ) -> list[dict] | dict | None:
     """Execute a query and return results as dicts."""
-    db = await get_db()
-    try:
-        cursor = await db.execute(query, params)
-        if query.strip().upper().startswith("SELECT"):
-            rows = await cursor.fetchall()
-            if fetch_one:
-                return dict(rows[0]) if rows else None
-            return [dict(row) for row in rows]
-        else:
-            await db.commit()
-            return {"lastrowid": cursor.lastrowid, "rowcount": cursor.rowcount}
-    finally:
-        await db.close()
+    statement = sql_statement_label(query)
+    with DB_QUERY_SECONDS.time(statement=statement), span("db", "db", statement=statement):
+        db = await get_db()
+        try:
+            cursor = await db.execute(query, params)
+            if query.strip().upper().startswith("SELECT"):
+                rows = await cursor.fetchall()
+                if fetch_one:
+                    return dict(rows[0]) if rows else None
+                return [dict(row) for row in rows]
+            else:
+                await db.commit()
+                return {"lastrowid": cursor.lastrowid, "rowcount": cursor.rowcount}
+        finally:
+            await db.close()
 
 
 async def execute_insert(query: str, params: tuple = ()) -> int:
     """Execute an INSERT and return the last row id."""
-    db = await get_db()
-    try:
-        cursor = await db.execute(query, params)
-        await db.commit()
-        return cursor.lastrowid
-    finally:
-        await db.close()
+    statement = sql_statement_label(query)
+    with DB_QUERY_SECONDS.time(statement=statement), span("db", "db", statement=statement):
+        db = await get_db()
+        try:
+            cursor = await db.execute(query, params)
+            await db.commit()
+            return cursor.lastrowid
+        finally:
+            await db.close()
 
 
 async def load_risk_config() -> dict[str, str]:
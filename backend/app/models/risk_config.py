@@ -0,0 +1,96 @@
+"""Typed risk configuration parsed from the risk_config key/value table."""
+from __future__ import annotations
+
+import dataclasses
+import logging
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_BOOL_FALSE = ("false", "0", "no", "off")
+
+
+@dataclass(frozen=True)
+class RiskConfig:
+    """Immutable snapshot of risk_config — defaults match the previous per-call fallbacks."""
+
+    # Position thresholds
+    stop_loss_pct: float = -3.0
+    take_profit_pct: float = 5.0
+    max_positions: int = 5
+    max_position_weight_pct: float = 20.0
+    max_daily_loss: float = 500000.0
+    signal_approval_mode: str = "auto"
+    initial_capital: float = 0.0
+    min_composite_score: float = 15.0
+    calibration_ceiling: float = 2.0
+    min_rr_score: float = 2.0
+    # Multi-factor weights
+    weight_rr_ratio: float = 0.25
+    weight_expert_consensus: float = 0.25
+    weight_fundamental: float = 0.20
+    weight_technical: float = 0.20
+    weight_institutional: float = 0.10
+    # Scanner settings
+    max_candidates: int = 25
+    max_expert_stocks: int = 10
+    overbought_stoch_k: float = 80.0
+    vol_collapse_pct: float = -50.0
+    # Stage-1 screening: "rank" (거래량/등락률 TOP50 교차) | "universe" (전 종목 스냅샷 점수)
+    stage1_mode: str = "rank"
+    stage1_score_formula: str = "volume_ratio:0.4,change_pct:0.4,turnover:0.2"
+    stage1_max_quote_age_sec: float = 30.0
+    # Critic settings
+    critic_check_dissent: bool = True
+    critic_check_variant: bool = True
+    # Data gate settings
+    dart_per_required: bool = True
+    # Execution settings
+    max_buy_qty: int = 10
+    sector_max_pct: float = 40.0
+    min_hold_minutes: int = 0
+    # ATR dynamic stop-loss
+    atr_stop_loss_multiplier_short: float = 2.0
+    atr_stop_loss_multiplier_long: float = 3.0
+    position_reeval_enabled: bool = True
+    # Keys without a typed field, kept as stored strings
+    extra: Mapping[str, str] = field(default_factory=dict, compare=False)
+
+    @classmethod
+    def from_mapping(cls, raw: Mapping[str, Any]) -> RiskConfig:
+        """Parse stored string values; unparsable values fall back to the field default."""
+        values: dict[str, Any] = {}
+        extra: dict[str, str] = {}
+        for key, value in raw.items():
+            f = _FIELDS.get(key)
+            if f is None:
+                extra[key] = value
+                continue
+            try:
+                values[key] = _parse(f.type, value)
+            except (TypeError, ValueError):
+                logger.warning(f"Invalid risk_config {key}={value!r}, using default {f.default!r}")
+        return cls(**values, extra=extra)
+
+    def multiplier_for(self, horizon: str) -> float:
+        """ATR stop-loss multiplier for an investment horizon ('short' | 'long')."""
+        return self.atr_stop_loss_multiplier_long if horizon == "long" else self.atr_stop_loss_multiplier_short
+
+    def to_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in _FIELDS}
+
+
+def _parse(type_name: str, value: Any) -> Any:
+    if type_name == "bool":
+        return value if isinstance(value, bool) else str(value).strip().lower() not in _BOOL_FALSE
+    if type_name == "int":
+        return int(float(value))
+    if type_name == "float":
+        return float(value)
+    return str(value)
+
+
+# `from __future__ import annotations` → f.type는 문자열 ("float", "int", ...)
+_FIELDS = {f.name: f for f in dataclasses.fields(RiskConfig) if f.name != "extra"}
@@ -1,6 +1,7 @@
 """Agent management API router."""
 
 import json
+from typing import Literal
 
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
@@ -8,8 +9,11 @@ from pydantic import BaseModel
 from app.agents.engine import agent_engine
 from app.agents.base import AgentContext, AgentStatus
 from app.agents.event_bus import AgentEvent, event_bus
+from app.agents.trigger_book import trigger_book
 from app.models.db import execute_insert, execute_query
 from app.services import portfolio_service
+from app.services.risk_config_service import risk_config_service
+from app.services.universe_snapshot import parse_formula
 
 router = APIRouter(prefix="/api/agents", tags=["agents"])
 
@@ -37,6 +41,9 @@ class RiskConfigUpdate(BaseModel):
     # Scanner settings
     max_candidates: int | None = None
     max_expert_stocks: int | None = None
+    stage1_mode: Literal["rank", "universe"] | None = None
+    stage1_score_formula: str | None = None
+    stage1_max_quote_age_sec: float | None = None
     # Critic settings
     critic_check_dissent: bool | None = None
     critic_check_variant: bool | None = None
@@ -92,49 +99,11 @@ async def get_agent_events(limit: int = Query(default=100, ge=1, le=1000)):
     return {"events": events}
 
 
-def _format_risk_config(config: dict) -> dict:
-    """Format risk_config dict with proper types and defaults."""
-    return {
-        "stop_loss_pct": float(config.get("stop_loss_pct", -3.0)),
-        "take_profit_pct": float(config.get("take_profit_pct", 5.0)),
-        "max_positions": int(config.get("max_positions", 5)),
-        "max_position_weight_pct": float(config.get("max_position_weight_pct", 20.0)),
-        "max_daily_loss": float(config.get("max_daily_loss", 500000)),
-        "signal_approval_mode": config.get("signal_approval_mode", "auto"),
-        "initial_capital": float(config.get("initial_capital", 0)),
-        "min_composite_score": float(config.get("min_composite_score", 15)),
-        "calibration_ceiling": float(config.get("calibration_ceiling", 2.0)),
-        # Scanner settings
-        "max_candidates": int(config.get("max_candidates", 25)),
-        "max_expert_stocks": int(config.get("max_expert_stocks", 10)),
-        # Critic settings
-        "critic_check_dissent": config.get("critic_check_dissent", "true").lower() != "false",
-        "critic_check_variant": config.get("critic_check_variant", "true").lower() != "false",
-        # Data gate settings
-        "dart_per_required": config.get("dart_per_required", "true").lower() != "false",
-        # Execution settings
-        "max_buy_qty": int(config.get("max_buy_qty", 10)),
-        "sector_max_pct": float(config.get("sector_max_pct", 40.0)),
-        "min_hold_minutes": int(config.get("min_hold_minutes", 0)),
-        # Multi-factor weights
-        "weight_rr_ratio": float(config.get("weight_rr_ratio", 0.25)),
-        "weight_expert_consensus": float(config.get("weight_expert_consensus", 0.25)),
-        "weight_fundamental": float(config.get("weight_fundamental", 0.20)),
-        "weight_technical": float(config.get("weight_technical", 0.20)),
-        "weight_institutional": float(config.get("weight_institutional", 0.10)),
-        # ATR dynamic stop-loss
-        "atr_stop_loss_multiplier_short": float(config.get("atr_stop_loss_multiplier_short", 2.0)),
-        "atr_stop_loss_multiplier_long": float(config.get("atr_stop_loss_multiplier_long", 3.0)),
-        "position_reeval_enabled": config.get("position_reeval_enabled", "true").lower() != "false",
-    }
-
-
 @router.get("/risk-config")
 async def get_risk_config():
     """Get current risk management configuration."""
-    rows = await execute_query("SELECT key, value FROM risk_config")
-    config = {row["key"]: row["value"] for row in rows} if rows else {}
-    return _format_risk_config(config)
+    config = await risk_config_service.get()
+    return config.to_dict()
 
 
 @router.put("/risk-config")
@@ -143,17 +112,14 @@ async def update_risk_config(body: RiskConfigUpdate):
     patch = body.model_dump(exclude_none=True)
     if not patch:
         raise HTTPException(400, "No risk config values provided")
+    if "stage1_score_formula" in patch:
+        try:
+            parse_formula(patch["stage1_score_formula"])
+        except ValueError as e:
+            raise HTTPException(400, str(e)) from None
 
-    for key, value in patch.items():
-        await execute_query(
-            "INSERT INTO risk_config (key, value) VALUES (?, ?) "
-            "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
-            (key, str(value)),
-        )
-
-    rows = await execute_query("SELECT key, value FROM risk_config")
-    config = {row["key"]: row["value"] for row in rows} if rows else {}
-    return _format_risk_config(config)
+    config = await risk_config_service.update(patch)
+    return config.to_dict()
 
 
 class StockStopLossUpdate(BaseModel):
@@ -183,6 +149,7 @@ async def update_stock_stop_loss(stock_code: str, body: StockStopLossUpdate):
                updated_at = datetime('now')""",
         (stock_code, body.stop_loss_pct, body.take_profit_pct),
     )
+    await _publish_thresholds_updated(stock_code, "manual")
     return {"stock_code": stock_code, "stop_loss_pct": body.stop_loss_pct, "source": "manual"}
 
 
@@ -193,9 +160,29 @@ async def reset_stock_stop_loss(stock_code: str):
         "UPDATE stock_stop_loss_overrides SET source = 'auto', updated_at = datetime('now') WHERE stock_code = ?",
         (stock_code,),
     )
+    await _publish_thresholds_updated(stock_code, "reset")
     return {"stock_code": stock_code, "reset": True}
 
 
+@router.get("/risk/triggers")
+async def get_risk_triggers():
+    """Current stop-loss/take-profit trigger book and trigger-to-order latency."""
+    return {
+        "triggers": trigger_book.snapshot(),
+        "latency": trigger_book.latency_stats(),
+        "recomputes": trigger_book.recomputes,
+    }
+
+
+async def _publish_thresholds_updated(stock_code: str, source: str) -> None:
+    """Tell the risk manager to recompute triggers for this stock only."""
+    await event_bus.publish(AgentEvent(
+        event_type="risk.thresholds_updated",
+        agent_id="user",
+        data={"stock_code": stock_code, "source": source},
+    ))
+
+
 @router.get("/risk/position-evaluations")
 async def get_position_evaluations(
     stock_code: str = Query(default=None),
@@ -228,6 +215,33 @@ async def get_agent(agent_id: str):
     return info
 
 
+@router.get("/{agent_id}/runs/{run_id}/trace")
+async def get_agent_run_trace(agent_id: str, run_id: int):
+    """Per-stage spans of one agent run (run_id = agent_logs.id), ordered for a waterfall view."""
+    row = await execute_query(
+        """SELECT t.log_id, t.trace_id, t.started_at, t.duration_ms, t.span_count, t.spans_json,
+                  l.success, l.result_summary, l.error_message
+           FROM agent_run_traces t JOIN agent_logs l ON l.id = t.log_id
+           WHERE t.log_id = ? AND t.agent_id = ?""",
+        (run_id, agent_id),
+        fetch_one=True,
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail=f"Trace not found: {agent_id} run {run_id}")
+    return {
+        "agent_id": agent_id,
+        "run_id": row["log_id"],
+        "trace_id": row["trace_id"],
+        "started_at": row["started_at"],
+        "duration_ms": row["duration_ms"],
+        "success": bool(row["success"]),
+        "summary": row["result_summary"],
+        "error": row["error_message"],
+        "span_count": row["span_count"],
+        "spans": json.loads(row["spans_json"] or "[]"),
+    }
+
+
 @router.put("/{agent_id}/config")
 async def update_agent_config(agent_id: str, body: AgentConfigUpdate):
     """Update agent configuration."""
@@ -276,6 +290,7 @@ async def run_agent(agent_id: str):
         "summary": result.summary,
         "events_emitted": result.events_emitted,
         "error": result.error,
+        "run_id": result.run_id,
     }
 
 
@@ -1,42 +1,41 @@
+import json
 import logging
-from collections import defaultdict
 
 from fastapi import APIRouter
 from sse_starlette.sse import EventSourceResponse
 
 from app.models.schemas import ChatRequest
+from app.services.chat_session_store import chat_session_store
 from app.services.claude_service import stream_chat
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# In-memory session store: session_id -> list of messages
-sessions: dict[str, list[dict]] = defaultdict(list)
-
 
 @router.post("/api/chat")
 async def chat(request: ChatRequest):
     """Stream a chat response via SSE."""
     session_id = request.session_id
 
-    # Add user message to session history
-    sessions[session_id].append({"role": "user", "content": request.message})
+    # Persist the user message, then load the (compacted) context for Claude
+    await chat_session_store.append(session_id, [{"role": "user", "content": request.message}])
+    summary, history = await chat_session_store.get_context(session_id)
 
     async def event_generator():
-        assistant_text = ""
-        async for event_str in stream_chat(sessions[session_id], session_id):
-            import json
+        transcript: list[dict] = []
+        async for event_str in stream_chat(history, session_id, transcript=transcript, context_summary=summary):
             event_data = json.loads(event_str)
 
-            # Accumulate assistant text for session history
-            if event_data["event"] == "text_delta":
-                assistant_text += event_data["data"]["text"]
-            elif event_data["event"] == "done":
-                # Save assistant response to session history
-                if assistant_text:
-                    sessions[session_id].append(
-                        {"role": "assistant", "content": assistant_text}
+            if event_data["event"] == "done":
+                # Save assistant/tool messages and token usage, then compact off the request path
+                if transcript:
+                    await chat_session_store.append(session_id, transcript)
+                usage = event_data["data"].get("usage")
+                if usage:
+                    await chat_session_store.record_usage(
+                        session_id, usage.get("input_tokens", 0), usage.get("output_tokens", 0)
                     )
+                chat_session_store.schedule_compaction(session_id)
 
             yield {"event": event_data["event"], "data": json.dumps(event_data["data"])}
 
@@ -46,17 +45,14 @@ async def chat(request: ChatRequest):
 @router.delete("/api/sessions/{session_id}")
 async def delete_session(session_id: str):
     """Clear a chat session."""
-    if session_id in sessions:
-        del sessions[session_id]
+    await chat_session_store.delete(session_id)
     return {"status": "ok"}
 
 
 @router.get("/api/sessions")
 async def list_sessions():
-    """List all active session IDs."""
+    """List persisted chat sessions with token usage."""
     return {
-        "sessions": [
-            {"id": sid, "message_count": len(msgs)}
-            for sid, msgs in sessions.items()
-        ]
+        "sessions": await chat_session_store.list_sessions(),
+        "cache": chat_session_store.stats(),
     }
@@ -4,6 +4,8 @@ from fastapi import APIRouter, Query
 
 from app.models.db import execute_query
 from app.services import portfolio_service
+from app.services.downsample import downsample
+from app.services.risk_config_service import risk_config_service
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
@@ -22,12 +24,8 @@ async def get_portfolio():
             "positions": [],
         }
 
-    # Fetch initial capital from risk_config
-    ic_row = await execute_query(
-        "SELECT value FROM risk_config WHERE key = 'initial_capital'",
-        fetch_one=True,
-    )
-    initial_capital = float(ic_row["value"]) if ic_row else snapshot["cash_balance"]
+    # Initial capital from the cached risk_config
+    initial_capital = (await risk_config_service.get()).initial_capital or snapshot["cash_balance"]
 
     # Recalculate P/L based on initial capital (includes realized + unrealized)
     total_value = snapshot["total_value"]
@@ -48,10 +46,21 @@ async def get_portfolio():
 
 
 @router.get("/portfolio/history")
-async def get_portfolio_history(hours: int = Query(default=24, ge=1, le=720)):
-    """Get portfolio snapshots from the last N hours."""
-    snapshots = await portfolio_service.get_portfolio_history(hours)
-    return {"snapshots": snapshots}
+async def get_portfolio_history(
+    hours: int = Query(default=24, ge=1, le=720),
+    points: int | None = Query(default=None, ge=10, le=5000),
+    mode: str = Query(default="minmax", pattern="^(minmax|lttb)$"),
+):
+    """Get portfolio snapshots from the last N hours (downsampled to ~points rows if given)."""
+    if points is None:
+        snapshots = await portfolio_service.get_portfolio_history(hours)
+        return {"snapshots": snapshots}
+    result = await portfolio_service.get_downsampled_history(hours, points, mode)
+    return {
+        "snapshots": result["points"],
+        "max_drawdown": round(result["max_drawdown"], 2),
+        "downsampled": result["downsampled"],
+    }
 
 
 @router.get("/positions")
@@ -69,8 +78,7 @@ async def _enrich_positions_with_stop_loss(positions: list[dict]) -> None:
     from app.models.db import execute_query
 
     # Load global default + all overrides in bulk (max 5 positions)
-    config_row = await execute_query("SELECT value FROM risk_config WHERE key = 'stop_loss_pct'", fetch_one=True)
-    global_stop = float(config_row["value"]) if config_row else -3.0
+    global_stop = (await risk_config_service.get()).stop_loss_pct
 
     override_rows = await execute_query(
         "SELECT stock_code, stop_loss_pct, source, investment_horizon FROM stock_stop_loss_overrides"
@@ -108,14 +116,24 @@ async def get_orders(
 
 
 @router.get("/performance")
-async def get_performance(period: str = Query(default="7d")):
-    """Get performance metrics for the given period."""
-    # Parse period to hours
-    hours_map = {"1d": 24, "7d": 168, "30d": 720, "90d": 2160}
-    hours = hours_map.get(period, 168)
-
-    snapshots = await portfolio_service.get_portfolio_history(hours)
-    if not snapshots:
+async def get_performance(
+    period: str = Query(default="7d"),
+    points: int | None = Query(default=None, ge=10, le=5000),
+    mode: str = Query(default="minmax", pattern="^(minmax|lttb)$"),
+):
+    """Get performance metrics for the given period (read from rollup tables).
+
+    points: chart_data 를 약 points 개로 줄임 (수익률·최대낙폭은 전체 버킷 기준).
+    """
+    # Parse period to hours; long ranges use daily buckets
+    hours_map = {"1d": 24, "7d": 168, "30d": 720, "90d": 2160, "1y": 8760}
+    hours = None if period == "all" else hours_map.get(period, 168)
+    bucket = "hour" if hours is not None and hours <= 2160 else "day"
+
+    rows = await portfolio_service.get_value_rollups(hours, bucket=bucket)
+    chart_rows = downsample(rows or [], points, mode) if points else rows or []
+    chart_data = [portfolio_service.chart_point(r) for r in chart_rows]
+    if not rows:
         return {
             "returns_pct": 0,
             "max_drawdown": 0,
@@ -123,45 +141,37 @@ async def get_performance(period: str = Query(default="7d")):
             "chart_data": [],
         }
 
-    # Calculate basic performance metrics
-    values = [s["total_value"] for s in snapshots if s["total_value"] > 0]
-    if len(values) < 2:
+    snapshot_count = sum(r["snapshot_count"] for r in rows)
+    if snapshot_count < 2:
         return {
             "returns_pct": 0,
             "max_drawdown": 0,
             "trade_count": 0,
-            "chart_data": snapshots,
+            "chart_data": chart_data,
         }
 
-    initial = values[0]
-    final = values[-1]
+    initial = rows[0]["open_value"]
+    final = rows[-1]["close_value"]
     returns_pct = ((final - initial) / initial * 100) if initial > 0 else 0
+    max_dd = portfolio_service.max_drawdown_pct(rows)
 
-    # Max drawdown
-    peak = values[0]
-    max_dd = 0
-    for v in values:
-        if v > peak:
-            peak = v
-        dd = (peak - v) / peak * 100 if peak > 0 else 0
-        if dd > max_dd:
-            max_dd = dd
-
-    # Trade count from orders
-    orders_data = await portfolio_service.get_orders(limit=1000, status="filled")
-    trade_count = orders_data["total_count"]
+    # Trade count from the order rollup
+    trade_count = await portfolio_service.get_order_count(status="filled")
 
-    return {
+    result = {
         "returns_pct": round(returns_pct, 2),
         "max_drawdown": round(max_dd, 2),
         "trade_count": trade_count,
-        "chart_data": snapshots,
+        "bucket": bucket,
+        "chart_data": chart_data,
     }
+    if points:
+        result["downsampled"] = {"mode": mode, "points": points, "source_rows": len(rows), "returned": len(chart_data)}
+    return result
 
 
 @router.get("/risk-analysis")
-async def risk_analysis():
-    from app.services.portfolio_risk_service import compute_portfolio_risk
-    positions = await portfolio_service.get_latest_positions()
-    risk = await compute_portfolio_risk(positions)
-    return risk
+async def risk_analysis(max_age: float | None = Query(None, ge=0)):
+    """Latest risk snapshot; recomputed only when holdings/daily bars changed or older than max_age (sec)."""
+    from app.services.risk_snapshot_service import risk_snapshot_service
+    return await risk_snapshot_service.get(max_age=max_age)
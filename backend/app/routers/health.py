@@ -1,6 +1,9 @@
 from fastapi import APIRouter
+from fastapi.responses import Response
 
+from app.config import settings
 from app.services.mcp_client import mcp_manager
+from app.services.metrics import CONTENT_TYPE, metrics
 from app.services.runtime_settings import runtime_settings
 
 router = APIRouter()
@@ -11,6 +14,7 @@ async def health():
     """Health check endpoint showing MCP, agent, and scheduler status."""
     from app.agents.engine import agent_engine
     from app.services.scheduler import trading_scheduler
+    from app.services.tick_feed import tick_feed
     from app.services.ws_manager import ws_manager
 
     current = runtime_settings.get_all()
@@ -19,10 +23,26 @@ async def health():
         "mcp_connected": mcp_manager.connected,
         "mcp_tools_count": len(mcp_manager.tools),
         "mcp_tools": [t["name"] for t in mcp_manager.tools],
+        "mcp_pool": mcp_manager.pool_stats(),
         "trading_mode": current.get("trading_mode", "demo"),
         "claude_model": current.get("claude_model"),
         "agents_count": len(agent_engine.agents),
         "agents_running": agent_engine.is_running,
         "scheduler_running": trading_scheduler.is_running,
         "ws_clients": ws_manager.client_count,
+        "tick_feed": tick_feed.stats() if settings.tick_feed_enabled else None,
     }
+
+
+@router.get("/health/storage")
+async def storage_stats():
+    """Per-table row counts and sizes, file sizes, and the last retention run."""
+    from app.services.retention_service import retention_service
+
+    return await retention_service.table_stats()
+
+
+@router.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text exposition of in-process metrics."""
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
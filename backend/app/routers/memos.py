@@ -1,29 +1,48 @@
-from fastapi import APIRouter
-from fastapi.responses import HTMLResponse, Response
-from app.services.memo_service import generate_memo_html
+from fastapi import APIRouter, Query
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from app.services.memo_service import memo_renderer
 
 router = APIRouter(prefix="/api/memos", tags=["memos"])
 
 
+def _timing_headers(artifact) -> dict[str, str]:
+    return {
+        "Content-Disposition": f"attachment; filename={artifact.filename}",
+        "X-Memo-Cache": "hit" if artifact.cached else "miss",
+        "X-Render-Ms": f"{artifact.render_ms:.1f}",
+    }
+
+
+@router.get("/stats")
+async def memo_render_stats():
+    """Per-format render counts, cache hits and timings since startup."""
+    return memo_renderer.stats()
+
+
+@router.get("/export")
+async def export_memos_zip(
+    signal_ids: list[int] = Query(..., description="Signal IDs (repeat the parameter)"),
+    format: str = Query("docx", pattern="^(html|docx)$"),
+):
+    """Bulk export — memos are rendered in the worker pool and streamed as a zip."""
+    return StreamingResponse(
+        memo_renderer.stream_zip(signal_ids, format),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=memos_{format}.zip"},
+    )
+
+
 @router.get("/{signal_id}/html", response_class=HTMLResponse)
 async def export_memo_html(signal_id: int):
-    html = await generate_memo_html(signal_id)
-    if not html:
+    artifact = await memo_renderer.render_signal(signal_id, "html")
+    if not artifact:
         return HTMLResponse("<p>시그널을 찾을 수 없습니다</p>", status_code=404)
-    return HTMLResponse(
-        html,
-        headers={"Content-Disposition": f"attachment; filename=memo_{signal_id}.html"}
-    )
+    return HTMLResponse(artifact.content.decode("utf-8"), headers=_timing_headers(artifact))
 
 
 @router.get("/{signal_id}/docx")
 async def export_memo_docx(signal_id: int):
-    from app.services.memo_service import generate_memo_docx
-    docx_bytes = await generate_memo_docx(signal_id)
-    if not docx_bytes:
+    artifact = await memo_renderer.render_signal(signal_id, "docx")
+    if not artifact:
         return Response(content="시그널을 찾을 수 없습니다", status_code=404)
-    return Response(
-        content=docx_bytes,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f"attachment; filename=memo_{signal_id}.docx"}
-    )
+    return Response(content=artifact.content, media_type=artifact.media_type, headers=_timing_headers(artifact))
@@ -5,6 +5,7 @@ import json
 from fastapi import APIRouter, HTTPException, Query
 
 from app.models.db import execute_query
+from app.services import portfolio_service
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
@@ -102,11 +103,6 @@ async def delete_reports_bulk(
 
 @router.get("/performance/history")
 async def get_performance_history(days: int = Query(30, ge=1, le=365)):
-    """Return portfolio value history for charting."""
-    rows = await execute_query(
-        """SELECT timestamp, total_value, cash_balance, total_pnl, total_pnl_pct
-           FROM portfolio_snapshots
-           ORDER BY timestamp DESC LIMIT ?""",
-        (days * 20,),  # multiple snapshots per day
-    )
-    return {"history": list(reversed(rows or []))}
+    """Return portfolio value history for charting (hourly rollup closes)."""
+    rows = await portfolio_service.get_value_rollups(days * 24, bucket="hour")
+    return {"history": [portfolio_service.chart_point(r) for r in rows or []]}
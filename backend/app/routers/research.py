@@ -71,48 +71,19 @@ async def search_stocks(q: str = Query(..., min_length=1)):
         return {"results": results}
 
     try:
-        raw = await mcp_manager.call_tool(
+        result = await mcp_manager.call_tool_result(
             "domestic_stock",
             {"api_type": "find_stock_code", "params": {"stock_name": q}},
         )
-        import json as _json
-
-        # Parse MCP response — may be CallToolResult, str, or dict
-        if isinstance(raw, str):
-            try:
-                data = _json.loads(raw)
-            except (_json.JSONDecodeError, TypeError):
-                data = {}
-        elif hasattr(raw, "content"):
-            text = raw.content if isinstance(raw.content, str) else raw.content[0].text
-            try:
-                data = _json.loads(text)
-            except (_json.JSONDecodeError, TypeError):
-                data = {}
-        elif isinstance(raw, dict):
-            data = raw
-        else:
-            data = {}
 
         # MCP returns {"ok": True, "data": {"stock_code": ..., "stock_name_found": ...}}
-        if isinstance(data, dict) and data.get("ok"):
-            inner = data.get("data", {})
-            if inner.get("found") and inner.get("stock_code") and inner["stock_code"] not in seen:
-                results.append({
-                    "stock_code": inner["stock_code"],
-                    "stock_name": inner.get("stock_name_found", query),
-                    "market": inner.get("ex", ""),
-                })
-        elif isinstance(data, list):
-            for item in data[:20]:
-                if isinstance(item, dict):
-                    code = item.get("stock_code", item.get("code", ""))
-                    if code and code not in seen:
-                        results.append({
-                            "stock_code": code,
-                            "stock_name": item.get("stock_name", item.get("name", "")),
-                            "market": item.get("market", ""),
-                        })
+        inner = result.value if result.ok and isinstance(result.value, dict) else {}
+        if inner.get("found") and inner.get("stock_code") and inner["stock_code"] not in seen:
+            results.append({
+                "stock_code": inner["stock_code"],
+                "stock_name": inner.get("stock_name_found", query),
+                "market": inner.get("ex", ""),
+            })
 
         return {"results": results}
     except Exception as e:
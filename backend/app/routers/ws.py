@@ -13,8 +13,17 @@ async def websocket_endpoint(ws: WebSocket):
     await ws_manager.connect(ws)
     try:
         while True:
-            # Keep connection alive; handle client messages if needed
+            # subscribe / unsubscribe / resync commands (see WebSocketManager)
             data = await ws.receive_text()
-            # Future: handle subscribe/unsubscribe commands from client
+            await ws_manager.handle_client_message(ws, data)
     except WebSocketDisconnect:
         await ws_manager.disconnect(ws)
+
+
+@router.get("/api/ws/clients")
+async def websocket_clients():
+    """Per-client outbound queue depth and send lag."""
+    return {
+        "clients": ws_manager.client_stats(),
+        "dropped_clients": ws_manager.dropped_clients,
+    }
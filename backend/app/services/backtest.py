@@ -0,0 +1,649 @@
+"""Vectorized backtester — replays the scanner pipeline over historical daily bars.
+
+일봉을 (종목 N × 거래일 T) 배열로 적재하고, 스캐너의 결정적 단계를 전 구간에 대해
+한 번에 계산한 뒤 포트폴리오를 일자 순으로 시뮬레이션한다.
+
+- Stage 1: 거래량/등락률 순위 점수 → 상위 max_candidates (유니버스 내 순위)
+- Stage 2: 기술 지표 (backtest_indicators, compute_all_indicators 와 동일 값)
+- Stage 2.7/2.8: check_hard_gate, 과매수+거래량 급감 필터
+- Stage 3~5 (LLM): StageScorer 로 대체 (R/R, 전문가 합의, 수급, 방향, critic)
+- Stage 4.5/5.5: 복합 점수, 투자 기간, ATR 손절율 (compute_composite_score 등과 동일 식)
+- 리스크 게이트: check_signal_limits (RiskManagerAgent._validate_signal 과 같은 함수)
+- 체결: 신호 다음 날 시가 + 슬리피지, 장중 고가/저가로 손절/익절, 수수료·거래세 반영
+
+파라미터 스윕은 run_sweep 으로 프로세스 풀에서 돌린다 (지표는 한 번만 계산).
+"""
+from __future__ import annotations
+
+import csv
+import dataclasses
+import itertools
+import logging
+import math
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+import numpy as np
+
+from app.agents.risk_manager import check_signal_limits
+from app.agents.state import PortfolioCache
+from app.models.composite_score import (
+    compute_data_quality_multiplier,
+    normalize_weights,
+    score_fundamental,
+)
+from app.models.confidence import CRITICAL_FIELDS, check_hard_gate
+from app.models.risk_config import RiskConfig
+from app.services.backtest_indicators import IndicatorPanel, compute_indicator_panel
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+RANK_SIZE = 50  # get_volume_rank / get_fluctuation_rank 조회 건수
+DEFAULT_INITIAL_CAPITAL = 10_000_000.0
+
+
+# ── Bars ──
+
+
+@dataclass
+class BarPanel:
+    """Daily OHLCV aligned on one date axis — arrays shaped (N symbols, T dates).
+
+    상장 전 구간은 NaN, 상장 후 결측일(거래정지)은 직전 종가로 채우고 거래량 0.
+    """
+
+    codes: list[str]
+    dates: list[str]
+    opens: np.ndarray
+    highs: np.ndarray
+    lows: np.ndarray
+    closes: np.ndarray
+    volumes: np.ndarray
+    sectors: dict[str, str] = field(default_factory=dict)
+    # {code: {"per", "roe", "debt_ratio", "operating_margin"}} — 없으면 펀더멘털 점수 0.5
+    fundamentals: dict[str, dict] = field(default_factory=dict)
+    # {code: {field: "A".."D"}} — 없으면 CRITICAL_FIELDS 전부 "A"
+    confidence_grades: dict[str, dict[str, str]] = field(default_factory=dict)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.closes.shape
+
+    @classmethod
+    def from_series(
+        cls, bars: dict[str, dict[str, tuple[float, float, float, float, float]]], **meta: Any
+    ) -> BarPanel:
+        """{code: {"YYYYMMDD": (open, high, low, close, volume)}} → panel."""
+        codes = [c for c, s in bars.items() if s]
+        dates = sorted({d for c in codes for d in bars[c]})
+        index = {d: t for t, d in enumerate(dates)}
+        raw = np.full((5, len(codes), len(dates)), np.nan)
+        for i, code in enumerate(codes):
+            series = bars[code]
+            cols = np.fromiter((index[d] for d in series), dtype=np.int64, count=len(series))
+            raw[:, i, cols] = np.asarray(list(series.values()), dtype=np.float64).T
+        opens, highs, lows, closes, volumes = _fill_gaps(raw)
+        return cls(codes, dates, opens, highs, lows, closes, volumes, **meta)
+
+    @classmethod
+    def from_charts(cls, charts: dict[str, list[dict]], **meta: Any) -> BarPanel:
+        """KIS inquire_daily_itemchartprice output2 rows per code (any order)."""
+        bars: dict[str, dict[str, tuple]] = {}
+        for code, rows in charts.items():
+            series = {}
+            for row in rows:
+                try:
+                    bar = tuple(float(row.get(k) or 0) for k in ("stck_oprc", "stck_hgpr", "stck_lwpr", "stck_clpr", "acml_vol"))
+                except (TypeError, ValueError):
+                    continue
+                date = row.get("stck_bsop_date")
+                if date and bar[3] > 0:
+                    series[date] = bar
+            bars[code] = series
+        return cls.from_series(bars, **meta)
+
+    @classmethod
+    def from_csv_dir(cls, path: str | Path, **meta: Any) -> BarPanel:
+        """``{code}.csv`` files with a date,open,high,low,close,volume header."""
+        bars = {}
+        for file in sorted(Path(path).glob("*.csv")):
+            with file.open(newline="") as f:
+                bars[file.stem] = {
+                    row["date"].replace("-", ""): tuple(
+                        float(row[k]) for k in ("open", "high", "low", "close", "volume")
+                    )
+                    for row in csv.DictReader(f)
+                }
+        return cls.from_series(bars, **meta)
+
+    def save(self, path: str | Path) -> None:
+        """Cache arrays as .npz (sector map included; fundamentals/grades are not)."""
+        np.savez_compressed(
+            path,
+            codes=np.array(self.codes),
+            dates=np.array(self.dates),
+            ohlcv=np.stack([self.opens, self.highs, self.lows, self.closes, self.volumes]),
+            sector_codes=np.array(list(self.sectors), dtype=str),
+            sector_names=np.array(list(self.sectors.values()), dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path, **meta: Any) -> BarPanel:
+        with np.load(path) as data:
+            opens, highs, lows, closes, volumes = data["ohlcv"]
+            sectors = dict(zip(data["sector_codes"].tolist(), data["sector_names"].tolist()))
+            return cls(
+                data["codes"].tolist(), data["dates"].tolist(),
+                opens, highs, lows, closes, volumes,
+                **{"sectors": sectors, **meta},
+            )
+
+
+def _fill_gaps(raw: np.ndarray) -> np.ndarray:
+    """Forward-fill suspended days after listing: OHLC = previous close, volume 0."""
+    closes = raw[3]
+    n, t_len = closes.shape
+    valid = ~np.isnan(closes)
+    last = np.where(valid, np.arange(t_len), -1)
+    np.maximum.accumulate(last, axis=1, out=last)
+    listed = last >= 0
+    gap = listed & ~valid
+    filled_close = np.where(listed, closes[np.arange(n)[:, None], np.maximum(last, 0)], np.nan)
+    out = raw.copy()
+    out[3] = filled_close
+    for k in range(3):
+        out[k] = np.where(gap, filled_close, raw[k])
+    out[4] = np.where(gap, 0.0, raw[4])
+    return out
+
+
+async def load_kospi200_panel(start: str, end: str, codes: list[str] | None = None) -> BarPanel:
+    """Fetch KOSPI200 daily bars from KIS for [start, end] (YYYYMMDD) — slow; save() the result."""
+    from app.models.db import execute_query
+    from app.services.market_service import get_daily_chart_range, get_kospi200_components
+
+    codes = codes or await get_kospi200_components()
+    charts = {}
+    for n, code in enumerate(codes, 1):
+        charts[code] = await get_daily_chart_range(code, start, end)
+        if n % 20 == 0:
+            logger.info(f"Backtest bars: {n}/{len(codes)} symbols loaded")
+    rows = await execute_query("SELECT stock_code, sector FROM kospi200_components")
+    sectors = {r["stock_code"]: r["sector"] for r in rows or [] if r.get("sector")}
+    return BarPanel.from_charts(charts, sectors=sectors)
+
+
+# ── LLM stage stubs ──
+
+
+@dataclass
+class StageScores:
+    """Outputs of the LLM stages — scalars or (N, T) arrays."""
+
+    rr_score: Any = 2.0             # compute_rr_score 결과 (시나리오 R/R)
+    expert_consensus: Any = 0.5     # score_expert_consensus (0–1)
+    institutional: Any = 0.5        # score_institutional_flow (0–1)
+    buy: Any = True                 # 방향 == BUY
+    sell: Any = False               # 방향 == SELL (보유 종목만 의미 있음)
+    critic_pass: Any = True
+
+
+class StageScorer(Protocol):
+    """Stand-in for expert panel / chief debate / critic."""
+
+    def __call__(self, panel: BarPanel, indicators: IndicatorPanel) -> StageScores: ...
+
+
+@dataclass(frozen=True)
+class ConstantScorer:
+    """Same LLM outcome for every candidate — isolates the deterministic stages."""
+
+    rr_score: float = 2.0
+    expert_consensus: float = 0.5
+    institutional: float = 0.5
+
+    def __call__(self, panel: BarPanel, indicators: IndicatorPanel) -> StageScores:
+        return StageScores(self.rr_score, self.expert_consensus, self.institutional)
+
+
+@dataclass(frozen=True)
+class ExecutionCosts:
+    """Fill model (percent values)."""
+
+    slippage_pct: float = 0.05
+    commission_pct: float = 0.015
+    sell_tax_pct: float = 0.18
+
+
+# ── Deterministic stages (vectorized) ──
+
+
+def _rank_points(values: np.ndarray, valid: np.ndarray, size: int) -> np.ndarray:
+    """Per-date rank score ``size - rank`` for the top ``size`` symbols, else 0."""
+    n = values.shape[0]
+    keyed = np.where(valid, values, -np.inf)
+    order = np.argsort(-keyed, axis=0, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(n)[:, None], order.shape), axis=0)
+    return np.where(valid & (ranks < size), size - ranks, 0)
+
+
+def stage1_scores(panel: BarPanel, indicators: IndicatorPanel) -> np.ndarray:
+    """_stage1_screening 점수 (거래량 순위 + 등락률 순위) — 유니버스 안에서의 순위 기준."""
+    traded = panel.volumes > 0
+    change_ok = traded & ~np.isnan(indicators.change_pct)
+    return (
+        _rank_points(panel.volumes, traded, RANK_SIZE)
+        + _rank_points(indicators.change_pct, change_ok, RANK_SIZE)
+    )
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    order = np.argsort(-scores, axis=0, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(scores.shape[0])[:, None], order.shape), axis=0)
+    return (scores > 0) & (ranks < k)
+
+
+def technical_scores(ind: IndicatorPanel) -> np.ndarray:
+    """score_technical_momentum over the panel.
+
+    compute_composite_score 는 `tech.get("rsi_14") or ...` 로 읽으므로 0.0 은 결측으로
+    취급되고, compute_all_indicators 에는 histogram_prev 가 없어 'rising' 은 항상 False —
+    라이브와 같은 점수를 내도록 그대로 따른다.
+    """
+    rsi, hist = ind.rsi_14, ind.macd_histogram
+    vol, k = ind.volume_change_5d_pct, ind.stochastic_k
+    with np.errstate(invalid="ignore"):
+        parts = [
+            (np.select(
+                [rsi > 80, rsi >= 50, rsi >= 40, rsi >= 30],
+                [np.full_like(rsi, 0.3), 0.5 + (rsi - 50) / 20.0 * 0.5,
+                 0.3 + (rsi - 40) / 10.0 * 0.2, 0.2 + (rsi - 30) / 10.0 * 0.1],
+                0.4,
+            ), ~np.isnan(rsi) & (rsi != 0)),
+            (np.where(hist > 0, 0.6, 0.2), ~np.isnan(hist)),
+            (np.select(
+                [vol >= 50, vol >= 0, vol >= -30],
+                [np.ones_like(vol), 0.5 + vol / 50.0 * 0.5, 0.2 + (vol + 30) / 30.0 * 0.3],
+                0.2,
+            ), ~np.isnan(vol) & (vol != 0)),
+            (np.select(
+                [k > 80, k >= 50, k >= 20],
+                [np.full_like(k, 0.2), 0.5 + (k - 50) / 30.0 * 0.3, 0.3 + (k - 20) / 30.0 * 0.2],
+                0.5,
+            ), ~np.isnan(k)),
+        ]
+    total = sum(np.where(present, score, 0.0) for score, present in parts)
+    count = sum(present.astype(np.int64) for _, present in parts)
+    return np.where(count > 0, total / np.maximum(count, 1), 0.5)
+
+
+def _fundamental_field(fins: dict, key: str) -> float | None:
+    return fins.get(key) or fins.get(f"dart_{key}")
+
+
+def composite_scores(
+    panel: BarPanel, ind: IndicatorPanel, scores: StageScores, config: RiskConfig
+) -> np.ndarray:
+    """compute_composite_score (0–100) for every (symbol, date)."""
+    n, t_len = panel.shape
+    w = normalize_weights({
+        "rr_ratio": config.weight_rr_ratio,
+        "expert_consensus": config.weight_expert_consensus,
+        "fundamental": config.weight_fundamental,
+        "technical": config.weight_technical,
+        "institutional": config.weight_institutional,
+    })
+    ceiling = config.calibration_ceiling
+    rr = np.broadcast_to(np.asarray(scores.rr_score, dtype=np.float64), (n, t_len))
+    rr_sub = np.clip(rr / ceiling, 0.0, 1.0) if ceiling > 0 else np.zeros((n, t_len))
+    fundamental = np.array([
+        score_fundamental(**{k: _fundamental_field(panel.fundamentals.get(c, {}), k)
+                             for k in ("per", "roe", "debt_ratio", "operating_margin")})
+        for c in panel.codes
+    ])
+    quality = np.array([compute_data_quality_multiplier(_grades(panel, c)) for c in panel.codes])
+    raw = (
+        w.get("rr_ratio", 0.25) * rr_sub
+        + w.get("expert_consensus", 0.25) * np.asarray(scores.expert_consensus, dtype=np.float64)
+        + w.get("fundamental", 0.20) * fundamental[:, None]
+        + w.get("technical", 0.20) * technical_scores(ind)
+        + w.get("institutional", 0.10) * np.asarray(scores.institutional, dtype=np.float64)
+    )
+    return np.clip(raw * quality[:, None] * 100, 0.0, 100.0)
+
+
+def stop_loss_pcts(panel: BarPanel, ind: IndicatorPanel, config: RiskConfig) -> np.ndarray:
+    """determine_investment_horizon + compute_atr_stop_loss_pct; NaN → 전역 stop_loss_pct."""
+    long_fundamentals = np.array([
+        bool((per := _fundamental_field(f, "per")) and 0 < per < 20
+             and (roe := _fundamental_field(f, "roe")) and roe > 10)
+        for f in (panel.fundamentals.get(c, {}) for c in panel.codes)
+    ])
+    rsi, hist = ind.rsi_14, ind.macd_histogram
+    with np.errstate(invalid="ignore"):
+        long_signals = (
+            ind.ma_bullish.astype(np.int64)
+            + ((rsi > 40) & (rsi < 65))
+            + long_fundamentals[:, None]
+            + (ind.macd_bullish_cross | (np.nan_to_num(hist) > 0))
+        )
+        multiplier = np.where(
+            long_signals >= 3, config.atr_stop_loss_multiplier_long, config.atr_stop_loss_multiplier_short
+        )
+        price = panel.closes
+        return np.where(
+            (ind.atr_14 > 0) & (price > 0),
+            -np.round(ind.atr_14 * multiplier / price * 100, 2),
+            np.nan,
+        )
+
+
+def _grades(panel: BarPanel, code: str) -> dict[str, str]:
+    return panel.confidence_grades.get(code) or {f: "A" for f in CRITICAL_FIELDS}
+
+
+@dataclass
+class _Plan:
+    """Config-dependent arrays consumed by the day loop."""
+
+    stage1: np.ndarray
+    entry: np.ndarray
+    composite: np.ndarray
+    stop_pct: np.ndarray
+    sell: np.ndarray
+    critic_pass: np.ndarray
+
+
+def build_plan(
+    panel: BarPanel, ind: IndicatorPanel, scores: StageScores, config: RiskConfig
+) -> _Plan:
+    """Stages 1–5.5 for the whole panel (everything before the portfolio-dependent gates)."""
+    shape = panel.shape
+    stage1 = stage1_scores(panel, ind)
+    candidates = _top_k(stage1, config.max_candidates) & ind.ready
+    gate = np.array([
+        check_hard_gate(_grades(panel, c), dart_per_required=config.dart_per_required)[0]
+        for c in panel.codes
+    ])
+    with np.errstate(invalid="ignore"):
+        overbought = (ind.stochastic_k > config.overbought_stoch_k) & (
+            ind.volume_change_5d_pct < config.vol_collapse_pct
+        )
+    buy = np.broadcast_to(np.asarray(scores.buy, dtype=bool), shape)
+    return _Plan(
+        stage1=stage1,
+        entry=candidates & gate[:, None] & ~overbought & buy,
+        composite=composite_scores(panel, ind, scores, config),
+        stop_pct=stop_loss_pcts(panel, ind, config),
+        sell=np.broadcast_to(np.asarray(scores.sell, dtype=bool), shape),
+        critic_pass=np.broadcast_to(np.asarray(scores.critic_pass, dtype=bool), shape),
+    )
+
+
+# ── Portfolio simulation ──
+
+
+@dataclass
+class _Position:
+    qty: int
+    cost: float       # 매수 수수료 포함 취득원가 합계
+    avg_price: float  # 트리거 기준가 (체결가 평균)
+    stop_pct: float
+    entry_date: str
+
+
+@dataclass
+class BacktestResult:
+    dates: list[str]
+    equity: np.ndarray
+    trades: list[dict[str, Any]]
+    rejections: dict[str, int]
+    open_positions: int
+    initial_capital: float
+    params: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        equity = self.equity
+        if len(equity) == 0:
+            return {"total_return_pct": 0.0, "trades": 0}
+        returns = np.diff(equity) / equity[:-1] if len(equity) > 1 else np.zeros(0)
+        peak = np.maximum.accumulate(equity)
+        years = len(equity) / TRADING_DAYS
+        final = float(equity[-1]) / self.initial_capital
+        std = float(returns.std()) if len(returns) > 1 else 0.0
+        pnl = np.array([t["pnl_pct"] for t in self.trades])
+        return {
+            "total_return_pct": round((final - 1) * 100, 2),
+            "cagr_pct": round((final ** (1 / years) - 1) * 100, 2) if years > 0 and final > 0 else 0.0,
+            "max_drawdown_pct": round(float(((peak - equity) / peak).max()) * 100, 2),
+            "sharpe": round(float(returns.mean()) / std * math.sqrt(TRADING_DAYS), 2) if std > 0 else 0.0,
+            "trades": len(self.trades),
+            "win_rate_pct": round(float((pnl > 0).mean()) * 100, 1) if len(pnl) else 0.0,
+            "avg_trade_pct": round(float(pnl.mean()), 2) if len(pnl) else 0.0,
+            "open_positions": self.open_positions,
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "params": self.params,
+            "stats": self.stats,
+            "rejections": self.rejections,
+            "trades": self.trades,
+            "equity": [{"date": d, "value": round(float(v), 0)} for d, v in zip(self.dates, self.equity)],
+        }
+
+
+def _rejection_key(reason: str) -> str:
+    return reason.split(" (")[0].split(":")[0]
+
+
+def simulate(
+    panel: BarPanel,
+    plan: _Plan,
+    config: RiskConfig,
+    costs: ExecutionCosts = ExecutionCosts(),
+    initial_capital: float | None = None,
+) -> BacktestResult:
+    """Walk the dates: fill at next open, check stops/targets on the day's range, mark at close.
+
+    라이브와 마찬가지로 손절을 익절보다 먼저 본다 (같은 봉에서 둘 다 닿으면 손절).
+    시가가 이미 트리거를 넘었으면 시가에 체결 (갭).
+    """
+    capital = initial_capital or config.initial_capital or DEFAULT_INITIAL_CAPITAL
+    n, t_len = panel.shape
+    codes, dates = panel.codes, panel.dates
+    slip = costs.slippage_pct / 100
+    commission = costs.commission_pct / 100
+    sell_fee = commission + costs.sell_tax_pct / 100
+
+    cash = capital
+    positions: dict[int, _Position] = {}
+    pending_buys: list[tuple[int, float]] = []
+    pending_sells: list[int] = []
+    equity = np.empty(t_len)
+    trades: list[dict[str, Any]] = []
+    rejections: Counter[str] = Counter()
+
+    def close_position(i: int, price: float, t: int, reason: str) -> None:
+        nonlocal cash
+        pos = positions.pop(i)
+        fill = price * (1 - slip)
+        proceeds = pos.qty * fill * (1 - sell_fee)
+        cash += proceeds
+        trades.append({
+            "stock_code": codes[i],
+            "entry_date": pos.entry_date,
+            "exit_date": dates[t],
+            "qty": pos.qty,
+            "entry_price": round(pos.avg_price, 2),
+            "exit_price": round(fill, 2),
+            "pnl": round(proceeds - pos.cost, 0),
+            "pnl_pct": round((proceeds / pos.cost - 1) * 100, 2),
+            "reason": reason,
+        })
+
+    for t in range(t_len):
+        opens, highs, lows, closes = (a[:, t] for a in (panel.opens, panel.highs, panel.lows, panel.closes))
+
+        # 1) 전일 신호 체결 (시가)
+        for i in pending_sells:
+            if i in positions:
+                close_position(i, float(opens[i]), t, "signal")
+        for i, stop_pct in pending_buys:
+            fill = float(opens[i]) * (1 + slip)
+            qty = min(int(cash // (fill * (1 + commission))), config.max_buy_qty) if fill > 0 else 0
+            if qty <= 0:
+                rejections["매수 가능 수량 없음"] += 1
+                continue
+            cost = qty * fill * (1 + commission)
+            cash -= cost
+            held = positions.get(i)
+            if held:
+                total = held.qty + qty
+                positions[i] = _Position(
+                    total, held.cost + cost, (held.avg_price * held.qty + fill * qty) / total,
+                    stop_pct, held.entry_date,
+                )
+            else:
+                positions[i] = _Position(qty, cost, fill, stop_pct, dates[t])
+        pending_buys, pending_sells = [], []
+
+        # 2) 장중 손절/익절 (trigger_book.check 와 같은 순서)
+        for i in list(positions):
+            pos = positions[i]
+            stop = pos.avg_price * (1 + pos.stop_pct / 100)
+            target = pos.avg_price * (1 + config.take_profit_pct / 100)
+            o, h, low = float(opens[i]), float(highs[i]), float(lows[i])
+            if low <= stop:
+                close_position(i, min(o, stop), t, "stop_loss")
+            elif h >= target:
+                close_position(i, max(o, target), t, "take_profit")
+
+        # 3) 종가 평가
+        market_values = {i: pos.qty * float(closes[i]) for i, pos in positions.items()}
+        equity[t] = cash + sum(market_values.values())
+        if t == t_len - 1:
+            break
+
+        # 4) 종가 기준 신호 → 리스크 게이트 → 다음 날 시가 주문
+        portfolio = PortfolioCache(
+            total_value=float(equity[t]),
+            cash_balance=cash,
+            total_pnl=sum(market_values[i] - pos.cost for i, pos in positions.items()),
+            positions=[{"stock_code": codes[i], "market_value": v} for i, v in market_values.items()],
+        )
+        for i in positions:
+            if plan.sell[i, t]:
+                signal = {"stock_code": codes[i], "direction": "sell",
+                          "confidence": float(plan.composite[i, t]) / 100,
+                          "critic_result": "pass" if plan.critic_pass[i, t] else "fail"}
+                reason = check_signal_limits(signal, config, portfolio, panel.sectors)
+                if reason:
+                    rejections[_rejection_key(reason)] += 1
+                else:
+                    pending_sells.append(i)
+
+        candidates = np.flatnonzero(plan.entry[:, t])
+        for i in candidates[np.argsort(-plan.stage1[candidates, t], kind="stable")].tolist():
+            signal = {"stock_code": codes[i], "direction": "buy",
+                      "confidence": float(plan.composite[i, t]) / 100,
+                      "critic_result": "pass" if plan.critic_pass[i, t] else "fail"}
+            reason = check_signal_limits(signal, config, portfolio, panel.sectors)
+            if reason:
+                rejections[_rejection_key(reason)] += 1
+                continue
+            stop_pct = float(plan.stop_pct[i, t])
+            pending_buys.append((i, config.stop_loss_pct if math.isnan(stop_pct) else stop_pct))
+            if i not in positions:
+                # 같은 날 이후 신호가 보는 포지션 수/섹터 비중에 승인분을 반영 (추정 체결 금액)
+                estimate = min(config.max_buy_qty * float(closes[i]), portfolio.cash_balance)
+                portfolio.positions.append({"stock_code": codes[i], "market_value": estimate})
+
+    return BacktestResult(
+        dates=dates,
+        equity=equity,
+        trades=trades,
+        rejections=dict(rejections),
+        open_positions=len(positions),
+        initial_capital=capital,
+    )
+
+
+def run_backtest(
+    panel: BarPanel,
+    config: RiskConfig | None = None,
+    scorer: StageScorer | None = None,
+    costs: ExecutionCosts = ExecutionCosts(),
+    initial_capital: float | None = None,
+    indicators: IndicatorPanel | None = None,
+) -> BacktestResult:
+    """Full pipeline replay. Pass ``indicators`` to reuse one indicator pass across runs."""
+    config = config or RiskConfig()
+    ind = indicators or compute_indicators(panel)
+    scores = (scorer or ConstantScorer())(panel, ind)
+    plan = build_plan(panel, ind, scores, config)
+    return simulate(panel, plan, config, costs, initial_capital)
+
+
+def compute_indicators(panel: BarPanel) -> IndicatorPanel:
+    return compute_indicator_panel(panel.opens, panel.highs, panel.lows, panel.closes, panel.volumes)
+
+
+# ── Parameter sweeps ──
+
+
+def param_grid(**axes: list[Any]) -> list[dict[str, Any]]:
+    """Cartesian product of RiskConfig overrides: param_grid(stop_loss_pct=[-3, -5], ...)."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(panel: BarPanel, indicators: IndicatorPanel, base: RiskConfig,
+                 scorer: StageScorer, costs: ExecutionCosts, initial_capital: float | None) -> None:
+    _worker.update(panel=panel, indicators=indicators, base=base, scorer=scorer, costs=costs,
+                   initial_capital=initial_capital)
+
+
+def _run_params(params: dict[str, Any]) -> dict[str, Any]:
+    config = dataclasses.replace(_worker["base"], **params)
+    result = run_backtest(
+        _worker["panel"], config, _worker["scorer"], _worker["costs"],
+        _worker["initial_capital"], indicators=_worker["indicators"],
+    )
+    return {"params": params, **result.stats}
+
+
+def run_sweep(
+    panel: BarPanel,
+    grid: list[dict[str, Any]],
+    base: RiskConfig | None = None,
+    scorer: StageScorer | None = None,
+    costs: ExecutionCosts = ExecutionCosts(),
+    initial_capital: float | None = None,
+    max_workers: int | None = None,
+) -> list[dict[str, Any]]:
+    """Run one backtest per grid entry on a process pool; stats in grid order.
+
+    지표는 부모 프로세스에서 한 번 계산해 워커 초기화 시 한 번만 전달한다.
+    scorer 는 pickle 가능해야 한다 (모듈 최상위 클래스).
+    """
+    indicators = compute_indicators(panel)
+    # spawn: 백엔드 안에서 호출될 때 aiosqlite/httpx 스레드가 있는 부모를 fork 하지 않음
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(panel, indicators, base or RiskConfig(), scorer or ConstantScorer(), costs, initial_capital),
+    ) as pool:
+        return list(pool.map(_run_params, grid))
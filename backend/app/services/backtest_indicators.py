@@ -0,0 +1,194 @@
+"""Vectorized technical indicators over a (symbols × dates) bar panel.
+
+market_scanner_indicators 의 스칼라 함수를 모든 종목·모든 날짜에 대해 한 번에 계산한다.
+[i, t] 값은 해당 종목의 t일까지의 봉 전체로 스칼라 함수를 호출한 결과와 같다
+(반올림 포함). 재귀 지표(RSI/ATR 의 Wilder 평활, MACD 의 EMA)는 종목마다
+첫 관측일부터 시드하므로, 최근 90봉만 받는 라이브 스캐너와는 워밍업 구간에서만
+미세하게 다르다.
+
+스칼라 함수가 None 을 반환하는 자리는 NaN 이다.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+MIN_BARS = 26  # compute_all_indicators 가 None 을 반환하는 기준
+
+
+@dataclass
+class IndicatorPanel:
+    """Indicator arrays, each shaped (N, T) like the bar panel."""
+
+    bars_seen: np.ndarray  # 상장 이후 누적 관측 봉 수 (int)
+    ma5: np.ndarray
+    ma20: np.ndarray
+    ma60: np.ndarray
+    ma_bullish: np.ndarray  # ma5 > ma20 > ma60 (bool)
+    rsi_14: np.ndarray
+    macd_histogram: np.ndarray
+    macd_bullish_cross: np.ndarray  # bool
+    stochastic_k: np.ndarray
+    atr_14: np.ndarray
+    volume_change_5d_pct: np.ndarray
+    change_pct: np.ndarray  # 전일 대비 등락률 (%)
+
+    @property
+    def ready(self) -> np.ndarray:
+        """compute_all_indicators() would return a dict (enough bars)."""
+        return self.bars_seen >= MIN_BARS
+
+    def snapshot(self, i: int, t: int) -> dict:
+        """Indicator dict for one cell in compute_all_indicators() shape (fields the scoring reads)."""
+        def val(arr: np.ndarray) -> float | None:
+            v = arr[i, t]
+            return None if np.isnan(v) else float(v)
+
+        hist = val(self.macd_histogram)
+        k = val(self.stochastic_k)
+        return {
+            "ma5": val(self.ma5),
+            "ma20": val(self.ma20),
+            "ma60": val(self.ma60),
+            "ma_alignment": "bullish" if self.ma_bullish[i, t] else "neutral",
+            "rsi_14": val(self.rsi_14),
+            "macd": None if hist is None else {
+                "histogram": hist,
+                "cross": "bullish" if self.macd_bullish_cross[i, t] else "none",
+            },
+            "stochastic": None if k is None else {"k": k},
+            "atr_14": val(self.atr_14),
+            "volume_change_5d_pct": val(self.volume_change_5d_pct),
+        }
+
+
+def _rolling_mean(x: np.ndarray, seen: np.ndarray, period: int) -> np.ndarray:
+    """Trailing mean over ``period`` bars; NaN until ``period`` bars are observed."""
+    filled = np.nan_to_num(x)
+    csum = np.cumsum(filled, axis=1)
+    out = csum.copy()
+    out[:, period:] -= csum[:, :-period]
+    out /= period
+    out[seen < period] = np.nan
+    return out
+
+
+def _seeded_smooth(x: np.ndarray, period: int, wilder: bool) -> np.ndarray:
+    """SMA-seeded recursive smoothing along time (Wilder or EMA k=2/(p+1)).
+
+    x 는 종목별로 앞쪽만 NaN 인 배열 (한 번 값이 생기면 끝까지 유지).
+    시간 축만 루프를 돌고 종목 축은 벡터 연산이다.
+    """
+    n, t_len = x.shape
+    out = np.full((n, t_len), np.nan)
+    seen = np.zeros(n, dtype=np.int64)
+    acc = np.zeros(n)
+    avg = np.full(n, np.nan)
+    k = 2 / (period + 1)
+    for t in range(t_len):
+        col = x[:, t]
+        ok = ~np.isnan(col)
+        seen += ok
+        acc = np.where(ok & (seen <= period), acc + np.where(ok, col, 0.0), acc)
+        seeded = ok & (seen == period)
+        step = ok & (seen > period)
+        if wilder:
+            nxt = (avg * (period - 1) + col) / period
+        else:
+            nxt = col * k + avg * (1 - k)
+        avg = np.where(seeded, acc / period, np.where(step, nxt, avg))
+        out[:, t] = np.where(ok & (seen >= period), avg, np.nan)
+    return out
+
+
+def _shift(x: np.ndarray, fill: float = np.nan) -> np.ndarray:
+    out = np.empty_like(x)
+    out[:, 0] = fill
+    out[:, 1:] = x[:, :-1]
+    return out
+
+
+def _rolling_extreme(x: np.ndarray, period: int, fn) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= period:
+        out[:, period - 1:] = fn(sliding_window_view(x, period, axis=1), axis=-1)
+    return out
+
+
+def compute_indicator_panel(
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    volumes: np.ndarray,
+) -> IndicatorPanel:
+    """All scanner indicators for every (symbol, date) in one pass.
+
+    입력은 (N, T) 배열이며 상장 전 구간은 NaN (그 이후 결측은 없어야 한다).
+    """
+    valid = ~np.isnan(closes)
+    seen = np.cumsum(valid, axis=1)
+    prev_close = _shift(closes)
+
+    ma5 = _rolling_mean(closes, seen, 5)
+    ma20 = _rolling_mean(closes, seen, 20)
+    ma60 = _rolling_mean(closes, seen, 60)
+    with np.errstate(invalid="ignore"):
+        ma_bullish = (ma5 > ma20) & (ma20 > ma60)
+
+    # RSI(14) — calculate_rsi: 최초 평균은 처음 14개 등락의 단순평균, 이후 Wilder
+    diff = closes - prev_close
+    gain_avg = _seeded_smooth(np.where(np.isnan(diff), np.nan, np.maximum(diff, 0)), 14, wilder=True)
+    loss_avg = _seeded_smooth(np.where(np.isnan(diff), np.nan, np.maximum(-diff, 0)), 14, wilder=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.round(100 - 100 / (1 + gain_avg / loss_avg), 2)
+    rsi = np.where(loss_avg == 0, 100.0, rsi)
+    rsi[np.isnan(loss_avg)] = np.nan
+
+    # MACD(12, 26, 9) — calculate_macd 는 35봉 미만이면 None
+    macd_line = _seeded_smooth(closes, 12, wilder=False) - _seeded_smooth(closes, 26, wilder=False)
+    signal_line = _seeded_smooth(macd_line, 9, wilder=False)
+    hist_raw = macd_line - signal_line
+    prev_hist = _shift(hist_raw)
+    hist_raw[seen < 35] = np.nan
+    with np.errstate(invalid="ignore"):
+        macd_bullish_cross = (prev_hist < 0) & (hist_raw > 0)
+    macd_histogram = np.round(hist_raw, 2)
+
+    # Stochastic %K(14) — calculate_stochastic 은 17봉 미만이면 None
+    hh = _rolling_extreme(highs, 14, np.max)
+    ll = _rolling_extreme(lows, 14, np.min)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stoch_k = np.where(hh == ll, 50.0, np.round((closes - ll) / (hh - ll) * 100, 2))
+    stoch_k[seen < 17] = np.nan
+
+    # ATR(14) — True Range 의 Wilder 평활, 정수 반올림
+    true_range = np.fmax(highs - lows, np.fmax(np.abs(highs - prev_close), np.abs(lows - prev_close)))
+    true_range[np.isnan(prev_close)] = np.nan
+    atr = np.round(_seeded_smooth(true_range, 14, wilder=True), 0)
+
+    # 거래량 변화 — 당일 / 직전 5일 평균
+    prev_vol_avg = _shift(_rolling_mean(volumes, seen, 5))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_change = np.round((volumes / prev_vol_avg - 1) * 100, 1)
+    vol_change[(seen < 6) | (prev_vol_avg == 0)] = np.nan
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change_pct = (closes / prev_close - 1) * 100
+
+    return IndicatorPanel(
+        bars_seen=seen,
+        ma5=ma5,
+        ma20=ma20,
+        ma60=ma60,
+        ma_bullish=ma_bullish,
+        rsi_14=rsi,
+        macd_histogram=macd_histogram,
+        macd_bullish_cross=macd_bullish_cross,
+        stochastic_k=stoch_k,
+        atr_14=atr,
+        volume_change_5d_pct=vol_change,
+        change_pct=change_pct,
+    )
@@ -0,0 +1,314 @@
+"""Persistent chat session store with an LRU memory tier and context compaction.
+
+세션 메시지는 SQLite(chat_sessions / chat_messages)에 저장되고, 최근 사용한
+세션만 메모리(LRU, idle TTL)에 올려둔다. 대화가 토큰 예산을 넘으면
+1) 지난 턴의 tool_result 본문을 짧은 표시로 바꾸고, 2) 그래도 넘으면 오래된
+턴을 요약(summary)으로 접는다. 접힌 메시지는 compacted=1 로 남아 다시 로드되지
+않으며, 오래 쓰지 않은 세션은 retention 작업이 삭제한다.
+"""
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.config import settings
+from app.models.db import execute_query, get_db
+
+logger = logging.getLogger(__name__)
+
+# 압축 후 목표 크기 (예산 대비 비율) — 매 턴마다 다시 요약하지 않도록 여유를 둠
+COMPACT_TARGET_RATIO = 0.5
+STRIPPED_TOOL_RESULT = "[이전 도구 결과 생략 — 원문 {chars}자]"
+SUMMARY_MAX_CHARS = 4000
+
+# (previous_summary, messages) -> (summary, usage{"input_tokens", "output_tokens"})
+Summarizer = Callable[[str | None, list[dict]], Awaitable[tuple[str, dict]]]
+
+
+def estimate_tokens(content: Any) -> int:
+    """Rough token estimate (~3 chars/token for mixed Korean/English/JSON)."""
+    text = content if isinstance(content, str) else json.dumps(content, ensure_ascii=False)
+    return max(1, math.ceil(len(text) / 3))
+
+
+def _is_user_turn(message: dict) -> bool:
+    """A real user question (not a tool_result carrier) — safe place to cut history."""
+    return message["role"] == "user" and isinstance(message["content"], str)
+
+
+@dataclass
+class _Session:
+    session_id: str
+    summary: str | None = None
+    messages: list[dict] = field(default_factory=list)  # {"id", "role", "content", "tokens"}
+    last_access: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def tokens(self) -> int:
+        summary_tokens = estimate_tokens(self.summary) if self.summary else 0
+        return summary_tokens + sum(m["tokens"] for m in self.messages)
+
+
+class ChatSessionStore:
+    """SQLite-backed chat history; only the compacted working context is kept in memory."""
+
+    def __init__(
+        self,
+        max_cached: int | None = None,
+        idle_ttl_sec: float | None = None,
+        token_budget: int | None = None,
+        summarizer: Summarizer | None = None,
+    ):
+        self.max_cached = max_cached or settings.chat_session_cache_size
+        self.idle_ttl_sec = idle_ttl_sec if idle_ttl_sec is not None else settings.chat_session_idle_minutes * 60
+        self.token_budget = token_budget or settings.chat_context_token_budget
+        self._summarizer = summarizer
+        self._cache: OrderedDict[str, _Session] = OrderedDict()
+        self._load_locks: dict[str, asyncio.Lock] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    # --- memory tier ---
+
+    def _evict(self, current: str) -> None:
+        now = time.monotonic()
+        # OrderedDict 는 접근 순서 — 앞쪽부터 idle TTL 초과분 제거 (방금 접근한 세션 제외)
+        while self._cache:
+            sid, entry = next(iter(self._cache.items()))
+            if sid == current or now - entry.last_access <= self.idle_ttl_sec or entry.lock.locked():
+                break
+            del self._cache[sid]
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+
+    async def _entry(self, session_id: str) -> _Session:
+        entry = self._cache.get(session_id)
+        if entry is None:
+            lock = self._load_locks.setdefault(session_id, asyncio.Lock())
+            async with lock:
+                entry = self._cache.get(session_id)
+                if entry is None:
+                    entry = await self._load(session_id)
+                    self._cache[session_id] = entry
+            self._load_locks.pop(session_id, None)
+        entry.last_access = time.monotonic()
+        self._cache.move_to_end(session_id)
+        self._evict(session_id)
+        return entry
+
+    async def _load(self, session_id: str) -> _Session:
+        row = await execute_query(
+            "SELECT summary FROM chat_sessions WHERE id = ?", (session_id,), fetch_one=True
+        )
+        rows = await execute_query(
+            """SELECT id, role, content_json, tokens FROM chat_messages
+               WHERE session_id = ? AND compacted = 0 ORDER BY id""",
+            (session_id,),
+        )
+        return _Session(
+            session_id=session_id,
+            summary=row["summary"] if row else None,
+            messages=[
+                {"id": r["id"], "role": r["role"], "content": json.loads(r["content_json"]), "tokens": r["tokens"]}
+                for r in rows or []
+            ],
+        )
+
+    # --- public API ---
+
+    async def append(self, session_id: str, messages: list[dict]) -> None:
+        """Persist new messages ({"role", "content"}) and add them to the working context."""
+        entry = await self._entry(session_id)
+        async with entry.lock:
+            db = await get_db()
+            try:
+                await db.execute(
+                    """INSERT INTO chat_sessions (id) VALUES (?)
+                       ON CONFLICT(id) DO UPDATE SET updated_at = datetime('now')""",
+                    (session_id,),
+                )
+                new = []
+                for msg in messages:
+                    tokens = estimate_tokens(msg["content"])
+                    cursor = await db.execute(
+                        "INSERT INTO chat_messages (session_id, role, content_json, tokens) VALUES (?, ?, ?, ?)",
+                        (session_id, msg["role"], json.dumps(msg["content"], ensure_ascii=False), tokens),
+                    )
+                    new.append({"id": cursor.lastrowid, "role": msg["role"], "content": msg["content"], "tokens": tokens})
+                if any(_is_user_turn(m) for m in messages):
+                    await db.execute(
+                        "UPDATE chat_sessions SET turn_count = turn_count + 1 WHERE id = ?", (session_id,)
+                    )
+                await db.commit()
+            finally:
+                await db.close()
+            entry.messages.extend(new)
+
+    async def get_context(self, session_id: str) -> tuple[str | None, list[dict]]:
+        """Return (summary, messages) to send to Claude — waits for a running compaction."""
+        entry = await self._entry(session_id)
+        async with entry.lock:
+            return entry.summary, [{"role": m["role"], "content": m["content"]} for m in entry.messages]
+
+    async def record_usage(self, session_id: str, input_tokens: int, output_tokens: int) -> None:
+        await execute_query(
+            """UPDATE chat_sessions SET input_tokens = input_tokens + ?, output_tokens = output_tokens + ?,
+               updated_at = datetime('now') WHERE id = ?""",
+            (input_tokens or 0, output_tokens or 0, session_id),
+        )
+
+    def schedule_compaction(self, session_id: str) -> None:
+        """Compact in the background so the next turn starts from a smaller prompt."""
+        task = asyncio.create_task(self.compact(session_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def compact(self, session_id: str) -> dict[str, int]:
+        """Bring the working context under the token budget."""
+        entry = await self._entry(session_id)
+        async with entry.lock:
+            before = entry.tokens
+            if before <= self.token_budget:
+                return {"before": before, "after": before, "stripped": 0, "summarized": 0}
+            stripped = await self._strip_tool_results(entry)
+            summarized = 0
+            if entry.tokens > self.token_budget:
+                summarized = await self._summarize(entry)
+            after = entry.tokens
+        logger.info(
+            f"Chat session {session_id} compacted: {before} → {after} tokens "
+            f"({stripped} tool results stripped, {summarized} messages summarized)"
+        )
+        return {"before": before, "after": after, "stripped": stripped, "summarized": summarized}
+
+    async def _strip_tool_results(self, entry: _Session) -> int:
+        """Replace tool_result bodies of all but the latest user turn with a short marker."""
+        turn_starts = [i for i, m in enumerate(entry.messages) if _is_user_turn(m)]
+        keep_from = turn_starts[-1] if turn_starts else len(entry.messages)
+        updates = []
+        for msg in entry.messages[:keep_from]:
+            if msg["role"] != "user" or not isinstance(msg["content"], list):
+                continue
+            changed = False
+            blocks = []
+            for block in msg["content"]:
+                body = block.get("content")
+                if block.get("type") == "tool_result" and isinstance(body, str) and not body.startswith("[이전 도구 결과"):
+                    block = {**block, "content": STRIPPED_TOOL_RESULT.format(chars=len(body))}
+                    changed = True
+                blocks.append(block)
+            if changed:
+                # 새 리스트로 교체 — 진행 중인 요청이 들고 있는 content 는 건드리지 않음
+                msg["content"] = blocks
+                msg["tokens"] = estimate_tokens(blocks)
+                updates.append((json.dumps(msg["content"], ensure_ascii=False), msg["tokens"], msg["id"]))
+        if updates:
+            db = await get_db()
+            try:
+                await db.executemany("UPDATE chat_messages SET content_json = ?, tokens = ? WHERE id = ?", updates)
+                await db.commit()
+            finally:
+                await db.close()
+        return len(updates)
+
+    async def _summarize(self, entry: _Session) -> int:
+        """Fold the oldest turns into the session summary, cutting only at user-turn boundaries."""
+        target = self.token_budget * COMPACT_TARGET_RATIO
+        turn_starts = [i for i, m in enumerate(entry.messages) if _is_user_turn(m)]
+        if len(turn_starts) < 2:
+            return 0  # 최신 턴 하나뿐 — 접을 대상 없음
+        cut = turn_starts[-1]
+        for start in turn_starts[1:]:
+            if sum(m["tokens"] for m in entry.messages[start:]) <= target:
+                cut = start
+                break
+
+        folded = entry.messages[:cut]
+        plain = [{"role": m["role"], "content": m["content"]} for m in folded]
+        usage: dict = {}
+        try:
+            summary, usage = await self._summarize_messages(entry.summary, plain)
+        except Exception as e:
+            logger.warning(f"Chat summary failed for {entry.session_id}, using extractive summary: {e}")
+            summary = extractive_summary(entry.summary, plain)
+        summary = summary[-SUMMARY_MAX_CHARS:]
+
+        ids = [m["id"] for m in folded]
+        db = await get_db()
+        try:
+            await db.execute(
+                f"UPDATE chat_messages SET compacted = 1 WHERE id IN ({','.join('?' * len(ids))})", ids
+            )
+            await db.execute(
+                """UPDATE chat_sessions SET summary = ?, input_tokens = input_tokens + ?,
+                   output_tokens = output_tokens + ? WHERE id = ?""",
+                (summary, usage.get("input_tokens") or 0, usage.get("output_tokens") or 0, entry.session_id),
+            )
+            await db.commit()
+        finally:
+            await db.close()
+        entry.summary = summary
+        entry.messages = entry.messages[cut:]
+        return len(folded)
+
+    async def _summarize_messages(self, previous: str | None, messages: list[dict]) -> tuple[str, dict]:
+        if self._summarizer is not None:
+            return await self._summarizer(previous, messages)
+        from app.services.claude_service import summarize_history
+
+        return await summarize_history(previous, messages)
+
+    async def delete(self, session_id: str) -> None:
+        self._cache.pop(session_id, None)
+        db = await get_db()
+        try:
+            await db.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+            await db.execute("DELETE FROM chat_sessions WHERE id = ?", (session_id,))
+            await db.commit()
+        finally:
+            await db.close()
+
+    async def list_sessions(self) -> list[dict]:
+        rows = await execute_query(
+            """SELECT s.id, s.created_at, s.updated_at, s.turn_count, s.input_tokens, s.output_tokens,
+                      s.summary IS NOT NULL AS summarized,
+                      (SELECT COUNT(*) FROM chat_messages m WHERE m.session_id = s.id) AS message_count
+               FROM chat_sessions s ORDER BY s.updated_at DESC"""
+        )
+        for row in rows or []:
+            entry = self._cache.get(row["id"])
+            row["context_tokens"] = entry.tokens if entry else None
+            row["summarized"] = bool(row["summarized"])
+        return rows or []
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "cached_sessions": len(self._cache),
+            "max_cached": self.max_cached,
+            "cached_tokens": sum(e.tokens for e in self._cache.values()),
+        }
+
+
+def extractive_summary(previous: str | None, messages: list[dict]) -> str:
+    """Fallback summary without an API call: keep the head of each question/answer."""
+    lines = [previous] if previous else []
+    for msg in messages:
+        content = msg["content"]
+        if isinstance(content, str):
+            text = content
+        else:
+            text = " ".join(b.get("text", "") for b in content if b.get("type") == "text")
+        text = " ".join(text.split())
+        if text:
+            prefix = "사용자" if msg["role"] == "user" else "어시스턴트"
+            lines.append(f"- {prefix}: {text[:200]}")
+    return "\n".join(lines)
+
+
+# Singleton
+chat_session_store = ChatSessionStore()
@@ -1,11 +1,14 @@
+import asyncio
 import json
 import logging
+import time
 from collections.abc import AsyncGenerator
 
 import anthropic
 
 from app.config import settings
 from app.services.mcp_client import mcp_manager
+from app.services.metrics import observe_claude, record_claude
 from app.services.runtime_settings import runtime_settings
 
 logger = logging.getLogger(__name__)
@@ -94,29 +97,76 @@ def get_system_prompt() -> str:
     )
 
 
+_client: anthropic.AsyncAnthropic | None = None
+
+TOOL_RESULT_MAX_CHARS = 10000
+
+
+def _get_client() -> anthropic.AsyncAnthropic:
+    """Shared async client — reuses the HTTP connection pool across requests."""
+    global _client
+    if _client is None:
+        _client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+    return _client
+
+
+async def _run_tool(block) -> tuple[str, float]:
+    """Execute one tool_use block via MCP. Returns (result_text, duration_ms)."""
+    started = time.perf_counter()
+    result_text = await mcp_manager.call_tool(
+        block.name,
+        block.input if isinstance(block.input, dict) else {},
+    )
+    # Truncate very long results to avoid token limits
+    if len(result_text) > TOOL_RESULT_MAX_CHARS:
+        result_text = result_text[:TOOL_RESULT_MAX_CHARS] + "\n... (결과가 너무 길어 일부만 표시합니다)"
+    return result_text, (time.perf_counter() - started) * 1000
+
+
 async def stream_chat(
-    messages: list[dict], session_id: str
+    messages: list[dict],
+    session_id: str,
+    transcript: list[dict] | None = None,
+    context_summary: str | None = None,
 ) -> AsyncGenerator[str, None]:
     """
     Stream a chat response from Claude, handling tool calls via MCP.
     Yields SSE-formatted event strings.
+
+    Uses AsyncAnthropic so the event loop keeps serving agents/WebSocket while
+    the model streams. Tool calls requested in the same turn run concurrently.
+    Each turn emits a ``metrics`` event (first-token / model / tool / turn ms).
+
+    New assistant/tool_result messages are appended to ``transcript`` (if given)
+    so the caller can persist them; ``context_summary`` (compacted earlier
+    turns) is added to the system prompt.
     """
-    client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+    client = _get_client()
     tools = mcp_manager.get_claude_tools()
 
     current_model = runtime_settings.get("claude_model")
     current_max_tokens = runtime_settings.get("claude_max_tokens")
     system_prompt = get_system_prompt()
+    if context_summary:
+        system_prompt += f"\n\n## 이전 대화 요약\n{context_summary}"
 
     # Build messages for Claude
     claude_messages = []
     for msg in messages:
         claude_messages.append({"role": msg["role"], "content": msg["content"]})
 
+    request_started = time.perf_counter()
+    first_token_ms: float | None = None
+    turn = 0
+    usage_total = {"input_tokens": 0, "output_tokens": 0}
+
     # Agentic loop: keep going until Claude stops using tools
     while True:
+        turn += 1
+        turn_started = time.perf_counter()
+        turn_first_token_ms: float | None = None
         try:
-            with client.messages.stream(
+            async with client.messages.stream(
                 model=current_model,
                 max_tokens=current_max_tokens,
                 system=system_prompt,
@@ -124,7 +174,12 @@ async def stream_chat(
                 tools=tools if tools else anthropic.NOT_GIVEN,
             ) as stream:
                 # Stream events to the frontend for live UI updates
-                for event in stream:
+                async for event in stream:
+                    if event.type in ("content_block_start", "content_block_delta") and turn_first_token_ms is None:
+                        turn_first_token_ms = (time.perf_counter() - turn_started) * 1000
+                        if first_token_ms is None:
+                            first_token_ms = (time.perf_counter() - request_started) * 1000
+
                     if event.type == "content_block_start":
                         block = event.content_block
                         if block.type == "tool_use":
@@ -139,15 +194,24 @@ async def stream_chat(
                             yield _sse_event("text_delta", {"text": delta.text})
 
                 # Get the complete, properly-structured response
-                response = stream.get_final_message()
+                response = await stream.get_final_message()
 
         except anthropic.APIError as e:
+            record_claude("chat", current_model, turn_started, error=True)
             yield _sse_event("error", {"message": f"Claude API error: {e}"})
             yield _sse_event("done", {})
             return
 
+        model_ms = (time.perf_counter() - turn_started) * 1000
+        record_claude("chat", current_model, turn_started, response)
+        usage = getattr(response, "usage", None)
+        for key in usage_total:
+            usage_total[key] += getattr(usage, key, None) or 0
+        tool_blocks = [b for b in response.content if b.type == "tool_use"]
+        tool_ms = 0.0
+
         # If Claude wants to use tools, execute them and continue the loop
-        if response.stop_reason == "tool_use":
+        if response.stop_reason == "tool_use" and tool_blocks:
             # Build content blocks from the final message (preserves correct order)
             content_blocks = []
             for block in response.content:
@@ -162,52 +226,136 @@ async def stream_chat(
                     })
 
             # Add assistant message with all content blocks
-            claude_messages.append({"role": "assistant", "content": content_blocks})
-
-            # Execute each tool call and collect results
-            tool_results = []
-            for block in response.content:
-                if block.type == "tool_use":
-                    yield _sse_event(
-                        "tool_executing",
-                        {"tool_name": block.name, "tool_id": block.id, "input": block.input},
-                    )
-
-                    result_text = await mcp_manager.call_tool(
-                        block.name,
-                        block.input if isinstance(block.input, dict) else {},
-                    )
-
-                    # Truncate very long results to avoid token limits
-                    if len(result_text) > 10000:
-                        result_text = result_text[:10000] + "\n... (결과가 너무 길어 일부만 표시합니다)"
-
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": result_text,
-                    })
-
-                    yield _sse_event(
-                        "tool_result",
-                        {
-                            "tool_name": block.name,
-                            "tool_id": block.id,
-                            "result_preview": result_text[:500],
-                        },
-                    )
-
-            # Add tool results to messages
-            claude_messages.append({"role": "user", "content": tool_results})
-
+            assistant_message = {"role": "assistant", "content": content_blocks}
+            claude_messages.append(assistant_message)
+
+            # Execute all tool calls of this turn concurrently (MCP client pool)
+            for block in tool_blocks:
+                yield _sse_event(
+                    "tool_executing",
+                    {"tool_name": block.name, "tool_id": block.id, "input": block.input},
+                )
+
+            tools_started = time.perf_counter()
+            tasks = {asyncio.create_task(_run_tool(block)): block for block in tool_blocks}
+            results: dict[str, str] = {}
+            try:
+                pending = set(tasks)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        block = tasks[task]
+                        result_text, duration_ms = task.result()
+                        results[block.id] = result_text
+                        yield _sse_event(
+                            "tool_result",
+                            {
+                                "tool_name": block.name,
+                                "tool_id": block.id,
+                                "result_preview": result_text[:500],
+                                "duration_ms": round(duration_ms, 1),
+                            },
+                        )
+            finally:
+                # 클라이언트 연결이 끊기면 남은 도구 호출 취소
+                for task in tasks:
+                    task.cancel()
+            tool_ms = (time.perf_counter() - tools_started) * 1000
+
+            # Add tool results to messages (same order as the tool_use blocks)
+            results_message = {
+                "role": "user",
+                "content": [
+                    {"type": "tool_result", "tool_use_id": block.id, "content": results[block.id]}
+                    for block in tool_blocks
+                ],
+            }
+            claude_messages.append(results_message)
+            if transcript is not None:
+                transcript.extend([assistant_message, results_message])
+
+            yield _sse_event("metrics", _turn_metrics(turn, turn_first_token_ms, model_ms, tool_ms,
+                                                      len(tool_blocks), turn_started, response))
             # Continue the loop to get Claude's response after tool execution
             continue
 
         # No more tool calls - we're done
-        yield _sse_event("done", {})
+        final_text = "".join(b.text for b in response.content if b.type == "text")
+        if transcript is not None and final_text:
+            transcript.append({"role": "assistant", "content": final_text})
+        yield _sse_event("metrics", _turn_metrics(turn, turn_first_token_ms, model_ms, tool_ms,
+                                                  0, turn_started, response))
+        total_ms = (time.perf_counter() - request_started) * 1000
+        logger.info(
+            f"Chat {session_id}: {turn} turn(s), first token "
+            f"{first_token_ms or 0:.0f}ms, total {total_ms:.0f}ms"
+        )
+        yield _sse_event("done", {
+            "metrics": {
+                "first_token_ms": round(first_token_ms, 1) if first_token_ms is not None else None,
+                "total_ms": round(total_ms, 1),
+                "turns": turn,
+            },
+            "usage": usage_total,
+        })
         return
 
 
+def _turn_metrics(turn: int, first_token_ms: float | None, model_ms: float, tool_ms: float,
+                  tool_count: int, turn_started: float, response) -> dict:
+    usage = getattr(response, "usage", None)
+    return {
+        "turn": turn,
+        "first_token_ms": round(first_token_ms, 1) if first_token_ms is not None else None,
+        "model_ms": round(model_ms, 1),
+        "tool_ms": round(tool_ms, 1),
+        "tool_count": tool_count,
+        "turn_ms": round((time.perf_counter() - turn_started) * 1000, 1),
+        "input_tokens": getattr(usage, "input_tokens", None),
+        "output_tokens": getattr(usage, "output_tokens", None),
+    }
+
+
+def _render_for_summary(messages: list[dict]) -> str:
+    lines = []
+    for msg in messages:
+        content = msg["content"]
+        if isinstance(content, str):
+            lines.append(f"[{msg['role']}] {content}")
+            continue
+        for block in content:
+            if block.get("type") == "text":
+                lines.append(f"[{msg['role']}] {block['text']}")
+            elif block.get("type") == "tool_use":
+                lines.append(f"[tool_use] {block['name']} {json.dumps(block.get('input', {}), ensure_ascii=False)[:300]}")
+            elif block.get("type") == "tool_result":
+                lines.append(f"[tool_result] {str(block.get('content', ''))[:500]}")
+    return "\n".join(lines)
+
+
+async def summarize_history(previous_summary: str | None, messages: list[dict]) -> tuple[str, dict]:
+    """Summarize earlier chat turns for context compaction. Returns (summary, usage)."""
+    prompt = (
+        "다음은 주식 트레이딩 어시스턴트와 사용자의 이전 대화입니다. 이후 대화에 필요한 사실"
+        "(종목/코드, 조회된 수치, 주문 내역, 사용자의 의도와 결정)을 중심으로 한국어 불릿 요약을 "
+        "작성하세요. 15줄 이내.\n\n"
+    )
+    if previous_summary:
+        prompt += f"## 기존 요약\n{previous_summary}\n\n"
+    prompt += f"## 대화\n{_render_for_summary(messages)[:40000]}"
+    response = await observe_claude("chat_summarizer", _get_client().messages.create(
+        model=runtime_settings.get("claude_model"),
+        max_tokens=1024,
+        messages=[{"role": "user", "content": prompt}],
+    ))
+    summary = "".join(b.text for b in response.content if b.type == "text").strip()
+    usage = getattr(response, "usage", None)
+    return summary, {
+        "input_tokens": getattr(usage, "input_tokens", 0),
+        "output_tokens": getattr(usage, "output_tokens", 0),
+    }
+
+
 def _sse_event(event_type: str, data: dict) -> str:
     """Format an SSE event string."""
     return json.dumps({"event": event_type, "data": data})
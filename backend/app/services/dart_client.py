@@ -18,6 +18,7 @@ import xmltodict  # type: ignore
 
 from app.config import settings
 from app.models.db import execute_insert, execute_query
+from app.services.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +42,7 @@ class DartClient:
             return
         await self._refresh_corp_codes_if_stale()
 
+    @traced("dart.fetch", "internal")
     async def fetch(self, stock_code: str, current_price: float = 0) -> dict:
         """
         Fetch DART fundamentals for a stock.
@@ -118,6 +120,7 @@ class DartClient:
         )
         return rows[0]["corp_code"] if rows else None
 
+    @traced("dart.corpCode", "http")
     async def _refresh_corp_codes_if_stale(self) -> None:
         rows = await execute_query(
             "SELECT MAX(cached_at) as last FROM dart_corp_codes"
@@ -182,6 +185,7 @@ class DartClient:
             (stock_code, today, json.dumps(financials, ensure_ascii=False)),
         )
 
+    @traced("dart.fnlttSinglAcntAll", "http")
     async def _fetch_financials(self, corp_code: str, year: str) -> dict | None:
         try:
             async with httpx.AsyncClient(timeout=15) as client:
@@ -286,6 +290,7 @@ class DartClient:
             "_total_equity": total_equity,  # used for PBR calculation
         }
 
+    @traced("dart.alotMatter", "http")
     async def _fetch_dividend(self, corp_code: str, year: str) -> float | None:
         try:
             async with httpx.AsyncClient(timeout=10) as client:
@@ -303,6 +308,7 @@ class DartClient:
             return None
         return None  # items list was empty
 
+    @traced("dart.stockTotqySttus", "http")
     async def _fetch_share_count(self, corp_code: str, year: str) -> int | None:
         """Fetch outstanding share count (보통주 발행주식총수) from DART."""
         try:
@@ -328,6 +334,7 @@ class DartClient:
             return None
         return None
 
+    @traced("dart.cash_flow", "http")
     async def fetch_cash_flow(self, stock_code: str) -> dict | None:
         """DART 현금흐름표 조회"""
         if not self.enabled:
@@ -385,6 +392,7 @@ class DartClient:
             logger.warning(f"Cash flow fetch failed for {stock_code}: {e}")
             return None
 
+    @traced("dart.elestock", "http")
     async def fetch_insider_trades(self, stock_code: str, limit: int = 5) -> list[dict]:
         """DART 임원 주요주주 특정증권등 소유상황 보고서 조회"""
         if not self.enabled:
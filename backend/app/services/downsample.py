@@ -0,0 +1,115 @@
+"""Server-side downsampling of portfolio value series for charts.
+
+입력은 롤업 버킷 형태의 행(open/high/low/close_value, max_dd_pct ...)이며, 원본
+스냅샷(total_value 만 있는 행)은 한 점짜리 버킷으로 취급한다. 두 방식 모두 최대
+낙폭(drawdown)이 원본과 동일하게 유지된다.
+
+- minmax: 연속 구간별 open/high/low/last 집계 (np.*.reduceat, 완전 벡터화)
+- lttb: Largest-Triangle-Three-Buckets 로 대표점 선택 + 최대 낙폭 고점/저점 강제 포함
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+def _columns(rows: list[dict]) -> dict[str, np.ndarray]:
+    close = np.array([r.get("close_value", r.get("total_value")) or 0.0 for r in rows], dtype=np.float64)
+    high = np.array([r.get("high_value", c) for r, c in zip(rows, close)], dtype=np.float64)
+    low = np.array([r.get("low_value", c) for r, c in zip(rows, close)], dtype=np.float64)
+    within = np.array([r.get("max_dd_pct") or 0.0 for r in rows], dtype=np.float64)
+    return {"close": close, "high": high, "low": low, "within": within}
+
+
+def _drawdowns(high: np.ndarray, low: np.ndarray, within: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Per-row drawdown (%) against the running peak of earlier rows in the same segment.
+
+    starts: 각 구간의 시작 인덱스 (전체 한 구간이면 [0]).
+    """
+    n = len(high)
+    seg = np.zeros(n, dtype=np.int64)
+    seg[starts[1:]] = 1
+    seg = np.cumsum(seg)
+    # 구간마다 누적 최대를 초기화하기 위해 구간 번호만큼 큰 오프셋을 더해 cummax
+    offset = seg * (float(high.max(initial=0.0)) * 2 + 1)
+    running = np.maximum.accumulate(high + offset) - offset
+    prev_peak = np.empty(n)
+    prev_peak[0] = 0.0
+    prev_peak[1:] = running[:-1]
+    prev_peak[starts] = 0.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cross = np.where((prev_peak > 0) & (low < prev_peak), (prev_peak - low) / prev_peak * 100, 0.0)
+    return np.maximum(cross, within)
+
+
+def minmax(rows: list[dict], points: int) -> list[dict]:
+    """Aggregate consecutive rows into ``points`` buckets: open, high, low, last."""
+    n = len(rows)
+    if n <= points:
+        return rows
+    starts = np.unique(np.linspace(0, n, points, endpoint=False).astype(np.int64))
+    ends = np.append(starts[1:], n) - 1
+    cols = _columns(rows)
+    high = np.maximum.reduceat(cols["high"], starts)
+    low = np.minimum.reduceat(cols["low"], starts)
+    dd = np.maximum.reduceat(_drawdowns(cols["high"], cols["low"], cols["within"], starts), starts)
+    counts = np.add.reduceat(np.array([r.get("snapshot_count", 1) for r in rows]), starts)
+
+    out = []
+    for i, (s, e) in enumerate(zip(starts.tolist(), ends.tolist())):
+        first, last = rows[s], rows[e]
+        out.append({
+            **last,
+            "bucket": first.get("bucket", first.get("timestamp")),
+            "first_ts": first.get("first_ts", first.get("timestamp")),
+            "last_ts": last.get("last_ts", last.get("timestamp")),
+            "open_value": first.get("open_value", first.get("total_value")),
+            "high_value": float(high[i]),
+            "low_value": float(low[i]),
+            "close_value": float(cols["close"][e]),
+            "snapshot_count": int(counts[i]),
+            "max_dd_pct": float(dd[i]),
+        })
+    return out
+
+
+def lttb_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets over evenly spaced x. Returns selected indices."""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=np.float64)
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def lttb(rows: list[dict], points: int) -> list[dict]:
+    """LTTB on closing values; the max-drawdown peak and trough rows are always kept."""
+    n = len(rows)
+    if n <= points:
+        return rows
+    cols = _columns(rows)
+    dd = _drawdowns(cols["high"], cols["low"], cols["within"], np.array([0]))
+    trough = int(dd.argmax())
+    keep = [trough]
+    if dd[trough] > cols["within"][trough]:
+        keep.append(int(cols["high"][:trough].argmax()))
+    idx = np.union1d(lttb_indices(cols["close"], max(points - len(keep), 3)), keep)
+    return [rows[i] for i in idx.tolist()]
+
+
+def downsample(rows: list[dict], points: int, mode: str = "minmax") -> list[dict]:
+    if mode == "lttb":
+        return lttb(rows, points)
+    return minmax(rows, points)
@@ -0,0 +1,261 @@
+"""Intraday OHLCV bar aggregator fed by realtime execution ticks.
+
+ccnl_krx(H0STCNT0) / ccnl_nxt(H0NXCNT0) 체결 데이터를 받아 종목별 1m/5m/15m
+봉을 ring buffer 에 유지한다. 각 필드는 길이 2N 배열에 같은 봉을 i, i+N 두
+위치에 기록(mirrored ring)하므로 최근 N개 봉을 항상 연속된 numpy view 로
+복사 없이 꺼낼 수 있다.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+import numpy as np
+
+from app.agents.market_scanner_indicators import compute_all_indicators
+
+logger = logging.getLogger(__name__)
+
+KST = timezone(timedelta(hours=9))
+
+# 세션 구분 (KST 초 단위, 종료 시각 포함) — 봉은 세션 경계를 넘지 않는다
+SESSIONS: list[tuple[str, int, int]] = [
+    ("nxt_pre", 8 * 3600, 8 * 3600 + 50 * 60),  # NXT 프리마켓 08:00–08:50
+    ("regular", 9 * 3600, 15 * 3600 + 30 * 60),  # KRX/NXT 정규장 09:00–15:30
+    ("nxt_after", 15 * 3600 + 40 * 60, 20 * 3600),  # NXT 애프터마켓 15:40–20:00
+]
+
+TICK_TR_IDS = {"H0STCNT0", "H0NXCNT0", "H0UNCNT0"}
+DEFAULT_TIMEFRAMES = (1, 5, 15)
+FIELDS = ("ts", "open", "high", "low", "close", "volume")
+
+
+def session_of(seconds_of_day: int) -> tuple[str, int, int] | None:
+    """Return (session name, start, end seconds) or None outside trading hours."""
+    for name, start, end in SESSIONS:
+        if start <= seconds_of_day <= end:
+            return name, start, end
+    return None
+
+
+class BarRing:
+    """Fixed-capacity ring of OHLCV bars for one symbol and timeframe."""
+
+    def __init__(self, timeframe_sec: int, capacity: int):
+        self.timeframe = timeframe_sec
+        self.capacity = capacity
+        n2 = capacity * 2
+        self.ts = np.zeros(n2, dtype=np.int64)  # bar start (epoch seconds)
+        self.open = np.zeros(n2, dtype=np.float64)
+        self.high = np.zeros(n2, dtype=np.float64)
+        self.low = np.zeros(n2, dtype=np.float64)
+        self.close = np.zeros(n2, dtype=np.float64)
+        self.volume = np.zeros(n2, dtype=np.float64)
+        # 봉 내 첫/마지막 체결시각 — 늦게 도착한 체결의 open/close 반영 판단용
+        self._first = np.zeros(n2, dtype=np.int64)
+        self._last = np.zeros(n2, dtype=np.int64)
+        self.count = 0  # 지금까지 기록된 봉 수
+        self.session_start = -1  # 현재 봉이 속한 세션 시작 (epoch seconds)
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    @property
+    def _slot(self) -> int:
+        return (self.count - 1) % self.capacity
+
+    def _write(self, slot: int, ts: int, o: float, h: float, l: float, c: float,
+               v: float, first: int, last: int) -> None:
+        for idx in (slot, slot + self.capacity):
+            self.ts[idx] = ts
+            self.open[idx] = o
+            self.high[idx] = h
+            self.low[idx] = l
+            self.close[idx] = c
+            self.volume[idx] = v
+            self._first[idx] = first
+            self._last[idx] = last
+
+    def _append(self, *bar) -> None:
+        self.count += 1
+        self._write(self._slot, *bar)
+
+    def add(self, trade_ts: int, price: float, qty: float, session_start: int) -> str:
+        """Apply one trade. Returns 'new', 'update', 'late' or 'dropped'."""
+        tf = self.timeframe
+        bucket = session_start + (trade_ts - session_start) // tf * tf
+
+        if self.count == 0 or session_start > self.session_start or (
+            session_start == self.session_start and bucket > self.ts[self._slot]
+        ):
+            if self.count and session_start == self.session_start:
+                # 같은 세션 내 공백 구간은 직전 종가로 평탄한 봉을 채워 시간축을 유지
+                prev_close = self.close[self._slot]
+                prev_ts = int(self.ts[self._slot])
+                gap = min((bucket - prev_ts) // tf - 1, self.capacity)
+                for k in range(gap, 0, -1):
+                    t = bucket - k * tf
+                    self._append(t, prev_close, prev_close, prev_close, prev_close, 0.0, t, t)
+            self.session_start = session_start
+            self._append(bucket, price, price, price, price, qty, trade_ts, trade_ts)
+            return "new"
+
+        slot = self._slot
+        if bucket == self.ts[slot] and session_start == self.session_start:
+            idx = slot
+        else:
+            # 지난 봉으로 늦게 도착한 체결 — 버퍼 안에 남아 있으면 해당 봉을 갱신
+            window = self.ts[slot + 1: slot + self.capacity + 1][-len(self):]
+            pos = int(np.searchsorted(window, bucket))
+            if pos >= len(window) or window[pos] != bucket:
+                return "dropped"
+            idx = (slot + 1 + (self.capacity - len(self)) + pos) % self.capacity
+
+        o = self.open[idx]
+        c = self.close[idx]
+        first = int(self._first[idx])
+        last = int(self._last[idx])
+        v = self.volume[idx]
+        if v == 0:
+            # 공백 채움 봉에 첫 체결이 들어온 경우
+            o = c = price
+            h = l = price
+            first = last = trade_ts
+        else:
+            h = max(self.high[idx], price)
+            l = min(self.low[idx], price)
+            if trade_ts < first:
+                o, first = price, trade_ts
+            if trade_ts >= last:
+                c, last = price, trade_ts
+        self._write(idx, int(self.ts[idx]), o, h, l, c, v + qty, first, last)
+        return "update" if idx == slot else "late"
+
+    def view(self, field: str, count: int | None = None) -> np.ndarray:
+        """Read-only view (oldest-first) of the last ``count`` bars — no copy.
+
+        View 는 내부 버퍼를 그대로 가리키므로 이후 체결이 들어오면 값이 바뀐다.
+        스냅샷이 필요하면 호출 측에서 ``.copy()`` 한다.
+        """
+        n = len(self) if count is None else min(count, len(self))
+        if n == 0:
+            return getattr(self, field)[:0]
+        end = self._slot + self.capacity + 1
+        v = getattr(self, field)[end - n:end]
+        v.flags.writeable = False
+        return v
+
+
+class IntradayBarAggregator:
+    """Per-symbol rolling intraday bars for several timeframes."""
+
+    def __init__(self, timeframes: Iterable[int] = DEFAULT_TIMEFRAMES, capacity: int = 400):
+        self.timeframes = tuple(timeframes)
+        self.capacity = capacity
+        self._rings: dict[str, dict[int, BarRing]] = {}
+        self._day_epoch: dict[str, int] = {}
+        self.stats_counters = {"trades": 0, "late": 0, "dropped": 0, "off_session": 0}
+
+    def _epoch_of_day(self, bsop_date: str) -> int:
+        epoch = self._day_epoch.get(bsop_date)
+        if epoch is None:
+            d = datetime.strptime(bsop_date, "%Y%m%d").replace(tzinfo=KST)
+            epoch = int(d.timestamp())
+            self._day_epoch[bsop_date] = epoch
+        return epoch
+
+    def add_trade(self, stock_code: str, bsop_date: str, hhmmss: str,
+                  price: float, qty: float) -> bool:
+        """Feed one execution. Returns False when the trade was ignored."""
+        sec = int(hhmmss[:2]) * 3600 + int(hhmmss[2:4]) * 60 + int(hhmmss[4:6])
+        session = session_of(sec)
+        if session is None:
+            self.stats_counters["off_session"] += 1
+            return False
+
+        day = self._epoch_of_day(bsop_date)
+        # 종료 시각 체결(장 마감 동시호가)은 마지막 봉에 포함
+        trade_ts = day + (sec - 1 if sec == session[2] else sec)
+        session_start = day + session[1]
+
+        rings = self._rings.get(stock_code)
+        if rings is None:
+            rings = {tf: BarRing(tf * 60, self.capacity) for tf in self.timeframes}
+            self._rings[stock_code] = rings
+
+        self.stats_counters["trades"] += 1
+        accepted = False
+        for ring in rings.values():
+            result = ring.add(trade_ts, price, qty, session_start)
+            if result == "late":
+                self.stats_counters["late"] += 1
+            elif result == "dropped":
+                self.stats_counters["dropped"] += 1
+                continue
+            accepted = True
+        return accepted
+
+    def ingest(self, tr_id: str, rows: Iterable[dict[str, Any]]) -> int:
+        """Feed ccnl_krx / ccnl_nxt rows (dicts keyed by KIS column names)."""
+        if tr_id not in TICK_TR_IDS:
+            return 0
+        today = datetime.now(KST).strftime("%Y%m%d")
+        n = 0
+        for row in rows:
+            try:
+                if self.add_trade(
+                    row["MKSC_SHRN_ISCD"],
+                    row.get("BSOP_DATE") or today,
+                    str(row["STCK_CNTG_HOUR"]).zfill(6),
+                    float(row["STCK_PRPR"]),
+                    float(row["CNTG_VOL"]),
+                ):
+                    n += 1
+            except (KeyError, TypeError, ValueError) as e:
+                logger.debug(f"Skipping malformed tick row: {e}")
+        return n
+
+    def bars(self, stock_code: str, minutes: int = 1, count: int | None = None) -> dict[str, np.ndarray] | None:
+        """Read-only numpy views of the latest bars (oldest-first), or None."""
+        ring = self._rings.get(stock_code, {}).get(minutes)
+        if ring is None or len(ring) == 0:
+            return None
+        return {field: ring.view(field, count) for field in FIELDS}
+
+    def compute_indicators(self, stock_code: str, minutes: int = 5) -> dict[str, Any] | None:
+        """Run the scanner's indicator set on intraday bars instead of daily bars."""
+        bars = self.bars(stock_code, minutes)
+        if bars is None:
+            return None
+        closes = bars["close"].tolist()
+        return compute_all_indicators(
+            {
+                "closes": closes,
+                "highs": bars["high"].tolist(),
+                "lows": bars["low"].tolist(),
+                "volumes": bars["volume"].tolist(),
+            },
+            closes[-1],
+        )
+
+    def symbols(self) -> list[str]:
+        return list(self._rings.keys())
+
+    def reset(self, stock_code: str | None = None) -> None:
+        if stock_code is None:
+            self._rings.clear()
+        else:
+            self._rings.pop(stock_code, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "symbols": len(self._rings),
+            "timeframes": list(self.timeframes),
+            "capacity": self.capacity,
+            **self.stats_counters,
+        }
+
+
+# Singleton
+intraday_bars = IntradayBarAggregator()
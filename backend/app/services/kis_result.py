@@ -0,0 +1,81 @@
+"""KIS MCP 도구 결과 — MCP structuredContent를 재파싱 없이 읽는 래퍼.
+
+MCP 서버 응답 구조:
+    {"ok": true, "data": {"success": true, "outputs": {"output": {"length": n, "columns": {...}}},
+                          "value": ..., "kis": {"rt_cd", "msg_cd", "msg1"}, "timing": {...}}}
+
+테이블은 열 단위(columnar)로 전송되므로 필요할 때 레코드로 묶기만 한다.
+"""
+from dataclasses import dataclass, field
+from typing import Any
+
+
+def table_records(table: dict[str, Any] | None) -> list[dict[str, Any]]:
+    """열 단위 테이블 → 레코드(dict) 목록."""
+    columns = (table or {}).get("columns") or {}
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+@dataclass
+class KisResult:
+    """한 번의 MCP 도구 호출 결과."""
+
+    ok: bool
+    error: str = ""
+    outputs: dict[str, dict[str, Any]] = field(default_factory=dict)
+    value: Any = None
+    rt_cd: str = ""
+    msg_cd: str = ""
+    msg1: str = ""
+    timing: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def rejected(self) -> bool:
+        """KIS가 요청을 거절함 (rt_cd != "0")."""
+        return bool(self.rt_cd) and self.rt_cd != "0"
+
+    @property
+    def status(self) -> dict[str, str]:
+        return {"rt_cd": self.rt_cd, "msg_cd": self.msg_cd, "msg1": self.msg1}
+
+    def records(self, name: str | None = None) -> list[dict[str, Any]]:
+        """테이블을 레코드 목록으로. name이 없으면 첫 번째 테이블."""
+        if name is None:
+            table = next(iter(self.outputs.values()), None)
+        else:
+            table = self.outputs.get(name)
+        return table_records(table)
+
+    def first(self, name: str | None = None) -> dict[str, Any]:
+        """테이블 첫 행 (단건 조회 응답). 없으면 빈 dict."""
+        rows = self.records(name)
+        return rows[0] if rows else {}
+
+    @classmethod
+    def from_content(cls, content: Any) -> "KisResult":
+        """MCP 도구의 structuredContent(dict)에서 생성."""
+        if not isinstance(content, dict):
+            return cls(ok=False, error="MCP 도구가 구조화 결과를 반환하지 않았습니다", value=content)
+        if not content.get("ok"):
+            return cls(ok=False, error=str(content.get("error") or content.get("message") or "unknown MCP error"))
+
+        data = content.get("data")
+        if not isinstance(data, dict) or not ({"outputs", "kis", "success"} & data.keys()):
+            # find_stock_code / find_api_detail 등 서버 내부 처리 결과
+            return cls(ok=True, value=data)
+
+        kis = data.get("kis") or {}
+        result = cls(
+            ok=bool(data.get("success")),
+            error=str(data.get("error") or ""),
+            outputs=data.get("outputs") or {},
+            value=data.get("value"),
+            rt_cd=str(kis.get("rt_cd", "")),
+            msg_cd=str(kis.get("msg_cd", "")),
+            msg1=str(kis.get("msg1", "")),
+            timing=data.get("timing") or {},
+        )
+        if not result.ok and not result.error:
+            result.error = result.msg1 or "unknown MCP error"
+        return result
@@ -1,12 +1,12 @@
 """Market data service — wraps MCP market data tools for agent use."""
 
 import asyncio
-import json
 import logging
 from datetime import datetime, timedelta
 from typing import Any
 
 from app.models.db import execute_insert, execute_query
+from app.services.kis_result import KisResult
 from app.services.mcp_client import mcp_manager
 
 logger = logging.getLogger(__name__)
@@ -14,7 +14,7 @@ logger = logging.getLogger(__name__)
 
 async def get_volume_rank(count: int = 20) -> list[dict]:
     """Fetch top volume stocks from KIS via MCP."""
-    raw = await mcp_manager.call_tool(
+    result = await mcp_manager.call_tool_result(
         "domestic_stock",
         {
             "api_type": "volume_rank",
@@ -33,12 +33,12 @@ async def get_volume_rank(count: int = 20) -> list[dict]:
             },
         },
     )
-    return _parse_list_response(raw, count)
+    return _records(result, count)
 
 
 async def get_fluctuation_rank(count: int = 20) -> list[dict]:
     """Fetch top fluctuation (등락률) stocks."""
-    raw = await mcp_manager.call_tool(
+    result = await mcp_manager.call_tool_result(
         "domestic_stock",
         {
             "api_type": "fluctuation",
@@ -60,15 +60,15 @@ async def get_fluctuation_rank(count: int = 20) -> list[dict]:
             },
         },
     )
-    return _parse_list_response(raw, count)
+    return _records(result, count)
 
 
 async def get_stock_price(stock_code: str) -> dict[str, Any]:
     """Fetch current price for a stock.
 
-    KIS inquire_price 응답은 list[dict] 형태로 오므로 첫 번째 요소를 반환한다.
+    KIS inquire_price 응답은 단일 행 테이블이므로 첫 번째 행을 반환한다.
     """
-    raw = await mcp_manager.call_tool(
+    result = await mcp_manager.call_tool_result(
         "domestic_stock",
         {
             "api_type": "inquire_price",
@@ -79,15 +79,27 @@ async def get_stock_price(stock_code: str) -> dict[str, Any]:
             },
         },
     )
-    try:
-        data = _unwrap_mcp_response(raw)
-        if isinstance(data, list) and data:
-            return data[0]  # DataFrame 첫 행
-        if isinstance(data, dict):
-            return data.get("output", data)
-        return {}
-    except (json.JSONDecodeError, TypeError):
-        return {}
+    if not result.ok:
+        logger.warning(f"inquire_price failed for {stock_code}: {result.error}")
+    return result.first()  # DataFrame 첫 행
+
+
+async def get_multi_price(stock_codes: list[str]) -> list[dict]:
+    """관심종목(멀티종목) 시세 — 30종목씩 intstock_multprice 로 나눠 순차 조회."""
+    rows: list[dict] = []
+    for i in range(0, len(stock_codes), 30):
+        params: dict[str, str] = {}
+        for n, code in enumerate(stock_codes[i:i + 30], 1):
+            params[f"fid_cond_mrkt_div_code_{n}"] = "J"
+            params[f"fid_input_iscd_{n}"] = code
+        result = await mcp_manager.call_tool_result(
+            "domestic_stock", {"api_type": "intstock_multprice", "params": params}
+        )
+        if not result.ok:
+            logger.warning(f"intstock_multprice failed ({len(params) // 2} codes): {result.error}")
+            continue
+        rows.extend(result.records())
+    return rows
 
 
 async def get_daily_chart(stock_code: str, period: str = "D") -> list[dict]:
@@ -95,7 +107,7 @@ async def get_daily_chart(stock_code: str, period: str = "D") -> list[dict]:
     from datetime import date, timedelta
     today = date.today().strftime("%Y%m%d")
     start = (date.today() - timedelta(days=90)).strftime("%Y%m%d")
-    raw = await mcp_manager.call_tool(
+    result = await mcp_manager.call_tool_result(
         "domestic_stock",
         {
             "api_type": "inquire_daily_itemchartprice",
@@ -111,43 +123,41 @@ async def get_daily_chart(stock_code: str, period: str = "D") -> list[dict]:
         },
     )
     # chart price returns output2 (daily OHLCV list), not output/output1
-    try:
-        data = _unwrap_mcp_response(raw)
-        if isinstance(data, dict):
-            for key in ("output2", "output", "output1"):
-                if key in data and isinstance(data[key], list):
-                    return data[key][:90]
-        return []
-    except Exception:
-        return []
-
-
-def _unwrap_mcp_response(raw: Any) -> Any:
-    """Unwrap the MCP double-wrapped response structure.
-
-    MCP returns: {"ok": true, "data": {"data": "JSON_STRING", ...}}
-    This extracts the inner KIS API data.
-    """
-    try:
-        data = json.loads(raw) if isinstance(raw, str) else raw
-        if isinstance(data, dict) and "data" in data:
-            inner = data["data"]
-            if isinstance(inner, dict) and "data" in inner:
-                inner_data = inner["data"]
-                if isinstance(inner_data, str):
-                    # Strip "The End\n" prefix produced by some KIS API wrappers
-                    cleaned = inner_data.strip()
-                    if cleaned.startswith("The End"):
-                        newline_pos = cleaned.find("\n")
-                        cleaned = cleaned[newline_pos + 1:] if newline_pos != -1 else cleaned
-                    return json.loads(cleaned)
-                return inner_data
-            if isinstance(inner, str):
-                return json.loads(inner)
-            return inner
-        return data
-    except (json.JSONDecodeError, TypeError):
-        return raw
+    for key in ("output2", "output", "output1"):
+        if key in result.outputs:
+            return result.records(key)[:90]
+    return []
+
+
+async def get_daily_chart_range(stock_code: str, start: str, end: str) -> list[dict]:
+    """Daily bars for [start, end] (YYYYMMDD), paging backwards — KIS returns ≤100 rows per call."""
+    rows: list[dict] = []
+    cursor = end
+    while cursor >= start:
+        result = await mcp_manager.call_tool_result(
+            "domestic_stock",
+            {
+                "api_type": "inquire_daily_itemchartprice",
+                "params": {
+                    "env_dv": "demo",
+                    "fid_cond_mrkt_div_code": "J",
+                    "fid_input_iscd": stock_code,
+                    "fid_input_date_1": start,
+                    "fid_input_date_2": cursor,
+                    "fid_period_div_code": "D",
+                    "fid_org_adj_prc": "0",
+                },
+            },
+        )
+        page = [r for r in result.records("output2") if r.get("stck_bsop_date")]
+        if not result.ok or not page:
+            break
+        rows.extend(page)
+        oldest = min(r["stck_bsop_date"] for r in page)
+        if len(page) < 100:
+            break
+        cursor = (datetime.strptime(oldest, "%Y%m%d") - timedelta(days=1)).strftime("%Y%m%d")
+    return rows
 
 
 async def get_kospi200_components() -> list[str]:
@@ -277,7 +287,7 @@ def parse_ohlcv_from_chart(chart_data: list[dict]) -> dict[str, list[float]]:
 async def get_investor_trend(stock_code: str, days: int = 20) -> dict[str, Any]:
     """외국인/기관 매매동향 조회 (KIS MCP domestic_stock)"""
     try:
-        raw = await mcp_manager.call_tool("domestic_stock", {
+        result = await mcp_manager.call_tool_result("domestic_stock", {
             "api_type": "inquire_investor",
             "params": {
                 "env_dv": "demo",
@@ -285,13 +295,13 @@ async def get_investor_trend(stock_code: str, days: int = 20) -> dict[str, Any]:
                 "fid_input_iscd": stock_code,
             },
         })
-        data = _unwrap_mcp_response(raw)
-        if not data:
+        table = next(iter(result.outputs.values()), {}).get("columns", {})
+        if not table:
             return {"foreign_net_buy": 0, "institution_net_buy": 0, "foreign_holding_pct": None}
 
-        items = data if isinstance(data, list) else data.get("output", []) if isinstance(data, dict) else []
-        foreign_total = sum(int(v) for item in items if isinstance(item, dict) for v in [item.get("frgn_ntby_qty")] if v not in (None, ""))
-        inst_total = sum(int(v) for item in items if isinstance(item, dict) for v in [item.get("orgn_ntby_qty")] if v not in (None, ""))
+        # 열 단위 테이블이므로 레코드로 묶지 않고 해당 컬럼만 합산
+        foreign_total = sum(int(v) for v in table.get("frgn_ntby_qty", []) if v not in (None, ""))
+        inst_total = sum(int(v) for v in table.get("orgn_ntby_qty", []) if v not in (None, ""))
 
         return {
             "foreign_net_buy": foreign_total,
@@ -304,18 +314,9 @@ async def get_investor_trend(stock_code: str, days: int = 20) -> dict[str, Any]:
         return {"foreign_net_buy": 0, "institution_net_buy": 0, "foreign_holding_pct": None}
 
 
-def _parse_list_response(raw: Any, limit: int = 20) -> list[dict]:
-    """Parse MCP list response into list of dicts."""
-    try:
-        data = _unwrap_mcp_response(raw)
-        if isinstance(data, list):
-            return data[:limit]
-        if isinstance(data, dict):
-            # Try common KIS output structures
-            for key in ("output", "output1"):
-                if key in data and isinstance(data[key], list):
-                    return data[key][:limit]
-        return []
-    except (json.JSONDecodeError, TypeError) as e:
-        logger.warning(f"Failed to parse market response: {e}")
+def _records(result: KisResult, limit: int = 20) -> list[dict]:
+    """Ranking API 결과 테이블을 레코드 목록으로 (최대 limit개)."""
+    if not result.ok:
+        logger.warning(f"Market ranking call failed: {result.error}")
         return []
+    return result.records()[:limit]
@@ -1,18 +1,39 @@
+import asyncio
+import json
 import logging
+import time
 from typing import Any
 
 from fastmcp import Client
 
 from app.config import settings
+from app.services.kis_result import KisResult
+from app.services.metrics import KIS_RESPONSES, MCP_CALL_SECONDS
+from app.services.tracing import span
 
 logger = logging.getLogger(__name__)
 
 
+class PoolUnavailable(Exception):
+    """No pooled session could be borrowed (pool down or all sessions busy too long)."""
+
+
 class MCPClientManager:
-    """Manages connection to the KIS Trading MCP server."""
+    """Manages a small pool of connections to the KIS Trading MCP server.
 
-    def __init__(self):
-        self._client: Client | None = None
+    Each call borrows one session from the pool, so independent tool calls
+    (e.g. several tool_use blocks in one chat turn) run concurrently.
+    """
+
+    def __init__(self, pool_size: int | None = None, acquire_timeout: float = 60.0):
+        self._pool_size = pool_size
+        self.acquire_timeout = acquire_timeout
+        self._client: Client | None = None  # primary session (tool listing)
+        self._clients: list[Client] = []
+        # None = 연결 없음 sentinel — 대기 중인 호출을 깨워 실패시킨다
+        self._idle: asyncio.Queue[Client | None] = asyncio.Queue()
+        self._generation = 0
+        self._reconnect_lock = asyncio.Lock()
         self._tools: list[dict] = []
         self._connected = False
 
@@ -24,16 +45,46 @@ class MCPClientManager:
     def tools(self) -> list[dict]:
         return self._tools
 
+    @property
+    def pool_size(self) -> int:
+        return max(1, self._pool_size or settings.mcp_pool_size)
+
+    def pool_stats(self) -> dict[str, int]:
+        idle = self._idle.qsize() if self._clients else 0  # 연결이 없으면 큐에는 sentinel 뿐
+        return {
+            "size": len(self._clients),
+            "idle": idle,
+            "in_use": len(self._clients) - idle,
+        }
+
     async def connect(self) -> None:
-        """Connect to MCP server and fetch tool definitions."""
+        """Connect the session pool to the MCP server and fetch tool definitions."""
         try:
-            self._client = Client(settings.mcp_server_url)
-            await self._client.__aenter__()
+            clients: list[Client] = []
+            for i in range(self.pool_size):
+                client = Client(settings.mcp_server_url)
+                try:
+                    await client.__aenter__()
+                except Exception:
+                    if i == 0:
+                        raise
+                    logger.warning(f"MCP pool: only {i}/{self.pool_size} sessions connected")
+                    break
+                clients.append(client)
+
+            self._clients = clients
+            self._client = clients[0]
+            self._generation += 1
+            # 같은 큐를 재사용 — 재연결 중 대기하던 호출도 새 세션을 받는다
+            while not self._idle.empty():
+                self._idle.get_nowait()
+            for client in clients:
+                self._idle.put_nowait(client)
             self._connected = True
             await self._refresh_tools()
             logger.info(
                 f"Connected to MCP server at {settings.mcp_server_url} "
-                f"with {len(self._tools)} tools"
+                f"with {len(self._tools)} tools ({len(clients)} sessions)"
             )
         except Exception as e:
             self._connected = False
@@ -41,16 +92,22 @@ class MCPClientManager:
             raise
 
     async def disconnect(self) -> None:
-        """Disconnect from MCP server."""
-        if self._client:
+        """Disconnect all pooled sessions and fail calls still waiting for one."""
+        await self._close_sessions()
+        self._idle.put_nowait(None)
+
+    async def _close_sessions(self) -> None:
+        clients, self._clients = self._clients, []
+        for client in clients:
             try:
-                await self._client.__aexit__(None, None, None)
+                await client.__aexit__(None, None, None)
             except Exception as e:
                 logger.warning(f"Error disconnecting from MCP server: {e}")
-            finally:
-                self._client = None
-                self._connected = False
-                self._tools = []
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        self._client = None
+        self._connected = False
+        self._tools = []
 
     async def _refresh_tools(self) -> None:
         """Fetch tool definitions from MCP server."""
@@ -70,21 +127,84 @@ class MCPClientManager:
         """Return tools formatted for Claude API."""
         return self._tools
 
-    async def _reconnect(self) -> bool:
-        """Attempt to reconnect to MCP server."""
-        logger.info("Attempting MCP server reconnection...")
+    async def _reconnect(self, generation: int) -> bool:
+        """Attempt to reconnect to MCP server (once per failed pool generation)."""
+        async with self._reconnect_lock:
+            if self._generation != generation and self._connected:
+                return True  # another call already reconnected
+            logger.info("Attempting MCP server reconnection...")
+            try:
+                await self._close_sessions()  # 대기 중인 호출은 새 세션을 기다린다
+                await self.connect()
+                logger.info("MCP server reconnection successful")
+                return True
+            except Exception as e:
+                logger.error(f"MCP server reconnection failed: {e}")
+                self._idle.put_nowait(None)
+                return False
+
+    async def _acquire(self) -> Client:
+        """Borrow an idle session, waiting at most ``acquire_timeout`` seconds."""
         try:
-            await self.disconnect()
-            await self.connect()
-            logger.info("MCP server reconnection successful")
-            return True
-        except Exception as e:
-            logger.error(f"MCP server reconnection failed: {e}")
-            return False
+            client = await asyncio.wait_for(self._idle.get(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise PoolUnavailable(f"no MCP session free within {self.acquire_timeout:g}s") from None
+        if client is None:
+            self._idle.put_nowait(None)  # 다음 대기자도 깨운다
+            raise PoolUnavailable("MCP server not connected")
+        return client
 
-    async def call_tool(self, name: str, arguments: dict[str, Any]) -> str:
-        """Execute an MCP tool and return the result as a string."""
-        if not self._client or not self._connected:
+    async def _call(self, name: str, arguments: dict[str, Any]) -> Any:
+        """Run one call on a borrowed pool session."""
+        client = await self._acquire()
+        generation = self._generation
+        try:
+            return await client.call_tool(name, arguments)
+        finally:
+            # 재연결 이전 세대의 세션은 풀에 돌려놓지 않음
+            if generation == self._generation:
+                self._idle.put_nowait(client)
+
+    @staticmethod
+    def _result_text(result: Any) -> str:
+        """Extract text content from CallToolResult (or a list of content items)."""
+        items = result.content if hasattr(result, "content") else result if isinstance(result, list) else None
+        if items is None:
+            return str(result)
+        return "\n".join(item.text if hasattr(item, "text") else str(item) for item in items)
+
+    @classmethod
+    def _structured(cls, result: Any) -> Any:
+        """structuredContent from CallToolResult (text JSON only for servers without an output schema)."""
+        content = getattr(result, "structured_content", None)
+        if content is not None:
+            return content
+        try:
+            return json.loads(cls._result_text(result))
+        except (json.JSONDecodeError, TypeError):
+            return None
+
+    async def _invoke(self, name: str, arguments: dict[str, Any]) -> Any:
+        """Execute an MCP tool with one reconnect-and-retry. Returns the raw result or an error string."""
+        api_type = arguments.get("api_type", "")
+        with span(f"mcp.{name}", "mcp", api_type=api_type) as trace_span:
+            started = time.perf_counter()
+            result = await self._invoke_once(name, arguments)
+            failed = isinstance(result, str)
+            MCP_CALL_SECONDS.observe(
+                time.perf_counter() - started, tool=name, api_type=api_type, outcome="error" if failed else "ok")
+            if trace_span is not None:
+                if failed:
+                    trace_span.status = "error"
+                else:
+                    # 서버 측 단계(코드 준비/하위 프로세스/KIS HTTP)를 request_id와 함께 자식 스팬으로 연결
+                    content = getattr(result, "structured_content", None)
+                    data = content.get("data") if isinstance(content, dict) else None
+                    trace_span.link_remote(data.get("trace") if isinstance(data, dict) else None)
+        return result
+
+    async def _invoke_once(self, name: str, arguments: dict[str, Any]) -> Any:
+        if not self._clients or not self._connected:
             return "Error: MCP server not connected"
 
         # Safety: override env_dv based on current trading mode
@@ -94,48 +214,22 @@ class MCPClientManager:
                 if arguments["params"].get("env_dv") == "real":
                     arguments["params"]["env_dv"] = "demo"
 
+        generation = self._generation
         try:
             logger.info(f"Calling MCP tool: {name} with args: {arguments}")
-            result = await self._client.call_tool(name, arguments)
-
-            # Extract text content from CallToolResult
-            if hasattr(result, "content"):
-                parts = []
-                for item in result.content:
-                    if hasattr(item, "text"):
-                        parts.append(item.text)
-                    else:
-                        parts.append(str(item))
-                return "\n".join(parts)
-            if isinstance(result, list):
-                parts = []
-                for item in result:
-                    if hasattr(item, "text"):
-                        parts.append(item.text)
-                    else:
-                        parts.append(str(item))
-                return "\n".join(parts)
-            return str(result)
+            return await self._call(name, arguments)
+        except PoolUnavailable as e:
+            logger.error(f"MCP tool call failed: {name}: {e}")
+            return f"Error calling tool {name}: {e}"
         except Exception as e:
             error_msg = str(e) or type(e).__name__
             logger.error(f"MCP tool call failed: {name}: {error_msg}")
 
             # Attempt reconnection on connection-related failures
-            if await self._reconnect():
+            if await self._reconnect(generation):
                 try:
                     logger.info(f"Retrying MCP tool: {name} after reconnection")
-                    result = await self._client.call_tool(name, arguments)
-                    if hasattr(result, "content"):
-                        parts = []
-                        for item in result.content:
-                            parts.append(item.text if hasattr(item, "text") else str(item))
-                        return "\n".join(parts)
-                    if isinstance(result, list):
-                        parts = []
-                        for item in result:
-                            parts.append(item.text if hasattr(item, "text") else str(item))
-                        return "\n".join(parts)
-                    return str(result)
+                    return await self._call(name, arguments)
                 except Exception as retry_err:
                     retry_msg = str(retry_err) or type(retry_err).__name__
                     logger.error(f"MCP tool retry also failed: {name}: {retry_msg}")
@@ -143,6 +237,23 @@ class MCPClientManager:
 
             return f"Error calling tool {name}: {error_msg}"
 
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> str:
+        """Execute an MCP tool and return the result as a string (for Claude tool_result)."""
+        result = await self._invoke(name, arguments)
+        return result if isinstance(result, str) else self._result_text(result)
+
+    async def call_tool_result(self, name: str, arguments: dict[str, Any]) -> KisResult:
+        """Execute an MCP tool and return its structured content as a KisResult."""
+        result = await self._invoke(name, arguments)
+        if isinstance(result, str):
+            return KisResult(ok=False, error=result)
+        kis_result = KisResult.from_content(self._structured(result))
+        if kis_result.rt_cd:
+            KIS_RESPONSES.inc(api_type=arguments.get("api_type", ""), rt_cd=kis_result.rt_cd, msg_cd=kis_result.msg_cd)
+        if kis_result.timing:
+            logger.debug(f"MCP tool {name} serialization: {kis_result.timing}")
+        return kis_result
+
 
 # Singleton instance
 mcp_manager = MCPClientManager()
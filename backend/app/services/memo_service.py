@@ -1,26 +1,45 @@
-"""투자 메모 생성 서비스"""
+"""투자 메모 생성 서비스
+
+렌더링(render_memo_html / render_memo_docx)은 순수 함수로 분리되어 프로세스
+풀에서 실행되므로 큰 메모도 이벤트 루프를 막지 않는다. 결과물은
+(signal_id, 시그널 row 의 content hash) 기준으로 디스크에 캐시되고
+memo_exports 에 기록된다.
+"""
+import asyncio
+import hashlib
 import json
 import logging
+import multiprocessing
+import time
+import zipfile
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from datetime import datetime
-from app.models.db import execute_query, execute_insert
+from pathlib import Path
+
+from app.config import settings
+from app.models import db as db_module
+from app.models.db import execute_insert, execute_query
 
 logger = logging.getLogger(__name__)
 
+MEDIA_TYPES = {
+    "html": "text/html; charset=utf-8",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
 
-async def generate_memo_html(signal_id: int) -> str | None:
-    """시그널 데이터 기반 HTML 투자 메모 생성"""
-    rows = await execute_query("SELECT * FROM signals WHERE id = ?", (signal_id,))
-    if not rows:
-        return None
 
-    signal = dict(rows[0])
+def render_memo_html(signal: dict, generated_at: str) -> str:
+    """시그널 row → HTML 투자 메모 (순수 함수, 워커 프로세스에서 실행)"""
+    signal_id = signal["id"]
     scenarios = json.loads(signal.get("scenarios_json") or "{}")
     dart = json.loads(signal.get("dart_fundamentals_json") or "{}")
     expert_stances = json.loads(signal.get("expert_stances_json") or "{}")
     metadata = json.loads(signal.get("metadata_json") or "{}")
 
     direction_kr = {"buy": "매수", "sell": "매도", "hold": "보유"}.get(signal.get("direction", ""), signal.get("direction", ""))
-    generated_at = datetime.now().strftime("%Y-%m-%d %H:%M")
     rr_score = signal.get("rr_score", 0) or 0
 
     html = f"""<!DOCTYPE html>
@@ -105,31 +124,17 @@ async def generate_memo_html(signal_id: int) -> str | None:
 
     html += '<hr><p class="meta">본 메모는 AI 분석 시스템에 의해 자동 생성되었습니다. 투자 판단의 참고 자료로만 활용하세요.</p>'
     html += '</body></html>'
-
-    # DB 기록
-    try:
-        await execute_insert(
-            "INSERT INTO memo_exports (signal_id, format, file_path) VALUES (?, 'html', ?)",
-            (signal_id, f"memo_{signal_id}_{datetime.now().strftime('%Y%m%d')}.html")
-        )
-    except Exception:
-        pass
-
     return html
 
 
-async def generate_memo_docx(signal_id: int) -> bytes | None:
-    """시그널 데이터 기반 DOCX 투자 메모 생성"""
+def render_memo_docx(signal: dict, generated_at: str) -> bytes:
+    """시그널 row → DOCX 투자 메모 (순수 함수, 워커 프로세스에서 실행)"""
     from docx import Document
     from docx.shared import Pt, RGBColor
     from docx.enum.text import WD_ALIGN_PARAGRAPH
     from io import BytesIO
 
-    rows = await execute_query("SELECT * FROM signals WHERE id = ?", (signal_id,))
-    if not rows:
-        return None
-
-    signal = dict(rows[0])
+    signal_id = signal["id"]
     scenarios = json.loads(signal.get("scenarios_json") or "{}")
     dart = json.loads(signal.get("dart_fundamentals_json") or "{}")
     expert_stances = json.loads(signal.get("expert_stances_json") or "{}")
@@ -145,7 +150,7 @@ async def generate_memo_docx(signal_id: int) -> bytes | None:
 
     # Meta
     meta = doc.add_paragraph()
-    meta.add_run(f'생성일: {datetime.now().strftime("%Y-%m-%d %H:%M")} | 시그널 #{signal_id} | R/R Score: {rr_score:.1f}').font.size = Pt(9)
+    meta.add_run(f'생성일: {generated_at} | 시그널 #{signal_id} | R/R Score: {rr_score:.1f}').font.size = Pt(9)
     meta.runs[0].font.color.rgb = RGBColor(0x66, 0x66, 0x66)
 
     # Investment Opinion
@@ -237,14 +242,228 @@ async def generate_memo_docx(signal_id: int) -> bytes | None:
     buffer = BytesIO()
     doc.save(buffer)
     buffer.seek(0)
+    return buffer.getvalue()
+
+
+_RENDERERS = {"html": render_memo_html, "docx": render_memo_docx}
+
+
+@dataclass
+class MemoArtifact:
+    signal_id: int
+    format: str
+    content: bytes
+    cached: bool
+    render_ms: float
+
+    @property
+    def filename(self) -> str:
+        return f"memo_{self.signal_id}.{self.format}"
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.format]
+
+
+def signal_content_hash(signal: dict) -> str:
+    """시그널 row 전체의 해시 — 내용이 바뀌면 캐시가 자동으로 무효화됨"""
+    payload = json.dumps(signal, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _render_bytes(fmt: str, signal: dict, generated_at: str) -> tuple[bytes, float]:
+    """워커 프로세스 진입점: (content, render_ms)"""
+    started = time.perf_counter()
+    result = _RENDERERS[fmt](signal, generated_at)
+    content = result.encode("utf-8") if isinstance(result, str) else result
+    return content, (time.perf_counter() - started) * 1000
+
+
+class MemoRenderer:
+    """Process-pool memo renderer with an on-disk artifact cache and per-format timings."""
+
+    def __init__(self, max_workers: int | None = None, cache_dir: Path | None = None):
+        self.max_workers = max_workers or settings.memo_render_workers
+        self._cache_dir = cache_dir
+        self._pool: ProcessPoolExecutor | None = None
+        self._stats: dict[str, dict] = {}
+
+    @property
+    def cache_dir(self) -> Path:
+        return self._cache_dir or db_module.DB_PATH.parent / "memos"
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: aiosqlite/httpx 스레드가 있는 부모 프로세스를 fork 하지 않음
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self, fmt: str, signal: dict, generated_at: str) -> tuple[bytes, float]:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), _render_bytes, fmt, signal, generated_at)
+        except BrokenProcessPool:
+            logger.warning("Memo render pool broken — restarting")
+            self._pool = None
+            return await loop.run_in_executor(self._get_pool(), _render_bytes, fmt, signal, generated_at)
+
+    def _record(self, fmt: str, cached: bool, ms: float) -> None:
+        s = self._stats.setdefault(fmt, {"renders": 0, "cache_hits": 0, "total_ms": 0.0, "max_ms": 0.0})
+        if cached:
+            s["cache_hits"] += 1
+            return
+        s["renders"] += 1
+        s["total_ms"] += ms
+        s["max_ms"] = max(s["max_ms"], ms)
+
+    def stats(self) -> dict[str, dict]:
+        return {
+            fmt: {
+                "renders": s["renders"],
+                "cache_hits": s["cache_hits"],
+                "avg_ms": round(s["total_ms"] / s["renders"], 1) if s["renders"] else None,
+                "max_ms": round(s["max_ms"], 1),
+            }
+            for fmt, s in self._stats.items()
+        }
 
-    # DB record
-    try:
-        await execute_insert(
-            "INSERT INTO memo_exports (signal_id, format, file_path) VALUES (?, 'docx', ?)",
-            (signal_id, f"memo_{signal_id}_{datetime.now().strftime('%Y%m%d')}.docx")
+    async def render(self, signal: dict, fmt: str) -> MemoArtifact:
+        """Return the cached artifact for this signal version, rendering it if needed."""
+        signal_id = signal["id"]
+        content_hash = signal_content_hash(signal)
+        cached = await execute_query(
+            """SELECT file_path FROM memo_exports
+               WHERE signal_id = ? AND format = ? AND content_hash = ? ORDER BY id DESC LIMIT 1""",
+            (signal_id, fmt, content_hash),
+            fetch_one=True,
+        )
+        if cached and cached["file_path"]:
+            path = Path(cached["file_path"])
+            try:
+                content = await asyncio.to_thread(path.read_bytes)
+                self._record(fmt, True, 0)
+                return MemoArtifact(signal_id, fmt, content, True, 0.0)
+            except OSError:
+                pass  # 파일 삭제됨 → 다시 렌더링
+
+        generated_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+        content, render_ms = await self._run(fmt, signal, generated_at)
+        self._record(fmt, False, render_ms)
+        logger.info(f"Memo #{signal_id} {fmt} rendered in {render_ms:.0f}ms ({len(content):,} bytes)")
+
+        path = self.cache_dir / f"{signal_id}_{content_hash}.{fmt}"
+        try:
+            await asyncio.to_thread(self._write, path, content)
+            await execute_insert(
+                """INSERT INTO memo_exports (signal_id, format, file_path, content_hash, size_bytes, render_ms)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (signal_id, fmt, str(path), content_hash, len(content), round(render_ms, 1)),
+            )
+            await self._prune_superseded(signal_id, fmt, content_hash)
+        except Exception as e:
+            logger.warning(f"Memo cache write failed for #{signal_id}: {e}")
+        return MemoArtifact(signal_id, fmt, content, False, render_ms)
+
+    async def _prune_superseded(self, signal_id: int, fmt: str, content_hash: str) -> None:
+        """Drop files/rows of older versions of this signal's memo — only the latest is served."""
+        stale = await execute_query(
+            """SELECT id, file_path FROM memo_exports
+               WHERE signal_id = ? AND format = ? AND content_hash IS NOT ?""",
+            (signal_id, fmt, content_hash),
         )
-    except Exception:
+        if not stale:
+            return
+        for row in stale:
+            if row["file_path"]:
+                await asyncio.to_thread(Path(row["file_path"]).unlink, missing_ok=True)
+        await execute_query(
+            f"DELETE FROM memo_exports WHERE id IN ({','.join('?' * len(stale))})",
+            tuple(row["id"] for row in stale),
+        )
+
+    @staticmethod
+    def _write(path: Path, content: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(content)
+        tmp.replace(path)
+
+    async def render_signal(self, signal_id: int, fmt: str) -> MemoArtifact | None:
+        signal = await execute_query("SELECT * FROM signals WHERE id = ?", (signal_id,), fetch_one=True)
+        if not signal:
+            return None
+        return await self.render(signal, fmt)
+
+    async def stream_zip(self, signal_ids: list[int], fmt: str) -> AsyncIterator[bytes]:
+        """Render many memos (bounded by pool size) and stream them as a zip, in order."""
+        ids = list(dict.fromkeys(signal_ids))
+        rows = await execute_query(
+            f"SELECT * FROM signals WHERE id IN ({','.join('?' * len(ids))})", tuple(ids)
+        ) if ids else []
+        signals = {row["id"]: row for row in rows or []}
+
+        limit = asyncio.Semaphore(self.max_workers * 2)
+
+        async def bounded(signal: dict) -> MemoArtifact:
+            async with limit:
+                return await self.render(signal, fmt)
+
+        tasks = [asyncio.create_task(bounded(signals[i])) for i in ids if i in signals]
+        sink = _ZipSink()
+        # docx 는 이미 압축된 포맷 — 재압축하지 않음
+        compression = zipfile.ZIP_STORED if fmt == "docx" else zipfile.ZIP_DEFLATED
+        try:
+            with zipfile.ZipFile(sink, "w", compression=compression) as zf:
+                for task in tasks:
+                    artifact = await task
+                    zf.writestr(artifact.filename, artifact.content)
+                    yield sink.drain()
+                missing = [i for i in ids if i not in signals]
+                if missing:
+                    zf.writestr("missing.txt", "\n".join(str(i) for i in missing))
+            yield sink.drain()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class _ZipSink:
+    """Write-only, non-seekable file object so ZipFile emits data descriptors we can stream."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
         pass
 
-    return buffer.getvalue()
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def generate_memo_html(signal_id: int) -> str | None:
+    """시그널 데이터 기반 HTML 투자 메모 생성"""
+    artifact = await memo_renderer.render_signal(signal_id, "html")
+    return artifact.content.decode("utf-8") if artifact else None
+
+
+async def generate_memo_docx(signal_id: int) -> bytes | None:
+    """시그널 데이터 기반 DOCX 투자 메모 생성"""
+    artifact = await memo_renderer.render_signal(signal_id, "docx")
+    return artifact.content if artifact else None
+
+
+# Singleton
+memo_renderer = MemoRenderer()
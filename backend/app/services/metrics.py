@@ -0,0 +1,291 @@
+"""In-process metrics (counters, gauges, histograms) rendered in Prometheus text format.
+
+기록은 dict 갱신 + bisect 한 번뿐이고 문자열 포맷은 /metrics 스크레이프 때만 일어난다.
+큐 길이 같은 게이지는 콜백으로 등록해 스크레이프 시점에만 계산한다.
+"""
+import math
+import re
+import time
+from bisect import bisect_left
+from collections.abc import Awaitable, Callable, Iterable
+from functools import lru_cache
+from typing import Any
+
+from app.services.tracing import span
+
+# 초 단위 — 수 ms 짜리 DB 쿼리부터 수십 초 걸리는 Claude 호출까지
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, Any]) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """Set directly, or backed by a callback evaluated only at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._callback: Callable[[], float | dict[tuple, float]] | None = None
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, callback: Callable[[], float | dict[tuple, float]]) -> None:
+        """Callback returns a number (no labels) or {label values tuple: number}."""
+        self._callback = callback
+
+    def value(self, **labels: Any) -> float:
+        return self._current().get(self._key(labels), 0.0)
+
+    def _current(self) -> dict[tuple, float]:
+        if self._callback is None:
+            return self._values
+        try:
+            result = self._callback()
+        except Exception:
+            return {}
+        return result if isinstance(result, dict) else {(): result}
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(self._current().items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key → [bucket counts..., +Inf count, sum]
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, **labels: Any) -> "_Timer":
+        """Context manager that observes elapsed seconds."""
+        return _Timer(self, labels)
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def sum(self, **labels: Any) -> float:
+        series = self._series.get(self._key(labels))
+        return series[-1] if series else 0.0
+
+    def _samples(self) -> list[str]:
+        lines = []
+        for key, series in sorted(self._series.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram: Histogram, labels: dict[str, Any]):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self._histogram.observe(time.perf_counter() - self._started, **self._labels)
+        return False
+
+
+class MetricsRegistry:
+    """Holds metrics by name; get-or-create so modules can declare what they use."""
+
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self._metrics: dict[str, _Metric] = {}
+
+    def _get(self, cls: type, name: str, help_text: str, labelnames: Iterable[str], **kwargs: Any) -> Any:
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        metric = self._metrics.get(full_name)
+        if metric is None:
+            metric = self._metrics[full_name] = cls(full_name, help_text, labelnames, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {full_name} already registered as {metric.kind}")
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+_SQL_VERB = re.compile(r"^\s*(\w+)", re.IGNORECASE)
+_SQL_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?[\"`]?(\w+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def sql_statement_label(sql: str) -> str:
+    """'SELECT * FROM signals WHERE ...' → 'SELECT signals' (라벨 카디널리티를 테이블 수로 제한)."""
+    verb = _SQL_VERB.match(sql)
+    table = _SQL_TABLE.search(sql)
+    parts = [verb.group(1).upper() if verb else "SQL"]
+    if table:
+        parts.append(table.group(1).lower())
+    return " ".join(parts)
+
+
+# Singleton
+metrics = MetricsRegistry("trading")
+
+# --- Hot-path metrics (declared once, shared by instrumented modules) ---
+MCP_CALL_SECONDS = metrics.histogram(
+    "mcp_call_duration_seconds", "MCP tool call latency", ("tool", "api_type", "outcome"))
+KIS_RESPONSES = metrics.counter(
+    "kis_responses_total", "KIS responses seen by the backend by rt_cd/msg_cd", ("api_type", "rt_cd", "msg_cd"))
+CLAUDE_SECONDS = metrics.histogram(
+    "claude_request_duration_seconds", "Claude API latency", ("persona", "model", "outcome"))
+CLAUDE_TOKENS = metrics.counter(
+    "claude_tokens_total", "Claude tokens by persona", ("persona", "model", "kind"))
+DB_QUERY_SECONDS = metrics.histogram(
+    "db_query_duration_seconds", "SQLite statement latency (verb + table)", ("statement",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+EVENT_HANDLER_SECONDS = metrics.histogram(
+    "event_handler_duration_seconds", "EventBus handler latency", ("event_type", "handler", "outcome"))
+EVENT_BUS_IN_FLIGHT = metrics.gauge(
+    "event_bus_in_flight", "Events currently being dispatched by EventBus.publish")
+EVENT_BUS_PENDING_PERSIST = metrics.gauge(
+    "event_bus_pending_persist", "Event persistence tasks not yet written to SQLite")
+SCHEDULER_LAG_SECONDS = metrics.histogram(
+    "scheduler_job_lag_seconds", "Delay between a job's scheduled time and its submission", ("job",))
+SCHEDULER_MISSED = metrics.counter(
+    "scheduler_jobs_missed_total", "Scheduled runs skipped past misfire grace time", ("job",))
+AGENT_RUN_SECONDS = metrics.histogram(
+    "agent_run_duration_seconds", "Agent run latency", ("agent", "outcome"))
+WS_SEND_LAG_SECONDS = metrics.histogram(
+    "ws_send_lag_seconds", "WebSocket fan-out lag (enqueue → sent)",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+WS_QUEUE_DEPTH = metrics.gauge("ws_queue_depth", "Messages queued across WebSocket clients")
+WS_CLIENTS = metrics.gauge("ws_clients", "Connected WebSocket clients")
+
+
+def record_claude(persona: str, model: str, started: float, response: Any = None, error: bool = False) -> None:
+    """Observe one Claude call (started = time.perf_counter() before the request)."""
+    CLAUDE_SECONDS.observe(time.perf_counter() - started, persona=persona, model=model,
+                           outcome="error" if error else "ok")
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    for kind in ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"):
+        value = getattr(usage, kind, None)
+        if isinstance(value, (int, float)) and value:
+            CLAUDE_TOKENS.inc(value, persona=persona, model=model, kind=kind.removesuffix("_tokens"))
+
+
+async def observe_claude(persona: str, call: Awaitable[Any]) -> Any:
+    """Await a messages.create(...) call, recording latency and token usage per persona (and a trace span)."""
+    with span("claude", "llm", persona=persona) as trace_span:
+        started = time.perf_counter()
+        try:
+            response = await call
+        except Exception:
+            record_claude(persona, "", started, error=True)
+            raise
+        record_claude(persona, getattr(response, "model", "") or "", started, response)
+        usage = getattr(response, "usage", None)
+        if trace_span is not None and usage is not None:
+            trace_span.set(model=getattr(response, "model", ""),
+                           input_tokens=getattr(usage, "input_tokens", None),
+                           output_tokens=getattr(usage, "output_tokens", None))
+        return response
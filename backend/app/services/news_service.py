@@ -1,29 +1,133 @@
-"""뉴스/매크로 데이터 수집 서비스 — NAVER + Google News RSS 폴백"""
-import re
+"""뉴스/매크로 데이터 수집 서비스 — NAVER + Google News RSS 폴백
+
+여러 종목을 한 번에 처리하는 배치 파이프라인:
+1. news_cache 에서 당일 수집분을 한 번의 쿼리로 조회
+2. 미스 종목은 종목끼리 동시에 NAVER 를 요청하고, 결과가 없을 때만 Google RSS
+   (호스트별 동시성 제한, ETag / If-Modified-Since 조건부 요청)
+3. 헤드라인을 정규화 해시로 중복 제거 (종목 간 공유 헤드라인은 한 번만 분류)
+4. 전체 종목의 감성 분석을 한 번의 Claude 호출로 처리
+5. news_cache 에 단일 트랜잭션으로 기록 (분류에 실패한 종목은 다음 호출에서 재시도하도록 제외)
+"""
+import asyncio
+import hashlib
 import json
 import logging
+import re
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from collections.abc import Callable
 from html import unescape
-import httpx
+from urllib.parse import urlencode, urlparse
+
 import anthropic
+import httpx
+
 from app.config import settings
-from app.models.db import execute_query, execute_insert
+from app.models.db import execute_query, get_db
+from app.services.metrics import observe_claude
 
 logger = logging.getLogger(__name__)
 
+NEWS_MODEL = "claude-haiku-4-5-20251001"
+HOST_CONCURRENCY = {"search.naver.com": 4, "news.google.com": 4}
+DEFAULT_HOST_CONCURRENCY = 2
+CONDITIONAL_CACHE_SIZE = 512
+# 한 번의 감성 분석 호출에 넣을 최대 헤드라인 수 (초과 시 청크로 나눔)
+MAX_HEADLINES_PER_CALL = 150
+
+_http: httpx.AsyncClient | None = None
+_anthropic: anthropic.AsyncAnthropic | None = None
+_host_limits: dict[str, asyncio.Semaphore] = {}
+# url -> (etag, last_modified, parsed titles) — 304 응답 시 재사용
+_conditional_cache: OrderedDict[str, tuple[str | None, str | None, list[str]]] = OrderedDict()
+
+
+def _get_http() -> httpx.AsyncClient:
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(timeout=10, follow_redirects=True)
+    return _http
+
+
+def _get_anthropic() -> anthropic.AsyncAnthropic:
+    global _anthropic
+    if _anthropic is None:
+        _anthropic = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+    return _anthropic
+
+
+def _host_limit(host: str) -> asyncio.Semaphore:
+    if host not in _host_limits:
+        _host_limits[host] = asyncio.Semaphore(HOST_CONCURRENCY.get(host, DEFAULT_HOST_CONCURRENCY))
+    return _host_limits[host]
+
+
+def headline_hash(title: str) -> str:
+    """정규화(공백/구두점/대소문자 무시) 후 해시 — 출처별 표기 차이를 같은 헤드라인으로 취급"""
+    normalized = re.sub(r"[\W_]+", "", unescape(title).lower())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+async def _conditional_get(
+    url: str, params: dict, headers: dict, parse: Callable[[str], list[str]]
+) -> list[str]:
+    """GET with ETag/If-Modified-Since; 304 returns the titles parsed last time."""
+    key = f"{url}?{urlencode(params)}"
+    cached = _conditional_cache.get(key)
+    request_headers = dict(headers)
+    if cached:
+        etag, last_modified, _ = cached
+        if etag:
+            request_headers["If-None-Match"] = etag
+        if last_modified:
+            request_headers["If-Modified-Since"] = last_modified
+
+    async with _host_limit(urlparse(url).hostname or ""):
+        resp = await _get_http().get(url, params=params, headers=request_headers)
+
+    if resp.status_code == 304 and cached:
+        _conditional_cache.move_to_end(key)
+        return cached[2]
+    resp.raise_for_status()
+    titles = parse(resp.text)
+    etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+    if etag or last_modified:
+        _conditional_cache[key] = (etag, last_modified, titles)
+        _conditional_cache.move_to_end(key)
+        while len(_conditional_cache) > CONDITIONAL_CACHE_SIZE:
+            _conditional_cache.popitem(last=False)
+    return titles
+
+
+def _parse_naver(text: str) -> list[str]:
+    return [unescape(t) for t in re.findall(r'class="news_tit"[^>]*title="([^"]+)"', text)]
+
+
+def _parse_google_rss(text: str) -> list[str]:
+    root = ET.fromstring(text)
+    titles = []
+    for item in root.findall(".//item"):
+        title_el = item.find("title")
+        if title_el is not None and title_el.text:
+            # Clean up HTML entities and source suffix
+            title = unescape(title_el.text)
+            # Google News adds " - Source" at the end, remove it
+            title = re.sub(r'\s*-\s*[^-]+$', '', title).strip()
+            if title:
+                titles.append(title)
+    return titles
+
 
 async def _fetch_naver_news(stock_name: str, max_items: int = 5) -> list[str]:
     """NAVER 뉴스 검색으로 헤드라인 수집"""
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                "https://search.naver.com/search.naver",
-                params={"where": "news", "query": f"{stock_name} 주가", "sort": "1"},
-                headers={"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"},
-                timeout=10,
-            )
-            titles = re.findall(r'class="news_tit"[^>]*title="([^"]+)"', resp.text)[:max_items]
-            return titles
+        titles = await _conditional_get(
+            "https://search.naver.com/search.naver",
+            {"where": "news", "query": f"{stock_name} 주가", "sort": "1"},
+            {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"},
+            _parse_naver,
+        )
+        return titles[:max_items]
     except Exception as e:
         logger.warning(f"NAVER news fetch failed for {stock_name}: {e}")
         return []
@@ -32,93 +136,195 @@ async def _fetch_naver_news(stock_name: str, max_items: int = 5) -> list[str]:
 async def _fetch_google_news_rss(stock_name: str, max_items: int = 5) -> list[str]:
     """Google News RSS 폴백으로 헤드라인 수집"""
     try:
-        query = f"{stock_name} 주식"
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"https://news.google.com/rss/search",
-                params={"q": query, "hl": "ko", "gl": "KR", "ceid": "KR:ko"},
-                headers={"User-Agent": "Mozilla/5.0"},
-                timeout=10,
-            )
-            root = ET.fromstring(resp.text)
-            titles = []
-            for item in root.findall(".//item")[:max_items]:
-                title_el = item.find("title")
-                if title_el is not None and title_el.text:
-                    # Clean up HTML entities and source suffix
-                    title = unescape(title_el.text)
-                    # Google News adds " - Source" at the end, remove it
-                    title = re.sub(r'\s*-\s*[^-]+$', '', title).strip()
-                    if title:
-                        titles.append(title)
-            return titles
+        titles = await _conditional_get(
+            "https://news.google.com/rss/search",
+            {"q": f"{stock_name} 주식", "hl": "ko", "gl": "KR", "ceid": "KR:ko"},
+            {"User-Agent": "Mozilla/5.0"},
+            _parse_google_rss,
+        )
+        return titles[:max_items]
     except Exception as e:
         logger.warning(f"Google News RSS fetch failed for {stock_name}: {e}")
         return []
 
 
-async def fetch_stock_news(stock_name: str, stock_code: str, max_items: int = 5) -> dict:
-    """종목 관련 뉴스 수집 + Claude 요약. NAVER 우선, Google News RSS 폴백."""
-    # 1. 캐시 확인 (당일)
-    cached = await execute_query(
-        "SELECT title, summary, sentiment FROM news_cache WHERE stock_code = ? AND cached_at >= date('now') LIMIT ?",
-        (stock_code, max_items)
-    )
-    if cached and len(cached) >= 3:
-        headlines = [r["title"] for r in cached]
-        sentiments = [r["sentiment"] for r in cached if r.get("sentiment")]
-        return {
-            "headlines": headlines,
-            "sentiment": _aggregate_sentiment(sentiments),
-            "source": "cache",
-        }
+async def _collect(stock_name: str, max_items: int) -> tuple[list[str], str]:
+    """NAVER 우선 — 결과가 없을 때만 Google RSS 를 요청."""
+    naver = await _fetch_naver_news(stock_name, max_items)
+    if naver:
+        return naver, "naver"
+    google = await _fetch_google_news_rss(stock_name, max_items)
+    if google:
+        return google, "google_rss"
+    return [], "empty"
 
-    # 2. NAVER 우선, 실패 시 Google News RSS 폴백
-    titles = await _fetch_naver_news(stock_name, max_items)
-    source = "naver"
-    if not titles:
-        titles = await _fetch_google_news_rss(stock_name, max_items)
-        source = "google_rss"
 
-    if not titles:
-        return {"headlines": [], "sentiment": "neutral", "source": "empty"}
+def _dedupe(titles: list[str]) -> list[tuple[str, str]]:
+    seen: set[str] = set()
+    unique = []
+    for title in titles:
+        h = headline_hash(title)
+        if h not in seen:
+            seen.add(h)
+            unique.append((h, title))
+    return unique
 
-    # 3. Claude로 뉴스 감성 분석
-    sentiment = "neutral"
-    summary = ""
-    try:
-        client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
-        resp = await client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=256,
-            messages=[{"role": "user", "content": f"""다음 {stock_name}({stock_code}) 관련 뉴스 헤드라인의 종합 감성을 분석해주세요.
+
+async def _classify_batch(
+    stocks: dict[str, str], headlines: dict[str, str], stock_headlines: dict[str, list[str]]
+) -> dict[str, dict]:
+    """한 번의 Claude 호출로 여러 종목의 뉴스 감성/요약을 분류.
+
+    stocks: code -> name, headlines: hash -> title, stock_headlines: code -> [hash].
+    Returns code -> {"sentiment", "summary"}.
+    """
+    used = dict.fromkeys(h for hashes in stock_headlines.values() for h in hashes)
+    ids = {h: str(i + 1) for i, h in enumerate(used)}
+    headline_lines = "\n".join(f"[{ids[h]}] {headlines[h]}" for h in used)
+    stock_lines = "\n".join(
+        f"- {code} {stocks[code]}: {', '.join(ids[h] for h in hashes)}"
+        for code, hashes in stock_headlines.items()
+    )
+    prompt = f"""다음 종목별 뉴스 헤드라인의 종합 감성을 종목마다 분석해주세요.
 
 헤드라인:
-{chr(10).join(f'- {t}' for t in titles)}
+{headline_lines}
+
+종목별 헤드라인 번호:
+{stock_lines}
 
 JSON으로만 응답 (다른 텍스트 없이):
-{{"sentiment": "positive|negative|neutral", "summary": "한 줄 요약"}}"""}],
-        )
-        text = resp.content[0].text.strip()
-        if "```" in text:
-            text = re.sub(r'```(?:json)?\s*', '', text).strip().rstrip('`')
-        result = json.loads(text)
-        sentiment = result.get("sentiment", "neutral")
-        summary = result.get("summary", "")
-    except Exception as e:
-        logger.warning(f"News sentiment analysis failed: {e}")
+{{"종목코드": {{"sentiment": "positive|negative|neutral", "summary": "한 줄 요약"}}, ...}}"""
 
-    # 4. 캐시 저장
-    for title in titles:
+    resp = await observe_claude("news_classifier", _get_anthropic().messages.create(
+        model=NEWS_MODEL,
+        max_tokens=min(4096, 120 * len(stock_headlines) + 256),
+        messages=[{"role": "user", "content": prompt}],
+    ))
+    text = resp.content[0].text.strip()
+    if "```" in text:
+        text = re.sub(r'```(?:json)?\s*', '', text).strip().rstrip('`')
+    result = json.loads(text)
+    out = {}
+    for code in stock_headlines:
+        item = result.get(code) or {}
+        sentiment = item.get("sentiment", "neutral")
+        out[code] = {
+            "sentiment": sentiment if sentiment in ("positive", "negative", "neutral") else "neutral",
+            "summary": item.get("summary", ""),
+        }
+    return out
+
+
+def _chunks(stock_headlines: dict[str, list[str]]) -> list[dict[str, list[str]]]:
+    chunks, current, size = [], {}, 0
+    for code, hashes in stock_headlines.items():
+        if current and size + len(hashes) > MAX_HEADLINES_PER_CALL:
+            chunks.append(current)
+            current, size = {}, 0
+        current[code] = hashes
+        size += len(hashes)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def fetch_news_batch(stocks: list[tuple[str, str]], max_items: int = 5) -> dict[str, dict]:
+    """여러 종목의 뉴스 수집 + 감성 분석. stocks: [(stock_name, stock_code)].
+
+    Returns stock_code -> {"headlines", "sentiment", "summary", "source"}.
+    """
+    names = {code: name or code for name, code in stocks}
+    if not names:
+        return {}
+    results: dict[str, dict] = {}
+
+    # 1. 캐시 확인 (당일 수집분이 있으면 재수집하지 않음)
+    placeholders = ",".join("?" * len(names))
+    cached_rows = await execute_query(
+        f"""SELECT stock_code, title, summary, sentiment FROM news_cache
+            WHERE stock_code IN ({placeholders}) AND cached_at >= date('now')
+            ORDER BY id""",
+        tuple(names),
+    )
+    by_code: dict[str, list[dict]] = {}
+    for row in cached_rows or []:
+        by_code.setdefault(row["stock_code"], []).append(row)
+    for code, rows in by_code.items():
+        rows = rows[:max_items]
+        results[code] = {
+            "headlines": [r["title"] for r in rows],
+            "sentiment": _aggregate_sentiment([r["sentiment"] for r in rows if r.get("sentiment")]),
+            "summary": next((r["summary"] for r in rows if r.get("summary")), ""),
+            "source": "cache",
+        }
+
+    missing = [code for code in names if code not in results]
+    if not missing:
+        return results
+
+    # 2. 미스 종목 동시 수집
+    collected = await asyncio.gather(*(_collect(names[code], max_items) for code in missing))
+
+    # 3. 헤드라인 해시 중복 제거 (종목 내/종목 간)
+    headlines: dict[str, str] = {}
+    stock_headlines: dict[str, list[str]] = {}
+    sources: dict[str, str] = {}
+    for code, (titles, source) in zip(missing, collected):
+        sources[code] = source
+        if not titles:
+            results[code] = {"headlines": [], "sentiment": "neutral", "source": "empty"}
+            continue
+        unique = _dedupe(titles)
+        stock_headlines[code] = [h for h, _ in unique]
+        for h, title in unique:
+            headlines.setdefault(h, title)
+    if not stock_headlines:
+        return results
+    logger.info(
+        f"News batch: {len(stock_headlines)} stocks, {len(headlines)} unique headlines "
+        f"({sum(len(v) for v in stock_headlines.values())} total)"
+    )
+
+    # 4. Claude 배치 감성 분석 (청크당 1회 호출)
+    classified: dict[str, dict] = {}
+    for chunk in _chunks(stock_headlines):
         try:
-            await execute_insert(
+            classified.update(await _classify_batch(names, headlines, chunk))
+        except Exception as e:
+            logger.warning(f"News sentiment analysis failed for {len(chunk)} stocks: {e}")
+
+    # 5. 단일 트랜잭션으로 캐시 저장
+    rows = []
+    for code, hashes in stock_headlines.items():
+        info = classified.get(code)
+        titles = [headlines[h] for h in hashes]
+        if info is None:
+            # 분류 실패 — 중립으로 응답하되 캐시하지 않아 당일 다음 호출에서 다시 분류
+            results[code] = {"headlines": titles, "sentiment": "neutral", "summary": "", "source": sources[code]}
+            continue
+        rows.extend((code, headlines[h], info["summary"], info["sentiment"]) for h in hashes)
+        results[code] = {"headlines": titles, **info, "source": sources[code]}
+    try:
+        db = await get_db()
+        try:
+            await db.executemany(
                 "INSERT INTO news_cache (stock_code, title, summary, sentiment) VALUES (?, ?, ?, ?)",
-                (stock_code, title, summary, sentiment)
+                rows,
             )
-        except Exception:
-            pass
+            await db.commit()
+        finally:
+            await db.close()
+    except Exception as e:
+        logger.warning(f"News cache write failed: {e}")
 
-    return {"headlines": titles, "sentiment": sentiment, "summary": summary, "source": source}
+    return results
+
+
+async def fetch_stock_news(stock_name: str, stock_code: str, max_items: int = 5) -> dict:
+    """종목 관련 뉴스 수집 + Claude 요약. NAVER 우선, Google News RSS 폴백."""
+    results = await fetch_news_batch([(stock_name, stock_code)], max_items)
+    return results[stock_code]
 
 
 def _aggregate_sentiment(sentiments: list[str]) -> str:
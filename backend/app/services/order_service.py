@@ -43,39 +43,26 @@ async def check_buyable(stock_code: str, price: int = 0) -> dict[str, Any]:
         "cma_evlu_amt_icld_yn": "Y",
         "ovrs_icld_yn": "N",
     }
-    raw = await mcp_manager.call_tool(
+    result = await mcp_manager.call_tool_result(
         "domestic_stock",
         {"api_type": "inquire_psbl_order", "params": params},
     )
-
-    # MCP 응답: {"ok": true, "data": {MCP metadata dict with "error" key}}
-    # 실제 KIS 응답은 error가 없을 때 별도 data 필드에 있음
-    raw_parsed = json.loads(raw) if isinstance(raw, str) else raw
-    mcp_inner = raw_parsed.get("data", raw_parsed) if isinstance(raw_parsed, dict) else raw_parsed
-
-    # MCP 툴 자체 에러 확인
-    if isinstance(mcp_inner, dict) and mcp_inner.get("error"):
-        logger.warning(f"check_buyable MCP error: {str(mcp_inner['error'])[:200]}")
+    if not result.ok:
+        logger.warning(f"check_buyable MCP error: {result.error[:200]}")
         return {"nrcvb_buy_qty": "0", "max_buy_qty": "0", "ord_psbl_cash": "0"}
 
-    # 실제 KIS 응답 추출 (이중 래핑)
-    result = _unwrap_mcp_response(raw_parsed)
-    if isinstance(result, list) and result:
-        result = result[0]
-    if not isinstance(result, dict):
-        result = {}
-
+    data = result.first()
     logger.info(
         f"check_buyable({stock_code}@{price}): "
-        f"nrcvb={result.get('nrcvb_buy_qty')}, max={result.get('max_buy_qty')}, "
-        f"cash={result.get('ord_psbl_cash')}"
+        f"nrcvb={data.get('nrcvb_buy_qty')}, max={data.get('max_buy_qty')}, "
+        f"cash={data.get('ord_psbl_cash')}"
     )
-    return result
+    return data
 
 
 async def check_sellable(stock_code: str) -> dict[str, Any]:
     """Check how many shares can be sold (매도 가능 조회)."""
-    raw = await mcp_manager.call_tool(
+    result = await mcp_manager.call_tool_result(
         "domestic_stock",
         {
             "api_type": "inquire_psbl_sell",
@@ -87,7 +74,7 @@ async def check_sellable(stock_code: str) -> dict[str, Any]:
             },
         },
     )
-    return _parse_dict(raw)
+    return result.first() if result.ok else {"raw": result.error[:500]}
 
 
 async def place_order(
@@ -133,50 +120,21 @@ async def place_order(
     )
 
     try:
-        raw = await mcp_manager.call_tool(
+        mcp_result = await mcp_manager.call_tool_result(
             "domestic_stock",
             {"api_type": "order_cash", "params": params},
         )
 
-        # Parse MCP double-wrapped response
-        raw_parsed = json.loads(raw) if isinstance(raw, str) else raw
-        mcp_data = raw_parsed.get("data", raw_parsed) if isinstance(raw_parsed, dict) else {}
-        mcp_error = mcp_data.get("error", "") if isinstance(mcp_data, dict) else ""
-        mcp_success = mcp_data.get("success", False) if isinstance(mcp_data, dict) else False
-
-        # Check for MCP-level error (e.g. unexpected keyword argument)
-        if mcp_error:
-            raise RuntimeError(str(mcp_error)[:500])
-
-        # Parse inner KIS data
-        inner_data_str = mcp_data.get("data", "") if isinstance(mcp_data, dict) else ""
-        kis_data = {}
-        if isinstance(inner_data_str, str) and inner_data_str.strip():
-            # Check for error patterns in plain-text responses from KIS
-            if "rt_cd : 1" in inner_data_str or "Error in response" in inner_data_str:
-                mcp_success = False
-                kis_data = {"raw_error": inner_data_str[:500]}
-            else:
-                try:
-                    kis_data = json.loads(inner_data_str)
-                except json.JSONDecodeError:
-                    kis_data = {"raw_error": inner_data_str[:500]}
-                    mcp_success = False
-        elif isinstance(inner_data_str, (dict, list)):
-            kis_data = inner_data_str
+        # MCP-level error (e.g. unexpected keyword argument) — KIS 거절은 아래에서 처리
+        if not mcp_result.ok and not mcp_result.rejected:
+            raise RuntimeError(mcp_result.error[:500])
 
         # Determine success: MCP success + KIS order number present
-        order_no = ""
-        if isinstance(kis_data, list) and kis_data:
-            order_no = kis_data[0].get("ODNO", "")
-        elif isinstance(kis_data, dict):
-            order_no = kis_data.get("ODNO", kis_data.get("output", {}).get("ODNO", ""))
-            # Also check rt_cd for KIS-level rejection
-            rt_cd = kis_data.get("rt_cd", "")
-            if rt_cd and rt_cd != "0":
-                mcp_success = False
+        kis_data = mcp_result.first()
+        order_no = kis_data.get("ODNO", "")
+        mcp_success = mcp_result.ok
 
-        result = {"mcp_success": mcp_success, "order_no": order_no, "kis_data": kis_data, "raw": mcp_data}
+        result = {"mcp_success": mcp_success, "order_no": order_no, "kis_data": kis_data, "kis": mcp_result.status}
 
         if mcp_success and order_no:
             # Update order status to filled
@@ -208,11 +166,7 @@ async def place_order(
             }
         else:
             # Order rejected by KIS
-            msg = ""
-            if isinstance(kis_data, dict):
-                msg = kis_data.get("msg1", kis_data.get("msg", ""))
-            if not msg:
-                msg = str(mcp_error) if mcp_error else "Unknown error"
+            msg = mcp_result.msg1 or mcp_result.error or "Unknown error"
             await execute_query(
                 "UPDATE orders SET status='rejected', reason=?, mcp_result_json=? WHERE id=?",
                 (msg, json.dumps(result, ensure_ascii=False)[:2000], order_id),
@@ -238,31 +192,3 @@ async def place_order(
             "status": "rejected",
             "error": str(e),
         }
-
-
-def _unwrap_mcp_response(raw: Any) -> Any:
-    """Unwrap the MCP double-wrapped response structure."""
-    try:
-        data = json.loads(raw) if isinstance(raw, str) else raw
-        if isinstance(data, dict) and "data" in data:
-            inner = data["data"]
-            if isinstance(inner, dict) and "data" in inner:
-                inner_data = inner["data"]
-                if isinstance(inner_data, str):
-                    return json.loads(inner_data)
-                return inner_data
-            if isinstance(inner, str):
-                return json.loads(inner)
-            return inner
-        return data
-    except (json.JSONDecodeError, TypeError):
-        return raw
-
-
-def _parse_dict(raw: Any) -> dict[str, Any]:
-    """Parse MCP response into a dict."""
-    try:
-        data = _unwrap_mcp_response(raw)
-        return data if isinstance(data, dict) else {"raw": str(raw)[:500]}
-    except (json.JSONDecodeError, TypeError):
-        return {"raw": str(raw)[:500]}
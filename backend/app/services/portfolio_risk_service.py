@@ -1,62 +1,17 @@
 """포트폴리오 리스크 분석 서비스"""
+import asyncio
 import logging
+from datetime import datetime, timedelta, timezone
+
+
 from app.models.db import execute_query
-from app.services.market_service import get_daily_chart, parse_ohlcv_from_chart
+from app.services.market_service import get_daily_chart
+from app.services.mcp_client import mcp_manager
+from app.services.risk_engine import MARKET_PROXY, compute_risk_metrics
 
 logger = logging.getLogger(__name__)
 
-
-def _compute_returns(closes: list[float]) -> list[float]:
-    return [(closes[i] - closes[i - 1]) / closes[i - 1] for i in range(1, len(closes)) if closes[i - 1] > 0]
-
-
-def calculate_beta(stock_returns: list[float], market_returns: list[float]) -> float:
-    """종목 베타 = Cov(stock, market) / Var(market)"""
-    n = min(len(stock_returns), len(market_returns))
-    if n < 10:
-        return 1.0
-    sr = stock_returns[:n]
-    mr = market_returns[:n]
-    mean_s = sum(sr) / n
-    mean_m = sum(mr) / n
-    cov = sum((sr[i] - mean_s) * (mr[i] - mean_m) for i in range(n)) / n
-    var_m = sum((mr[i] - mean_m) ** 2 for i in range(n)) / n
-    if var_m == 0:
-        return 1.0
-    return round(cov / var_m, 3)
-
-
-def compute_correlation_matrix(returns_map: dict[str, list[float]]) -> dict:
-    """종목 간 수익률 상관관계 매트릭스"""
-    codes = list(returns_map.keys())
-    if len(codes) < 2:
-        return {"codes": codes, "matrix": []}
-
-    n = min(len(r) for r in returns_map.values())
-    if n < 10:
-        return {"codes": codes, "matrix": []}
-
-    matrix = []
-    for i, code_i in enumerate(codes):
-        row = []
-        ri = returns_map[code_i][:n]
-        mean_i = sum(ri) / n
-        std_i = (sum((x - mean_i) ** 2 for x in ri) / n) ** 0.5
-        for j, code_j in enumerate(codes):
-            if i == j:
-                row.append(1.0)
-            else:
-                rj = returns_map[code_j][:n]
-                mean_j = sum(rj) / n
-                std_j = (sum((x - mean_j) ** 2 for x in rj) / n) ** 0.5
-                if std_i == 0 or std_j == 0:
-                    row.append(0.0)
-                else:
-                    cov = sum((ri[k] - mean_i) * (rj[k] - mean_j) for k in range(n)) / n
-                    row.append(round(cov / (std_i * std_j), 3))
-        matrix.append(row)
-
-    return {"codes": codes, "matrix": matrix}
+KST = timezone(timedelta(hours=9))
 
 
 def calculate_historical_var(returns: list[float], confidence: float = 0.95) -> float:
@@ -67,20 +22,77 @@ def calculate_historical_var(returns: list[float], confidence: float = 0.95) ->
     return abs(sorted_returns[max(idx, 0)])
 
 
+def _dated_closes(chart: list[dict]) -> dict[str, float]:
+    """KIS 일봉 응답 → {영업일자: 종가}"""
+    closes = {}
+    for day in chart:
+        date = day.get("stck_bsop_date")
+        try:
+            close = float(day.get("stck_clpr") or 0)
+        except (TypeError, ValueError):
+            continue
+        if date and close > 0:
+            closes[date] = close
+    return closes
+
+
+# 일봉은 하루 단위로만 바뀌므로 (종목, 거래일) 단위로 캐시 — 포지션 변경 시 신규 종목만 조회.
+# 보유 종목 + 시장 대용 지수만 남기고 매 계산마다 정리한다.
+_closes_cache: dict[str, tuple[str, dict[str, float]]] = {}
+
+
+def bars_date() -> str:
+    """Cache key for daily bars (KST calendar date)."""
+    return datetime.now(KST).strftime("%Y%m%d")
+
+
+async def get_cached_daily_closes(stock_code: str) -> dict[str, float]:
+    today = bars_date()
+    cached = _closes_cache.get(stock_code)
+    if cached and cached[0] == today:
+        return cached[1]
+    try:
+        closes = _dated_closes(await get_daily_chart(stock_code))
+    except Exception as e:
+        logger.warning(f"Chart fetch failed for {stock_code}: {e}")
+        return cached[1] if cached else {}
+    if closes:
+        _closes_cache[stock_code] = (today, closes)
+    return closes
+
+
+async def get_daily_closes_for(stock_codes: list[str]) -> dict[str, dict[str, float]]:
+    """Cached closes for many codes — cache misses fetched concurrently up to the MCP pool size."""
+    limit = asyncio.Semaphore(mcp_manager.pool_size)
+
+    async def fetch(code: str) -> tuple[str, dict[str, float]]:
+        async with limit:
+            return code, await get_cached_daily_closes(code)
+
+    return dict(await asyncio.gather(*(fetch(code) for code in dict.fromkeys(stock_codes))))
+
+
+def prune_closes_cache(keep: set[str]) -> None:
+    for code in list(_closes_cache):
+        if code not in keep:
+            del _closes_cache[code]
+
+
+async def _get_sectors(stock_codes: list[str]) -> dict[str, str]:
+    if not stock_codes:
+        return {}
+    placeholders = ",".join("?" * len(stock_codes))
+    rows = await execute_query(
+        f"SELECT stock_code, sector FROM kospi200_components WHERE stock_code IN ({placeholders})",
+        tuple(stock_codes),
+    )
+    return {r["stock_code"]: r["sector"] for r in rows or [] if r.get("sector")}
+
+
 async def compute_portfolio_risk(positions: list[dict]) -> dict:
     if not positions:
         return {"var_95": 0, "var_99": 0, "portfolio_beta": 1.0, "sector_breakdown": {}, "total_value": 0}
 
-    stock_returns_map = {}
-    for pos in positions:
-        try:
-            chart = await get_daily_chart(pos["stock_code"])
-            ohlcv = parse_ohlcv_from_chart(chart)
-            if ohlcv and ohlcv.get("closes") and len(ohlcv["closes"]) > 10:
-                stock_returns_map[pos["stock_code"]] = _compute_returns(ohlcv["closes"])
-        except Exception as e:
-            logger.warning(f"Chart fetch failed for {pos['stock_code']}: {e}")
-
     total_value = sum(
         pos.get("market_value", 0) or (pos.get("current_price", 0) * pos.get("quantity", 0))
         for pos in positions
@@ -88,67 +100,42 @@ async def compute_portfolio_risk(positions: list[dict]) -> dict:
     if total_value == 0:
         return {"var_95": 0, "var_99": 0, "portfolio_beta": 1.0, "sector_breakdown": {}, "total_value": 0}
 
-    # Weighted portfolio daily returns
-    min_len = min((len(r) for r in stock_returns_map.values()), default=0)
-    if min_len < 10:
-        var_95 = 0
-        var_99 = 0
-    else:
-        portfolio_returns = []
-        for i in range(min_len):
-            daily = 0
-            for pos in positions:
-                code = pos["stock_code"]
-                if code in stock_returns_map and i < len(stock_returns_map[code]):
-                    weight = (pos.get("market_value", 0) or 0) / total_value
-                    daily += stock_returns_map[code][i] * weight
-            portfolio_returns.append(daily)
-
-        var_95 = calculate_historical_var(portfolio_returns, 0.95)
-        var_99 = calculate_historical_var(portfolio_returns, 0.99)
-
-    # Fetch market proxy (KODEX200 ETF) for beta calculation
-    market_returns = []
-    try:
-        market_chart = await get_daily_chart("069500")
-        market_ohlcv = parse_ohlcv_from_chart(market_chart)
-        if market_ohlcv and market_ohlcv.get("closes") and len(market_ohlcv["closes"]) > 10:
-            market_returns = _compute_returns(market_ohlcv["closes"])
-    except Exception:
-        pass
-
-    # Portfolio beta (value-weighted)
-    if market_returns:
-        weighted_beta = 0.0
-        for pos in positions:
-            code = pos["stock_code"]
-            if code in stock_returns_map:
-                beta = calculate_beta(stock_returns_map[code], market_returns)
-                weight = (pos.get("market_value", 0) or 0) / total_value if total_value > 0 else 0
-                weighted_beta += beta * weight
-        portfolio_beta = round(weighted_beta, 3)
-    else:
-        portfolio_beta = 1.0
-
-    # Correlation matrix
-    correlation = compute_correlation_matrix(stock_returns_map)
+    codes = [pos["stock_code"] for pos in positions] + [MARKET_PROXY]
+    fetched = await get_daily_closes_for(codes)
+    prune_closes_cache(set(codes))
+    closes_by_code = {code: closes for code, closes in fetched.items() if len(closes) > 10}
+
+    weights = {
+        pos["stock_code"]: (pos.get("market_value", 0) or 0) / total_value
+        for pos in positions
+    }
+    metrics = compute_risk_metrics(closes_by_code, weights)
 
     # Sector breakdown
+    sectors = await _get_sectors([pos["stock_code"] for pos in positions])
     sector_breakdown = {}
     for pos in positions:
-        row = await execute_query(
-            "SELECT sector FROM kospi200_components WHERE stock_code = ?",
-            (pos["stock_code"],)
-        )
-        sector = row[0]["sector"] if row and row[0].get("sector") else "기타"
+        sector = sectors.get(pos["stock_code"], "기타")
         weight = (pos.get("market_value", 0) or 0) / total_value * 100
         sector_breakdown[sector] = round(sector_breakdown.get(sector, 0) + weight, 1)
 
+    def pct(section: str, level: str, key: str) -> float:
+        return round(metrics[section].get(level, {}).get(key, 0.0) * 100, 2)
+
     return {
-        "var_95": round(var_95 * 100, 2),
-        "var_99": round(var_99 * 100, 2),
-        "portfolio_beta": portfolio_beta,
+        "var_95": pct("historical", "95", "var"),
+        "var_99": pct("historical", "99", "var"),
+        "cvar_95": pct("historical", "95", "cvar"),
+        "cvar_99": pct("historical", "99", "cvar"),
+        "parametric_var_95": pct("parametric", "95", "var"),
+        "parametric_var_99": pct("parametric", "99", "var"),
+        "monte_carlo_var_95": pct("monte_carlo", "95", "var"),
+        "monte_carlo_var_99": pct("monte_carlo", "99", "var"),
+        "monte_carlo_cvar_99": pct("monte_carlo", "99", "cvar"),
+        "portfolio_beta": metrics["portfolio_beta"],
+        "betas": metrics["betas"],
+        "observations": metrics["observations"],
         "sector_breakdown": sector_breakdown,
         "total_value": round(total_value),
-        "correlation": correlation,
+        "correlation": metrics["correlation"],
     }
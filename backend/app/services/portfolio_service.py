@@ -1,8 +1,10 @@
 """Portfolio service — wraps MCP balance queries and DB access."""
 
+import json
 import logging
 
-from app.models.db import execute_query
+from app.models.db import execute_query, get_db
+from app.services import downsample
 
 logger = logging.getLogger(__name__)
 
@@ -26,15 +28,299 @@ async def get_portfolio_history(hours: int = 24) -> list[dict]:
     )
 
 
-async def get_latest_positions() -> list[dict]:
-    """Get positions from the latest snapshot."""
-    snapshot = await get_latest_portfolio()
-    if not snapshot:
-        return []
+_ROLLUP_TABLES = {"hour": "portfolio_rollup_hourly", "day": "portfolio_rollup_daily"}
+_BUCKET_FORMATS = {"hour": "%Y-%m-%d %H:00:00", "day": "%Y-%m-%d"}
+
+
+async def get_value_rollups(
+    hours: int | None = None,
+    bucket: str = "hour",
+    start: str | None = None,
+    end: str | None = None,
+) -> list[dict]:
+    """Portfolio value OHLC buckets, oldest first.
+
+    Either the last ``hours`` (relative to now, UTC) or an explicit
+    [start, end] date range (YYYY-MM-DD, inclusive). No limit = full history.
+    """
+    table = _ROLLUP_TABLES[bucket]
+    clauses, params = [], []
+    if hours is not None:
+        clauses.append("bucket >= strftime(?, 'now', ?)")
+        params += [_BUCKET_FORMATS[bucket], f"-{hours} hours"]
+    if start:
+        clauses.append("bucket >= date(?)")
+        params.append(start)
+    if end:
+        clauses.append("bucket < date(?, '+1 day')")
+        params.append(end)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
     return await execute_query(
-        "SELECT * FROM positions WHERE snapshot_id = ?",
-        (snapshot["id"],),
+        f"""SELECT bucket, first_ts, last_ts, open_value, high_value, low_value, close_value,
+                  close_cash, close_pnl, close_pnl_pct, snapshot_count, max_dd_pct
+           FROM {table} {where}
+           ORDER BY bucket ASC""",
+        tuple(params),
+    )
+
+
+def max_drawdown_pct(rows: list[dict]) -> float:
+    """Exact max drawdown (%) over consecutive rollup buckets or raw snapshots.
+
+    Within a bucket the drawdown is precomputed (max_dd_pct); across buckets the
+    worst case is the running peak of earlier buckets against this bucket's low.
+    Raw snapshot rows (total_value only) are treated as one-point buckets.
+    """
+    peak = 0.0
+    max_dd = 0.0
+    for row in rows:
+        value = row.get("close_value", row.get("total_value")) or 0
+        high = row.get("high_value", value) or 0
+        low = row.get("low_value", value) or 0
+        if low <= 0:
+            continue
+        if peak > 0 and low < peak:
+            max_dd = max(max_dd, (peak - low) / peak * 100)
+        max_dd = max(max_dd, row.get("max_dd_pct") or 0)
+        peak = max(peak, high)
+    return max_dd
+
+
+def chart_point(row: dict) -> dict:
+    """Chart row from a rollup bucket (or a raw snapshot)."""
+    value = row.get("close_value", row.get("total_value"))
+    return {
+        "timestamp": row.get("bucket", row.get("timestamp")),
+        "total_value": value,
+        "cash_balance": row.get("close_cash", row.get("cash_balance")),
+        "total_pnl": row.get("close_pnl", row.get("total_pnl")),
+        "total_pnl_pct": row.get("close_pnl_pct", row.get("total_pnl_pct")),
+        "open": row.get("open_value", value),
+        "high": row.get("high_value", value),
+        "low": row.get("low_value", value),
+    }
+
+
+async def get_downsampled_history(hours: int | None, points: int, mode: str = "minmax") -> dict:
+    """Portfolio value series reduced to about ``points`` chart rows.
+
+    가장 거친 소스부터(일별 → 시간별 롤업) points 이상 행이 있으면 그것을 쓰고,
+    그보다 짧은 구간은 원본 스냅샷을 줄인다.
+    """
+    rows, source = None, "raw"
+    for bucket in ("day", "hour"):
+        candidate = await get_value_rollups(hours, bucket=bucket)
+        if len(candidate or []) >= points:
+            rows, source = candidate, bucket
+            break
+    if rows is None:
+        if hours is None:
+            rows = await execute_query(
+                """SELECT id, timestamp, total_value, cash_balance, total_pnl, total_pnl_pct
+                   FROM portfolio_snapshots WHERE total_value > 0 ORDER BY timestamp ASC"""
+            )
+        else:
+            rows = [r for r in await get_portfolio_history(hours) or [] if r["total_value"] > 0]
+        rows = rows or []
+
+    sampled = downsample.downsample(rows, points, mode)
+    return {
+        "points": [chart_point(r) for r in sampled],
+        "max_drawdown": max_drawdown_pct(rows),
+        "downsampled": {
+            "source": source,
+            "mode": mode,
+            "points": points,
+            "source_rows": len(rows),
+            "returned": len(sampled),
+        },
+    }
+
+
+async def get_order_count(status: str | None = None) -> int:
+    """Order count from the daily rollup, optionally filtered by status."""
+    if status and status != "all":
+        row = await execute_query(
+            "SELECT COALESCE(SUM(order_count), 0) AS cnt FROM order_rollup_daily WHERE status = ?",
+            (status,),
+            fetch_one=True,
+        )
+    else:
+        row = await execute_query(
+            "SELECT COALESCE(SUM(order_count), 0) AS cnt FROM order_rollup_daily",
+            fetch_one=True,
+        )
+    return row["cnt"] if row else 0
+
+
+_POSITION_FIELDS = (
+    "stock_code", "stock_name", "quantity", "avg_buy_price", "current_price",
+    "market_value", "unrealized_pnl", "unrealized_pnl_pct",
+)
+
+# current_positions 테이블의 프로세스 내 사본 — save_snapshot 이 갱신
+_current_positions: list[dict] | None = None
+
+
+def _position_row(pos: dict) -> tuple:
+    return (
+        pos.get("stock_code", ""),
+        pos.get("stock_name", ""),
+        pos.get("quantity", 0),
+        pos.get("avg_buy_price", 0),
+        pos.get("current_price", 0),
+        pos.get("market_value", 0),
+        pos.get("unrealized_pnl", 0),
+        pos.get("unrealized_pnl_pct", 0),
+    )
+
+
+async def save_snapshot(
+    total_value: float,
+    cash_balance: float,
+    total_pnl: float,
+    total_pnl_pct: float,
+    positions: list[dict],
+    compact: bool = True,
+) -> int:
+    """Write a portfolio snapshot and its positions in one transaction.
+
+    compact: 수량/평단이 바뀐 종목만 position_lots 에 쓰고, 가격은 바뀐 경우에만
+    position_prices 에 기록한다. False 면 기존 방식(positions_json + positions 행).
+    """
+    global _current_positions
+    positions = [p for p in positions if p.get("stock_code")]
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """INSERT INTO portfolio_snapshots
+               (total_value, cash_balance, total_pnl, total_pnl_pct, positions_json)
+               VALUES (?, ?, ?, ?, ?)""",
+            (
+                total_value,
+                cash_balance,
+                total_pnl,
+                total_pnl_pct,
+                "[]" if compact else json.dumps(positions, ensure_ascii=False),
+            ),
+        )
+        snapshot_id = cursor.lastrowid
+
+        if compact:
+            cursor = await db.execute(
+                "SELECT id, stock_code, quantity, avg_buy_price FROM position_lots WHERE closed_snapshot_id IS NULL"
+            )
+            open_lots = {row["stock_code"]: row for row in await cursor.fetchall()}
+            last_prices = {}
+            if positions:
+                # SQLite: MAX() 집계와 함께 고른 bare column 은 최댓값 행의 값 — 종목별 최신 가격
+                placeholders = ",".join("?" * len(positions))
+                cursor = await db.execute(
+                    f"""SELECT stock_code, current_price, MAX(snapshot_id) FROM position_prices
+                        WHERE stock_code IN ({placeholders}) GROUP BY stock_code""",
+                    tuple(p["stock_code"] for p in positions),
+                )
+                last_prices = {row["stock_code"]: row["current_price"] for row in await cursor.fetchall()}
+
+            held = {p["stock_code"] for p in positions}
+            close_ids = [(snapshot_id, lot["id"]) for code, lot in open_lots.items() if code not in held]
+            new_lots = []
+            for pos in positions:
+                lot = open_lots.get(pos["stock_code"])
+                if lot is not None and (
+                    lot["quantity"] == pos.get("quantity", 0)
+                    and lot["avg_buy_price"] == pos.get("avg_buy_price", 0)
+                ):
+                    continue
+                if lot is not None:
+                    close_ids.append((snapshot_id, lot["id"]))
+                new_lots.append((
+                    pos["stock_code"], pos.get("stock_name", ""), pos.get("quantity", 0),
+                    pos.get("avg_buy_price", 0), snapshot_id,
+                ))
+            prices = [
+                (pos["stock_code"], snapshot_id, pos.get("current_price", 0))
+                for pos in positions
+                if last_prices.get(pos["stock_code"]) != pos.get("current_price", 0)
+            ]
+
+            await db.executemany("UPDATE position_lots SET closed_snapshot_id = ? WHERE id = ?", close_ids)
+            await db.executemany(
+                """INSERT INTO position_lots
+                   (stock_code, stock_name, quantity, avg_buy_price, opened_snapshot_id)
+                   VALUES (?, ?, ?, ?, ?)""",
+                new_lots,
+            )
+            await db.executemany(
+                "INSERT OR REPLACE INTO position_prices (stock_code, snapshot_id, current_price) VALUES (?, ?, ?)",
+                prices,
+            )
+        else:
+            await db.executemany(
+                """INSERT INTO positions
+                   (snapshot_id, stock_code, stock_name, quantity, avg_buy_price,
+                    current_price, market_value, unrealized_pnl, unrealized_pnl_pct)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                [(snapshot_id, *_position_row(p)) for p in positions],
+            )
+
+        await db.execute("DELETE FROM current_positions")
+        await db.executemany(
+            """INSERT INTO current_positions
+               (snapshot_id, stock_code, stock_name, quantity, avg_buy_price,
+                current_price, market_value, unrealized_pnl, unrealized_pnl_pct)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [(snapshot_id, *_position_row(p)) for p in positions],
+        )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+    _current_positions = [
+        {"snapshot_id": snapshot_id, **dict(zip(_POSITION_FIELDS, _position_row(p)))} for p in positions
+    ]
+    return snapshot_id
+
+
+async def get_latest_positions() -> list[dict]:
+    """Get positions from the latest snapshot (cached current_positions)."""
+    global _current_positions
+    if _current_positions is None:
+        _current_positions = await execute_query("SELECT * FROM current_positions ORDER BY stock_code") or []
+    # 호출 측에서 dict 를 수정하므로 사본을 반환
+    return [dict(p) for p in _current_positions]
+
+
+async def get_positions_at(snapshot_id: int) -> list[dict]:
+    """Positions as of a past snapshot — legacy rows if present, else lots + last price."""
+    rows = await execute_query("SELECT * FROM positions WHERE snapshot_id = ?", (snapshot_id,))
+    if rows:
+        return rows
+    rows = await execute_query(
+        """SELECT l.stock_code, l.stock_name, l.quantity, l.avg_buy_price,
+                  (SELECT p.current_price FROM position_prices p
+                   WHERE p.stock_code = l.stock_code AND p.snapshot_id <= ?
+                   ORDER BY p.snapshot_id DESC LIMIT 1) AS current_price
+           FROM position_lots l
+           WHERE l.opened_snapshot_id <= ?
+             AND (l.closed_snapshot_id IS NULL OR l.closed_snapshot_id > ?)
+           ORDER BY l.stock_code""",
+        (snapshot_id, snapshot_id, snapshot_id),
     )
+    for row in rows or []:
+        price = row["current_price"] or 0
+        cost = row["avg_buy_price"] * row["quantity"]
+        row["current_price"] = price
+        row["market_value"] = price * row["quantity"]
+        row["unrealized_pnl"] = row["market_value"] - cost
+        row["unrealized_pnl_pct"] = (
+            round((price - row["avg_buy_price"]) / row["avg_buy_price"] * 100, 2) if row["avg_buy_price"] else 0.0
+        )
+        row["snapshot_id"] = snapshot_id
+    return rows or []
 
 
 async def get_orders(limit: int = 50, offset: int = 0, status: str | None = None) -> dict:
@@ -130,16 +416,14 @@ async def remove_from_watchlist(stock_code: str) -> bool:
 
 
 async def get_risk_config() -> dict:
-    """Get all risk configuration values."""
-    rows = await execute_query("SELECT key, value FROM risk_config")
-    return {row["key"]: row["value"] for row in rows} if rows else {}
+    """Get all risk configuration values (typed, from the in-memory cache)."""
+    from app.services.risk_config_service import risk_config_service
+
+    return (await risk_config_service.get()).to_dict()
 
 
 async def update_risk_config(key: str, value: str) -> None:
-    """Update a risk configuration value."""
-    await execute_query(
-        """INSERT INTO risk_config (key, value, updated_at)
-           VALUES (?, ?, datetime('now'))
-           ON CONFLICT(key) DO UPDATE SET value=?, updated_at=datetime('now')""",
-        (key, value, value),
-    )
+    """Update a risk configuration value and notify risk.config_updated subscribers."""
+    from app.services.risk_config_service import risk_config_service
+
+    await risk_config_service.update({key: value})
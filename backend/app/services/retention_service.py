@@ -0,0 +1,360 @@
+"""Retention, archival and compaction for append-only tables.
+
+테이블별 정책(보존 기간, 최대 행 수, 스냅샷 다운샘플)에 따라 오래된 행을
+작은 배치로 월별 JSONL.gz 파일에 보관(archive)한 뒤 삭제한다. 스케줄러가 장외
+시간에 짧은 시간 예산으로 반복 호출하므로 한 번에 끝내지 않고 다음 실행에서
+이어서 처리한다. 마지막에 incremental VACUUM 과 WAL checkpoint 를 수행한다.
+"""
+import asyncio
+import bisect
+import gzip
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+
+from app.models import db as db_module
+from app.models.db import get_db
+
+logger = logging.getLogger(__name__)
+
+# 타임스탬프 컬럼 저장 형식 — cutoff 문자열을 같은 형식으로 만들어 인덱스 비교
+TS_FORMATS = {
+    "sql": lambda dt: dt.strftime("%Y-%m-%d %H:%M:%S"),
+    "iso": lambda dt: dt.isoformat(),
+    "date": lambda dt: dt.strftime("%Y-%m-%d"),
+}
+
+
+@dataclass
+class RetentionPolicy:
+    table: str
+    ts_column: str
+    ts_format: str = "sql"
+    max_age_days: int | None = None
+    max_rows: int | None = None
+    # 스냅샷: 이 기간이 지난 행은 시간당 마지막 1건만 남김
+    downsample_after_days: int | None = None
+    archive: bool = True
+    # 부모 행 삭제 전에 지울 자식 테이블 (table, fk column)
+    children: tuple[tuple[str, str], ...] = ()
+    # compact 포지션 이력(position_lots / position_prices)을 남은 스냅샷으로 이월
+    position_history: bool = False
+
+
+DEFAULT_POLICIES = [
+    RetentionPolicy("agent_events", "timestamp", "iso", max_age_days=30, max_rows=200_000),
+    RetentionPolicy(
+        "agent_logs", "timestamp", max_age_days=90, max_rows=200_000,
+        children=(("agent_run_traces", "log_id"),),
+    ),
+    RetentionPolicy(
+        "portfolio_snapshots", "timestamp", max_age_days=730, downsample_after_days=14,
+        children=(("positions", "snapshot_id"),), position_history=True,
+    ),
+    RetentionPolicy("news_cache", "cached_at", max_age_days=30, archive=False),
+    RetentionPolicy("signal_snapshots", "snapshot_date", "date", max_age_days=365),
+    # 30일간 사용하지 않은 채팅 세션 (메시지 포함)
+    RetentionPolicy(
+        "chat_sessions", "updated_at", max_age_days=30, archive=False,
+        children=(("chat_messages", "session_id"),),
+    ),
+]
+
+
+class RetentionService:
+    """Incremental, batch-wise retention runner."""
+
+    def __init__(
+        self,
+        policies: list[RetentionPolicy] | None = None,
+        archive_dir: Path | None = None,
+        batch_size: int = 500,
+        vacuum_pages: int = 2000,
+    ):
+        self.policies = policies if policies is not None else list(DEFAULT_POLICIES)
+        self._archive_dir = archive_dir
+        self.batch_size = batch_size
+        self.vacuum_pages = vacuum_pages
+        self._lock = asyncio.Lock()
+        self.last_run: dict[str, Any] | None = None
+
+    @property
+    def archive_dir(self) -> Path:
+        return self._archive_dir or db_module.DB_PATH.parent / "archive"
+
+    async def run(self, time_budget_sec: float = 20.0, now: datetime | None = None) -> dict[str, Any]:
+        """Process policies until done or the time budget runs out."""
+        if self._lock.locked():
+            return {"skipped": "already running"}
+        async with self._lock:
+            started = time.monotonic()
+            deadline = started + time_budget_sec
+            now = now or datetime.now(timezone.utc)
+            report: dict[str, Any] = {"tables": {}, "complete": True}
+
+            db = await get_db()
+            try:
+                for policy in self.policies:
+                    stats = await self._apply(db, policy, now, deadline)
+                    report["tables"][policy.table] = stats
+                    if stats.get("pending"):
+                        report["complete"] = False
+                report["maintenance"] = await self._maintenance(db)
+            finally:
+                await db.close()
+
+            report["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+            report["finished_at"] = datetime.now(timezone.utc).isoformat()
+            self.last_run = report
+            deleted = sum(t.get("deleted", 0) for t in report["tables"].values())
+            logger.info(f"Retention run: {deleted} rows removed in {report['duration_ms']}ms "
+                        f"(complete={report['complete']})")
+            return report
+
+    async def _apply(
+        self, db: aiosqlite.Connection, policy: RetentionPolicy, now: datetime, deadline: float
+    ) -> dict[str, Any]:
+        stats = {"deleted": 0, "archived": 0, "pending": False}
+        fmt = TS_FORMATS[policy.ts_format]
+        steps = []
+        if policy.max_age_days is not None:
+            cutoff = fmt(now - timedelta(days=policy.max_age_days))
+            steps.append(self._limit_step(
+                db, f"SELECT * FROM {policy.table} WHERE {policy.ts_column} < ? ORDER BY id LIMIT ?", (cutoff,),
+            ))
+        if policy.downsample_after_days is not None:
+            cutoff = fmt(now - timedelta(days=policy.downsample_after_days))
+            steps.append(self._downsample_step(db, policy, cutoff))
+        if policy.max_rows is not None:
+            cursor = await db.execute(
+                f"SELECT id FROM {policy.table} ORDER BY id DESC LIMIT 1 OFFSET ?", (policy.max_rows,)
+            )
+            row = await cursor.fetchone()
+            if row is not None:
+                steps.append(self._limit_step(
+                    db, f"SELECT * FROM {policy.table} WHERE id <= ? ORDER BY id LIMIT ?", (row[0],),
+                ))
+
+        for next_batch in steps:
+            while True:
+                if time.monotonic() >= deadline:
+                    stats["pending"] = True
+                    return stats
+                rows = await next_batch()
+                if not rows:
+                    break
+                if policy.archive:
+                    await asyncio.to_thread(self._archive, policy, rows)
+                    stats["archived"] += len(rows)
+                await self._delete(db, policy, [r["id"] for r in rows])
+                stats["deleted"] += len(rows)
+                if len(rows) < self.batch_size:
+                    break
+                await asyncio.sleep(0)  # 배치 사이에 다른 작업에 양보
+        return stats
+
+    def _limit_step(self, db: aiosqlite.Connection, sql: str, params: tuple):
+        """Batches from re-running an indexed ``... ORDER BY id LIMIT ?`` query."""
+        async def next_batch() -> list[dict]:
+            cursor = await db.execute(sql, (*params, self.batch_size))
+            return [dict(r) for r in await cursor.fetchall()]
+        return next_batch
+
+    def _downsample_step(self, db: aiosqlite.Connection, policy: RetentionPolicy, cutoff: str):
+        """Batches of rows that are not the last of their hour.
+
+        The window over all rows before ``cutoff`` runs once per pass (when the
+        step starts, after the age step has deleted its rows); batches then
+        walk the resulting id list instead of re-running the window.
+        """
+        drop: list[int] | None = None
+
+        async def next_batch() -> list[dict]:
+            nonlocal drop
+            if drop is None:
+                cursor = await db.execute(
+                    f"""SELECT id FROM (
+                            SELECT id, ROW_NUMBER() OVER (
+                                PARTITION BY substr({policy.ts_column}, 1, 13) ORDER BY id DESC) AS rn
+                            FROM {policy.table} WHERE {policy.ts_column} < ?)
+                        WHERE rn > 1 ORDER BY id""",
+                    (cutoff,),
+                )
+                drop = [r[0] for r in await cursor.fetchall()]
+            batch, drop = drop[: self.batch_size], drop[self.batch_size:]
+            if not batch:
+                return []
+            cursor = await db.execute(
+                f"SELECT * FROM {policy.table} WHERE id IN ({','.join('?' * len(batch))}) ORDER BY id", batch
+            )
+            return [dict(r) for r in await cursor.fetchall()]
+        return next_batch
+
+    async def _delete(self, db: aiosqlite.Connection, policy: RetentionPolicy, ids: list[int]) -> None:
+        placeholders = ",".join("?" * len(ids))
+        for child, fk in policy.children:
+            await db.execute(f"DELETE FROM {child} WHERE {fk} IN ({placeholders})", ids)
+        await db.execute(f"DELETE FROM {policy.table} WHERE id IN ({placeholders})", ids)
+        if policy.position_history:
+            await self._carry_forward_positions(db, policy.table, sorted(ids))
+        await db.commit()
+
+    async def _carry_forward_positions(self, db: aiosqlite.Connection, table: str, ids: list[int]) -> None:
+        """Re-point compact position history off deleted snapshots.
+
+        position_lots / position_prices 는 스냅샷 id 구간으로 유효 범위를 표현한다
+        (lot: opened ≤ id < closed, price: 종목별 다음 가격 행 전까지). 삭제된 id 를
+        다음으로 남은 스냅샷 id 로 옮기면 남은 모든 스냅샷의 조회 결과가 그대로 유지되고,
+        어떤 스냅샷에서도 보이지 않게 된 행(청산된 lot, 덮인 가격)은 지운다. 이후에 남은
+        스냅샷이 없는 id 의 행은 다음 저장 시 비교용이므로 그대로 둔다.
+        """
+        lo, hi = ids[0], ids[-1]
+        cursor = await db.execute(f"SELECT id FROM {table} WHERE id > ? AND id < ? ORDER BY id", (lo, hi))
+        survivors = [r[0] for r in await cursor.fetchall()]
+        cursor = await db.execute(f"SELECT MIN(id) FROM {table} WHERE id > ?", (hi,))
+        (after,) = await cursor.fetchone()
+        if after is not None:
+            survivors.append(after)
+
+        def next_survivor(snapshot_id: int) -> int | None:
+            i = bisect.bisect_right(survivors, snapshot_id)
+            return survivors[i] if i < len(survivors) else None
+
+        targets = {sid: t for sid in ids if (t := next_survivor(sid)) is not None}
+        if not targets:
+            return
+        placeholders = ",".join("?" * len(targets))
+        moved = list(targets)
+
+        # 가격: 최신 행부터 옮겨, 대상 스냅샷에 이미 있는(더 최신) 가격은 유지
+        cursor = await db.execute(
+            f"SELECT stock_code, snapshot_id FROM position_prices WHERE snapshot_id IN ({placeholders})"
+            " ORDER BY snapshot_id DESC",
+            moved,
+        )
+        prices = await cursor.fetchall()
+        await db.executemany(
+            "UPDATE OR IGNORE position_prices SET snapshot_id = ? WHERE stock_code = ? AND snapshot_id = ?",
+            [(targets[sid], code, sid) for code, sid in prices],
+        )
+        await db.execute(f"DELETE FROM position_prices WHERE snapshot_id IN ({placeholders})", moved)
+
+        # lot: 열림/청산 시점을 옮기고, 남은 스냅샷 어디에도 걸치지 않는 청산 lot 삭제
+        cursor = await db.execute(
+            f"""SELECT id, opened_snapshot_id, closed_snapshot_id FROM position_lots
+                WHERE opened_snapshot_id IN ({placeholders}) OR closed_snapshot_id IN ({placeholders})""",
+            moved + moved,
+        )
+        lots = [(targets.get(opened, opened), targets.get(closed, closed), lot_id)
+                for lot_id, opened, closed in await cursor.fetchall()]
+        await db.executemany(
+            "UPDATE position_lots SET opened_snapshot_id = ?, closed_snapshot_id = ? WHERE id = ?", lots
+        )
+        await db.executemany(
+            "DELETE FROM position_lots WHERE id = ? AND closed_snapshot_id <= opened_snapshot_id",
+            [(lot_id,) for _, _, lot_id in lots],
+        )
+        # lot 이 하나도 남지 않은 종목의 가격은 더 이상 조회되지 않는다
+        await db.executemany(
+            """DELETE FROM position_prices WHERE stock_code = ?
+               AND NOT EXISTS (SELECT 1 FROM position_lots WHERE stock_code = ?)""",
+            [(code, code) for code in {code for code, _ in prices}],
+        )
+
+    def _archive(self, policy: RetentionPolicy, rows: list[dict]) -> None:
+        """Append rows to <archive>/<table>/<YYYY-MM>.jsonl.gz (one gzip member per batch)."""
+        by_month: dict[str, list[dict]] = {}
+        for row in rows:
+            month = str(row.get(policy.ts_column) or "unknown")[:7]
+            by_month.setdefault(month, []).append(row)
+        folder = self.archive_dir / policy.table
+        folder.mkdir(parents=True, exist_ok=True)
+        for month, items in by_month.items():
+            with gzip.open(folder / f"{month}.jsonl.gz", "at", encoding="utf-8") as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+
+    async def _maintenance(self, db: aiosqlite.Connection) -> dict[str, Any]:
+        # incremental 모드 전환(전체 VACUUM)은 init_database 가 시작 시 한 번 수행
+        cursor = await db.execute("PRAGMA auto_vacuum")
+        (mode,) = await cursor.fetchone()
+        result: dict[str, Any] = {"auto_vacuum": mode}
+        cursor = await db.execute("PRAGMA freelist_count")
+        (free_before,) = await cursor.fetchone()
+        await db.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})")
+        cursor = await db.execute("PRAGMA freelist_count")
+        (free_after,) = await cursor.fetchone()
+        cursor = await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        busy, log_frames, checkpointed = await cursor.fetchone()
+        result.update({
+            "pages_reclaimed": free_before - free_after,
+            "freelist_pages": free_after,
+            "wal_checkpoint": {"busy": busy, "log_frames": log_frames, "checkpointed": checkpointed},
+        })
+        return result
+
+    async def table_stats(self) -> dict[str, Any]:
+        """Row counts, on-disk bytes and oldest row per table, plus file sizes."""
+        db = await get_db()
+        try:
+            cursor = await db.execute("PRAGMA page_size")
+            (page_size,) = await cursor.fetchone()
+            cursor = await db.execute("PRAGMA page_count")
+            (page_count,) = await cursor.fetchone()
+            cursor = await db.execute("PRAGMA freelist_count")
+            (freelist,) = await cursor.fetchone()
+
+            sizes: dict[str, int] = {}
+            try:
+                cursor = await db.execute(
+                    "SELECT name, SUM(pgsize) FROM dbstat WHERE aggregate = 0 GROUP BY name"
+                )
+                sizes = {name: size for name, size in await cursor.fetchall()}
+            except Exception:
+                pass  # dbstat 미지원 빌드 — 행 수만 제공
+
+            cursor = await db.execute(
+                "SELECT name, tbl_name, type FROM sqlite_master WHERE type IN ('table', 'index')"
+                " AND name NOT LIKE 'sqlite_%'"
+            )
+            objects = await cursor.fetchall()
+            policies = {p.table: p for p in self.policies}
+            tables: dict[str, dict[str, Any]] = {}
+            for name, tbl_name, kind in objects:
+                if kind == "table":
+                    cursor = await db.execute(f"SELECT COUNT(*) FROM {name}")
+                    (rows,) = await cursor.fetchone()
+                    entry = tables.setdefault(name, {"rows": 0, "table_bytes": 0, "index_bytes": 0})
+                    entry["rows"] = rows
+                    entry["table_bytes"] = sizes.get(name, 0)
+                    policy = policies.get(name)
+                    if policy is not None:
+                        cursor = await db.execute(f"SELECT MIN({policy.ts_column}) FROM {name}")
+                        (entry["oldest"],) = await cursor.fetchone()
+                else:
+                    entry = tables.setdefault(tbl_name, {"rows": 0, "table_bytes": 0, "index_bytes": 0})
+                    entry["index_bytes"] += sizes.get(name, 0)
+        finally:
+            await db.close()
+
+        db_path = db_module.DB_PATH
+        wal = db_path.with_name(db_path.name + "-wal")
+        archive_bytes = sum(f.stat().st_size for f in self.archive_dir.rglob("*.jsonl.gz")) if self.archive_dir.exists() else 0
+        return {
+            "database_bytes": page_size * page_count,
+            "freelist_bytes": page_size * freelist,
+            "wal_bytes": wal.stat().st_size if wal.exists() else 0,
+            "archive_bytes": archive_bytes,
+            "tables": dict(sorted(tables.items(), key=lambda kv: -(kv[1]["table_bytes"] + kv[1]["index_bytes"]))),
+            "last_run": self.last_run,
+        }
+
+
+# Singleton
+retention_service = RetentionService()
@@ -0,0 +1,98 @@
+"""In-memory typed risk_config with change notifications.
+
+risk_config는 시작 시 한 번 읽어 RiskConfig로 파싱해 두고, 값이 바뀌면
+risk.config_updated 이벤트로 다시 읽는다. 핫 패스(이벤트 핸들러 등)는
+`risk_config_service.current`를 동기로 읽는다.
+"""
+import logging
+from typing import Any
+
+from app.agents.event_bus import AgentEvent, event_bus
+from app.models.db import get_db, load_risk_config
+from app.models.risk_config import RiskConfig
+
+logger = logging.getLogger(__name__)
+
+CONFIG_UPDATED_EVENT = "risk.config_updated"
+
+
+class RiskConfigService:
+    """Typed risk_config snapshot, reloaded only when a writer publishes risk.config_updated."""
+
+    def __init__(self) -> None:
+        self._config = RiskConfig()
+        self._loaded = False
+        self.loads = 0
+
+    @property
+    def current(self) -> RiskConfig:
+        """Latest loaded config (defaults before the first load) — no I/O."""
+        return self._config
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def get(self) -> RiskConfig:
+        """Current config, loading from the DB only on first use or after invalidation."""
+        if not self._loaded:
+            await self.reload()
+        return self._config
+
+    async def reload(self) -> RiskConfig:
+        try:
+            raw = await load_risk_config()
+        except Exception as e:
+            logger.error(f"Failed to load risk config, keeping previous values: {e}")
+            return self._config
+        self._config = RiskConfig.from_mapping(raw)
+        self._loaded = True
+        self.loads += 1
+        return self._config
+
+    def invalidate(self) -> None:
+        self._loaded = False
+
+    async def update(self, patch: dict[str, Any], source: str = "user", only_missing: bool = False) -> RiskConfig:
+        """Write key/values in one transaction, then notify subscribers (which reload the cache).
+
+        only_missing=True keeps existing values (e.g. auto-set initial_capital).
+        """
+        if not patch:
+            return await self.get()
+        conflict = "DO NOTHING" if only_missing else "DO UPDATE SET value=excluded.value, updated_at=datetime('now')"
+        db = await get_db()
+        try:
+            await db.executemany(
+                f"""INSERT INTO risk_config (key, value, updated_at) VALUES (?, ?, datetime('now'))
+                    ON CONFLICT(key) {conflict}""",
+                [(key, _stored(value)) for key, value in patch.items()],
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+        self.invalidate()
+        await event_bus.publish(AgentEvent(
+            event_type=CONFIG_UPDATED_EVENT,
+            agent_id=source,
+            data={"keys": sorted(patch)},
+        ))
+        return await self.get()
+
+    async def on_config_updated(self, event: AgentEvent) -> None:
+        """EventBus handler — reload once per change."""
+        if not self._loaded:
+            await self.reload()
+            logger.info(f"Risk config reloaded ({', '.join(event.data.get('keys', []))})")
+
+
+def _stored(value: Any) -> str:
+    """Store values the way the table always has (bools as 'true'/'false')."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+# Singleton
+risk_config_service = RiskConfigService()
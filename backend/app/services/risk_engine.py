@@ -0,0 +1,221 @@
+"""Vectorized portfolio risk engine (NumPy).
+
+일자 기준으로 정렬된 수익률 행렬(T×N)을 한 번 만들고, 그 위에서 공분산·상관계수·
+베타·VaR/CVaR(역사적/모수적/몬테카를로)를 행렬 연산으로 계산한다.
+종목마다 상장일·거래정지 등으로 데이터 길이가 다르므로, 공분산은 두 종목이 모두
+관측된 날짜만 사용하는 pairwise-complete 방식으로 계산한다.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Any
+
+import numpy as np
+
+MARKET_PROXY = "069500"  # KODEX 200
+
+
+@dataclass
+class ReturnsMatrix:
+    """Date-aligned daily returns; NaN where a symbol has no return that day."""
+
+    codes: list[str]
+    dates: list[str]
+    values: np.ndarray  # shape (T, N)
+
+    def column(self, code: str) -> np.ndarray:
+        return self.values[:, self.codes.index(code)]
+
+
+def build_returns_matrix(closes_by_code: dict[str, dict[str, float]]) -> ReturnsMatrix:
+    """Align close series by date and compute simple daily returns.
+
+    closes_by_code: {code: {"YYYYMMDD": close}}. 각 종목의 수익률은 해당 종목의
+    직전 관측일 대비로 계산하고, 합집합 날짜 축에 맞춰 배치한다.
+    """
+    codes = [c for c, s in closes_by_code.items() if len(s) >= 2]
+    dates = sorted({d for c in codes for d in closes_by_code[c]})
+    index = {d: i for i, d in enumerate(dates)}
+
+    closes = np.full((len(dates), len(codes)), np.nan)
+    for j, code in enumerate(codes):
+        series = closes_by_code[code]
+        rows = np.fromiter((index[d] for d in series), dtype=np.int64, count=len(series))
+        closes[rows, j] = np.fromiter(series.values(), dtype=np.float64, count=len(series))
+
+    returns = np.full_like(closes, np.nan)
+    for j in range(len(codes)):
+        # 종목별 관측 행만 골라 연속 관측 간 수익률 계산 (결측일을 건너뜀)
+        rows = np.flatnonzero(~np.isnan(closes[:, j]) & (closes[:, j] > 0))
+        if len(rows) >= 2:
+            col = closes[rows, j]
+            returns[rows[1:], j] = col[1:] / col[:-1] - 1.0
+
+    keep = ~np.all(np.isnan(returns), axis=1) if len(codes) else np.zeros(len(dates), dtype=bool)
+    return ReturnsMatrix(codes, [d for d, k in zip(dates, keep) if k], returns[keep])
+
+
+def _pairwise_moments(values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pairwise-complete (counts, cov, var) — var[i, j] 는 j 가 관측된 날 기준 i 의 분산."""
+    mask = (~np.isnan(values)).astype(np.float64)
+    x = np.where(mask > 0, values, 0.0)
+
+    n = mask.T @ mask  # 쌍별 공통 관측 수
+    sx = x.T @ mask  # sx[i, j] = j 가 관측된 날의 i 합
+    sxx = (x * x).T @ mask
+    sxy = x.T @ x
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_i = sx / n
+        cov = sxy / n - mean_i * mean_i.T
+        var = sxx / n - mean_i ** 2
+    return n, cov, var
+
+
+def pairwise_covariance(values: np.ndarray, min_periods: int = 10) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pairwise-complete covariance and correlation.
+
+    Returns (cov, corr, counts). 관측 수가 min_periods 미만인 쌍은 NaN.
+    """
+    n, cov, var = _pairwise_moments(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = cov / np.sqrt(var * var.T)
+
+    invalid = n < min_periods
+    cov[invalid] = np.nan
+    corr[invalid] = np.nan
+    np.fill_diagonal(corr, np.where(np.diag(n) >= min_periods, 1.0, np.nan))
+    return cov, np.clip(corr, -1.0, 1.0), n
+
+
+def historical_var_cvar(returns: np.ndarray, confidence: float) -> tuple[float, float]:
+    """Historical VaR / CVaR as positive loss fractions.
+
+    VaR 분위수 위치는 기존 calculate_historical_var 와 동일 (int(n·(1-c))).
+    """
+    r = np.sort(returns[~np.isnan(returns)])
+    if len(r) < 10:
+        return 0.0, 0.0
+    idx = max(int(len(r) * (1 - confidence)), 0)
+    var = -r[idx]
+    cvar = -r[: idx + 1].mean()
+    return float(max(var, 0.0)), float(max(cvar, 0.0))
+
+
+def parametric_var_cvar(mu: float, sigma: float, confidence: float) -> tuple[float, float]:
+    """Gaussian (variance-covariance) VaR / CVaR."""
+    if sigma <= 0 or np.isnan(sigma):
+        return 0.0, 0.0
+    nd = NormalDist()
+    z = nd.inv_cdf(confidence)
+    var = z * sigma - mu
+    cvar = sigma * nd.pdf(z) / (1 - confidence) - mu
+    return float(max(var, 0.0)), float(max(cvar, 0.0))
+
+
+def _nearest_psd(cov: np.ndarray) -> np.ndarray:
+    """Clip negative eigenvalues — pairwise covariance need not be PSD."""
+    sym = (cov + cov.T) / 2
+    vals, vecs = np.linalg.eigh(sym)
+    return (vecs * np.clip(vals, 0.0, None)) @ vecs.T
+
+
+def monte_carlo_var_cvar(
+    mu: np.ndarray,
+    cov: np.ndarray,
+    weights: np.ndarray,
+    confidences: tuple[float, ...],
+    n_sims: int = 10000,
+    seed: int | None = 42,
+) -> dict[float, tuple[float, float]]:
+    """Simulate multivariate-normal daily returns and read off VaR / CVaR."""
+    rng = np.random.default_rng(seed)
+    psd = _nearest_psd(cov)
+    vals, vecs = np.linalg.eigh(psd)
+    factor = vecs * np.sqrt(np.clip(vals, 0.0, None))
+    shocks = rng.standard_normal((n_sims, len(mu)))
+    portfolio = (shocks @ factor.T + mu) @ weights
+    return {c: historical_var_cvar(portfolio, c) for c in confidences}
+
+
+def compute_risk_metrics(
+    closes_by_code: dict[str, dict[str, float]],
+    weights: dict[str, float],
+    market_code: str = MARKET_PROXY,
+    confidences: tuple[float, ...] = (0.95, 0.99),
+    mc_sims: int = 10000,
+    seed: int | None = 42,
+    min_periods: int = 10,
+) -> dict[str, Any]:
+    """All portfolio risk metrics from dated close series and value weights.
+
+    closes_by_code 에 market_code 시계열이 있으면 베타를 계산한다. weights 는 보유
+    종목 평가금액 비중(합 1). 결과 수익률/VaR 값은 소수(0.023 = 2.3%)이다.
+    """
+    matrix = build_returns_matrix(closes_by_code)
+    holdings = [c for c in matrix.codes if c in weights and c != market_code]
+    result: dict[str, Any] = {
+        "codes": holdings,
+        "observations": 0,
+        "betas": {},
+        "portfolio_beta": 1.0,
+        "correlation": {"codes": holdings, "matrix": []},
+        "historical": {},
+        "parametric": {},
+        "monte_carlo": {},
+    }
+    if not holdings:
+        return result
+
+    cols = [matrix.codes.index(c) for c in holdings]
+    has_market = market_code in matrix.codes
+    if has_market:
+        cols.append(matrix.codes.index(market_code))
+    values = matrix.values[:, cols]
+    cov, corr, counts = pairwise_covariance(values, min_periods)
+    k = len(holdings)
+
+    w = np.array([weights[c] for c in holdings], dtype=np.float64)
+    total_w = w.sum()
+    if total_w > 0:
+        w = w / total_w * min(total_w, 1.0)
+
+    # 베타 = Cov(stock, market) / Var(market) — 같은 관측일 기준
+    if has_market:
+        _, _, var = _pairwise_moments(values)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var_m = var[k, :k]  # 종목별 공통 관측일 기준 시장 분산
+            betas = cov[:k, k] / var_m
+        betas = np.where((counts[:k, k] >= min_periods) & (var_m > 0), betas, 1.0)
+        result["betas"] = {c: round(float(b), 3) for c, b in zip(holdings, betas)}
+        result["portfolio_beta"] = round(float(betas @ w), 3)
+
+    if k >= 2:
+        sub = corr[:k, :k]
+        result["correlation"]["matrix"] = np.round(np.nan_to_num(sub, nan=0.0), 3).tolist()
+
+    # 역사적 VaR — 모든 보유 종목이 관측된 날만 사용 (날짜 정렬, 길이 절단 아님)
+    held = values[:, :k]
+    complete = ~np.any(np.isnan(held), axis=1)
+    portfolio_returns = held[complete] @ w
+    result["observations"] = int(complete.sum())
+
+    mu = np.nanmean(held, axis=0) if len(held) else np.zeros(k)
+    mu = np.nan_to_num(mu)
+    cov_h = np.nan_to_num(cov[:k, :k])
+    mu_p = float(mu @ w)
+    sigma_p = float(np.sqrt(max(w @ cov_h @ w, 0.0)))
+
+    mc = monte_carlo_var_cvar(mu, cov_h, w, confidences, mc_sims, seed) if sigma_p > 0 else {}
+    for c in confidences:
+        key = str(int(round(c * 100)))
+        var, cvar = historical_var_cvar(portfolio_returns, c)
+        result["historical"][key] = {"var": var, "cvar": cvar}
+        var, cvar = parametric_var_cvar(mu_p, sigma_p, c)
+        result["parametric"][key] = {"var": var, "cvar": cvar}
+        var, cvar = mc.get(c, (0.0, 0.0))
+        result["monte_carlo"][key] = {"var": var, "cvar": cvar}
+
+    result["portfolio_volatility"] = sigma_p
+    return result
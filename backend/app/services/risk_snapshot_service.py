@@ -0,0 +1,146 @@
+"""Cached portfolio risk snapshots backed by portfolio_risk_snapshots.
+
+리스크 분석은 보유 종목(수량)이나 일봉이 바뀔 때만 다시 계산한다. 지문
+(fingerprint)은 보유 종목·수량과 일봉 기준일로 만들고, 결과는 테이블에 저장해
+재시작 후에도 그대로 제공한다. portfolio.updated 이벤트가 오면 지문이 달라진
+경우에만 백그라운드로 재계산한다.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any
+
+from app.agents.event_bus import AgentEvent
+from app.models.db import execute_insert, execute_query
+from app.services import portfolio_service
+from app.services.portfolio_risk_service import bars_date, compute_portfolio_risk
+
+logger = logging.getLogger(__name__)
+
+
+def risk_fingerprint(positions: list[dict]) -> str:
+    """Hash of held quantities + daily-bar date; market value drift is ignored."""
+    holdings = sorted(
+        (p.get("stock_code", ""), int(p.get("quantity", 0) or 0))
+        for p in positions
+        if p.get("stock_code")
+    )
+    raw = json.dumps({"holdings": holdings, "bars": bars_date()})
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+class RiskSnapshotService:
+    """Serve risk analysis from the latest matching snapshot, recomputing on change."""
+
+    def __init__(self) -> None:
+        self._latest: dict[str, Any] | None = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    async def _load_latest(self) -> dict[str, Any] | None:
+        row = await execute_query(
+            """SELECT id, snapshot_date, fingerprint, result_json FROM portfolio_risk_snapshots
+               WHERE result_json IS NOT NULL ORDER BY id DESC LIMIT 1""",
+            fetch_one=True,
+        )
+        if not row:
+            return None
+        computed_at = datetime.strptime(row["snapshot_date"], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        return {
+            "id": row["id"],
+            "fingerprint": row["fingerprint"],
+            "computed_at": computed_at,
+            "result": json.loads(row["result_json"]),
+        }
+
+    async def get(self, max_age: float | None = None) -> dict[str, Any]:
+        """Return risk analysis, recomputing only if stale.
+
+        max_age: 초 단위 최대 허용 나이. None 이면 지문이 같은 한 계속 재사용하고,
+        0 이면 항상 재계산한다.
+        """
+        positions = await portfolio_service.get_latest_positions()
+        fingerprint = risk_fingerprint(positions)
+
+        if self._latest is None:
+            self._latest = await self._load_latest()
+        if self._is_fresh(self._latest, fingerprint, max_age):
+            return self._response(self._latest, cached=True)
+
+        async with self._lock:
+            # 대기하는 동안 다른 요청/백그라운드 작업이 갱신했을 수 있음
+            if self._is_fresh(self._latest, fingerprint, max_age):
+                return self._response(self._latest, cached=True)
+            snapshot = await self._compute(positions, fingerprint)
+        return self._response(snapshot, cached=False)
+
+    @staticmethod
+    def _is_fresh(snapshot: dict | None, fingerprint: str, max_age: float | None) -> bool:
+        if snapshot is None or snapshot["fingerprint"] != fingerprint:
+            return False
+        if max_age is None:
+            return True
+        age = (datetime.now(timezone.utc) - snapshot["computed_at"]).total_seconds()
+        return age < max_age
+
+    async def _compute(self, positions: list[dict], fingerprint: str) -> dict[str, Any]:
+        result = await compute_portfolio_risk(positions)
+        snapshot_id = await execute_insert(
+            """INSERT INTO portfolio_risk_snapshots
+               (var_95, var_99, portfolio_beta, sector_breakdown_json, correlation_matrix_json,
+                fingerprint, result_json)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (
+                result.get("var_95"),
+                result.get("var_99"),
+                result.get("portfolio_beta"),
+                json.dumps(result.get("sector_breakdown", {}), ensure_ascii=False),
+                json.dumps(result.get("correlation", {})),
+                fingerprint,
+                json.dumps(result, ensure_ascii=False),
+            ),
+        )
+        self._latest = {
+            "id": snapshot_id,
+            "fingerprint": fingerprint,
+            "computed_at": datetime.now(timezone.utc).replace(microsecond=0),
+            "result": result,
+        }
+        logger.info(f"Risk snapshot {snapshot_id} computed (fingerprint {fingerprint})")
+        return self._latest
+
+    @staticmethod
+    def _response(snapshot: dict[str, Any], cached: bool) -> dict[str, Any]:
+        age = (datetime.now(timezone.utc) - snapshot["computed_at"]).total_seconds()
+        return {
+            **snapshot["result"],
+            "snapshot": {
+                "id": snapshot["id"],
+                "computed_at": snapshot["computed_at"].isoformat(),
+                "age_sec": round(max(age, 0.0), 1),
+                "fingerprint": snapshot["fingerprint"],
+                "cached": cached,
+            },
+        }
+
+    async def on_portfolio_updated(self, event: AgentEvent) -> None:
+        """EventBus handler — schedule a background refresh when holdings changed."""
+        positions = event.data.get("positions", []) or []
+        fingerprint = risk_fingerprint(positions)
+        if self._latest is not None and self._latest["fingerprint"] == fingerprint:
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            await self.get()
+        except Exception as e:
+            logger.warning(f"Background risk refresh failed: {e}")
+
+
+# Singleton
+risk_snapshot_service = RiskSnapshotService()
@@ -3,10 +3,12 @@
 import logging
 from datetime import time, timezone, timedelta, datetime
 
+from apscheduler.events import EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from app.models.db import execute_query
+from app.services.metrics import SCHEDULER_LAG_SECONDS, SCHEDULER_MISSED
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +16,7 @@ logger = logging.getLogger(__name__)
 KST = timezone(timedelta(hours=9))
 KRX_OPEN = time(9, 0)
 KRX_CLOSE = time(15, 30)
+RETENTION_TIME_BUDGET_SEC = 20.0
 
 
 class TradingScheduler:
@@ -34,6 +37,8 @@ class TradingScheduler:
             return
 
         await self._load_tasks_from_db()
+        self._add_maintenance_jobs()
+        self._scheduler.add_listener(self._on_job_event, EVENT_JOB_SUBMITTED | EVENT_JOB_MISSED)
         self._scheduler.start()
         self._started = True
 
@@ -43,6 +48,16 @@ class TradingScheduler:
 
         logger.info("Trading scheduler started")
 
+    @staticmethod
+    def _on_job_event(event) -> None:
+        """Record job lag (scheduled → submitted) and missed runs."""
+        if event.code == EVENT_JOB_MISSED:
+            SCHEDULER_MISSED.inc(job=event.job_id)
+            return
+        now = datetime.now(KST)
+        for scheduled in event.scheduled_run_times:
+            SCHEDULER_LAG_SECONDS.observe(max(0.0, (now - scheduled).total_seconds()), job=event.job_id)
+
     async def stop(self) -> None:
         """Shut down the scheduler."""
         if self._started:
@@ -150,6 +165,26 @@ class TradingScheduler:
             (status, task_name),
         )
 
+    def _add_maintenance_jobs(self) -> None:
+        """Register DB retention — short incremental runs outside market hours."""
+        self._scheduler.add_job(
+            self._run_retention,
+            trigger=CronTrigger(minute="*/15", hour="20-23,0-7", timezone="Asia/Seoul"),
+            id="maintenance_retention",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=300,
+        )
+
+    async def _run_retention(self) -> None:
+        from app.services.retention_service import retention_service
+
+        try:
+            await retention_service.run(time_budget_sec=RETENTION_TIME_BUDGET_SEC)
+        except Exception as e:
+            logger.error(f"Retention run failed: {e}")
+
     async def reload_tasks(self) -> None:
         """Reload tasks from database (after config change)."""
         # Remove all existing jobs
@@ -0,0 +1,225 @@
+"""Realtime execution tick feed — KIS 웹소켓 체결(H0STCNT0)을 받아 장중 집계기에 공급.
+
+백엔드는 시세를 MCP(REST)로만 받으므로, 실시간 체결이 필요한 소비자(intraday_bars 의
+분봉, universe_snapshot 의 stage-1 시세)를 위해 웹소켓 세션 하나를 직접 연다.
+구독 종목은 보유 종목 + 최근 stage-1 후보이며, 세션당 구독 한도(40) 안에서 보유
+종목을 우선한다. 모의투자 앱키로 접속키를 발급받으며 settings.tick_feed_enabled 일
+때만 시작한다 (KIS_URL_*_PAPER 를 로컬 시뮬레이터로 돌리면 오프라인에서도 동작).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+from typing import Any, Awaitable, Callable, Iterable, Protocol
+
+import httpx
+import websockets
+
+from app.config import settings
+from app.services.intraday_bars import intraday_bars
+from app.services.universe_snapshot import universe_snapshot
+
+logger = logging.getLogger(__name__)
+
+CCNL_TR_ID = "H0STCNT0"
+MAX_SUBSCRIPTIONS = 40  # KIS 세션당 실시간 등록 한도
+# 국내주식 실시간체결가 (KRX) 응답 필드 순서
+CCNL_COLUMNS = [
+    "MKSC_SHRN_ISCD", "STCK_CNTG_HOUR", "STCK_PRPR", "PRDY_VRSS_SIGN",
+    "PRDY_VRSS", "PRDY_CTRT", "WGHN_AVRG_STCK_PRC", "STCK_OPRC",
+    "STCK_HGPR", "STCK_LWPR", "ASKP1", "BIDP1", "CNTG_VOL", "ACML_VOL",
+    "ACML_TR_PBMN", "SELN_CNTG_CSNU", "SHNU_CNTG_CSNU", "NTBY_CNTG_CSNU",
+    "CTTR", "SELN_CNTG_SMTN", "SHNU_CNTG_SMTN", "CCLD_DVSN", "SHNU_RATE",
+    "PRDY_VOL_VRSS_ACML_VOL_RATE", "OPRC_HOUR", "OPRC_VRSS_PRPR_SIGN",
+    "OPRC_VRSS_PRPR", "HGPR_HOUR", "HGPR_VRSS_PRPR_SIGN", "HGPR_VRSS_PRPR",
+    "LWPR_HOUR", "LWPR_VRSS_PRPR_SIGN", "LWPR_VRSS_PRPR", "BSOP_DATE",
+    "NEW_MKOP_CLS_CODE", "TRHT_YN", "ASKP_RSQN1", "BIDP_RSQN1",
+    "TOTAL_ASKP_RSQN", "TOTAL_BIDP_RSQN", "VOL_TNRT",
+    "PRDY_SMNS_HOUR_ACML_VOL", "PRDY_SMNS_HOUR_ACML_VOL_RATE",
+    "HOUR_CLS_CODE", "MRKT_TRTM_CLS_CODE", "VI_STND_PRC",
+]
+
+
+class TickConsumer(Protocol):
+    def ingest(self, tr_id: str, rows: Iterable[dict[str, Any]]) -> int: ...
+
+
+def parse_frame(raw: str) -> tuple[str, list[dict[str, str]]] | None:
+    """``0|H0STCNT0|003|a^b^...`` → (tr_id, rows). 한 프레임에 여러 건이 이어 붙어 올 수 있다."""
+    parts = raw.split("|", 3)
+    if len(parts) < 4 or parts[0] != "0" or parts[1] != CCNL_TR_ID:
+        return None  # 암호화("1") 프레임은 체결통보용 — 체결가 피드에는 오지 않는다
+    values = parts[3].split("^")
+    width = len(CCNL_COLUMNS)
+    count = min(int(parts[2] or 0), len(values) // width)
+    return parts[1], [dict(zip(CCNL_COLUMNS, values[i * width:(i + 1) * width])) for i in range(count)]
+
+
+def _backoff(attempt: int, cap: float = 60.0) -> float:
+    return min(cap, 2 ** max(attempt - 1, 0)) * (0.5 + random.random() / 2)
+
+
+class _ApprovalRejected(ConnectionError):
+    """서버가 접속키를 거부 (만료/무효) — 재발급 후 재접속"""
+
+
+class TickFeed:
+    """One KIS realtime session for held + candidate codes, fanned out to tick consumers."""
+
+    def __init__(self, consumers: list[TickConsumer] | None = None):
+        self.consumers: list[TickConsumer] = consumers if consumers is not None else [intraday_bars, universe_snapshot]
+        # 종목별 최신 체결 row 를 받는 async listener (예: ws_manager.on_tick → quotes:<code>)
+        self.quote_listeners: list[Callable[[str, dict[str, Any]], Awaitable[None]]] = []
+        self._held: list[str] = []
+        self._candidates: list[str] = []
+        self._subscribed: set[str] = set()
+        self._ws: Any = None
+        self._task: asyncio.Task | None = None
+        self._approval_key: str | None = None
+        self._send_lock = asyncio.Lock()
+        self._attempt = 0
+        self.stats_counters = {"frames": 0, "rows": 0, "reconnects": 0, "rejected": 0}
+
+    # ── watchlist ──
+
+    @property
+    def watchlist(self) -> list[str]:
+        """보유 종목 우선, 이어서 후보 — 중복 제거 후 구독 한도까지."""
+        return list(dict.fromkeys(self._held + self._candidates))[:MAX_SUBSCRIPTIONS]
+
+    async def set_held(self, codes: Iterable[str]) -> None:
+        self._held = [c for c in codes if c]
+        await self._sync()
+
+    async def set_candidates(self, codes: Iterable[str]) -> None:
+        self._candidates = [c for c in codes if c]
+        await self._sync()
+
+    async def on_portfolio_updated(self, event: Any) -> None:
+        await self.set_held(p.get("stock_code", "") for p in event.data.get("positions", []))
+
+    async def _sync(self) -> None:
+        """Diff the watchlist against live registrations (미접속이면 접속 시 일괄 등록)."""
+        ws = self._ws
+        if ws is None:
+            return
+        wanted = set(self.watchlist)
+        for code in sorted(self._subscribed - wanted):
+            await self._send(ws, "2", code)
+            self._subscribed.discard(code)
+        for code in [c for c in self.watchlist if c not in self._subscribed]:
+            await self._send(ws, "1", code)
+            self._subscribed.add(code)
+
+    async def _send(self, ws: Any, tr_type: str, code: str) -> None:
+        msg = {
+            "header": {"approval_key": self._approval_key, "custtype": "P", "tr_type": tr_type,
+                       "content-type": "utf-8"},
+            "body": {"input": {"tr_id": CCNL_TR_ID, "tr_key": code}},
+        }
+        async with self._send_lock:
+            await ws.send(json.dumps(msg))
+
+    # ── lifecycle ──
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name="tick-feed")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+
+    async def _issue_approval_key(self) -> str:
+        async with httpx.AsyncClient(timeout=10) as client:
+            resp = await client.post(
+                f"{settings.kis_url_rest_paper}/oauth2/Approval",
+                json={"grant_type": "client_credentials", "appkey": settings.kis_paper_app_key,
+                      "secretkey": settings.kis_paper_app_secret},
+            )
+            resp.raise_for_status()
+            return resp.json()["approval_key"]
+
+    async def _run(self) -> None:
+        url = f"{settings.kis_url_ws_paper}/tryitout/{CCNL_TR_ID}"
+        while True:
+            try:
+                if self._approval_key is None:
+                    self._approval_key = await self._issue_approval_key()
+                async with websockets.connect(url) as ws:
+                    self._ws, self._subscribed = ws, set()
+                    await self._sync()
+                    logger.info(f"Tick feed connected ({len(self._subscribed)} codes)")
+                    self._attempt = 0
+                    async for raw in ws:
+                        await self._handle(ws, raw)
+                raise ConnectionError("connection closed by server")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if isinstance(e, (_ApprovalRejected, websockets.InvalidStatus)):
+                    self._approval_key = None  # 거부된 키로 재시도하지 않는다
+                self._attempt += 1
+                self.stats_counters["reconnects"] += 1
+                logger.warning(f"Tick feed disconnected ({e}); retry #{self._attempt}")
+                await asyncio.sleep(_backoff(self._attempt))
+            finally:
+                self._ws = None
+                self._subscribed = set()
+
+    async def _handle(self, ws: Any, raw: str) -> None:
+        if raw[:1] in ("0", "1"):
+            parsed = parse_frame(raw)
+            if parsed is None:
+                return
+            tr_id, rows = parsed
+            self.stats_counters["frames"] += 1
+            self.stats_counters["rows"] += len(rows)
+            for consumer in self.consumers:
+                try:
+                    consumer.ingest(tr_id, rows)
+                except Exception as e:
+                    logger.warning(f"Tick consumer {type(consumer).__name__} failed: {e}")
+            if self.quote_listeners and tr_id == CCNL_TR_ID:
+                await self._notify_quotes(rows)
+            return
+
+        msg = json.loads(raw)
+        header, body = msg.get("header", {}), msg.get("body") or {}
+        if header.get("tr_id") == "PINGPONG":
+            await ws.send(raw)  # KIS 는 받은 PINGPONG 을 그대로 되돌려 보내야 세션을 유지한다
+        elif body.get("rt_cd", "0") != "0":
+            msg1 = body.get("msg1", "")
+            if "approval" in msg1.lower():
+                raise _ApprovalRejected(msg1)
+            self.stats_counters["rejected"] += 1
+            self._subscribed.discard(header.get("tr_key", ""))
+            logger.warning(f"Tick feed subscribe rejected for {header.get('tr_key')}: {msg1}")
+
+    async def _notify_quotes(self, rows: list[dict[str, str]]) -> None:
+        latest = {row["MKSC_SHRN_ISCD"]: row for row in rows if row.get("MKSC_SHRN_ISCD")}
+        for code, row in latest.items():
+            for listener in self.quote_listeners:
+                try:
+                    await listener(code, row)
+                except Exception as e:
+                    logger.warning(f"Tick quote listener failed for {code}: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        return {"running": self.running, "connected": self._ws is not None,
+                "watchlist": len(self.watchlist), "subscribed": len(self._subscribed), **self.stats_counters}
+
+
+# Singleton
+tick_feed = TickFeed()
@@ -0,0 +1,184 @@
+"""Lightweight per-run tracing spans (contextvars).
+
+BaseAgent.run이 트레이스(루트 스팬)를 열고, MCP/DART/Claude/DB 헬퍼가 현재 스팬 아래에
+자식 스팬을 단다. asyncio 태스크는 생성 시점의 컨텍스트를 복사하므로 gather로 병렬 실행한
+호출도 올바른 부모 아래에 붙는다. 트레이스 밖에서는 span()이 아무 일도 하지 않는다.
+"""
+import asyncio
+import functools
+import itertools
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+# 스캐너 1회 실행 ≈ 수백 스팬 — 폭주 방지용 상한 (초과분은 dropped로 집계)
+MAX_SPANS = 2000
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    span_id: int
+    parent_id: int | None
+    start: float  # time.perf_counter()
+    end: float | None = None
+    status: str = "ok"
+    attrs: dict[str, Any] = field(default_factory=dict)
+    trace: "Trace | None" = field(default=None, repr=False)
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def link_remote(self, remote: dict | None) -> None:
+        """Attach server-side spans (MCP result `trace`) as children of this span.
+
+        remote = {"request_id": ..., "spans": [{"name", "start_ms", "duration_ms", ...}]}
+        서버 시각은 이 스팬 시작 기준 오프셋으로 취급한다 (네트워크 지연은 무시).
+        """
+        if not isinstance(remote, dict) or self.trace is None:
+            return
+        if remote.get("request_id"):
+            self.attrs["request_id"] = remote["request_id"]
+        for item in remote.get("spans") or []:
+            try:
+                start = self.start + float(item["start_ms"]) / 1000
+                duration = float(item["duration_ms"]) / 1000
+            except (KeyError, TypeError, ValueError):
+                continue
+            attrs = {k: v for k, v in item.items() if k not in ("name", "start_ms", "duration_ms")}
+            self.trace.add_span(str(item.get("name", "remote")), "remote", self, start, start + duration, **attrs)
+
+
+class Trace:
+    """Spans collected for one agent run."""
+
+    def __init__(self, name: str, **attrs: Any):
+        self.trace_id = uuid.uuid4().hex
+        self.started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.spans: list[Span] = []
+        self.dropped = 0
+        self._ids = itertools.count(1)
+        self.root = self._open(name, "agent", None, attrs)
+
+    def _open(self, name: str, kind: str, parent: Span | None, attrs: dict[str, Any],
+              start: float | None = None) -> Span | None:
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped += 1
+            return None
+        span = Span(
+            name=name,
+            kind=kind,
+            span_id=next(self._ids),
+            parent_id=parent.span_id if parent else None,
+            start=time.perf_counter() if start is None else start,
+            attrs=attrs,
+            trace=self,
+        )
+        self.spans.append(span)
+        return span
+
+    def add_span(self, name: str, kind: str, parent: Span, start: float, end: float, **attrs: Any) -> None:
+        """Record an already finished span (e.g. reported by the MCP server)."""
+        span = self._open(name, kind, parent, attrs, start=start)
+        if span is not None:
+            span.end = end
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.root.end if self.root.end is not None else time.perf_counter()
+        return round((end - self.root.start) * 1000, 3)
+
+    def to_dict(self) -> dict:
+        """Flat span list ordered by start, with depth — enough for a waterfall/flame view."""
+        origin = self.root.start
+        depth: dict[int, int] = {}
+        spans = []
+        for span in sorted(self.spans, key=lambda s: (s.start, s.span_id)):
+            depth[span.span_id] = depth.get(span.parent_id, -1) + 1 if span.parent_id else 0
+            spans.append({
+                "id": span.span_id,
+                "parent_id": span.parent_id,
+                "name": span.name,
+                "kind": span.kind,
+                "depth": depth[span.span_id],
+                "start_ms": round((span.start - origin) * 1000, 3),
+                "duration_ms": round((span.end - span.start) * 1000, 3) if span.end is not None else None,
+                "status": span.status if span.end is not None else "open",
+                "attrs": span.attrs,
+            })
+        return {
+            "trace_id": self.trace_id,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "dropped_spans": self.dropped,
+            "spans": spans,
+        }
+
+
+_current_span: ContextVar[Span | None] = ContextVar("trace_span", default=None)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def _close(span: Span, error: BaseException | None) -> None:
+    span.end = time.perf_counter()
+    if error is not None:
+        span.status = "cancelled" if isinstance(error, asyncio.CancelledError) else "error"
+        span.attrs.setdefault("error", str(error)[:200] or type(error).__name__)
+
+
+@contextmanager
+def start_trace(name: str, **attrs: Any) -> Iterator[Trace]:
+    """Open a new trace whose root span is current for the duration of the block."""
+    parent = _current_span.get()
+    if parent is not None and parent.trace is not None:
+        attrs.setdefault("parent_trace_id", parent.trace.trace_id)
+    trace = Trace(name, **attrs)
+    token = _current_span.set(trace.root)
+    try:
+        yield trace
+    except BaseException as e:
+        _close(trace.root, e)
+        raise
+    else:
+        _close(trace.root, None)
+    finally:
+        _current_span.reset(token)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attrs: Any) -> Iterator[Span | None]:
+    """Child span of the current span; yields None (no-op) outside a trace."""
+    parent = _current_span.get()
+    child = parent.trace._open(name, kind, parent, attrs) if parent is not None and parent.trace else None
+    if child is None:
+        yield None
+        return
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        _close(child, e)
+        raise
+    else:
+        _close(child, None)
+    finally:
+        _current_span.reset(token)
+
+
+def traced(name: str, kind: str = "internal") -> Callable:
+    """Decorator form of span() for coroutine functions."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name, kind):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
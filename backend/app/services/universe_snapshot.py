@@ -0,0 +1,261 @@
+"""Universe-wide stage-1 snapshot — 전 종목 시세를 메모리에 유지하고 한 번에 점수화.
+
+거래량/등락률 TOP50 두 번의 순위 조회 대신 유니버스(KOSPI200 등) 전체의 현재가,
+등락률, 누적 거래량/대금, 20일 평균 대비 거래량 비율을 종목별 numpy 배열 슬롯에
+둔다. 시세는 관심종목 멀티시세(intstock_multprice, 호출당 30종목) 또는 실시간
+체결(H0STCNT0 등) 스트림으로 채우고, 점수는 전체 종목에 대해 벡터 연산으로 낸다.
+
+점수 공식은 "피처:가중치" 목록 (예: ``volume_ratio:0.4,change_pct:0.4,turnover:0.2``).
+각 피처는 유니버스 내 백분위 순위(0~1)로 정규화한 뒤 가중합하므로 단위가 다른 값을
+섞어도 된다. 음수 가중치는 반대 방향 선호 (예: ``change_pct:-0.3`` 역추세).
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime
+from typing import Any, Iterable
+
+import numpy as np
+
+from app.services.intraday_bars import KST, TICK_TR_IDS
+
+logger = logging.getLogger(__name__)
+
+FEATURES = ("change_pct", "abs_change_pct", "volume", "turnover", "volume_ratio")
+MULTPRICE_CHUNK = 30  # intstock_multprice 호출당 최대 종목 수
+BASELINE_DAYS = 20
+
+
+def parse_formula(spec: str) -> dict[str, float]:
+    """``"feature:weight,..."`` → {feature: weight}. 형식 오류/알 수 없는 피처는 ValueError."""
+    weights: dict[str, float] = {}
+    for term in spec.split(","):
+        term = term.strip()
+        if not term:
+            continue
+        name, sep, raw = term.partition(":")
+        name = name.strip()
+        if name not in FEATURES:
+            raise ValueError(f"unknown stage-1 feature {name!r} (expected one of {', '.join(FEATURES)})")
+        weights[name] = weights.get(name, 0.0) + (float(raw) if sep else 1.0)
+    if not any(weights.values()):
+        raise ValueError(f"stage-1 formula {spec!r} has no non-zero weights")
+    return weights
+
+
+def _pct_rank(values: np.ndarray) -> np.ndarray:
+    """Cross-sectional percentile rank in [0, 1]; NaN → 0.5 (중립)."""
+    out = np.full(values.shape, 0.5)
+    valid = ~np.isnan(values)
+    n = int(valid.sum())
+    if n > 1:
+        order = values[valid].argsort(kind="stable").argsort()
+        out[valid] = order / (n - 1)
+    return out
+
+
+def _weighted_score(weights: dict[str, float], cols: dict[str, np.ndarray], n: int) -> np.ndarray:
+    total = sum(abs(w) for w in weights.values()) or 1.0
+    score = np.zeros(n)
+    for feature, w in weights.items():
+        ranked = _pct_rank(cols[feature])
+        score += w * (ranked if w >= 0 else ranked - 1)  # 음수 가중치: 낮을수록 가점
+    return np.round(score / total * 100, 2)
+
+
+def _num(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class UniverseSnapshot:
+    """Latest quote per symbol in growable numpy columns, scored in one vectorized pass."""
+
+    def __init__(self, capacity: int = 256):
+        self.codes: list[str] = []
+        self.names: list[str] = []
+        self._index: dict[str, int] = {}
+        self._baseline_day: dict[str, str] = {}
+        self.price = np.full(capacity, np.nan)
+        self.change_pct = np.full(capacity, np.nan)
+        self.volume = np.full(capacity, np.nan)
+        self.turnover = np.full(capacity, np.nan)
+        self.avg_volume = np.full(capacity, np.nan)  # 직전 20거래일 평균 거래량
+        self.updated_at = np.zeros(capacity)  # time.time() 기준, 0 = 시세 없음
+        self.stats_counters = {"multprice_rows": 0, "ticks": 0, "multprice_calls": 0}
+
+    # ── slots ──
+
+    def _slot(self, code: str, name: str = "") -> int:
+        i = self._index.get(code)
+        if i is None:
+            i = len(self.codes)
+            if i == len(self.price):
+                self._grow()
+            self._index[code] = i
+            self.codes.append(code)
+            self.names.append(name)
+        elif name and not self.names[i]:
+            self.names[i] = name
+        return i
+
+    def _grow(self) -> None:
+        size = len(self.price) * 2
+        for attr in ("price", "change_pct", "volume", "turnover", "avg_volume"):
+            old = getattr(self, attr)
+            new = np.full(size, np.nan)
+            new[: len(old)] = old
+            setattr(self, attr, new)
+        updated = np.zeros(size)
+        updated[: len(self.updated_at)] = self.updated_at
+        self.updated_at = updated
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._index
+
+    # ── feeds ──
+
+    def update(self, code: str, price: float, change_pct: float, volume: float, turnover: float,
+               name: str = "", ts: float | None = None) -> None:
+        i = self._slot(code, name)
+        self.price[i] = price
+        self.change_pct[i] = change_pct
+        self.volume[i] = volume
+        self.turnover[i] = turnover
+        self.updated_at[i] = time.time() if ts is None else ts
+
+    def update_multprice(self, rows: Iterable[dict[str, Any]], ts: float | None = None) -> int:
+        """Feed intstock_multprice output rows (inter_shrn_iscd, inter2_prpr, ...)."""
+        n = 0
+        for row in rows:
+            code = row.get("inter_shrn_iscd")
+            price = _num(row.get("inter2_prpr"))
+            if not code or not price > 0:
+                continue
+            self.update(code, price, _num(row.get("prdy_ctrt")), _num(row.get("acml_vol")),
+                        _num(row.get("acml_tr_pbmn")), name=row.get("inter_kor_isnm") or "", ts=ts)
+            n += 1
+        self.stats_counters["multprice_rows"] += n
+        return n
+
+    def ingest(self, tr_id: str, rows: Iterable[dict[str, Any]]) -> int:
+        """Feed ccnl_krx / ccnl_nxt rows — 체결 메시지의 누적 거래량/대금으로 스냅샷 갱신."""
+        if tr_id not in TICK_TR_IDS:
+            return 0
+        now = time.time()
+        n = 0
+        for row in rows:
+            try:
+                self.update(row["MKSC_SHRN_ISCD"], float(row["STCK_PRPR"]), float(row["PRDY_CTRT"]),
+                            float(row["ACML_VOL"]), float(row["ACML_TR_PBMN"]), ts=now)
+                n += 1
+            except (KeyError, TypeError, ValueError) as e:
+                logger.debug(f"Skipping malformed tick row: {e}")
+        self.stats_counters["ticks"] += n
+        return n
+
+    def set_volume_baseline(self, code: str, avg_volume: float, day: str) -> None:
+        i = self._slot(code)
+        self.avg_volume[i] = avg_volume if avg_volume > 0 else np.nan
+        self._baseline_day[code] = day
+
+    def set_baseline_from_chart(self, code: str, chart_rows: list[dict], day: str) -> bool:
+        """일봉(최신 순)에서 당일 봉을 뺀 직전 20거래일 평균 거래량을 기준선으로 저장."""
+        vols = [_num(r.get("acml_vol")) for r in chart_rows if r.get("stck_bsop_date", "") < day]
+        vols = [v for v in vols[:BASELINE_DAYS] if v == v]
+        if not vols:
+            return False
+        self.set_volume_baseline(code, sum(vols) / len(vols), day)
+        return True
+
+    # ── queries ──
+
+    def stale(self, codes: Iterable[str], max_age_sec: float, now: float | None = None) -> list[str]:
+        """Codes with no quote or one older than ``max_age_sec``."""
+        cutoff = (time.time() if now is None else now) - max_age_sec
+        return [c for c in codes if c not in self._index or self.updated_at[self._index[c]] <= cutoff]
+
+    def missing_baseline(self, codes: Iterable[str], day: str) -> list[str]:
+        return [c for c in codes if self._baseline_day.get(c) != day]
+
+    def features(self, codes: list[str] | None = None) -> tuple[list[str], dict[str, np.ndarray]]:
+        """(codes, {feature: column}) for the given universe — 시세 없는 종목은 제외."""
+        if codes is None:
+            idx = np.arange(len(self.codes))
+        else:
+            idx = np.array([self._index[c] for c in codes if c in self._index], dtype=np.int64)
+        idx = idx[self.price[idx] > 0] if len(idx) else idx
+        change = self.change_pct[idx]
+        volume = self.volume[idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = volume / self.avg_volume[idx]
+        cols = {
+            "change_pct": change,
+            "abs_change_pct": np.abs(change),
+            "volume": volume,
+            "turnover": self.turnover[idx],
+            "volume_ratio": np.where(np.isfinite(ratio), ratio, np.nan),
+        }
+        return [self.codes[i] for i in idx], cols
+
+    def score(self, weights: dict[str, float], codes: list[str] | None = None) -> tuple[list[str], np.ndarray]:
+        """Weighted sum of per-feature percentile ranks, scaled to 0–100."""
+        names, cols = self.features(codes)
+        return names, _weighted_score(weights, cols, len(names))
+
+    def rank(self, formula: str, codes: list[str] | None = None, top: int = 25) -> list[dict[str, Any]]:
+        """Top ``top`` candidates as stage-1 dicts (stock_code, stock_name, score, 피처 값)."""
+        weights = parse_formula(formula)
+        names, cols = self.features(codes)
+        scores = _weighted_score(weights, cols, len(names))
+        out = []
+        for j in np.argsort(-scores, kind="stable")[:top]:
+            code = names[j]
+            out.append({
+                "stock_code": code,
+                "stock_name": self.names[self._index[code]],
+                "score": float(scores[j]),
+                **{f: (None if np.isnan(cols[f][j]) else round(float(cols[f][j]), 4)) for f in FEATURES},
+            })
+        return out
+
+    # ── refresh ──
+
+    async def refresh(self, codes: list[str], max_age_sec: float = 30.0) -> dict[str, int]:
+        """Bring ``codes`` up to date: 멀티시세로 오래된 시세만, 일봉으로 당일 기준선 없는 종목만.
+
+        기준선(20일 평균 거래량)은 하루 한 번 종목별 일봉 1회 호출로 채운다. 실시간 체결이
+        들어오는 종목은 시세가 신선하므로 멀티시세 호출에서 빠진다.
+        """
+        from app.services.market_service import get_batch_charts, get_multi_price
+
+        stale = self.stale(codes, max_age_sec)
+        if stale:
+            self.stats_counters["multprice_calls"] += -(-len(stale) // MULTPRICE_CHUNK)
+            self.update_multprice(await get_multi_price(stale))
+
+        today = datetime.now(KST).strftime("%Y%m%d")  # 거래일은 서버 로컬 시간대가 아닌 KST 기준
+        missing = self.missing_baseline(codes, today)
+        baselines = 0
+        if missing:
+            charts = await get_batch_charts(missing)
+            baselines = sum(self.set_baseline_from_chart(c, rows, today) for c, rows in charts.items() if rows)
+        return {"quotes": len(stale), "baselines": baselines}
+
+    def reset(self) -> None:
+        self.__init__(len(self.price))
+
+    def stats(self) -> dict[str, Any]:
+        quoted = int((self.updated_at[: len(self.codes)] > 0).sum())
+        return {"symbols": len(self.codes), "quoted": quoted, "baselines": len(self._baseline_day),
+                **self.stats_counters}
+
+
+# Singleton
+universe_snapshot = UniverseSnapshot()
@@ -1,61 +1,393 @@
-"""WebSocket manager for pushing real-time events to frontend clients."""
+"""WebSocket manager for pushing real-time events to frontend clients.
 
+Each client gets a bounded outbound queue drained by its own writer task, so
+a slow browser tab never blocks EventBus.publish or other clients. Clients
+that send a subscribe message only receive their topics; portfolio and quote
+streams are sent as deltas (see ws_topics) and are only diffed while some
+client subscribes to them.
+"""
+
+import asyncio
 import json
 import logging
+import time
+from collections import deque
+from typing import Any
 
 from fastapi import WebSocket
 
 from app.agents.event_bus import AgentEvent
+from app.services import ws_topics
+from app.services.metrics import WS_CLIENTS, WS_QUEUE_DEPTH, WS_SEND_LAG_SECONDS
+from app.services.ws_topics import StreamState
 
 logger = logging.getLogger(__name__)
 
+# 밀린 클라이언트에게는 최신 값만 의미 있는 이벤트 — 대기 중인 이전 메시지를 대체
+COALESCE_EVENT_TYPES = {"portfolio.updated"}
+
+
+class ClientConnection:
+    """One connected client: bounded outbound queue + writer task + lag metrics."""
+
+    def __init__(self, ws: WebSocket, client_id: str, max_queue: int):
+        self.ws = ws
+        self.client_id = client_id
+        self.max_queue = max_queue
+        # (payload, enqueued_at, coalesce_key)
+        self._queue: deque[tuple[str | bytes, float, str | None]] = deque()
+        self._wakeup = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.closed = False
+
+        # None = 구독 메시지를 보내지 않은 기존 클라이언트 (모든 agent_event 수신)
+        self.topics: set[str] | None = None
+        self.encoding = "json"
+        self.stream_seq: dict[str, int] = {}
+        self.since_snapshot: dict[str, int] = {}
+
+        self.connected_at = time.time()
+        self.last_send_at = time.monotonic()
+        self.sent = 0
+        self.coalesced = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def has_pending(self, coalesce_key: str) -> bool:
+        return any(key == coalesce_key for _, _, key in self._queue)
+
+    def enqueue(self, payload: str | bytes, coalesce_key: str | None = None) -> bool:
+        """Queue a pre-serialized message. Returns False if the client is too far behind."""
+        if self.closed:
+            return False
+        if coalesce_key is not None:
+            for i, (_, _, key) in enumerate(self._queue):
+                if key == coalesce_key:
+                    del self._queue[i]
+                    self.coalesced += 1
+                    break
+        if len(self._queue) >= self.max_queue:
+            return False
+        self._queue.append((payload, time.monotonic(), coalesce_key))
+        self._wakeup.set()
+        return True
+
+    async def writer(self) -> None:
+        try:
+            while not self.closed:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                payload, enqueued_at, _ = self._queue.popleft()
+                if isinstance(payload, bytes):
+                    await self.ws.send_bytes(payload)
+                else:
+                    await self.ws.send_text(payload)
+                now = time.monotonic()
+                self.last_send_at = now
+                self.sent += 1
+                self.last_lag_ms = (now - enqueued_at) * 1000
+                self.max_lag_ms = max(self.max_lag_ms, self.last_lag_ms)
+                WS_SEND_LAG_SECONDS.observe(now - enqueued_at)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.debug(f"WebSocket writer for {self.client_id} stopped: {e}")
+        finally:
+            self.closed = True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "client_id": self.client_id,
+            "connected_at": self.connected_at,
+            "topics": sorted(self.topics) if self.topics is not None else None,
+            "encoding": self.encoding,
+            "queue_depth": self.queue_depth,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "last_lag_ms": round(self.last_lag_ms, 2),
+            "max_lag_ms": round(self.max_lag_ms, 2),
+            "idle_sec": round(time.monotonic() - self.last_send_at, 1),
+        }
+
 
 class WebSocketManager:
     """Manages WebSocket connections from frontend clients."""
 
-    def __init__(self):
-        self._connections: set[WebSocket] = set()
+    def __init__(self, max_queue: int = 256, heartbeat_interval: float = 30.0,
+                 snapshot_every: int = 50):
+        self._clients: dict[WebSocket, ClientConnection] = {}
+        self._streams: dict[str, StreamState] = {}
+        self._last_portfolio: dict | None = None  # 구독 시 stream 을 만들 최신 portfolio
+        self._tick_topics: set[str] = set()  # tick feed 가 갱신하는 quotes stream
+        self.snapshot_every = snapshot_every
+        self.max_queue = max_queue
+        self.heartbeat_interval = heartbeat_interval
+        self._heartbeat_task: asyncio.Task | None = None
+        self._next_id = 0
+        self.dropped_clients = 0
 
-    async def connect(self, ws: WebSocket) -> None:
+    async def connect(self, ws: WebSocket) -> ClientConnection:
         await ws.accept()
-        self._connections.add(ws)
-        logger.info(f"WebSocket client connected (total: {len(self._connections)})")
+        self._next_id += 1
+        client = ClientConnection(ws, f"client-{self._next_id}", self.max_queue)
+        client.task = asyncio.create_task(client.writer())
+        self._clients[ws] = client
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        logger.info(f"WebSocket client connected (total: {len(self._clients)})")
+        return client
 
     async def disconnect(self, ws: WebSocket) -> None:
-        self._connections.discard(ws)
-        logger.info(f"WebSocket client disconnected (total: {len(self._connections)})")
+        client = self._clients.pop(ws, None)
+        if client is not None:
+            client.closed = True
+            if client.task is not None:
+                client.task.cancel()
+        logger.info(f"WebSocket client disconnected (total: {len(self._clients)})")
+
+    async def _drop(self, client: ClientConnection, reason: str) -> None:
+        """Disconnect a client that cannot keep up; the frontend reconnects on its own."""
+        self.dropped_clients += 1
+        logger.warning(f"Dropping WebSocket {client.client_id}: {reason}")
+        await self.disconnect(client.ws)
+        try:
+            await client.ws.close(code=1013)
+        except Exception:
+            pass
+
+    async def _enqueue_all(self, items: list[tuple[ClientConnection, str | bytes, str | None]]) -> None:
+        lagging = []
+        for client, payload, coalesce_key in items:
+            if client.closed or not client.enqueue(payload, coalesce_key):
+                lagging.append(client)
 
-    async def broadcast(self, event_type: str, data: dict) -> None:
-        """Send an event to all connected clients."""
-        if not self._connections:
+        for client in lagging:
+            reason = "writer closed" if client.closed else f"queue full ({client.queue_depth})"
+            await self._drop(client, reason)
+
+    async def broadcast(self, event_type: str, data: dict, coalesce_key: str | None = None) -> None:
+        """Serialize once and queue for every client — never awaits a client send."""
+        if not self._clients:
             return
 
         message = json.dumps({"type": event_type, "data": data}, ensure_ascii=False)
-        dead = set()
-        for ws in self._connections:
-            try:
-                await ws.send_text(message)
-            except Exception:
-                dead.add(ws)
-
-        self._connections -= dead
+        await self._enqueue_all([(c, message, coalesce_key) for c in list(self._clients.values())])
 
     async def on_agent_event(self, event: AgentEvent) -> None:
         """Handler for EventBus — forwards agent events to WebSocket clients."""
-        await self.broadcast(
-            "agent_event",
-            {
+        if not self._clients:
+            self._track_state(event)
+            return
+
+        message = {
+            "type": "agent_event",
+            "data": {
                 "event_type": event.event_type,
                 "agent_id": event.agent_id,
                 "data": event.data,
                 "timestamp": event.timestamp,
             },
+        }
+        coalesce_key = event.event_type if event.event_type in COALESCE_EVENT_TYPES else None
+        topics = ws_topics.event_topics(event.event_type)
+        encoded: dict[str, str | bytes] = {}
+        items = []
+        for client in list(self._clients.values()):
+            if client.topics is not None and not any(
+                ws_topics.topic_matches(client.topics, t) for t in topics
+            ):
+                continue
+            if client.encoding not in encoded:
+                encoded[client.encoding] = ws_topics.encode(message, client.encoding)
+            items.append((client, encoded[client.encoding], coalesce_key))
+        await self._enqueue_all(items)
+
+        await self._publish_states(self._track_state(event))
+
+    def _has_subscriber(self, topic: str) -> bool:
+        return any(
+            c.topics is not None and ws_topics.topic_matches(c.topics, topic) for c in self._clients.values()
+        )
+
+    def _evict_stream(self, topic: str) -> None:
+        """Forget a stream; clients restart from a snapshot if it comes back."""
+        self._streams.pop(topic, None)
+        self._tick_topics.discard(topic)
+        for client in self._clients.values():
+            client.stream_seq.pop(topic, None)
+            client.since_snapshot.pop(topic, None)
+
+    def _track_state(self, event: AgentEvent) -> list[StreamState]:
+        """Update portfolio/quote streams from an event; returns changed streams."""
+        if event.event_type != "portfolio.updated":
+            return []
+        self._last_portfolio = event.data
+        return self._update_streams(event.data)
+
+    def _update_streams(self, portfolio: dict) -> list[StreamState]:
+        """Diff only streams someone subscribes to; drop quotes for codes no longer held or ticked."""
+        positions = [p for p in portfolio.get("positions", []) or [] if p.get("stock_code")]
+        held = {f"{ws_topics.TOPIC_QUOTES}:{p['stock_code']}" for p in positions}
+        for topic in list(self._streams):
+            if topic.startswith(ws_topics.TOPIC_QUOTES + ":") and topic not in held | self._tick_topics:
+                self._evict_stream(topic)
+
+        updates = [(ws_topics.TOPIC_PORTFOLIO, portfolio)]
+        for p in positions:
+            topic = f"{ws_topics.TOPIC_QUOTES}:{p['stock_code']}"
+            state = ws_topics.quote_state(p)
+            if topic in self._tick_topics and topic in self._streams:
+                state = {**state, **self._streams[topic].state}  # 실시간 체결가가 잔고 평가가보다 최신
+            updates.append((topic, state))
+        changed = []
+        for topic, state in updates:
+            if not self._has_subscriber(topic):
+                self._evict_stream(topic)  # 구독자가 없으면 diff 비용을 쓰지 않는다
+                continue
+            stream = self._streams.get(topic)
+            if stream is None:
+                stream = self._streams[topic] = StreamState(topic)
+            if stream.update(state):
+                changed.append(stream)
+        return changed
+
+    async def publish_state(self, topic: str, state: dict) -> None:
+        """Publish a new state on a stream (e.g. quotes:<code> from a tick feed)."""
+        if not self._has_subscriber(topic):
+            self._evict_stream(topic)
+            return
+        stream = self._streams.get(topic)
+        if stream is None:
+            stream = self._streams[topic] = StreamState(topic)
+        if stream.update(state):
+            await self._publish_states([stream])
+
+    async def on_tick(self, stock_code: str, row: dict) -> None:
+        """Tick feed listener — merge a 체결가 row into quotes:<code>."""
+        topic = f"{ws_topics.TOPIC_QUOTES}:{stock_code}"
+        stream = self._streams.get(topic)
+        state = {**(stream.state if stream else {}), **ws_topics.tick_quote_state(row)}
+        self._tick_topics.add(topic)
+        await self.publish_state(topic, state)
+
+    async def _publish_states(self, streams: list[StreamState]) -> None:
+        items = []
+        for stream in streams:
+            for client in list(self._clients.values()):
+                if client.topics is None or not ws_topics.topic_matches(client.topics, stream.topic):
+                    continue
+                items.append((client, self._stream_payload(client, stream), stream.topic))
+        await self._enqueue_all(items)
+
+    def _stream_payload(self, client: ClientConnection, stream: StreamState, force_snapshot: bool = False) -> str | bytes:
+        """Delta if the client holds the previous seq, otherwise a full snapshot.
+
+        A pending message for the same stream is replaced (coalesced), so in
+        that case the client also needs a snapshot to stay consistent.
+        """
+        topic = stream.topic
+        use_delta = (
+            not force_snapshot
+            and client.stream_seq.get(topic) == stream.seq - 1
+            and client.since_snapshot.get(topic, 0) < self.snapshot_every
+            and not client.has_pending(topic)
         )
+        client.stream_seq[topic] = stream.seq
+        if use_delta:
+            client.since_snapshot[topic] = client.since_snapshot.get(topic, 0) + 1
+            return stream.message("delta", client.encoding)
+        client.since_snapshot[topic] = 0
+        return stream.message("snapshot", client.encoding)
+
+    async def handle_client_message(self, ws: WebSocket, raw: str) -> None:
+        """Handle subscribe / unsubscribe / resync commands from a client.
+
+        {"action": "subscribe", "topics": ["portfolio", "quotes:005930"], "encoding": "msgpack"}
+        """
+        client = self._clients.get(ws)
+        if client is None:
+            return
+        try:
+            msg = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if not isinstance(msg, dict):
+            return
+
+        action = msg.get("action")
+        topics = {str(t) for t in msg.get("topics", []) or []}
+        if action == "subscribe":
+            encoding = msg.get("encoding")
+            if encoding in ws_topics.ENCODINGS:
+                client.encoding = encoding
+            client.topics = (client.topics or set()) | topics
+        elif action == "unsubscribe":
+            client.topics = (client.topics or set()) - topics
+            for topic in list(client.stream_seq):
+                if not ws_topics.topic_matches(client.topics, topic):
+                    client.stream_seq.pop(topic, None)
+        elif action != "resync":
+            return
+
+        # 새로 구독했거나 재동기화 요청한 stream 은 현재 snapshot 부터 전송
+        items = []
+        if action in ("subscribe", "resync"):
+            if self._last_portfolio is not None:
+                self._update_streams(self._last_portfolio)
+            for stream in self._streams.values():
+                if stream.seq and ws_topics.topic_matches(topics, stream.topic) and (
+                    client.topics and ws_topics.topic_matches(client.topics, stream.topic)
+                ):
+                    payload = self._stream_payload(client, stream, force_snapshot=True)
+                    items.append((client, payload, stream.topic))
+
+        ack = {
+            "type": "subscription",
+            "topics": sorted(client.topics or []),
+            "encoding": client.encoding,
+            "available_encodings": list(ws_topics.ENCODINGS),
+        }
+        items.insert(0, (client, json.dumps(ack), None))
+        await self._enqueue_all(items)
+
+    async def _heartbeat_loop(self) -> None:
+        """Ping only clients that have been silent for a full interval.
+
+        Clients receiving traffic don't need a heartbeat, and clients with a
+        backlog would only get it queued behind stale data.
+        """
+        payload = json.dumps({"type": "heartbeat"})
+        while self._clients:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            for client in list(self._clients.values()):
+                if client.queue_depth == 0 and now - client.last_send_at >= self.heartbeat_interval:
+                    client.enqueue(payload)
+
+    async def shutdown(self) -> None:
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+        for ws in list(self._clients):
+            await self.disconnect(ws)
+
+    def client_stats(self) -> list[dict[str, Any]]:
+        return [c.stats() for c in self._clients.values()]
 
     @property
     def client_count(self) -> int:
-        return len(self._connections)
+        return len(self._clients)
+
+    def total_queue_depth(self) -> int:
+        return sum(c.queue_depth for c in self._clients.values())
 
 
 # Singleton
 ws_manager = WebSocketManager()
+WS_CLIENTS.set_function(lambda: ws_manager.client_count)
+WS_QUEUE_DEPTH.set_function(ws_manager.total_queue_depth)
@@ -0,0 +1,159 @@
+"""Topic routing and delta encoding for the /ws endpoint.
+
+클라이언트는 topic 을 구독하고, 상태형 topic(portfolio, quotes:<종목>)은 직전에
+받은 상태 대비 변경분(delta)만 받는다. 각 stream 은 seq 번호를 가지며, 클라이언트
+seq 가 어긋나거나 일정 횟수마다 전체 snapshot 을 보내 재동기화한다.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import msgpack  # type: ignore
+except ImportError:  # optional — JSON only when not installed
+    msgpack = None
+
+TOPIC_AGENT_EVENTS = "agent_events"
+TOPIC_SIGNALS = "signals"
+TOPIC_PORTFOLIO = "portfolio"
+TOPIC_QUOTES = "quotes"
+
+# 상태형 stream — 다른 topic 에서는 제외하고 delta 로만 전달
+STATE_EVENT_TYPES = {"portfolio.updated"}
+
+ENCODINGS = ("json", "msgpack") if msgpack is not None else ("json",)
+
+
+def encode(message: dict[str, Any], encoding: str) -> str | bytes:
+    if encoding == "msgpack" and msgpack is not None:
+        return msgpack.packb(message, use_bin_type=True)
+    return json.dumps(message, ensure_ascii=False)
+
+
+def topic_matches(subscribed: set[str], topic: str) -> bool:
+    """'quotes' subscribes to every quotes:<code> stream."""
+    if topic in subscribed:
+        return True
+    return topic.startswith(TOPIC_QUOTES + ":") and TOPIC_QUOTES in subscribed
+
+
+def event_topics(event_type: str) -> set[str]:
+    """Non-state topics an agent event is delivered on."""
+    if event_type in STATE_EVENT_TYPES:
+        return set()
+    topics = {TOPIC_AGENT_EVENTS}
+    if event_type.startswith("signal."):
+        topics.add(TOPIC_SIGNALS)
+    return topics
+
+
+_MISSING = object()
+
+
+def diff_flat(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """Changed/added keys of ``new``; removed keys map to None."""
+    changed = {k: v for k, v in new.items() if old.get(k, _MISSING) != v}
+    for k in old.keys() - new.keys():
+        changed[k] = None
+    return changed
+
+
+def diff_portfolio(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """Portfolio delta: changed scalar fields + per-position field changes."""
+    old_scalars = {k: v for k, v in old.items() if k != "positions"}
+    new_scalars = {k: v for k, v in new.items() if k != "positions"}
+    delta: dict[str, Any] = {"changed": diff_flat(old_scalars, new_scalars)}
+
+    old_pos = {p.get("stock_code"): p for p in old.get("positions", [])}
+    new_pos = {p.get("stock_code"): p for p in new.get("positions", [])}
+    upsert = []
+    for code, pos in new_pos.items():
+        prev = old_pos.get(code)
+        if prev is None:
+            upsert.append(pos)
+        else:
+            changed = diff_flat(prev, pos)
+            if changed:
+                upsert.append({"stock_code": code, **changed})
+    remove = [code for code in old_pos if code not in new_pos]
+    if upsert or remove:
+        delta["positions"] = {"upsert": upsert, "remove": remove}
+    return delta
+
+
+def apply_portfolio_delta(state: dict[str, Any], delta: dict[str, Any]) -> dict[str, Any]:
+    """Reference client-side merge (used by tests and non-browser consumers)."""
+    result = {**state, **delta.get("changed", {})}
+    positions = {p["stock_code"]: dict(p) for p in state.get("positions", [])}
+    pos_delta = delta.get("positions", {})
+    for code in pos_delta.get("remove", []):
+        positions.pop(code, None)
+    for upd in pos_delta.get("upsert", []):
+        positions.setdefault(upd["stock_code"], {}).update(upd)
+    result["positions"] = list(positions.values())
+    return result
+
+
+class StreamState:
+    """Latest state of one stream plus the pre-built snapshot/delta messages."""
+
+    def __init__(self, topic: str):
+        self.topic = topic
+        self.seq = 0
+        self.state: dict[str, Any] = {}
+        self._snapshot: dict[str, Any] | None = None
+        self._delta: dict[str, Any] | None = None
+        self._encoded: dict[tuple[str, str], str | bytes] = {}
+
+    def update(self, state: dict[str, Any]) -> bool:
+        """Advance to ``state``. Returns False when nothing changed."""
+        if self.topic == TOPIC_PORTFOLIO:
+            delta = diff_portfolio(self.state, state)
+            empty = not delta["changed"] and "positions" not in delta
+        else:
+            delta = diff_flat(self.state, state)
+            empty = not delta
+        if self.seq and empty:
+            return False
+        self.seq += 1
+        self.state = state
+        self._snapshot = {"type": self.topic.split(":")[0], "topic": self.topic,
+                          "mode": "snapshot", "seq": self.seq, "data": state}
+        self._delta = {"type": self.topic.split(":")[0], "topic": self.topic,
+                       "mode": "delta", "seq": self.seq, "base": self.seq - 1, "data": delta}
+        self._encoded.clear()
+        return True
+
+    def message(self, kind: str, encoding: str) -> str | bytes:
+        """Serialized snapshot/delta — encoded once per encoding and shared by all clients."""
+        key = (kind, encoding)
+        if key not in self._encoded:
+            self._encoded[key] = encode(self._snapshot if kind == "snapshot" else self._delta, encoding)
+        return self._encoded[key]
+
+
+def quote_state(position: dict[str, Any]) -> dict[str, Any]:
+    """Quote fields derived from a portfolio position."""
+    return {
+        "stock_code": position.get("stock_code"),
+        "stock_name": position.get("stock_name"),
+        "price": position.get("current_price"),
+    }
+
+
+def tick_quote_state(row: dict[str, Any]) -> dict[str, Any]:
+    """Quote fields from a realtime 체결가 row (KIS column names)."""
+    def num(key: str) -> float | None:
+        try:
+            return float(row[key])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    return {
+        "stock_code": row.get("MKSC_SHRN_ISCD"),
+        "price": num("STCK_PRPR"),
+        "change_pct": num("PRDY_CTRT"),
+        "volume": num("ACML_VOL"),
+        "time": row.get("STCK_CNTG_HOUR"),
+    }
@@ -0,0 +1,66 @@
+"""Seeded benchmark: 5-year KOSPI200-sized backtest and a process-pool parameter sweep.
+
+    cd backend && python -m benchmarks.bench_backtest
+"""
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from app.services.backtest import BarPanel, compute_indicators, param_grid, run_backtest, run_sweep
+
+SYMBOLS = 200
+DAYS = 1250  # ~5년
+
+
+def make_panel(symbols: int = SYMBOLS, days: int = DAYS, seed: int = 42) -> BarPanel:
+    """Synthetic daily OHLCV with late listings and suspended days."""
+    rng = np.random.default_rng(seed)
+    dates = [f"{20200000 + i:08d}" for i in range(days)]
+    bars = {}
+    for i in range(symbols):
+        close = np.round(np.cumprod(1 + rng.normal(0.0003, 0.02, days)) * rng.uniform(5000, 200000))
+        open_ = np.round(close * (1 + rng.normal(0, 0.005, days)))
+        high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.015, days))
+        low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.015, days))
+        volume = rng.lognormal(12, 0.6, days)
+        start = int(rng.integers(0, days // 4)) if i % 10 == 0 else 0
+        keep = rng.random(days) > 0.01  # 거래정지
+        bars[f"{i:06d}"] = {
+            d: (open_[t], high[t], low[t], close[t], volume[t])
+            for t, d in enumerate(dates) if t >= start and keep[t]
+        }
+    return BarPanel.from_series(bars, sectors={f"{i:06d}": f"sector{i % 12}" for i in range(symbols)})
+
+
+def _ms(fn) -> tuple[float, object]:
+    t0 = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t0) * 1000, out
+
+
+def run(symbols: int = SYMBOLS, days: int = DAYS, sweep: bool = True, seed: int = 42) -> dict:
+    panel = make_panel(symbols, days, seed)
+    ind_ms, ind = _ms(lambda: compute_indicators(panel))
+    run_ms, result = _ms(lambda: run_backtest(panel, indicators=ind))
+    out = {"symbols": symbols, "days": days, "indicators_ms": round(ind_ms, 2), "run_ms": round(run_ms, 2),
+           "trades": result.stats["trades"]}
+    if sweep:
+        grid = param_grid(take_profit_pct=[5.0, 10.0], atr_stop_loss_multiplier_short=[1.5, 2.0, 3.0],
+                          min_composite_score=[15.0, 60.0])
+        sweep_ms, _ = _ms(lambda: run_sweep(panel, grid))
+        out.update(sweep_size=len(grid), sweep_ms=round(sweep_ms, 2))
+    return out
+
+
+def main() -> None:
+    r = run()
+    print(f"backtest symbols={r['symbols']} days={r['days']}")
+    print(f"  indicators     {r['indicators_ms']:>9.1f}ms")
+    print(f"  full run       {r['run_ms']:>9.1f}ms  trades={r['trades']}")
+    print(f"  sweep x{r['sweep_size']:<3}     {r['sweep_ms']:>9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Seeded benchmark: per-call serialization overhead of MCP tool results, legacy vs structured.
+
+legacy     — subprocess prints records JSON → server wraps the text in {"ok", "data": {"data": str}}
+             → text content block → backend json.loads twice and unwraps.
+structured — subprocess prints one columnar JSON line → server parses it once → structuredContent
+             → backend reads the dict via KisResult (records only when asked).
+
+Both paths include the MCP wire message (JSON-RPC result) encode/decode.
+
+    cd backend && python -m benchmarks.bench_mcp_results [--rows 100] [--cols 13]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+
+from app.services.kis_result import KisResult
+
+MARKER = "__KIS_MCP_RESULT__"
+
+
+def make_table(rows: int, cols: int, seed: int = 42) -> dict[str, list[str]]:
+    """KIS 응답처럼 모든 값이 문자열인 열 단위 테이블."""
+    rng = random.Random(seed)
+    return {f"field_{c:02d}": [str(rng.randint(0, 10_000_000)) for _ in range(rows)] for c in range(cols)}
+
+
+def _meta() -> dict:
+    return {"success": True, "api_type": "inquire_daily_itemchartprice", "params": {"fid_input_iscd": "005930"},
+            "execution_time": "0.42s"}
+
+
+def legacy_call(columns: dict[str, list[str]]) -> tuple[list[dict], int]:
+    names = list(columns)
+    records = [dict(zip(names, row)) for row in zip(*columns.values())]
+    stdout = json.dumps(records, ensure_ascii=False)                     # subprocess: to_json(orient="records")
+    text = json.dumps({"ok": True, "data": {**_meta(), "data": stdout}}, ensure_ascii=False)
+    wire = json.dumps({"content": [{"type": "text", "text": text}]})      # JSON-RPC result
+
+    received = json.loads(wire)["content"][0]["text"]                     # backend
+    outer = json.loads(received)
+    return json.loads(outer["data"]["data"]), len(wire)
+
+
+def structured_call(columns: dict[str, list[str]]) -> tuple[list[dict], int]:
+    stdout = MARKER + json.dumps({"outputs": {"output": {"length": len(next(iter(columns.values()))),
+                                                         "columns": columns}},
+                                  "kis": {"rt_cd": "0", "msg_cd": "", "msg1": ""}}, ensure_ascii=False)
+    payload = json.loads(stdout[len(MARKER):])                            # server: ApiExecutor._parse_output
+    content = {"ok": True, "data": {**_meta(), **payload}}
+    text = json.dumps(content, ensure_ascii=False)                        # fastmcp keeps a text block too
+    wire = json.dumps({"content": [{"type": "text", "text": text}], "structuredContent": content})
+
+    structured = json.loads(wire)["structuredContent"]                    # backend
+    return KisResult.from_content(structured).records(), len(wire)
+
+
+def _timed(fn, columns, repeat: int) -> tuple[float, int, list[dict]]:
+    best, size, rows = float("inf"), 0, []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows, size = fn(columns)
+        best = min(best, (time.perf_counter() - t0) * 1e6)
+    return best, size, rows
+
+
+def run(rows: int = 100, cols: int = 13, repeat: int = 50, seed: int = 42) -> dict:
+    columns = make_table(rows, cols, seed)
+    legacy_us, legacy_bytes, legacy_rows = _timed(legacy_call, columns, repeat)
+    structured_us, structured_bytes, structured_rows = _timed(structured_call, columns, repeat)
+    assert legacy_rows == structured_rows
+    return {
+        "rows": rows,
+        "cols": cols,
+        "legacy_us_per_call": round(legacy_us, 1),
+        "structured_us_per_call": round(structured_us, 1),
+        "legacy_wire_bytes": legacy_bytes,
+        "structured_wire_bytes": structured_bytes,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--cols", type=int, default=13)
+    args = parser.parse_args()
+    for rows in sorted({1, 30, args.rows}):
+        r = run(rows, args.cols)
+        print(f"mcp results rows={r['rows']:>4} cols={r['cols']}  legacy={r['legacy_us_per_call']:>8.1f}us"
+              f" ({r['legacy_wire_bytes']}B)  structured={r['structured_us_per_call']:>8.1f}us"
+              f" ({r['structured_wire_bytes']}B)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Seeded benchmark: NumPy risk engine at 5, 50 and 200 holdings.
+
+    cd backend && python -m benchmarks.bench_risk_engine
+"""
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from app.services.risk_engine import MARKET_PROXY, compute_risk_metrics
+
+HOLDINGS = (5, 50, 200)
+DAYS = 250
+
+
+def make_universe(holdings: int, days: int = DAYS, seed: int = 42) -> tuple[dict, dict]:
+    """Synthetic one-factor market with a few late listings and missing days."""
+    rng = np.random.default_rng(seed)
+    dates = [f"{20240000 + i:08d}" for i in range(days)]
+    market = np.cumprod(1 + rng.normal(0.0003, 0.01, days)) * 30000
+    closes = {MARKET_PROXY: dict(zip(dates, market))}
+    mret = np.diff(market, prepend=market[0]) / market
+    betas = rng.uniform(0.5, 1.8, holdings)
+    for i in range(holdings):
+        r = betas[i] * mret + rng.normal(0, 0.015, days)
+        series = np.cumprod(1 + r) * rng.uniform(5000, 500000)
+        start = int(rng.integers(0, days // 4)) if i % 10 == 0 else 0
+        keep = rng.random(days) > 0.02  # 거래정지 등 결측
+        closes[f"{i:06d}"] = {d: c for d, c, k in zip(dates[start:], series[start:], keep[start:]) if k}
+    w = rng.random(holdings)
+    weights = {f"{i:06d}": float(x) for i, x in enumerate(w / w.sum())}
+    return closes, weights
+
+
+def run(holdings: int, repeat: int = 5, seed: int = 42) -> dict:
+    closes, weights = make_universe(holdings, seed=seed)
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        compute_risk_metrics(closes, weights, seed=seed)
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    return {"holdings": holdings, "median_ms": round(timings[len(timings) // 2], 2), "min_ms": round(timings[0], 2)}
+
+
+def main() -> None:
+    for n in HOLDINGS:
+        r = run(n)
+        print(f"risk_engine holdings={r['holdings']:>3}  median={r['median_ms']:>8.2f}ms  min={r['min_ms']:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
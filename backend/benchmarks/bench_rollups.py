@@ -0,0 +1,111 @@
+"""Seeded benchmark: raw snapshot scans vs rollup tables for a year of 1-minute snapshots.
+
+    cd backend && python -m benchmarks.bench_rollups [--days 365]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.models.database import SCHEMA_SQL
+from app.services.portfolio_service import max_drawdown_pct
+
+INSERT_SQL = """INSERT INTO portfolio_snapshots
+    (timestamp, total_value, cash_balance, total_pnl, total_pnl_pct) VALUES (?, ?, ?, ?, ?)"""
+
+
+def make_snapshots(days: int, seed: int = 42):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    value = 10_000_000.0
+    for i in range(days * 24 * 60):
+        value *= 1 + rng.gauss(0, 0.0005)
+        ts = (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S")
+        yield ts, value, 1_000_000.0, value - 10_000_000, (value / 10_000_000 - 1) * 100
+
+
+def _timed(fn, repeat: int = 3) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, (time.perf_counter() - t0) * 1000)
+    return best, result
+
+
+def _raw_drawdown(conn: sqlite3.Connection, since: str) -> float:
+    """Legacy path: load every snapshot in range and walk it in Python."""
+    values = [r[0] for r in conn.execute(
+        "SELECT total_value FROM portfolio_snapshots WHERE timestamp >= ? AND total_value > 0 ORDER BY timestamp",
+        (since,),
+    )]
+    peak, max_dd = values[0], 0.0
+    for v in values:
+        peak = max(peak, v)
+        max_dd = max(max_dd, (peak - v) / peak * 100)
+    return max_dd
+
+
+def _rollup_drawdown(conn: sqlite3.Connection, table: str, since: str) -> float:
+    conn.row_factory = sqlite3.Row
+    rows = [dict(r) for r in conn.execute(f"SELECT * FROM {table} WHERE bucket >= ? ORDER BY bucket", (since,))]
+    conn.row_factory = None
+    return max_drawdown_pct(rows)
+
+
+def run(days: int = 365, seed: int = 42) -> dict:
+    rows = list(make_snapshots(days, seed))
+    with tempfile.TemporaryDirectory() as tmp:
+        results: dict = {"snapshots": len(rows)}
+        for name, with_triggers in (("insert_plain", False), ("insert_rollup", True)):
+            conn = sqlite3.connect(Path(tmp) / f"{name}.db")
+            conn.executescript(SCHEMA_SQL)
+            if not with_triggers:
+                for (trigger,) in conn.execute("SELECT name FROM sqlite_master WHERE type='trigger'").fetchall():
+                    conn.execute(f"DROP TRIGGER {trigger}")
+            t0 = time.perf_counter()
+            conn.executemany(INSERT_SQL, rows)
+            conn.commit()
+            results[f"{name}_us_per_row"] = round((time.perf_counter() - t0) * 1e6 / len(rows), 2)
+            if not with_triggers:
+                conn.close()
+
+        last = rows[-1][0]
+        for label, span in (("90d", 90), ("1y", days)):
+            since = (datetime.strptime(last, "%Y-%m-%d %H:%M:%S") - timedelta(days=span)).strftime("%Y-%m-%d %H:%M:%S")
+            raw_ms, raw_dd = _timed(lambda: _raw_drawdown(conn, since))
+            hourly_ms, hourly_dd = _timed(lambda: _rollup_drawdown(conn, "portfolio_rollup_hourly", since[:13] + ":00:00"))
+            daily_ms, daily_dd = _timed(lambda: _rollup_drawdown(conn, "portfolio_rollup_daily", since[:10]))
+            results[label] = {
+                "raw_ms": round(raw_ms, 2),
+                "hourly_ms": round(hourly_ms, 2),
+                "daily_ms": round(daily_ms, 2),
+                "max_dd_raw": round(raw_dd, 4),
+                "max_dd_hourly": round(hourly_dd, 4),
+                "max_dd_daily": round(daily_dd, 4),
+            }
+        conn.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+    r = run(args.days)
+    print(f"rollups snapshots={r['snapshots']}  insert plain={r['insert_plain_us_per_row']}us/row"
+          f"  with triggers={r['insert_rollup_us_per_row']}us/row")
+    for label in ("90d", "1y"):
+        q = r[label]
+        print(f"rollups {label:>3} drawdown  raw={q['raw_ms']:>8.2f}ms  hourly={q['hourly_ms']:>7.2f}ms"
+              f"  daily={q['daily_ms']:>6.2f}ms  (dd raw={q['max_dd_raw']} hourly={q['max_dd_hourly']}"
+              f" daily={q['max_dd_daily']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Benchmark cases for ``python -m benchmarks.suite``.
+
+각 케이스는 {지표명: 값} dict 를 반환한다. 이름이 ``_ms`` 로 끝나는 값만 baseline 과 비교하는
+시간(밀리초, 낮을수록 좋음)이고, 나머지는 참고용 정보로 결과 JSON 에만 남는다.
+기존 bench_*.py 모듈은 여기서 run() 을 호출해 같은 스위트로 묶는다.
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+
+from benchmarks import bench_backtest, bench_mcp_results, bench_risk_engine, bench_rollups
+
+CASES: dict[str, Callable[[], dict[str, Any]]] = {}
+MCP_SERVER_DIR = Path(__file__).resolve().parents[2] / "open-trading-api" / "MCP" / "Kis Trading MCP"
+
+
+class Skip(Exception):
+    """Case cannot run here (e.g. the MCP server's own dependencies are not installed)."""
+
+
+def case(name: str) -> Callable:
+    def register(fn: Callable[[], dict[str, Any]]) -> Callable[[], dict[str, Any]]:
+        CASES[name] = fn
+        return fn
+    return register
+
+
+def best_ms(fn: Callable[[], Any], repeat: int = 5) -> float:
+    """Minimum wall time of ``repeat`` calls — 노이즈에 가장 덜 민감한 대표값."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - t0) * 1000)
+    return round(best, 4)
+
+
+async def abest_ms(fn: Callable[[], Awaitable[Any]], repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        best = min(best, (time.perf_counter() - t0) * 1000)
+    return round(best, 4)
+
+
+@asynccontextmanager
+async def temp_database():
+    """Point app.models.db at a fresh schema in a temp dir for the duration."""
+    from app.models import db as db_module
+
+    original = db_module.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        db_module.DB_PATH = Path(tmp) / "bench.db"
+        try:
+            await db_module.init_database()
+            yield db_module
+            # fire-and-forget 이벤트 저장 태스크가 임시 DB 를 닫기 전에 끝나도록
+            pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            if pending:
+                await asyncio.wait(pending, timeout=5)
+        finally:
+            db_module.DB_PATH = original
+
+
+def _ohlcv_rows(panel) -> list[dict[str, list[float]]]:
+    rows = []
+    for i in range(len(panel.codes)):
+        valid = ~np.isnan(panel.closes[i])
+        rows.append({k: getattr(panel, k)[i][valid].tolist() for k in ("closes", "highs", "lows", "volumes")})
+    return rows
+
+
+@case("indicators")
+def indicators() -> dict[str, Any]:
+    """Scanner indicators over a 90-bar window: per-symbol scalar path vs one panel pass."""
+    from app.agents.market_scanner_indicators import compute_all_indicators
+    from app.services.backtest import compute_indicators
+
+    out: dict[str, Any] = {}
+    for n in (25, 200, 2000):
+        panel = bench_backtest.make_panel(n, 90)
+        rows = _ohlcv_rows(panel)
+        repeat = 3 if n >= 2000 else 5
+        out[f"scalar_{n}_ms"] = best_ms(lambda: [compute_all_indicators(r, r["closes"][-1]) for r in rows], repeat)
+        out[f"panel_{n}_ms"] = best_ms(lambda: compute_indicators(panel), repeat)
+    return out
+
+
+@case("composite")
+def composite() -> dict[str, Any]:
+    from app.agents.market_scanner_indicators import compute_all_indicators
+    from app.models.composite_score import compute_composite_score
+    from app.models.risk_config import RiskConfig
+    from app.services.backtest import ConstantScorer, composite_scores, compute_indicators
+
+    panel = bench_backtest.make_panel(200, 250)
+    technicals = [t for t in (compute_all_indicators(r, r["closes"][-1]) for r in _ohlcv_rows(panel)) if t]
+    experts = [{"view": v, "confidence": 0.7} for v in ("bullish", "bullish", "neutral", "bearish", "bullish")]
+    fins = {"per": 11.0, "roe": 12.5, "debt_ratio": 80.0, "operating_margin": 12.0}
+
+    def scalar() -> None:
+        for tech in technicals:
+            compute_composite_score(rr_score=1.4, expert_analyses=experts, dart_financials=fins, technicals=tech,
+                                    investor_trend={"foreign_net_buy": 1000, "institution_net_buy": -200})
+
+    ind = compute_indicators(panel)
+    scores = ConstantScorer(rr_score=1.4)(panel, ind)
+    config = RiskConfig()
+    return {
+        "symbols": len(technicals),
+        "scalar_200_ms": best_ms(scalar),
+        "panel_200x250_ms": best_ms(lambda: composite_scores(panel, ind, scores, config)),
+    }
+
+
+@case("event_bus")
+def event_bus() -> dict[str, Any]:
+    """200 publishes fanned out to N no-op subscribers (DB persistence excluded)."""
+    from app.agents.event_bus import AgentEvent, EventBus
+
+    async def noop(_event: AgentEvent) -> None:
+        return None
+
+    async def run() -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        for subs in (1, 10, 100):
+            bus = EventBus()
+            bus._persist_event = noop  # 저장은 db 케이스에서 따로 잰다
+            for _ in range(subs):
+                bus.subscribe("signal.generated", noop)
+            event = AgentEvent(event_type="signal.generated", agent_id="bench", data={"stock_code": "005930"})
+
+            async def publish_200() -> None:
+                for _ in range(200):
+                    await bus.publish(event)
+
+            out[f"publish_200x{subs}_subs_ms"] = await abest_ms(publish_200)
+        return out
+
+    return asyncio.run(run())
+
+
+@case("db")
+def db() -> dict[str, Any]:
+    async def run() -> dict[str, Any]:
+        async with temp_database() as db_module:
+            sql = "INSERT INTO agent_events (event_type, agent_id, data, timestamp) VALUES (?, ?, ?, ?)"
+
+            async def inserts() -> None:
+                for i in range(200):
+                    await db_module.execute_insert(sql, ("bench", "bench", '{"i": %d}' % i, "2026-01-01T00:00:00"))
+
+            async def query() -> None:
+                await db_module.execute_query("SELECT * FROM agent_events ORDER BY id DESC LIMIT 100")
+
+            return {"execute_insert_x200_ms": await abest_ms(inserts, 3),
+                    "execute_query_100_rows_ms": await abest_ms(query, 10)}
+
+    return asyncio.run(run())
+
+
+@case("kis_result")
+def kis_result() -> dict[str, Any]:
+    """MCP tool result parsing (bench_mcp_results): legacy double-JSON unwrap vs structured KisResult."""
+    out: dict[str, Any] = {}
+    for rows in (1, 30, 100):
+        r = bench_mcp_results.run(rows)
+        out[f"legacy_{rows}_rows_ms"] = round(r["legacy_us_per_call"] / 1000, 4)
+        out[f"structured_{rows}_rows_ms"] = round(r["structured_us_per_call"] / 1000, 4)
+    return out
+
+
+@case("risk_engine")
+def risk_engine() -> dict[str, Any]:
+    return {f"holdings_{n}_ms": bench_risk_engine.run(n)["min_ms"] for n in bench_risk_engine.HOLDINGS}
+
+
+@case("rollups")
+def rollups() -> dict[str, Any]:
+    r = bench_rollups.run(days=30)
+    q = r["1y"]  # days=30 이므로 전체 구간
+    return {
+        "snapshots": r["snapshots"],
+        "insert_rollup_per_1k_rows_ms": round(r["insert_rollup_us_per_row"], 2),
+        "drawdown_raw_ms": q["raw_ms"],
+        "drawdown_hourly_ms": q["hourly_ms"],
+        "drawdown_daily_ms": q["daily_ms"],
+    }
+
+
+@case("backtest")
+def backtest() -> dict[str, Any]:
+    r = bench_backtest.run(200, 500, sweep=False)
+    return {"trades": r["trades"], "indicators_200x500_ms": r["indicators_ms"], "run_200x500_ms": r["run_ms"]}
+
+
+@case("master_file")
+def master_file() -> dict[str, Any]:
+    """KOSPI master (kospi_code.mst) parsing in the MCP server — needs that server's deps (pandas, sqlalchemy)."""
+    sys.path.insert(0, str(MCP_SERVER_DIR))
+    try:
+        from module.plugin.master_file import MasterFileManager
+    except ImportError as e:
+        raise Skip(f"MCP 서버 의존성 없음 ({e.name})") from None
+    finally:
+        sys.path.remove(str(MCP_SERVER_DIR))
+
+    async def noop(*_: Any) -> None:
+        return None
+
+    manager = MasterFileManager.__new__(MasterFileManager)  # DB 연결 없이 가공 단계만
+    manager._log = lambda *_: None
+    ctx = SimpleNamespace(info=noop, warning=noop, error=noop)
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = Path(tmp) / "kospi.tmp"
+        lines = [f"{i:06d}   KR7{i:06d}003종목{i:04d}".ljust(61) + "ST" + "0" * 225 for i in range(2500)]
+        raw.write_text("\n".join(lines), encoding="cp949")
+        process = manager._MasterFileManager__process_domestic_stock_kospi
+        return {"rows": len(lines), "kospi_2500_rows_ms": best_ms(lambda: asyncio.run(process(str(raw), ctx)), 3)}
+
+
+@case("universe_snapshot")
+def universe_snapshot() -> dict[str, Any]:
+    """Stage-1 universe scoring: multprice feed + vectorized rank over the whole snapshot."""
+    from app.services.universe_snapshot import UniverseSnapshot
+
+    rng = np.random.default_rng(7)
+    out: dict[str, Any] = {}
+    for n in (200, 2000):
+        snap = UniverseSnapshot()
+        rows = [{"inter_shrn_iscd": f"{i:06d}", "inter2_prpr": str(int(p)), "prdy_ctrt": f"{c:.2f}",
+                 "acml_vol": str(int(v)), "acml_tr_pbmn": str(int(v * p))}
+                for i, (p, c, v) in enumerate(zip(rng.uniform(5e3, 3e5, n), rng.normal(0, 2, n),
+                                                  rng.lognormal(13, 1, n)))]
+        for i in range(n):
+            snap.set_volume_baseline(f"{i:06d}", float(rng.lognormal(13, 0.8)), "20260101")
+        codes = [r["inter_shrn_iscd"] for r in rows]
+        out[f"feed_{n}_ms"] = best_ms(lambda: snap.update_multprice(rows))
+        out[f"rank_{n}_ms"] = best_ms(lambda: snap.rank("volume_ratio:0.4,change_pct:0.4,turnover:0.2", codes))
+    return out
+
+
+@case("market_scanner")
+def market_scanner() -> dict[str, Any]:
+    """Full MarketScannerAgent.execute against the KIS simulator + canned Claude/DART/news."""
+    from app.agents.base import AgentContext
+    from app.agents.market_scanner import MarketScannerAgent
+    from benchmarks.stubs import session_market, stubbed_backends
+
+    async def run() -> dict[str, Any]:
+        async with temp_database() as db_module:
+            market = session_market()
+            for sym in market.symbols:
+                await db_module.execute_insert(
+                    """INSERT OR REPLACE INTO kospi200_components (stock_code, stock_name, sector, updated_at)
+                       VALUES (?, ?, ?, datetime('now'))""",
+                    (sym.code, sym.name, sym.sector),
+                )
+            async with stubbed_backends(market) as mcp:
+                agent = MarketScannerAgent()
+                result = None
+
+                async def scan() -> None:
+                    nonlocal result
+                    result = await agent.execute(AgentContext())
+
+                scan_ms = await abest_ms(scan, 3)
+            return {"scan_ms": scan_ms, "signals": len(result.data.get("signals", [])),
+                    "mcp_calls_per_scan": mcp.calls // 3}
+
+    return asyncio.run(run())
@@ -0,0 +1,163 @@
+"""Offline stand-ins for the scanner's external backends (MCP/KIS, Claude, DART, news).
+
+MCP 호출은 로컬 KIS 시뮬레이터 앱을 ASGI 로 직접 호출한 뒤, MCP 서버와 같은 열 단위
+structuredContent 로 바꿔 KisResult.from_content 를 거친다 — 네트워크만 빠지고 파싱
+경로는 실제와 같다.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from contextlib import ExitStack, asynccontextmanager
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+
+from app.services.kis_result import KisResult
+from kis_simulator import SimConfig, SimMarket, create_app
+
+QUOTATIONS = "/uapi/domestic-stock/v1/quotations"
+API_ROUTES = {
+    "inquire_price": (f"{QUOTATIONS}/inquire-price", "FHKST01010100"),
+    "inquire_daily_itemchartprice": (f"{QUOTATIONS}/inquire-daily-itemchartprice", "FHKST03010100"),
+    "intstock_multprice": (f"{QUOTATIONS}/intstock-multprice", "FHKST11300006"),
+    "volume_rank": (f"{QUOTATIONS}/volume-rank", "FHPST01710000"),
+    "fluctuation": ("/uapi/domestic-stock/v1/ranking/fluctuation", "FHPST01700000"),
+    "inquire_investor": (f"{QUOTATIONS}/inquire-investor", "FHKST01010900"),
+    "inquire_balance": ("/uapi/domestic-stock/v1/trading/inquire-balance", "VTTC8434R"),
+}
+
+
+def _columnar(output: Any) -> dict[str, Any]:
+    rows = output if isinstance(output, list) else [output]
+    names = list(rows[0]) if rows else []
+    return {"length": len(rows), "columns": {k: [r.get(k) for r in rows] for k in names}}
+
+
+def structured_content(api_type: str, body: dict) -> dict:
+    """KIS JSON 응답 → MCP 서버의 structuredContent 형태."""
+    outputs = {k: _columnar(v) for k, v in body.items() if k.startswith("output") and v}
+    kis = {k: body.get(k, "") for k in ("rt_cd", "msg_cd", "msg1")}
+    return {"ok": True, "data": {"success": kis["rt_cd"] == "0", "api_type": api_type, "outputs": outputs, "kis": kis}}
+
+
+def session_market(symbols: int = 200, seed: int = 42, minutes: float = 60) -> SimMarket:
+    """Seeded market with its clock frozen ``minutes`` into the session (당일 거래량이 0 이면 신뢰도 게이트에서 탈락)."""
+    clock = [0.0]
+    market = SimMarket(symbols=symbols, seed=seed, history_days=120, clock=lambda: clock[0])
+    clock[0] = minutes * 60
+    market.advance()
+    return market
+
+
+class SimulatorMCP:
+    """Drop-in for ``mcp_manager.call_tool_result`` backed by an in-process simulator."""
+
+    def __init__(self, market: SimMarket) -> None:
+        self.market = market
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=create_app(SimConfig(rate_limit=0), market)),
+            base_url="http://kis-sim",
+        )
+        self.calls = 0
+
+    async def call_tool_result(self, name: str, arguments: dict[str, Any]) -> KisResult:
+        self.calls += 1
+        api_type = arguments.get("api_type", "")
+        if api_type not in API_ROUTES:
+            return KisResult(ok=False, error=f"simulator: unsupported api_type {api_type}")
+        path, tr_id = API_ROUTES[api_type]
+        params = {k: v for k, v in (arguments.get("params") or {}).items() if k != "env_dv"}
+        params.update({k.upper(): v for k, v in params.items()})  # 실제 예제 코드는 대문자 키로 보낸다
+        resp = await self.client.get(path, params=params, headers={"tr_id": tr_id})
+        return KisResult.from_content(structured_content(api_type, resp.json()))
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class FakeAnthropic:
+    """``anthropic.AsyncAnthropic`` replacement that answers each prompt type with fixed JSON."""
+
+    latency_sec = 0.0
+
+    def __init__(self, **_: Any) -> None:
+        self.messages = self
+
+    async def create(self, **kwargs: Any) -> SimpleNamespace:
+        if self.latency_sec:
+            await asyncio.sleep(self.latency_sec)
+        prompt = kwargs["messages"][-1]["content"]
+        if "Chief Market Analyst" in prompt:
+            text = "```json\n" + json.dumps({
+                "direction": "buy",
+                "bull": {"label": "강세", "price_target": 0, "upside_pct": 18.0, "probability": 0.4},
+                "base": {"label": "기본", "price_target": 0, "upside_pct": 6.0, "probability": 0.4},
+                "bear": {"label": "약세", "price_target": 0, "upside_pct": -7.0, "probability": 0.2},
+                "variant_view": "RSI 48, 외국인 5일 순매수 전환 — 컨센서스 대비 2분기 영업이익률 과소평가",
+                "expert_stances": {"기술적 분석가": "bullish", "모멘텀 트레이더": "bullish",
+                                   "리스크 평가자": "neutral", "포트폴리오 전략가": "bullish"},
+            }, ensure_ascii=False) + "\n```"
+        elif "품질 검토자" in prompt:
+            text = json.dumps({"check4_result": "PASS", "check4_reason": "이견 존재",
+                               "check5_result": "PASS", "check5_reason": "구체적 수치"})
+        else:
+            view = "neutral" if "리스크" in prompt[:40] else "bullish"
+            text = json.dumps({"view": view, "key_signals": ["MA 정배열", "거래량 증가"], "confidence": 0.7,
+                               "concern": None}, ensure_ascii=False)
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=text)], model=kwargs.get("model", "stub"),
+            stop_reason="end_turn", usage=SimpleNamespace(input_tokens=len(prompt) // 3, output_tokens=len(text) // 3),
+        )
+
+
+FINANCIALS = {
+    "dart_revenue": 1.2e12, "dart_operating_profit": 1.5e11, "dart_per": 11.0, "dart_pbr": 1.1,
+    "dart_roe": 12.5, "dart_debt_ratio": 80.0, "dart_operating_margin": 12.0, "dart_eps_yoy_pct": 8.0,
+}
+
+
+@asynccontextmanager
+async def stubbed_backends(market: SimMarket) -> AsyncIterator[SimulatorMCP]:
+    """Route MCP to the simulator and replace Claude/DART/news with canned answers for the duration."""
+    import anthropic
+
+    from app.agents import market_scanner
+    from app.services import news_service
+    from app.services.dart_client import dart_client
+    from app.services.mcp_client import mcp_manager
+
+    async def dart_fetch(stock_code: str, current_price: float = 0) -> dict:
+        return dart_client._build_result(dict(FINANCIALS), True)
+
+    async def no_rows(*_: Any, **__: Any) -> list:
+        return []
+
+    async def no_cash_flow(*_: Any, **__: Any) -> None:
+        return None
+
+    async def no_news(stocks: list[tuple[str, str]], max_items: int = 5) -> dict[str, dict]:
+        return {code: {"headlines": [], "sentiment": "neutral", "summary": "", "source": "stub"} for _, code in stocks}
+
+    mcp = SimulatorMCP(market)
+    with ExitStack() as stack:
+        for obj, name, value in (
+            (mcp_manager, "call_tool_result", mcp.call_tool_result),
+            (anthropic, "AsyncAnthropic", FakeAnthropic),
+            (dart_client, "fetch", dart_fetch),
+            (dart_client, "fetch_insider_trades", no_rows),
+            (dart_client, "fetch_cash_flow", no_cash_flow),
+            (news_service, "fetch_news_batch", no_news),
+            (market_scanner, "fetch_news_batch", no_news),
+        ):
+            if name in vars(obj):
+                stack.callback(setattr, obj, name, vars(obj)[name])
+            else:  # 인스턴스에 가린 메서드는 지워서 클래스 메서드로 되돌린다
+                stack.callback(delattr, obj, name)
+            setattr(obj, name, value)
+        try:
+            yield mcp
+        finally:
+            await mcp.aclose()
@@ -0,0 +1,184 @@
+"""Benchmark suite runner: times every case in benchmarks.cases, writes JSON, gates on a stored baseline.
+
+    cd backend && python -m benchmarks.suite                          # 전체 실행 + baseline 비교
+    python -m benchmarks.suite --only indicators,event_bus             # 일부 케이스만
+    python -m benchmarks.suite --threshold 0.5 --out results.json      # 허용 회귀폭 / 결과 파일
+    python -m benchmarks.suite --update-baseline                       # 현재 결과로 baseline 갱신
+
+baseline 보다 ``threshold`` (기본 25%) 이상 느려진 ``*_ms`` 지표가 하나라도 있으면 종료 코드 1.
+회귀로 보이는 케이스는 --retries 만큼 다시 돌려 가장 빠른 값으로 판정한다 (일시적 부하 걸러내기).
+baseline 은 측정한 머신에 묶이므로 저장소에 두지 않는다 (.gitignore). 없으면 첫 실행 결과를
+그 머신의 baseline 으로 기록하고 통과시키며, 하드웨어가 바뀌면 --update-baseline 으로 다시 만든다.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import traceback
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from benchmarks.cases import CASES, Skip
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.25
+# 타이머 해상도/스케줄링 잡음 — 이보다 작은 절대 증가는 회귀로 보지 않는다
+MIN_DELTA_MS = 0.005
+
+
+@dataclass(frozen=True)
+class Regression:
+    metric: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ms / self.baseline_ms if self.baseline_ms else float("inf")
+
+
+def run_cases(names: list[str] | None = None) -> dict[str, Any]:
+    """Run the selected cases (all by default); failures and skips are recorded, not raised."""
+    report: dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": f"{platform.system()} {platform.machine()}",
+        },
+        "results": {},
+        "skipped": {},
+        "errors": {},
+    }
+    for name in names or list(CASES):
+        if name not in CASES:
+            report["errors"][name] = "unknown case"
+            continue
+        print(f"  {name} ...", end="", flush=True)
+        try:
+            report["results"][name] = CASES[name]()
+            print(" ok")
+        except Skip as e:
+            report["skipped"][name] = str(e)
+            print(f" skipped ({e})")
+        except Exception as e:
+            report["errors"][name] = f"{type(e).__name__}: {e}"
+            print(" error")
+            traceback.print_exc()
+    return report
+
+
+def timings(report: dict[str, Any]) -> dict[str, float]:
+    """Flatten to {"case.metric_ms": value} — the values the baseline gate compares."""
+    return {
+        f"{case}.{metric}": float(value)
+        for case, metrics in report.get("results", {}).items()
+        for metric, value in metrics.items()
+        if metric.endswith("_ms")
+    }
+
+
+def compare(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_ms: float = MIN_DELTA_MS,
+) -> list[Regression]:
+    """Metrics that got slower than baseline by more than ``threshold`` (fraction). New/missing metrics are ignored."""
+    now, base = timings(current), timings(baseline)
+    regressions = []
+    for metric, value in now.items():
+        ref = base.get(metric)
+        if ref is None:
+            continue
+        if value > ref * (1 + threshold) and value - ref > min_delta_ms:
+            regressions.append(Regression(metric, ref, value))
+    return regressions
+
+
+def merge_best(report: dict[str, Any], rerun: dict[str, Any]) -> None:
+    """Keep the faster value of each ``*_ms`` metric from a confirmation re-run (in place)."""
+    for case, metrics in rerun.get("results", {}).items():
+        current = report["results"].setdefault(case, {})
+        for metric, value in metrics.items():
+            if metric.endswith("_ms") and metric in current:
+                current[metric] = min(current[metric], value)
+
+
+def _print_table(report: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    base = timings(baseline) if baseline else {}
+    for metric, value in timings(report).items():
+        ref = base.get(metric)
+        delta = f"{(value / ref - 1) * 100:+7.1f}%" if ref else "      —"
+        print(f"  {metric:<52} {value:>12.3f}ms  {delta}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks.suite", description=__doc__.splitlines()[0])
+    parser.add_argument("--only", help="comma-separated case names (default: all)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--out", type=Path, help="write this run's results JSON here")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction (0.25 = 25%%)")
+    parser.add_argument("--retries", type=int, default=3,
+                        help="re-run regressed cases (or, with --update-baseline, every case) this many times "
+                             "and keep the best time (noise filter)")
+    parser.add_argument("--update-baseline", action="store_true", help="save this run as the new baseline")
+    parser.add_argument("--list", action="store_true", help="list case names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(CASES))
+        return 0
+
+    names = [n.strip() for n in args.only.split(",")] if args.only else None
+    print(f"benchmark suite ({len(names or CASES)} cases)")
+    report = run_cases(names)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    if baseline is None and not args.update_baseline:
+        print(f"no baseline at {args.baseline} — recording this run as this machine's baseline")
+        args.update_baseline = True
+    if args.update_baseline:
+        # baseline 도 같은 방식(여러 번 중 최솟값)으로 잡아야 비교가 공정하다
+        for _ in range(args.retries):
+            merge_best(report, run_cases(list(report["results"])))
+    elif baseline is not None:
+        for _ in range(args.retries):
+            suspects = sorted({r.metric.split(".")[0] for r in compare(report, baseline, args.threshold)})
+            if not suspects:
+                break
+            print(f"confirming {', '.join(suspects)}")
+            merge_best(report, run_cases(suspects))
+    _print_table(report, baseline)
+    if args.out:
+        args.out.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n")
+        print(f"results → {args.out}")
+
+    if args.update_baseline:
+        merged = baseline or {"results": {}}
+        merged["meta"] = report["meta"]
+        merged["results"].update(report["results"])  # --only 실행은 해당 케이스만 갱신
+        args.baseline.write_text(json.dumps(merged, ensure_ascii=False, indent=2) + "\n")
+        print(f"baseline updated → {args.baseline}")
+        return 1 if report["errors"] else 0
+
+    regressions = compare(report, baseline, args.threshold)
+    for r in regressions:
+        print(f"REGRESSION {r.metric}: {r.baseline_ms:.3f}ms → {r.current_ms:.3f}ms (x{r.ratio:.2f})")
+    if report["errors"]:
+        print(f"errors: {', '.join(report['errors'])}")
+    if regressions or report["errors"]:
+        return 1
+    print(f"no regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+"""Local KIS OpenAPI simulator for load tests and offline development.
+
+    cd backend && python -m kis_simulator --port 9443
+"""
+from kis_simulator.market import SimMarket
+from kis_simulator.server import SimConfig, create_app
+
+__all__ = ["SimConfig", "SimMarket", "create_app"]
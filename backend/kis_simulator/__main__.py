@@ -0,0 +1,36 @@
+"""CLI: python -m kis_simulator [--port 9443] [--latency-ms 30] [--rate-limit 20] ..."""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+
+import uvicorn
+
+from kis_simulator.server import KisHttpProtocol, SimConfig, create_app
+
+YAML_HINT = """\
+# ~/KIS/config/kis_devlp.yaml — 모의투자(vps/vops) 주소를 시뮬레이터로
+vps: "http://{host}:{port}"
+vops: "ws://{host}:{port}"
+# MCP 서버는 .env 로도 지정 가능
+# KIS_URL_REST_PAPER=http://{host}:{port}
+# KIS_URL_WS_PAPER=ws://{host}:{port}
+"""
+
+
+def main() -> None:
+    defaults = SimConfig()
+    parser = argparse.ArgumentParser(prog="kis_simulator", description="Local KIS OpenAPI simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9443)
+    for f in dataclasses.fields(SimConfig):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=type(getattr(defaults, f.name)),
+                            default=getattr(defaults, f.name))
+    args = parser.parse_args()
+    config = SimConfig(**{f.name: getattr(args, f.name) for f in dataclasses.fields(SimConfig)})
+    print(YAML_HINT.format(host=args.host, port=args.port))
+    uvicorn.run(create_app(config), host=args.host, port=args.port, http=KisHttpProtocol, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Seeded random-walk market and paper account for the KIS simulator.
+
+가격 경로는 seed 와 틱 번호만으로 결정된다 (요청 타이밍과 무관). 가격/거래량/수급은
+각각 별도 난수 생성기를 써서, 틱을 몇 번에 나눠 진행하든 같은 경로가 나온다.
+"""
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+# 잘 알려진 종목 몇 개 + 합성 종목 (900000~) 으로 유니버스 구성
+KNOWN_SYMBOLS = [
+    ("005930", "삼성전자", "전기전자"),
+    ("000660", "SK하이닉스", "전기전자"),
+    ("005380", "현대차", "운수장비"),
+    ("035420", "NAVER", "서비스업"),
+    ("051910", "LG화학", "화학"),
+    ("006400", "삼성SDI", "전기전자"),
+    ("035720", "카카오", "서비스업"),
+    ("068270", "셀트리온", "의약품"),
+    ("105560", "KB금융", "금융업"),
+    ("055550", "신한지주", "금융업"),
+]
+SECTORS = ["전기전자", "화학", "금융업", "서비스업", "운수장비", "의약품", "철강금속", "유통업", "건설업", "음식료품"]
+
+COMMISSION_PCT = 0.015
+SELL_TAX_PCT = 0.18
+PRICE_LIMIT_PCT = 30.0
+
+
+def tick_size(price: float) -> int:
+    """KRX 호가단위."""
+    for bound, unit in ((2000, 1), (5000, 5), (20000, 10), (50000, 50), (200000, 100), (500000, 500)):
+        if price < bound:
+            return unit
+    return 1000
+
+
+def to_tick(price: float) -> int:
+    unit = tick_size(price)
+    return int(round(price / unit) * unit)
+
+
+def business_days(end: date, count: int) -> list[date]:
+    """``count`` weekdays ending the day before ``end`` (oldest first)."""
+    days: list[date] = []
+    d = end
+    while len(days) < count:
+        d -= timedelta(days=1)
+        if d.weekday() < 5:
+            days.append(d)
+    return days[::-1]
+
+
+@dataclass
+class Symbol:
+    code: str
+    name: str
+    sector: str
+    listed_shares: int
+    # 일봉 이력 (오래된 순): date, open, high, low, close, volume
+    history: list[tuple[str, int, int, int, int, int]] = field(default_factory=list)
+    flows: list[tuple[int, int, int]] = field(default_factory=list)  # (개인, 외국인, 기관) 순매수 수량
+
+
+@dataclass
+class Holding:
+    qty: int
+    avg_price: float
+    today_buy: int = 0
+    today_sell: int = 0
+
+
+@dataclass
+class RestingOrder:
+    odno: str
+    code: str
+    side: str  # "buy" | "sell"
+    qty: int
+    price: int
+
+
+class SimMarket:
+    """Universe, intraday tick state and one paper account.
+
+    clock: 초 단위 현재 시각을 돌려주는 함수 (테스트에서는 가짜 시계를 주입).
+    """
+
+    def __init__(
+        self,
+        symbols: int = 200,
+        seed: int = 42,
+        history_days: int = 1300,
+        tick_sec: float = 1.0,
+        cash: float = 100_000_000,
+        clock: Callable[[], float] = time.monotonic,
+        today: date | None = None,
+    ) -> None:
+        self.seed = seed
+        self.tick_sec = tick_sec
+        self.clock = clock
+        self.today = today or date.today()
+        self._rng_setup = np.random.default_rng(seed)
+        self._rng_price = np.random.default_rng(seed + 1)
+        self._rng_volume = np.random.default_rng(seed + 2)
+
+        self.symbols: list[Symbol] = []
+        self.index: dict[str, int] = {}
+        for i in range(symbols):
+            if i < len(KNOWN_SYMBOLS):
+                code, name, sector = KNOWN_SYMBOLS[i]
+            else:
+                code, name, sector = f"{900000 + i:06d}", f"시뮬{i:03d}", SECTORS[i % len(SECTORS)]
+            shares = int(self._rng_setup.integers(10, 600)) * 1_000_000
+            self.symbols.append(Symbol(code, name, sector, shares))
+            self.index[code] = i
+
+        n = len(self.symbols)
+        self.vol = self._rng_setup.uniform(0.012, 0.03, n)  # 일간 변동성
+        self.base_volume = self._rng_setup.lognormal(13, 0.8, n)
+        self._build_history(history_days)
+
+        self.prev_close = np.array([s.history[-1][4] for s in self.symbols], dtype=np.float64)
+        self.price = self.prev_close.copy()
+        self.open = np.full(n, np.nan)
+        self.high = self.price.copy()
+        self.low = self.price.copy()
+        self.volume = np.zeros(n, dtype=np.int64)
+        self.turnover = np.zeros(n, dtype=np.float64)
+        self.last_qty = np.zeros(n, dtype=np.int64)
+        self.ticks = 0
+        self._t0 = clock()
+        # 틱 간격당 변동성 (장 6.5시간 기준)
+        self._tick_vol = self.vol * math.sqrt(tick_sec / (6.5 * 3600))
+
+        self.cash = float(cash)
+        self.holdings: dict[str, Holding] = {}
+        self.resting: list[RestingOrder] = []
+        self.today_buy_amt = 0.0
+        self.today_sell_amt = 0.0
+        self._odno = 0
+
+    # ── history ──
+
+    def _build_history(self, days: int) -> None:
+        n = len(self.symbols)
+        dates = business_days(self.today, days)
+        rng = self._rng_setup
+        start = rng.uniform(5_000, 300_000, n)
+        returns = rng.normal(0.0002, 1.0, (days, n)) * self.vol
+        closes = start * np.cumprod(1 + returns, axis=0)
+        opens = closes / (1 + returns) * (1 + rng.normal(0, 0.3, (days, n)) * self.vol)
+        highs = np.maximum(opens, closes) * (1 + np.abs(rng.normal(0, 0.4, (days, n))) * self.vol)
+        lows = np.minimum(opens, closes) * (1 - np.abs(rng.normal(0, 0.4, (days, n))) * self.vol)
+        volumes = self.base_volume * rng.lognormal(0, 0.5, (days, n))
+        flow = rng.normal(0, 0.05, (days, n, 2)) * volumes[:, :, None]
+        for i, sym in enumerate(self.symbols):
+            sym.history = [
+                (d.strftime("%Y%m%d"), to_tick(o), to_tick(h), to_tick(lo), to_tick(c), int(v))
+                for d, o, h, lo, c, v in zip(dates, opens[:, i], highs[:, i], lows[:, i], closes[:, i], volumes[:, i])
+            ]
+            frgn, orgn = flow[:, i, 0].astype(np.int64), flow[:, i, 1].astype(np.int64)
+            sym.flows = [(int(-f - o), int(f), int(o)) for f, o in zip(frgn, orgn)]
+
+    # ── clock ──
+
+    def advance(self) -> int:
+        """Catch the intraday walk up to the clock; returns ticks applied."""
+        target = int((self.clock() - self._t0) / self.tick_sec)
+        steps = target - self.ticks
+        if steps <= 0:
+            return 0
+        n = len(self.symbols)
+        shocks = self._rng_price.standard_normal((steps, n)) * self._tick_vol
+        qty = (self._rng_volume.lognormal(0, 1.0, (steps, n)) * self.base_volume / 23_400 * self.tick_sec).astype(np.int64) + 1
+        upper, lower = self.prev_close * (1 + PRICE_LIMIT_PCT / 100), self.prev_close * (1 - PRICE_LIMIT_PCT / 100)
+        path = np.clip(self.price * np.cumprod(1 + shocks, axis=0), lower, upper)
+        if np.isnan(self.open).any():
+            self.open = np.where(np.isnan(self.open), path[0], self.open)
+        self.high = np.maximum(self.high, path.max(axis=0))
+        self.low = np.minimum(self.low, path.min(axis=0))
+        self.volume += qty.sum(axis=0)
+        self.turnover += (path * qty).sum(axis=0)
+        self.last_qty = qty[-1]
+        self.price = path[-1]
+        self.ticks = target
+        if self.resting:
+            self._match_resting(path)
+        return steps
+
+    def quote(self, code: str) -> dict:
+        """Rounded intraday state for one symbol (advance() first)."""
+        i = self.index[code]
+        price = to_tick(self.price[i])
+        prev = int(self.prev_close[i])
+        opened = not math.isnan(self.open[i])
+        return {
+            "symbol": self.symbols[i],
+            "price": price,
+            "prev_close": prev,
+            "open": to_tick(self.open[i]) if opened else price,
+            "high": max(to_tick(self.high[i]), price),
+            "low": min(to_tick(self.low[i]), price),
+            "volume": int(self.volume[i]),
+            "turnover": int(self.turnover[i]),
+            "last_qty": int(self.last_qty[i]),
+            "change": price - prev,
+            "change_pct": round((price / prev - 1) * 100, 2) if prev else 0.0,
+            "upper_limit": to_tick(prev * (1 + PRICE_LIMIT_PCT / 100)),
+            "lower_limit": to_tick(prev * (1 - PRICE_LIMIT_PCT / 100)),
+        }
+
+    def daily_bars(self, code: str) -> list[tuple[str, int, int, int, int, int]]:
+        """History plus today's in-progress bar (oldest first)."""
+        q = self.quote(code)
+        today = (self.today.strftime("%Y%m%d"), q["open"], q["high"], q["low"], q["price"], q["volume"])
+        return self.symbols[self.index[code]].history + [today]
+
+    # ── account ──
+
+    def _next_odno(self) -> str:
+        self._odno += 1
+        return f"{self._odno:010d}"
+
+    def buyable_qty(self, price: float) -> int:
+        if price <= 0:
+            return 0
+        return int(self.cash // (price * (1 + COMMISSION_PCT / 100)))
+
+    def place_order(self, code: str, side: str, qty: int, price: int, market: bool) -> tuple[str | None, str]:
+        """Returns (odno, error message). Marketable orders fill now, others rest."""
+        if code not in self.index:
+            return None, "종목코드가 올바르지 않습니다."
+        if qty <= 0:
+            return None, "주문수량을 확인하세요."
+        current = self.quote(code)["price"]
+        limit = current if market or price <= 0 else price
+        if side == "buy":
+            if self.buyable_qty(limit) < qty:
+                return None, "주문가능금액을 초과 했습니다"
+        else:
+            held = self.holdings.get(code)
+            reserved = sum(o.qty for o in self.resting if o.code == code and o.side == "sell")
+            if held is None or held.qty - reserved < qty:
+                return None, "주문 가능한 수량을 초과하였습니다."
+
+        odno = self._next_odno()
+        marketable = market or (side == "buy" and limit >= current) or (side == "sell" and limit <= current)
+        if marketable:
+            self._fill(code, side, qty, current if market else limit)
+        else:
+            if side == "buy":
+                self.cash -= qty * limit * (1 + COMMISSION_PCT / 100)  # 예약 (체결 시 정산)
+            self.resting.append(RestingOrder(odno, code, side, qty, limit))
+        return odno, ""
+
+    def _fill(self, code: str, side: str, qty: int, price: float, reserved: bool = False) -> None:
+        amount = qty * price
+        if side == "buy":
+            if not reserved:
+                self.cash -= amount * (1 + COMMISSION_PCT / 100)
+            held = self.holdings.get(code) or Holding(0, 0.0)
+            total = held.qty + qty
+            held.avg_price = (held.avg_price * held.qty + amount) / total
+            held.qty, held.today_buy = total, held.today_buy + qty
+            self.holdings[code] = held
+            self.today_buy_amt += amount
+        else:
+            held = self.holdings[code]
+            held.qty -= qty
+            held.today_sell += qty
+            self.cash += amount * (1 - (COMMISSION_PCT + SELL_TAX_PCT) / 100)
+            self.today_sell_amt += amount
+            if held.qty == 0:
+                del self.holdings[code]
+
+    def _match_resting(self, path: np.ndarray) -> None:
+        low, high = path.min(axis=0), path.max(axis=0)
+        still = []
+        for order in self.resting:
+            i = self.index[order.code]
+            if order.side == "buy" and low[i] <= order.price:
+                self._fill(order.code, "buy", order.qty, order.price, reserved=True)
+            elif order.side == "sell" and high[i] >= order.price:
+                self._fill(order.code, "sell", order.qty, order.price)
+            else:
+                still.append(order)
+        self.resting = still
+
+    def stamp(self) -> tuple[str, str]:
+        """(YYYYMMDD, HHMMSS) for frames and order timestamps."""
+        now = datetime.now()
+        return self.today.strftime("%Y%m%d"), now.strftime("%H%M%S")
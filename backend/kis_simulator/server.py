@@ -0,0 +1,532 @@
+"""FastAPI app that speaks the KIS REST/WebSocket wire format for the endpoints the agents use.
+
+응답 본문은 실제 API 와 같이 모든 숫자를 문자열로 내려주고, rt_cd/msg_cd/msg1 과
+output(output1/output2) 구조를 따른다. kis_auth 는 응답 헤더 중 소문자 키를
+namedtuple 필드로 쓰므로, 표준 헤더는 실제 서버처럼 `Content-Type` 으로 보내야 한다
+(uvicorn 은 헤더 이름을 소문자로 바꾸므로 KisHttpProtocol 이 되돌린다).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import secrets
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response
+from uvicorn.protocols.http.httptools_impl import HttpToolsProtocol
+
+from kis_simulator.market import SimMarket, tick_size
+
+logger = logging.getLogger(__name__)
+
+QUOTATIONS = "/uapi/domestic-stock/v1/quotations"
+TRADING = "/uapi/domestic-stock/v1/trading"
+RANK_ROWS = 30  # 순위 API 는 최대 30건
+CHART_ROWS = 100  # 기간별 시세는 호출당 최대 100건
+MULTPRICE_CODES = 30  # 관심종목 멀티시세는 호출당 최대 30종목
+MAX_WS_SUBSCRIPTIONS = 41
+
+CCNL_COLUMNS = [
+    "MKSC_SHRN_ISCD", "STCK_CNTG_HOUR", "STCK_PRPR", "PRDY_VRSS_SIGN",
+    "PRDY_VRSS", "PRDY_CTRT", "WGHN_AVRG_STCK_PRC", "STCK_OPRC",
+    "STCK_HGPR", "STCK_LWPR", "ASKP1", "BIDP1", "CNTG_VOL", "ACML_VOL",
+    "ACML_TR_PBMN", "SELN_CNTG_CSNU", "SHNU_CNTG_CSNU", "NTBY_CNTG_CSNU",
+    "CTTR", "SELN_CNTG_SMTN", "SHNU_CNTG_SMTN", "CCLD_DVSN", "SHNU_RATE",
+    "PRDY_VOL_VRSS_ACML_VOL_RATE", "OPRC_HOUR", "OPRC_VRSS_PRPR_SIGN",
+    "OPRC_VRSS_PRPR", "HGPR_HOUR", "HGPR_VRSS_PRPR_SIGN", "HGPR_VRSS_PRPR",
+    "LWPR_HOUR", "LWPR_VRSS_PRPR_SIGN", "LWPR_VRSS_PRPR", "BSOP_DATE",
+    "NEW_MKOP_CLS_CODE", "TRHT_YN", "ASKP_RSQN1", "BIDP_RSQN1",
+    "TOTAL_ASKP_RSQN", "TOTAL_BIDP_RSQN", "VOL_TNRT",
+    "PRDY_SMNS_HOUR_ACML_VOL", "PRDY_SMNS_HOUR_ACML_VOL_RATE",
+    "HOUR_CLS_CODE", "MRKT_TRTM_CLS_CODE", "VI_STND_PRC",
+]
+ASKING_COLUMNS = (
+    ["MKSC_SHRN_ISCD", "BSOP_HOUR", "HOUR_CLS_CODE"]
+    + [f"ASKP{i}" for i in range(1, 11)] + [f"BIDP{i}" for i in range(1, 11)]
+    + [f"ASKP_RSQN{i}" for i in range(1, 11)] + [f"BIDP_RSQN{i}" for i in range(1, 11)]
+    + ["TOTAL_ASKP_RSQN", "TOTAL_BIDP_RSQN", "OVTM_TOTAL_ASKP_RSQN", "OVTM_TOTAL_BIDP_RSQN",
+       "ANTC_CNPR", "ANTC_CNQN", "ANTC_VOL", "ANTC_CNTG_VRSS", "ANTC_CNTG_VRSS_SIGN",
+       "ANTC_CNTG_PRDY_CTRT", "ACML_VOL", "TOTAL_ASKP_RSQN_ICDC", "TOTAL_BIDP_RSQN_ICDC",
+       "OVTM_TOTAL_ASKP_ICDC", "OVTM_TOTAL_BIDP_ICDC", "STCK_DEAL_CLS_CODE"]
+)
+
+
+@dataclass
+class SimConfig:
+    """Simulator knobs (CLI: python -m kis_simulator --help)."""
+
+    seed: int = 42
+    symbols: int = 200
+    history_days: int = 1300
+    tick_sec: float = 1.0
+    cash: float = 100_000_000
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    rate_limit: float = 20.0  # 앱키당 초당 요청 수 (0 = 무제한)
+    ws_interval_sec: float = 1.0
+    ws_ping_sec: float = 30.0
+
+
+class _KisResponse(Response):
+    media_type = "application/json;charset=UTF-8"
+
+    def __init__(self, body: dict, status_code: int = 200, headers: dict[str, str] | None = None) -> None:
+        super().__init__(json.dumps(body, ensure_ascii=False).encode("utf-8"), status_code, headers)
+
+
+def canonical_header_case(data: bytes) -> bytes:
+    """Title-case hyphenated header names in an HTTP/1.1 status block (content-type → Content-Type).
+
+    tr_id/tr_cont 처럼 식별자로 쓸 수 있는 이름은 소문자 그대로 둔다.
+    """
+    if not data.startswith(b"HTTP/1.1 "):
+        return data
+    head, sep, body = data.partition(b"\r\n\r\n")
+    lines = head.split(b"\r\n")
+    for n, line in enumerate(lines[1:], 1):
+        name, colon, value = line.partition(b":")
+        if colon and b"-" in name:
+            lines[n] = b"-".join(part.capitalize() for part in name.split(b"-")) + colon + value
+    return b"\r\n".join(lines) + sep + body
+
+
+class _HeaderCaseTransport:
+    def __init__(self, transport) -> None:
+        self._transport = transport
+
+    def write(self, data: bytes) -> None:
+        self._transport.write(canonical_header_case(data))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._transport, name)
+
+
+class KisHttpProtocol(HttpToolsProtocol):
+    """uvicorn ``http=`` protocol that keeps KIS-style header casing on the wire."""
+
+    def connection_made(self, transport) -> None:  # type: ignore[override]
+        super().connection_made(_HeaderCaseTransport(transport))
+
+
+def _ok(tr_id: str, tr_cont: str = "", **outputs: Any) -> _KisResponse:
+    body = {"rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리 되었습니다.", **outputs}
+    return _KisResponse(body, headers={"tr_id": tr_id, "tr_cont": tr_cont, "gt_uid": secrets.token_hex(16)})
+
+
+def _error(tr_id: str, msg_cd: str, msg1: str, status_code: int = 200) -> _KisResponse:
+    return _KisResponse({"rt_cd": "1", "msg_cd": msg_cd, "msg1": msg1}, status_code, {"tr_id": tr_id, "tr_cont": ""})
+
+
+def _sign(change: float) -> str:
+    """전일대비부호: 2 상승, 3 보합, 5 하락."""
+    return "2" if change > 0 else "5" if change < 0 else "3"
+
+
+class _Throttle:
+    """Token bucket per appkey — 초과 시 KIS 와 같은 EGW00201."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def allow(self, key: str) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        tokens, last = self._buckets.get(key, (self.rate, now))
+        tokens = min(self.rate, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return False
+        self._buckets[key] = (tokens - 1, now)
+        return True
+
+
+def create_app(config: SimConfig | None = None, market: SimMarket | None = None) -> FastAPI:
+    config = config or SimConfig()
+    market = market or SimMarket(
+        symbols=config.symbols, seed=config.seed, history_days=config.history_days,
+        tick_sec=config.tick_sec, cash=config.cash,
+    )
+    app = FastAPI(title="KIS simulator", docs_url=None, redoc_url=None)
+    app.state.market = market
+    app.state.stats = Counter()
+    throttle = _Throttle(config.rate_limit)
+    jitter = random.Random(config.seed)
+
+    @app.middleware("http")
+    async def latency_and_throttle(request: Request, call_next):
+        path = request.url.path
+        if path.startswith("/uapi/"):
+            app.state.stats[path] += 1
+            if not throttle.allow(request.headers.get("appkey", "")):
+                app.state.stats["throttled"] += 1
+                return _error(request.headers.get("tr_id", ""), "EGW00201", "초당 거래건수를 초과하였습니다.", 500)
+            delay = config.latency_ms + jitter.random() * config.jitter_ms
+            if delay > 0:
+                await asyncio.sleep(delay / 1000)
+            market.advance()
+        return await call_next(request)
+
+    # ── auth ──
+
+    @app.post("/oauth2/tokenP")
+    async def token() -> _KisResponse:
+        expires = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")
+        return _KisResponse({
+            "access_token": secrets.token_urlsafe(48),
+            "access_token_token_expired": expires,
+            "token_type": "Bearer",
+            "expires_in": 86400,
+        })
+
+    @app.post("/oauth2/Approval")
+    async def approval() -> _KisResponse:
+        return _KisResponse({"approval_key": secrets.token_hex(18)})
+
+    @app.get("/sim/stats")
+    async def stats() -> dict:
+        return {"ticks": market.ticks, "requests": dict(app.state.stats)}
+
+    # ── quotations ──
+
+    @app.get(f"{QUOTATIONS}/inquire-price")
+    async def inquire_price(request: Request) -> _KisResponse:
+        code = request.query_params.get("FID_INPUT_ISCD", "")
+        if code not in market.index:
+            return _error("FHKST01010100", "MCA01000", "종목코드 오류입니다.")
+        q = market.quote(code)
+        sym = q["symbol"]
+        hist = sym.history[-250:]
+        return _ok("FHKST01010100", output={
+            "iscd_stat_cls_code": "55",
+            "marg_rate": "20.00",
+            "rprs_mrkt_kor_name": "KOSPI200",
+            "bstp_kor_isnm": sym.sector,
+            "temp_stop_yn": "N",
+            "stck_shrn_iscd": code,
+            "stck_prpr": str(q["price"]),
+            "prdy_vrss": str(q["change"]),
+            "prdy_vrss_sign": _sign(q["change"]),
+            "prdy_ctrt": f"{q['change_pct']:.2f}",
+            "acml_tr_pbmn": str(q["turnover"]),
+            "acml_vol": str(q["volume"]),
+            "prdy_vrss_vol_rate": f"{q['volume'] / max(sym.history[-1][5], 1) * 100:.2f}",
+            "stck_oprc": str(q["open"]),
+            "stck_hgpr": str(q["high"]),
+            "stck_lwpr": str(q["low"]),
+            "stck_mxpr": str(q["upper_limit"]),
+            "stck_llam": str(q["lower_limit"]),
+            "stck_sdpr": str(q["prev_close"]),
+            "wghn_avrg_stck_prc": f"{q['turnover'] / q['volume']:.2f}" if q["volume"] else str(q["price"]),
+            "hts_frgn_ehrt": "25.00",
+            "frgn_ntby_qty": str(sym.flows[-1][1]),
+            "per": "12.50",
+            "pbr": "1.20",
+            "eps": str(int(q["price"] / 12.5)),
+            "bps": str(int(q["price"] / 1.2)),
+            "w52_hgpr": str(max(b[2] for b in hist)),
+            "w52_lwpr": str(min(b[3] for b in hist)),
+            "hts_avls": str(int(q["price"] * sym.listed_shares / 100_000_000)),
+            "lstn_stcn": str(sym.listed_shares),
+            "vol_tnrt": f"{q['volume'] / sym.listed_shares * 100:.2f}",
+            "aspr_unit": str(tick_size(q["price"])),
+        })
+
+    @app.get(f"{QUOTATIONS}/intstock-multprice")
+    async def intstock_multprice(request: Request) -> _KisResponse:
+        p = request.query_params
+        codes = [p.get(f"FID_INPUT_ISCD_{n}", "") for n in range(1, MULTPRICE_CODES + 1)]
+        output = []
+        for code in (c for c in codes if c in market.index):
+            q = market.quote(code)
+            output.append({
+                "kospi_kosdaq_cls_name": "코스피", "mrkt_trtm_cls_name": "", "hour_cls_code": "0",
+                "inter_shrn_iscd": code, "inter_kor_isnm": q["symbol"].name,
+                "inter2_prpr": str(q["price"]), "inter2_prdy_vrss": str(q["change"]),
+                "prdy_vrss_sign": _sign(q["change"]), "prdy_ctrt": f"{q['change_pct']:.2f}",
+                "acml_vol": str(q["volume"]), "acml_tr_pbmn": str(q["turnover"]),
+                "inter2_oprc": str(q["open"]), "inter2_hgpr": str(q["high"]), "inter2_lwpr": str(q["low"]),
+                "inter2_llam": str(q["lower_limit"]), "inter2_mxpr": str(q["upper_limit"]),
+                "inter2_askp": str(q["price"] + tick_size(q["price"])), "inter2_bidp": str(q["price"]),
+                "inter2_prdy_clpr": str(q["prev_close"]), "inter2_sdpr": str(q["prev_close"]),
+            })
+        if not output:
+            return _error("FHKST11300006", "MCA01000", "종목코드 오류입니다.")
+        return _ok("FHKST11300006", output=output)
+
+    @app.get(f"{QUOTATIONS}/inquire-daily-itemchartprice")
+    async def daily_chart(request: Request) -> _KisResponse:
+        p = request.query_params
+        code = p.get("FID_INPUT_ISCD", "")
+        if code not in market.index:
+            return _error("FHKST03010100", "MCA01000", "종목코드 오류입니다.")
+        start, end = p.get("FID_INPUT_DATE_1", "00000000"), p.get("FID_INPUT_DATE_2", "99999999")
+        bars = _aggregate(market.daily_bars(code), p.get("FID_PERIOD_DIV_CODE", "D"))
+        rows = [b for b in bars if start <= b[0] <= end][::-1][:CHART_ROWS]  # 최신 순
+        q = market.quote(code)
+        output2 = []
+        for n, (d, o, h, lo, c, v) in enumerate(rows):
+            prev = rows[n + 1][4] if n + 1 < len(rows) else c
+            output2.append({
+                "stck_bsop_date": d, "stck_clpr": str(c), "stck_oprc": str(o), "stck_hgpr": str(h),
+                "stck_lwpr": str(lo), "acml_vol": str(v), "acml_tr_pbmn": str(int(v * c)),
+                "flng_cls_code": "00", "prtt_rate": "0.00", "mod_yn": "N",
+                "prdy_vrss_sign": _sign(c - prev), "prdy_vrss": str(c - prev), "revl_issu_reas": "",
+            })
+        return _ok("FHKST03010100", output1={
+            "prdy_vrss": str(q["change"]), "prdy_vrss_sign": _sign(q["change"]), "prdy_ctrt": f"{q['change_pct']:.2f}",
+            "stck_prdy_clpr": str(q["prev_close"]), "acml_vol": str(q["volume"]), "acml_tr_pbmn": str(q["turnover"]),
+            "hts_kor_isnm": q["symbol"].name, "stck_prpr": str(q["price"]), "stck_shrn_iscd": code,
+            "stck_oprc": str(q["open"]), "stck_hgpr": str(q["high"]), "stck_lwpr": str(q["low"]),
+        }, output2=output2)
+
+    @app.get(f"{QUOTATIONS}/volume-rank")
+    async def volume_rank(request: Request) -> _KisResponse:
+        sort = request.query_params.get("FID_BLNG_CLS_CODE", "0")
+        quotes = [market.quote(s.code) for s in market.symbols]
+        key = {
+            "1": lambda q: q["volume"] / max(q["symbol"].history[-1][5], 1),
+            "3": lambda q: q["turnover"],
+        }.get(sort, lambda q: q["volume"])
+        output = []
+        for rank, q in enumerate(sorted(quotes, key=key, reverse=True)[:RANK_ROWS], 1):
+            sym = q["symbol"]
+            prev_vol = sym.history[-1][5]
+            avg_vol = sum(b[5] for b in sym.history[-20:]) // 20
+            output.append({
+                "hts_kor_isnm": sym.name, "mksc_shrn_iscd": sym.code, "data_rank": str(rank),
+                "stck_prpr": str(q["price"]), "prdy_vrss_sign": _sign(q["change"]), "prdy_vrss": str(q["change"]),
+                "prdy_ctrt": f"{q['change_pct']:.2f}", "acml_vol": str(q["volume"]), "prdy_vol": str(prev_vol),
+                "lstn_stcn": str(sym.listed_shares), "avrg_vol": str(avg_vol),
+                "n_befr_clpr_vrss_prpr_rate": f"{q['change_pct']:.2f}",
+                "vol_inrt": f"{q['volume'] / max(prev_vol, 1) * 100:.2f}",
+                "vol_tnrt": f"{q['volume'] / sym.listed_shares * 100:.2f}",
+                "avrg_tr_pbmn": str(avg_vol * q["prev_close"]), "acml_tr_pbmn": str(q["turnover"]),
+            })
+        return _ok("FHPST01710000", output=output)
+
+    @app.get("/uapi/domestic-stock/v1/ranking/fluctuation")
+    async def fluctuation(request: Request) -> _KisResponse:
+        descending = request.query_params.get("fid_rank_sort_cls_code", "0") != "1"  # 0 상승률, 1 하락률
+        quotes = sorted((market.quote(s.code) for s in market.symbols), key=lambda q: q["change_pct"], reverse=descending)
+        output = [{
+            "stck_shrn_iscd": q["symbol"].code, "data_rank": str(rank), "hts_kor_isnm": q["symbol"].name,
+            "stck_prpr": str(q["price"]), "prdy_vrss": str(q["change"]), "prdy_vrss_sign": _sign(q["change"]),
+            "prdy_ctrt": f"{q['change_pct']:.2f}", "acml_vol": str(q["volume"]),
+            "stck_hgpr": str(q["high"]), "stck_lwpr": str(q["low"]),
+            "oprc_vrss_prpr": str(q["price"] - q["open"]), "oprc_vrss_prpr_sign": _sign(q["price"] - q["open"]),
+            "oprc_vrss_prpr_rate": f"{(q['price'] / q['open'] - 1) * 100:.2f}",
+            "prd_rsfl": str(q["change"]), "prd_rsfl_sign": _sign(q["change"]), "prd_rsfl_rate": f"{q['change_pct']:.2f}",
+        } for rank, q in enumerate(quotes[:RANK_ROWS], 1)]
+        return _ok("FHPST01700000", output=output)
+
+    @app.get(f"{QUOTATIONS}/inquire-investor")
+    async def inquire_investor(request: Request) -> _KisResponse:
+        code = request.query_params.get("FID_INPUT_ISCD", "")
+        if code not in market.index:
+            return _error("FHKST01010900", "MCA01000", "종목코드 오류입니다.")
+        sym = market.symbols[market.index[code]]
+        output = []
+        for (d, _o, _h, _lo, c, _v), (prsn, frgn, orgn), prev in list(
+            zip(sym.history[1:], sym.flows[1:], sym.history[:-1])
+        )[-30:][::-1]:
+            output.append({
+                "stck_bsop_date": d, "stck_clpr": str(c), "prdy_vrss": str(c - prev[4]),
+                "prdy_vrss_sign": _sign(c - prev[4]),
+                "prsn_ntby_qty": str(prsn), "frgn_ntby_qty": str(frgn), "orgn_ntby_qty": str(orgn),
+                "prsn_ntby_tr_pbmn": str(prsn * c // 1_000_000), "frgn_ntby_tr_pbmn": str(frgn * c // 1_000_000),
+                "orgn_ntby_tr_pbmn": str(orgn * c // 1_000_000),
+            })
+        return _ok("FHKST01010900", output=output)
+
+    # ── trading ──
+
+    @app.get(f"{TRADING}/inquire-balance")
+    async def inquire_balance(request: Request) -> _KisResponse:
+        tr_id = request.headers.get("tr_id", "VTTC8434R")
+        output1, buy_amt, eval_amt = [], 0.0, 0.0
+        for code, held in sorted(market.holdings.items()):
+            q = market.quote(code)
+            pchs, evlu = held.avg_price * held.qty, q["price"] * held.qty
+            buy_amt, eval_amt = buy_amt + pchs, eval_amt + evlu
+            output1.append({
+                "pdno": code, "prdt_name": q["symbol"].name, "trad_dvsn_name": "현금",
+                "bfdy_buy_qty": "0", "bfdy_sll_qty": "0",
+                "thdt_buyqty": str(held.today_buy), "thdt_sll_qty": str(held.today_sell),
+                "hldg_qty": str(held.qty), "ord_psbl_qty": str(held.qty),
+                "pchs_avg_pric": f"{held.avg_price:.4f}", "pchs_amt": str(int(pchs)),
+                "prpr": str(q["price"]), "evlu_amt": str(int(evlu)), "evlu_pfls_amt": str(int(evlu - pchs)),
+                "evlu_pfls_rt": f"{(evlu / pchs - 1) * 100:.2f}" if pchs else "0.00",
+                "evlu_erng_rt": f"{(evlu / pchs - 1) * 100:.8f}" if pchs else "0.00000000",
+                "fltt_rt": f"{q['change_pct']:.8f}", "bfdy_cprs_icdc": str(q["change"]),
+            })
+        cash = int(market.cash)
+        output2 = [{
+            "dnca_tot_amt": str(cash), "nxdy_excc_amt": str(cash), "prvs_rcdl_excc_amt": str(cash),
+            "thdt_buy_amt": str(int(market.today_buy_amt)), "thdt_sll_amt": str(int(market.today_sell_amt)),
+            "scts_evlu_amt": str(int(eval_amt)), "tot_evlu_amt": str(int(cash + eval_amt)),
+            "nass_amt": str(int(cash + eval_amt)), "pchs_amt_smtl_amt": str(int(buy_amt)),
+            "evlu_amt_smtl_amt": str(int(eval_amt)), "evlu_pfls_smtl_amt": str(int(eval_amt - buy_amt)),
+            "bfdy_tot_asst_evlu_amt": str(int(market.cash + buy_amt)), "asst_icdc_amt": str(int(eval_amt - buy_amt)),
+        }]
+        return _ok(tr_id, tr_cont="D", ctx_area_fk100="", ctx_area_nk100="", output1=output1, output2=output2)
+
+    @app.get(f"{TRADING}/inquire-psbl-order")
+    async def inquire_psbl_order(request: Request) -> _KisResponse:
+        p = request.query_params
+        code = p.get("PDNO", "")
+        price = float(p.get("ORD_UNPR") or 0)
+        if price <= 0 and code in market.index:
+            price = market.quote(code)["price"]
+        qty = market.buyable_qty(price)
+        cash = str(int(market.cash))
+        return _ok(request.headers.get("tr_id", "VTTC8908R"), output={
+            "ord_psbl_cash": cash, "ord_psbl_sbst": "0", "ruse_psbl_amt": "0", "fund_rpch_chgs": "0",
+            "psbl_qty_calc_unpr": str(int(price)), "nrcvb_buy_amt": cash, "nrcvb_buy_qty": str(qty),
+            "max_buy_amt": cash, "max_buy_qty": str(qty), "cma_evlu_amt": "0",
+            "ovrs_re_use_amt_wcrc": "0", "ord_psbl_frcr_amt_wcrc": "0",
+        })
+
+    @app.get(f"{TRADING}/inquire-psbl-sell")
+    async def inquire_psbl_sell(request: Request) -> _KisResponse:
+        code = request.query_params.get("PDNO", "")
+        held = market.holdings.get(code)
+        qty = held.qty if held else 0
+        q = market.quote(code) if code in market.index else None
+        price = q["price"] if q else 0
+        avg = held.avg_price if held else 0.0
+        return _ok(request.headers.get("tr_id", "TTTC8408R"), output={
+            "pdno": code, "prdt_name": q["symbol"].name if q else "", "buy_qty": str(qty), "sll_qty": "0",
+            "cblc_qty": str(qty), "nsvg_qty": "0", "ord_psbl_qty": str(qty),
+            "pchs_avg_pric": f"{avg:.4f}", "pchs_amt": str(int(avg * qty)), "now_pric": str(price),
+            "evlu_amt": str(price * qty), "evlu_pfls_amt": str(int((price - avg) * qty)),
+            "evlu_pfls_rt": f"{(price / avg - 1) * 100:.2f}" if avg else "0.00",
+        })
+
+    @app.post(f"{TRADING}/order-cash")
+    async def order_cash(request: Request) -> _KisResponse:
+        tr_id = request.headers.get("tr_id", "")
+        body = await request.json()
+        side = "sell" if tr_id.endswith("0011U") else "buy"  # TTTC0011U/VTTC0011U 매도, ...0012U 매수
+        try:
+            qty, price = int(body.get("ORD_QTY") or 0), int(float(body.get("ORD_UNPR") or 0))
+        except (TypeError, ValueError):
+            return _error(tr_id, "APBK0013", "주문수량 또는 단가를 확인하세요.")
+        odno, err = market.place_order(body.get("PDNO", ""), side, qty, price, market=body.get("ORD_DVSN") == "01")
+        if odno is None:
+            return _error(tr_id, "APBK0952" if side == "buy" else "APBK0400", err)
+        return _ok(tr_id, output={"KRX_FWDG_ORD_ORGNO": "91252", "ODNO": odno, "ORD_TMD": market.stamp()[1]})
+
+    # ── websocket ──
+
+    @app.websocket("/tryitout")
+    @app.websocket("/tryitout/{tr_path}")
+    async def realtime(ws: WebSocket, tr_path: str = "") -> None:
+        await ws.accept()
+        subs: dict[tuple[str, str], None] = {}
+
+        async def push() -> None:
+            last_ping = time.monotonic()
+            while True:
+                await asyncio.sleep(config.ws_interval_sec)
+                market.advance()
+                for tr_id, code in list(subs):
+                    frame = _ccnl_frame(market, code) if tr_id == "H0STCNT0" else _asking_frame(market, code)
+                    await ws.send_text(f"0|{tr_id}|001|{frame}")
+                if time.monotonic() - last_ping >= config.ws_ping_sec:
+                    last_ping = time.monotonic()
+                    await ws.send_text(json.dumps({"header": {"tr_id": "PINGPONG", "datetime": datetime.now().strftime("%Y%m%d%H%M%S")}}))
+
+        pusher = asyncio.create_task(push())
+        try:
+            while True:
+                msg = json.loads(await ws.receive_text())
+                header, body = msg.get("header", {}), msg.get("body", {}).get("input", {})
+                if header.get("tr_id") == "PINGPONG":
+                    continue
+                tr_id, code = body.get("tr_id", ""), body.get("tr_key", "")
+                await ws.send_text(json.dumps(_ws_ack(subs, tr_id, code, header.get("tr_type", "1"))))
+        except WebSocketDisconnect:
+            pass
+        finally:
+            pusher.cancel()
+
+    return app
+
+
+def _ws_ack(subs: dict, tr_id: str, code: str, tr_type: str) -> dict:
+    key = (tr_id, code)
+    header = {"tr_id": tr_id, "tr_key": code, "encrypt": "N"}
+    if tr_id not in ("H0STCNT0", "H0STASP0"):
+        return {"header": header, "body": {"rt_cd": "1", "msg_cd": "OPSP0011", "msg1": "invalid tr_id"}}
+    if tr_type == "2":
+        subs.pop(key, None)
+        return {"header": header, "body": {"rt_cd": "0", "msg_cd": "OPSP0001", "msg1": "UNSUBSCRIBE SUCCESS"}}
+    if key in subs:
+        return {"header": header, "body": {"rt_cd": "1", "msg_cd": "OPSP0002", "msg1": "ALREADY IN SUBSCRIBE"}}
+    if len(subs) >= MAX_WS_SUBSCRIPTIONS:
+        return {"header": header, "body": {"rt_cd": "1", "msg_cd": "OPSP0008", "msg1": "MAX SUBSCRIBE OVER"}}
+    subs[key] = None
+    return {"header": header, "body": {
+        "rt_cd": "0", "msg_cd": "OPSP0000", "msg1": "SUBSCRIBE SUCCESS",
+        "output": {"iv": secrets.token_hex(8), "key": secrets.token_hex(16)},
+    }}
+
+
+def _ccnl_frame(market: SimMarket, code: str) -> str:
+    q = market.quote(code)
+    unit = tick_size(q["price"])
+    bsop_date, hhmmss = market.stamp()
+    values = {
+        "MKSC_SHRN_ISCD": code, "STCK_CNTG_HOUR": hhmmss, "STCK_PRPR": q["price"],
+        "PRDY_VRSS_SIGN": _sign(q["change"]), "PRDY_VRSS": q["change"], "PRDY_CTRT": f"{q['change_pct']:.2f}",
+        "STCK_OPRC": q["open"], "STCK_HGPR": q["high"], "STCK_LWPR": q["low"],
+        "ASKP1": q["price"] + unit, "BIDP1": q["price"], "CNTG_VOL": q["last_qty"], "ACML_VOL": q["volume"],
+        "ACML_TR_PBMN": q["turnover"], "CCLD_DVSN": "1", "BSOP_DATE": bsop_date,
+        "NEW_MKOP_CLS_CODE": "20", "TRHT_YN": "N", "HOUR_CLS_CODE": "0", "MRKT_TRTM_CLS_CODE": "0",
+    }
+    return "^".join(str(values.get(c, "0")) for c in CCNL_COLUMNS)
+
+
+def _asking_frame(market: SimMarket, code: str) -> str:
+    q = market.quote(code)
+    unit = tick_size(q["price"])
+    values: dict[str, Any] = {"MKSC_SHRN_ISCD": code, "BSOP_HOUR": market.stamp()[1], "HOUR_CLS_CODE": "0",
+                              "ACML_VOL": q["volume"], "STCK_DEAL_CLS_CODE": "0"}
+    depth = max(q["last_qty"], 1) * 10
+    for i in range(1, 11):
+        values[f"ASKP{i}"] = q["price"] + unit * i
+        values[f"BIDP{i}"] = q["price"] - unit * (i - 1)
+        values[f"ASKP_RSQN{i}"] = depth * i
+        values[f"BIDP_RSQN{i}"] = depth * i
+    values["TOTAL_ASKP_RSQN"] = values["TOTAL_BIDP_RSQN"] = depth * 55
+    return "^".join(str(values.get(c, "0")) for c in ASKING_COLUMNS)
+
+
+def _aggregate(bars: list[tuple], period: str) -> list[tuple]:
+    """D 그대로, W(ISO 주)/M(월)/Y 는 구간의 첫 시가·최고·최저·마지막 종가·거래량 합."""
+    if period == "D":
+        return bars
+    def bucket(d: str) -> tuple:
+        dt = datetime.strptime(d, "%Y%m%d")
+        return {"W": dt.isocalendar()[:2], "M": (dt.year, dt.month)}.get(period, (dt.year,))
+
+    out: list[tuple] = []
+    current = None
+    for bar in bars:
+        key = bucket(bar[0])
+        if out and key == current:
+            d, o, h, lo, _c, v = out[-1]
+            out[-1] = (bar[0], o, max(h, bar[2]), min(lo, bar[3]), bar[4], v + bar[5])
+        else:
+            out.append(bar)
+            current = key
+    return out
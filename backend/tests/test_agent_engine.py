@@ -0,0 +1,152 @@
+"""AgentEngine single-flight / 데드라인 / 선점 테스트"""
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.agents import engine as engine_module
+from app.agents.base import AgentContext, AgentResult, BaseAgent
+from app.agents.engine import AgentEngine
+from app.agents.event_bus import AgentEvent
+from app.models import db as db_module
+
+
+@pytest.fixture
+async def temp_db(tmp_path, monkeypatch):
+    path = tmp_path / "trading.db"
+    monkeypatch.setattr(db_module, "DB_PATH", path)
+    await db_module.init_database()
+    return path
+
+
+def _actions(path, agent_id):
+    conn = sqlite3.connect(path)
+    rows = [r[0] for r in conn.execute("SELECT action FROM agent_logs WHERE agent_id = ? ORDER BY id", (agent_id,))]
+    conn.close()
+    return rows
+
+
+class _SlowScanner(BaseAgent):
+    agent_id = "slow_scanner"
+    name = "slow"
+    preemptible = True
+
+    def __init__(self, steps=3, step_sec=0.05):
+        super().__init__()
+        self.steps, self.step_sec = steps, step_sec
+        self.executions = []
+
+    async def execute(self, context: AgentContext) -> AgentResult:
+        self.executions.append(context.params)
+        for _ in range(self.steps):
+            await self.checkpoint()
+            await asyncio.sleep(self.step_sec)
+        return AgentResult(summary=f"run {len(self.executions)}")
+
+
+class _RiskCheck(BaseAgent):
+    agent_id = "risk_check"
+    name = "risk"
+    priority = 10
+
+    async def execute(self, context: AgentContext) -> AgentResult:
+        await asyncio.sleep(0.15)
+        return AgentResult(summary="risk ok")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_triggers_join_or_queue_one_follow_up(temp_db):
+    engine = AgentEngine()
+    scanner = _SlowScanner()
+    engine.register(scanner)
+
+    first = asyncio.create_task(engine.run_agent("slow_scanner", AgentContext(trigger="scheduled")))
+    await asyncio.sleep(0.01)
+    joined = asyncio.create_task(engine.run_agent("slow_scanner", AgentContext(trigger="manual")))
+    queued = [
+        asyncio.create_task(engine.run_agent("slow_scanner", AgentContext(trigger="manual", params={"n": i})))
+        for i in range(3)
+    ]
+    results = await asyncio.gather(first, joined, *queued)
+
+    assert results[0] is results[1]  # 같은 실행 결과 공유
+    assert results[2] is results[3] is results[4]  # 후속 실행 1회를 공유
+    assert scanner.executions == [{}, {"n": 2}]  # 최신 트리거 params로 1회만 추가 실행
+    assert not engine.is_agent_running("slow_scanner")
+    assert sorted(_actions(temp_db, "slow_scanner")) == ["execute", "execute", "joined", "joined", "joined", "queued"]
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_cooperatively(temp_db):
+    engine = AgentEngine()
+    scanner = _SlowScanner(steps=20)
+    scanner.config["timeout_sec"] = 0.1
+    engine.register(scanner)
+
+    result = await engine.run_agent("slow_scanner")
+    assert not result.success and result.error == "timeout"
+    assert len(scanner.executions) == 1 and scanner.status.value == "idle"
+    assert _actions(temp_db, "slow_scanner") == ["timeout"]
+
+
+@pytest.mark.asyncio
+async def test_risk_run_preempts_scan(temp_db):
+    engine = AgentEngine()
+    scanner, risk = _SlowScanner(steps=4), _RiskCheck()
+    engine.register(scanner)
+    engine.register(risk)
+
+    scan = asyncio.create_task(engine.run_agent("slow_scanner"))
+    await asyncio.sleep(0.02)
+    risk_result = await engine.run_agent("risk_check")
+    assert risk_result.success and not scan.done()  # 스캔은 리스크 실행 동안 일시정지
+
+    assert (await scan).success
+    assert "preempted" in _actions(temp_db, "slow_scanner")
+
+
+class _RiskHandler(_RiskCheck):
+    agent_id = "risk_handler"
+    subscribed_events = ["portfolio.updated"]
+
+    def __init__(self, handle_sec=0.15):
+        super().__init__()
+        self.handle_sec = handle_sec
+
+    async def handle_event(self, event: AgentEvent) -> None:
+        await asyncio.sleep(self.handle_sec)
+
+
+@pytest.mark.asyncio
+async def test_event_handlers_preempt_scan_and_respect_deadline(temp_db, monkeypatch):
+    engine = AgentEngine()
+    scanner, risk = _SlowScanner(steps=4), _RiskHandler()
+    engine.register(scanner)
+    engine.register(risk)
+    handler = engine._event_handler(risk)
+    assert handler.__qualname__ == "_RiskHandler.handle_event"  # 메트릭 라벨 유지
+
+    scan = asyncio.create_task(engine.run_agent("slow_scanner"))
+    await asyncio.sleep(0.02)
+    await handler(AgentEvent(event_type="portfolio.updated", agent_id="portfolio_monitor"))
+    assert not scan.done()  # 핸들러가 도는 동안 스캔은 일시정지
+    assert (await scan).success
+    assert "preempted" in _actions(temp_db, "slow_scanner")
+
+    monkeypatch.setattr(engine_module, "HARD_DEADLINE_GRACE_SEC", 0)
+    risk.handle_sec, risk.config["timeout_sec"] = 5, 0.05
+    await asyncio.wait_for(handler(AgentEvent(event_type="portfolio.updated", agent_id="t")), 1)
+    assert _actions(temp_db, "risk_handler") == ["timeout"]
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_in_flight_runs(temp_db):
+    engine = AgentEngine()
+    scanner = _SlowScanner(steps=50)
+    engine.register(scanner)
+
+    scan = asyncio.create_task(engine.run_agent("slow_scanner"))
+    await asyncio.sleep(0.02)
+    await engine.stop()
+    result = await scan
+    assert result.error == "shutdown" and _actions(temp_db, "slow_scanner") == ["cancelled"]
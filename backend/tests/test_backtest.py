@@ -0,0 +1,132 @@
+"""벡터화 백테스트 — 스칼라 파이프라인과의 일치, 체결/게이트, 스윕 테스트"""
+import dataclasses
+
+import numpy as np
+import pytest
+
+from app.agents.market_scanner import compute_atr_stop_loss_pct, determine_investment_horizon
+from app.agents.market_scanner_indicators import compute_all_indicators
+from app.models.composite_score import compute_composite_score
+from app.models.risk_config import RiskConfig
+from app.services.backtest import (
+    BarPanel,
+    ConstantScorer,
+    ExecutionCosts,
+    StageScores,
+    build_plan,
+    compute_indicators,
+    param_grid,
+    run_backtest,
+    run_sweep,
+)
+
+
+def _random_panel(n=4, days=120, seed=1, late=None):
+    rng = np.random.default_rng(seed)
+    dates = [f"{20240000 + t:08d}" for t in range(days)]
+    bars = {}
+    for i in range(n):
+        close = np.round(np.cumprod(1 + rng.normal(0, 0.02, days)) * 10000)
+        high = close * (1 + rng.uniform(0, 0.02, days))
+        low = close * (1 - rng.uniform(0, 0.02, days))
+        volume = rng.integers(1000, 100000, days).astype(float)
+        start = 30 if i == late else 0
+        bars[f"{i:06d}"] = {d: (close[t], high[t], low[t], close[t], volume[t]) for t, d in enumerate(dates) if t >= start}
+    return BarPanel.from_series(bars, fundamentals={"000000": {"per": 12.0, "roe": 15.0}})
+
+
+def test_vectorized_stages_match_scalar_pipeline():
+    panel = _random_panel(late=1)
+    ind = compute_indicators(panel)
+    config = RiskConfig()
+    plan = build_plan(panel, ind, ConstantScorer(rr_score=1.5)(panel, ind), config)
+
+    checked = 0
+    for i, code in enumerate(panel.codes):
+        for t in range(len(panel.dates)):
+            valid = ~np.isnan(panel.closes[i, : t + 1])
+            ohlcv = {k: list(getattr(panel, a)[i, : t + 1][valid]) for k, a in
+                     (("closes", "closes"), ("highs", "highs"), ("lows", "lows"), ("volumes", "volumes"))}
+            ref = compute_all_indicators(ohlcv, panel.closes[i, t]) if valid.any() else None
+            assert (ref is not None) == bool(ind.ready[i, t])
+            if ref is None:
+                continue
+            snap = ind.snapshot(i, t)
+            for key in ("rsi_14", "atr_14", "volume_change_5d_pct", "ma60"):
+                assert snap[key] == pytest.approx(ref[key], abs=1e-6)
+            fins = panel.fundamentals.get(code)
+            expected = compute_composite_score(
+                rr_score=1.5, calibration_ceiling=config.calibration_ceiling, technicals=ref,
+                dart_financials=fins, investor_trend={}, expert_analyses=[],
+                weights={"rr_ratio": 0.25, "expert_consensus": 0.25, "fundamental": 0.2,
+                         "technical": 0.2, "institutional": 0.1},
+            )
+            assert plan.composite[i, t] == pytest.approx(expected, abs=1e-9)
+            horizon = determine_investment_horizon(ref, fins)
+            stop = compute_atr_stop_loss_pct(ref["atr_14"], ref["current_price"], config.multiplier_for(horizon))
+            assert plan.stop_pct[i, t] == pytest.approx(stop, abs=1e-9)
+            checked += 1
+    assert checked > 300
+
+
+class _BuyOnce:
+    def __init__(self, t, rows=slice(None)):
+        self.t, self.rows = t, rows
+
+    def __call__(self, panel, indicators):
+        buy = np.zeros(panel.shape, dtype=bool)
+        buy[self.rows, self.t] = True
+        return StageScores(buy=buy)
+
+
+def test_gap_down_stop_fills_at_open_with_costs():
+    days = 45
+    dates = [f"{20240100 + t:08d}" for t in range(days)]
+    series = {d: (10000 + 10 * t, 10100 + 10 * t, 9900 + 10 * t, 10000 + 10 * t, 5000.0) for t, d in enumerate(dates)}
+    series[dates[41]] = (10000.0, 10500.0, 9990.0, 10400.0, 5000.0)
+    series[dates[42]] = (9000.0, 9100.0, 8900.0, 9050.0, 5000.0)  # 갭 하락
+    del series[dates[43]]  # 거래정지 → 직전 종가로 채움
+    other = {d: (5000.0, 5000.0, 5000.0, 5000.0, 100.0) for d in dates}
+    panel = BarPanel.from_series({"005930": series, "000660": other})
+    assert panel.closes[0, 43] == 9050.0 and panel.volumes[0, 43] == 0.0
+
+    costs = ExecutionCosts(slippage_pct=0.1, commission_pct=0.015, sell_tax_pct=0.18)
+    result = run_backtest(panel, RiskConfig(max_buy_qty=10), _BuyOnce(40, rows=0), costs, initial_capital=1_000_000)
+
+    (trade,) = result.trades
+    entry, exit_ = 10000 * 1.001, 9000 * 0.999
+    assert trade["entry_date"] == dates[41] and trade["exit_date"] == dates[42]
+    assert trade["reason"] == "stop_loss" and trade["qty"] == 10
+    assert trade["exit_price"] == pytest.approx(exit_, abs=0.01)
+    pnl = 10 * exit_ * (1 - 0.00195) - 10 * entry * 1.00015
+    assert trade["pnl"] == pytest.approx(pnl, abs=1)
+    assert result.equity[-1] == pytest.approx(1_000_000 + pnl, abs=1)
+
+
+def test_risk_gates_cap_positions_and_sectors():
+    panel = _random_panel(n=6, days=80, seed=3)
+    panel.sectors = {c: ("반도체" if i < 3 else "은행") for i, c in enumerate(panel.codes)}
+    config = RiskConfig(max_positions=2, take_profit_pct=100.0, atr_stop_loss_multiplier_short=50.0,
+                        atr_stop_loss_multiplier_long=50.0)
+    result = run_backtest(panel, config, _BuyOnce(40), initial_capital=100_000_000)
+    assert result.open_positions == 2 and not result.trades
+    assert result.rejections["최대 포지션 수 초과"] == 4
+
+    # 종목당 ~10% (10주 × ~1만원 / 100만원) → 섹터마다 첫 매수 승인 후 나머지는 섹터 한도 초과
+    sector = run_backtest(panel, dataclasses.replace(config, max_positions=5, sector_max_pct=5.0), _BuyOnce(40),
+                          initial_capital=1_000_000)
+    assert sector.open_positions == 2 and sector.rejections == {"섹터 집중도 초과": 4}
+
+    low = run_backtest(panel, RiskConfig(min_composite_score=99.0), _BuyOnce(40))
+    assert low.rejections["복합 점수 미달"] >= 1 and not low.trades and low.open_positions == 0
+
+
+def test_sweep_runs_on_process_pool_in_grid_order():
+    panel = _random_panel(n=8, days=150, seed=5)
+    grid = param_grid(take_profit_pct=[3.0, 8.0], min_composite_score=[15.0])
+    assert grid == [{"take_profit_pct": 3.0, "min_composite_score": 15.0},
+                    {"take_profit_pct": 8.0, "min_composite_score": 15.0}]
+    results = run_sweep(panel, grid, max_workers=2)
+    for params, row in zip(grid, results):
+        assert row["params"] == params
+        assert row == {"params": params, **run_backtest(panel, RiskConfig(**params)).stats}
@@ -0,0 +1,93 @@
+"""벤치마크 스위트 — baseline 비교/재시도 로직과 스텁 백엔드로 돌리는 스캐너 스모크 테스트"""
+import json
+
+import pytest
+
+from benchmarks import cases as cases_module
+from benchmarks import suite
+from benchmarks.cases import Skip
+
+
+def _report(**metrics):
+    results = {}
+    for key, value in metrics.items():
+        case, metric = key.split("__")
+        results.setdefault(case, {})[metric] = value
+    return {"results": results}
+
+
+def test_compare_flags_only_timings_beyond_threshold():
+    baseline = _report(a__fast_ms=10.0, a__slow_ms=10.0, a__tiny_ms=0.002, a__trades=5, b__gone_ms=1.0)
+    current = _report(a__fast_ms=12.0, a__slow_ms=13.0, a__tiny_ms=0.004, a__trades=50, c__new_ms=99.0)
+
+    (regression,) = suite.compare(current, baseline, threshold=0.25)
+    assert regression.metric == "a.slow_ms" and regression.ratio == pytest.approx(1.3)
+    # 절대 증가가 잡음 수준이면 비율이 커도 무시, 정보성 값(_ms 아님)과 신규/삭제 지표도 무시
+    assert suite.compare(current, baseline, threshold=0.5) == []
+
+
+def test_merge_best_keeps_faster_timing():
+    report = _report(a__x_ms=10.0, a__count=3)
+    suite.merge_best(report, _report(a__x_ms=7.0, a__count=4))
+    suite.merge_best(report, _report(a__x_ms=9.0))
+    assert report["results"]["a"] == {"x_ms": 7.0, "count": 3}
+
+
+def test_main_gates_on_baseline_and_retries_noisy_cases(tmp_path, monkeypatch):
+    timings = iter([5.0, 30.0, 30.0, 5.0])  # 첫 회 느림 → 재시도에서 회복
+
+    def noisy():
+        return {"run_ms": next(timings)}
+
+    def missing():
+        raise Skip("optional dependency missing")
+
+    monkeypatch.setattr(cases_module, "CASES", {"noisy": noisy, "missing": missing})
+    monkeypatch.setattr(suite, "CASES", cases_module.CASES)
+    baseline = tmp_path / "baseline.json"
+
+    # baseline 이 없으면 첫 실행을 이 머신의 baseline 으로 기록하고 통과
+    assert suite.main(["--baseline", str(baseline), "--retries", "1"]) == 0
+    saved = json.loads(baseline.read_text())
+    assert saved["results"] == {"noisy": {"run_ms": 5.0}}  # 두 번 중 최솟값
+
+    out = tmp_path / "run.json"
+    assert suite.main(["--baseline", str(baseline), "--out", str(out), "--retries", "1"]) == 0
+    report = json.loads(out.read_text())
+    assert report["results"]["noisy"]["run_ms"] == 5.0 and "missing" in report["skipped"]
+
+    monkeypatch.setitem(cases_module.CASES, "noisy", lambda: {"run_ms": 50.0})
+    assert suite.main(["--baseline", str(baseline), "--retries", "1"]) == 1
+    monkeypatch.setitem(cases_module.CASES, "noisy", lambda: 1 / 0)
+    assert suite.main(["--baseline", str(baseline), "--retries", "0"]) == 1
+
+
+def test_registered_cases_cover_pipeline():
+    assert {"indicators", "composite", "event_bus", "db", "kis_result", "master_file", "universe_snapshot",
+            "market_scanner", "risk_engine", "rollups", "backtest"} <= set(cases_module.CASES)
+
+
+async def test_scanner_runs_end_to_end_on_stub_backends(tmp_path, monkeypatch):
+    from app.agents.base import AgentContext
+    from app.agents.event_bus import event_bus
+    from app.agents.market_scanner import MarketScannerAgent
+    from app.models import db as db_module
+    from app.services.mcp_client import mcp_manager
+    from benchmarks.stubs import session_market, stubbed_backends
+
+    monkeypatch.setattr(db_module, "DB_PATH", tmp_path / "trading.db")
+    await db_module.init_database()
+    market = session_market(symbols=60)
+    for sym in market.symbols:
+        await db_module.execute_insert(
+            "INSERT INTO kospi200_components (stock_code, stock_name, sector, updated_at) VALUES (?, ?, ?, datetime('now'))",
+            (sym.code, sym.name, sym.sector),
+        )
+
+    async with stubbed_backends(market) as mcp:
+        result = await MarketScannerAgent().execute(AgentContext())
+    await event_bus.drain()  # 시그널 이벤트 저장을 tmp DB 가 살아 있는 동안 끝낸다
+    assert result.success and result.data["scanned"] > 0 and mcp.calls > 0
+    assert result.data["signals"]
+    # 스텁 해제 후 원래 메서드로 복구
+    assert "call_tool_result" not in vars(mcp_manager)
@@ -0,0 +1,122 @@
+"""채팅 세션 저장소(LRU + SQLite + 컨텍스트 압축) 테스트"""
+import sqlite3
+
+import pytest
+
+from app.models import db as db_module
+from app.services.chat_session_store import STRIPPED_TOOL_RESULT, ChatSessionStore
+
+
+@pytest.fixture
+async def temp_db(tmp_path, monkeypatch):
+    path = tmp_path / "trading.db"
+    monkeypatch.setattr(db_module, "DB_PATH", path)
+    await db_module.init_database()
+    return path
+
+
+def _tool_turn(i, body_chars=3000):
+    return [
+        {"role": "assistant", "content": [{"type": "tool_use", "id": f"t{i}", "name": "domestic_stock", "input": {}}]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": f"t{i}", "content": "x" * body_chars}]},
+        {"role": "assistant", "content": f"답변 {i}"},
+    ]
+
+
+async def _fake_summarizer(previous, messages):
+    return f"{previous or ''}|{len(messages)}개 요약", {"input_tokens": 7, "output_tokens": 3}
+
+
+@pytest.mark.asyncio
+async def test_sessions_survive_restart(temp_db):
+    store = ChatSessionStore()
+    await store.append("s1", [{"role": "user", "content": "삼성전자 현재가"}])
+    await store.append("s1", _tool_turn(1, 100))
+    await store.record_usage("s1", 100, 20)
+
+    restarted = ChatSessionStore()
+    summary, messages = await restarted.get_context("s1")
+    assert summary is None
+    assert [m["role"] for m in messages] == ["user", "assistant", "user", "assistant"]
+    assert messages[2]["content"][0]["tool_use_id"] == "t1"
+
+    (row,) = await restarted.list_sessions()
+    assert (row["turn_count"], row["input_tokens"], row["output_tokens"], row["message_count"]) == (1, 100, 20, 4)
+
+
+@pytest.mark.asyncio
+async def test_lru_and_idle_eviction(temp_db):
+    store = ChatSessionStore(max_cached=2, idle_ttl_sec=3600)
+    for sid in ("a", "b", "c"):
+        await store.append(sid, [{"role": "user", "content": sid}])
+    assert list(store._cache) == ["b", "c"]
+
+    # 메모리에서 밀려나도 DB 에서 다시 로드
+    _, messages = await store.get_context("a")
+    assert messages == [{"role": "user", "content": "a"}]
+
+    assert list(store._cache) == ["c", "a"]
+
+    store.idle_ttl_sec = 0
+    store._cache["c"].last_access -= 10
+    await store.get_context("a")
+    assert list(store._cache) == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_compaction_strips_tool_results_then_summarizes(temp_db):
+    store = ChatSessionStore(token_budget=2500, summarizer=_fake_summarizer)
+    for i in range(4):
+        await store.append("s", [{"role": "user", "content": f"질문 {i}"}, *_tool_turn(i)])
+
+    result = await store.compact("s")
+    assert result["stripped"] == 3  # 최신 턴의 tool_result 는 유지
+    assert result["after"] <= 2500
+
+    summary, messages = await store.get_context("s")
+    assert summary is None
+    assert messages[2]["content"][0]["content"] == STRIPPED_TOOL_RESULT.format(chars=3000)
+    assert messages[-2]["content"][0]["content"] == "x" * 3000
+
+    # 예산을 더 줄이면 오래된 턴을 요약으로 접음
+    store.token_budget = 1200
+    result = await store.compact("s")
+    assert result["summarized"] > 0
+    summary, messages = await store.get_context("s")
+    assert summary.endswith("개 요약")
+    assert messages[0] == {"role": "user", "content": "질문 3"}
+
+    # 재시작 후에도 같은 컨텍스트 + 요약 토큰 사용량 반영
+    restarted = ChatSessionStore()
+    assert await restarted.get_context("s") == (summary, messages)
+    conn = sqlite3.connect(temp_db)
+    stripped = conn.execute(
+        "SELECT COUNT(*) FROM chat_messages WHERE content_json LIKE ?", (f"%{STRIPPED_TOOL_RESULT[:10]}%",)
+    ).fetchone()[0]
+    usage = conn.execute("SELECT input_tokens, output_tokens FROM chat_sessions WHERE id = 's'").fetchone()
+    conn.close()
+    assert stripped == 3
+    assert usage == (7, 3)
+
+
+@pytest.mark.asyncio
+async def test_summarizer_failure_falls_back_to_extractive(temp_db):
+    async def broken(previous, messages):
+        raise RuntimeError("api down")
+
+    store = ChatSessionStore(token_budget=300, summarizer=broken)
+    for i in range(3):
+        await store.append("s", [{"role": "user", "content": f"질문 {i} " + "가" * 400}, {"role": "assistant", "content": f"답변 {i}"}])
+    await store.compact("s")
+    summary, messages = await store.get_context("s")
+    assert "- 사용자: 질문 0" in summary
+    assert messages[0]["content"].startswith("질문 2")
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_rows(temp_db):
+    store = ChatSessionStore()
+    await store.append("s", [{"role": "user", "content": "hi"}])
+    await store.delete("s")
+    assert await store.list_sessions() == []
+    assert await store.get_context("s") == (None, [])
@@ -0,0 +1,194 @@
+"""비동기 Claude 스트리밍 / MCP 세션 풀 테스트"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import claude_service, mcp_client
+from app.services.mcp_client import MCPClientManager
+
+
+def _tool_block(tool_id, name="domestic_stock"):
+    return SimpleNamespace(type="tool_use", id=tool_id, name=name, input={"api_type": "inquire_price"})
+
+
+class FakeStream:
+    def __init__(self, events, final):
+        self._events = events
+        self._final = final
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for event in self._events:
+            await asyncio.sleep(0)
+            yield event
+
+    async def get_final_message(self):
+        return self._final
+
+
+class FakeClient:
+    def __init__(self, turns):
+        self._turns = list(turns)
+        self.calls = []
+        self.messages = SimpleNamespace(stream=self._stream)
+
+    def _stream(self, **kwargs):
+        self.calls.append(kwargs)
+        return self._turns.pop(0)
+
+
+def _text(t):
+    return SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="text_delta", text=t))
+
+
+@pytest.fixture
+def fake_chat(monkeypatch):
+    blocks = [_tool_block("t1"), _tool_block("t2")]
+    usage = SimpleNamespace(input_tokens=10, output_tokens=5)
+    turns = [
+        FakeStream(
+            [SimpleNamespace(type="content_block_start", content_block=b) for b in blocks],
+            SimpleNamespace(stop_reason="tool_use", content=blocks, usage=usage),
+        ),
+        FakeStream(
+            [_text("삼성전자 "), _text("현재가입니다")],
+            SimpleNamespace(stop_reason="end_turn", content=[SimpleNamespace(type="text", text="...")], usage=usage),
+        ),
+    ]
+    client = FakeClient(turns)
+
+    async def slow_tool(name, arguments):
+        await asyncio.sleep(0.1)
+        return f"result-{name}"
+
+    monkeypatch.setattr(claude_service, "_get_client", lambda: client)
+    monkeypatch.setattr(claude_service.mcp_manager, "call_tool", slow_tool)
+    monkeypatch.setattr(claude_service.mcp_manager, "get_claude_tools", lambda: [])
+    monkeypatch.setattr(claude_service.runtime_settings, "get", lambda key: {"claude_max_tokens": 1024}.get(key, "m"))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_tools_run_concurrently_and_metrics_emitted(fake_chat):
+    started = time.perf_counter()
+    transcript: list[dict] = []
+    events = [
+        json.loads(e)
+        async for e in claude_service.stream_chat([{"role": "user", "content": "hi"}], "s1", transcript=transcript)
+    ]
+    elapsed = time.perf_counter() - started
+
+    names = [e["event"] for e in events]
+    assert names.count("tool_result") == 2
+    assert elapsed < 0.18  # 두 도구(각 0.1s)가 병렬 실행
+
+    metrics = [e["data"] for e in events if e["event"] == "metrics"]
+    assert [m["turn"] for m in metrics] == [1, 2]
+    assert metrics[0]["tool_count"] == 2
+    assert metrics[0]["tool_ms"] < 180
+    assert metrics[1]["first_token_ms"] is not None
+
+    done = events[-1]
+    assert done["event"] == "done"
+    assert done["data"]["metrics"]["turns"] == 2
+    assert done["data"]["metrics"]["first_token_ms"] <= done["data"]["metrics"]["total_ms"]
+    assert done["data"]["usage"] == {"input_tokens": 20, "output_tokens": 10}
+
+    # 세션 저장용 transcript: tool_use → tool_result → 최종 답변
+    assert [m["role"] for m in transcript] == ["assistant", "user", "assistant"]
+    assert transcript[-1]["content"] == "..."
+
+    # 두 번째 호출에는 tool_use 순서대로 tool_result 가 전달됨
+    tool_results = fake_chat.calls[1]["messages"][-1]["content"]
+    assert [r["tool_use_id"] for r in tool_results] == ["t1", "t2"]
+
+
+class FakeMCPClient:
+    active = 0
+    peak = 0
+
+    def __init__(self, url):
+        self.url = url
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def list_tools(self):
+        return [SimpleNamespace(name="domestic_stock", description="", inputSchema={})]
+
+    async def call_tool(self, name, arguments):
+        FakeMCPClient.active += 1
+        FakeMCPClient.peak = max(FakeMCPClient.peak, FakeMCPClient.active)
+        await asyncio.sleep(0.05)
+        FakeMCPClient.active -= 1
+        return SimpleNamespace(content=[SimpleNamespace(text=f"ok:{name}")])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pool_size,expected_peak", [(1, 1), (3, 3)])
+async def test_mcp_pool_limits_concurrency(monkeypatch, pool_size, expected_peak):
+    monkeypatch.setattr(mcp_client, "Client", FakeMCPClient)
+    FakeMCPClient.active = FakeMCPClient.peak = 0
+    manager = MCPClientManager(pool_size=pool_size)
+    await manager.connect()
+
+    results = await asyncio.gather(*(manager.call_tool("domestic_stock", {}) for _ in range(5)))
+    assert results == ["ok:domestic_stock"] * 5
+    assert FakeMCPClient.peak == expected_peak
+    assert manager.pool_stats() == {"size": pool_size, "idle": pool_size, "in_use": 0}
+    await manager.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_mcp_waiters_fail_fast_when_reconnect_fails(monkeypatch):
+    class BrokenClient(FakeMCPClient):
+        connects = 0
+
+        async def __aenter__(self):
+            BrokenClient.connects += 1
+            if BrokenClient.connects > 1:
+                raise ConnectionError("server down")
+            return self
+
+        async def call_tool(self, name, arguments):
+            await asyncio.sleep(0.02)
+            raise ConnectionError("session lost")
+
+    monkeypatch.setattr(mcp_client, "Client", BrokenClient)
+    manager = MCPClientManager(pool_size=1)
+    await manager.connect()
+
+    # 세션 1개에 호출 3개 — 재연결 실패 후 대기 중인 호출도 즉시 실패해야 한다
+    results = await asyncio.wait_for(
+        asyncio.gather(*(manager.call_tool("domestic_stock", {}) for _ in range(3))), 1)
+    assert all(r.startswith("Error") for r in results)
+    assert not manager.connected
+    assert manager.pool_stats() == {"size": 0, "idle": 0, "in_use": 0}
+
+
+@pytest.mark.asyncio
+async def test_mcp_acquire_times_out_without_reconnecting(monkeypatch):
+    monkeypatch.setattr(mcp_client, "Client", FakeMCPClient)
+    manager = MCPClientManager(pool_size=1, acquire_timeout=0.01)
+    await manager.connect()
+    generation = manager._generation
+
+    results = await asyncio.gather(*(manager.call_tool("domestic_stock", {}) for _ in range(2)))
+    assert results[0] == "ok:domestic_stock"
+    assert "no MCP session free" in results[1]
+    assert manager._generation == generation and manager.connected
+    await manager.disconnect()
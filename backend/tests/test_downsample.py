@@ -0,0 +1,65 @@
+"""포트폴리오 시계열 다운샘플링 테스트"""
+import numpy as np
+import pytest
+
+from app.services.downsample import downsample, lttb_indices
+from app.services.portfolio_service import max_drawdown_pct
+
+
+def _snapshots(n=5000, seed=7):
+    rng = np.random.default_rng(seed)
+    values = 10_000_000 * np.cumprod(1 + rng.normal(0, 0.002, n))
+    return [{"timestamp": f"t{i:06d}", "total_value": float(v)} for i, v in enumerate(values)]
+
+
+def _rollups(snapshots, size=60):
+    """Build hourly-like rollup rows from raw snapshots (same rules as the triggers)."""
+    rows = []
+    for s in range(0, len(snapshots), size):
+        chunk = [x["total_value"] for x in snapshots[s:s + size]]
+        peak, dd = chunk[0], 0.0
+        for v in chunk:
+            peak = max(peak, v)
+            dd = max(dd, (peak - v) / peak * 100)
+        rows.append({
+            "bucket": snapshots[s]["timestamp"], "open_value": chunk[0], "high_value": max(chunk),
+            "low_value": min(chunk), "close_value": chunk[-1], "snapshot_count": len(chunk), "max_dd_pct": dd,
+        })
+    return rows
+
+
+@pytest.mark.parametrize("mode", ["minmax", "lttb"])
+@pytest.mark.parametrize("source", ["raw", "rollup"])
+def test_downsample_keeps_drawdown_exact(mode, source):
+    raw = _snapshots()
+    rows = raw if source == "raw" else _rollups(raw)
+    out = downsample(rows, 50, mode)
+    assert len(out) <= 52
+    assert max_drawdown_pct(out) == pytest.approx(max_drawdown_pct(raw))
+
+
+def test_minmax_preserves_extremes_and_endpoints():
+    rows = _rollups(_snapshots())
+    out = downsample(rows, 20, "minmax")
+    assert len(out) == 20
+    assert max(r["high_value"] for r in out) == max(r["high_value"] for r in rows)
+    assert min(r["low_value"] for r in out) == min(r["low_value"] for r in rows)
+    assert out[0]["open_value"] == rows[0]["open_value"]
+    assert out[-1]["close_value"] == rows[-1]["close_value"]
+    assert sum(r["snapshot_count"] for r in out) == sum(r["snapshot_count"] for r in rows)
+
+
+def test_lttb_indices_picks_spike():
+    y = np.zeros(1000)
+    y[503] = 10.0
+    idx = lttb_indices(y, 20)
+    assert len(idx) == 20
+    assert idx[0] == 0 and idx[-1] == 999
+    assert 503 in idx
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_short_series_untouched():
+    rows = _snapshots(30)
+    assert downsample(rows, 50, "lttb") is rows
+    assert downsample(rows, 50, "minmax") is rows
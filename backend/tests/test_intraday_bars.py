@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from app.services.intraday_bars import IntradayBarAggregator
+
+DATE = "20260105"
+
+
+def _agg(capacity=400):
+    return IntradayBarAggregator(timeframes=(1, 5), capacity=capacity)
+
+
+def test_trades_aggregate_into_ohlcv():
+    agg = _agg()
+    agg.add_trade("005930", DATE, "090005", 70000, 10)
+    agg.add_trade("005930", DATE, "090030", 70500, 5)
+    agg.add_trade("005930", DATE, "090050", 69800, 3)
+    agg.add_trade("005930", DATE, "090101", 70100, 7)
+
+    one = agg.bars("005930", 1)
+    assert one["open"].tolist() == [70000, 70100]
+    assert one["high"][0] == 70500
+    assert one["low"][0] == 69800
+    assert one["close"][0] == 69800
+    assert one["volume"].tolist() == [18, 7]
+
+    five = agg.bars("005930", 5)
+    assert len(five["close"]) == 1
+    assert five["close"][0] == 70100
+    assert five["volume"][0] == 25
+
+
+def test_gaps_filled_with_flat_bars():
+    agg = _agg()
+    agg.add_trade("005930", DATE, "090000", 70000, 1)
+    agg.add_trade("005930", DATE, "090300", 71000, 1)
+    one = agg.bars("005930", 1)
+    assert one["close"].tolist() == [70000, 70000, 70000, 71000]
+    assert one["volume"].tolist() == [1, 0, 0, 1]
+    assert np.all(np.diff(one["ts"]) == 60)
+
+
+def test_late_trade_updates_closed_bar():
+    agg = _agg()
+    agg.add_trade("005930", DATE, "090010", 70000, 1)
+    agg.add_trade("005930", DATE, "090110", 70200, 1)
+    # 09:00:05 체결이 늦게 도착 — 09:00 봉의 open/high/volume 갱신, close 는 유지
+    assert agg.add_trade("005930", DATE, "090005", 70400, 2)
+    one = agg.bars("005930", 1)
+    assert one["open"][0] == 70400
+    assert one["high"][0] == 70400
+    assert one["close"][0] == 70000
+    assert one["volume"][0] == 3
+    assert agg.stats()["late"] == 1
+
+
+def test_trade_older_than_buffer_is_dropped():
+    agg = _agg(capacity=3)
+    for minute in range(5):
+        agg.add_trade("005930", DATE, f"090{minute}00", 70000 + minute, 1)
+    # 1분봉 버퍼에는 09:02~09:04 만 남아 있음
+    assert agg.add_trade("005930", DATE, "090000", 1, 1) is True  # 5분봉에는 반영
+    assert agg.stats()["dropped"] == 1
+    assert agg.bars("005930", 1)["ts"].size == 3
+
+
+def test_session_boundaries():
+    agg = _agg()
+    assert agg.add_trade("005930", DATE, "085500", 70000, 1) is False  # 장 시작 전 공백
+    agg.add_trade("005930", DATE, "152830", 70000, 1)
+    agg.add_trade("005930", DATE, "153000", 70500, 100)  # 종가 동시호가 → 마지막 봉
+    agg.add_trade("005930", DATE, "154100", 70600, 1)  # NXT 애프터마켓
+    five = agg.bars("005930", 5)
+    assert five["close"].tolist() == [70500, 70600]
+    assert five["volume"].tolist() == [101, 1]
+    # 세션 사이 공백은 채우지 않음
+    assert five["ts"][1] - five["ts"][0] == 15 * 60
+
+
+def test_views_are_zero_copy_and_read_only():
+    agg = _agg(capacity=4)
+    for minute in range(6):
+        agg.add_trade("005930", DATE, f"090{minute}00", 100 + minute, 1)
+    closes = agg.bars("005930", 1)["close"]
+    assert closes.tolist() == [102, 103, 104, 105]
+    assert not closes.flags.owndata
+    with pytest.raises(ValueError):
+        closes[0] = 0
+    # 같은 버퍼를 가리키므로 현재 봉 갱신이 즉시 보임
+    agg.add_trade("005930", DATE, "090530", 200, 1)
+    assert closes[-1] == 200
+
+
+def test_ingest_ccnl_rows():
+    agg = _agg()
+    rows = [
+        {"MKSC_SHRN_ISCD": "000660", "STCK_CNTG_HOUR": "090001", "STCK_PRPR": "150000",
+         "CNTG_VOL": "3", "BSOP_DATE": DATE},
+        {"MKSC_SHRN_ISCD": "000660", "STCK_CNTG_HOUR": "090002", "STCK_PRPR": "bad",
+         "CNTG_VOL": "3", "BSOP_DATE": DATE},
+    ]
+    assert agg.ingest("H0STCNT0", rows) == 1
+    assert agg.ingest("H0STASP0", rows) == 0
+    assert agg.symbols() == ["000660"]
@@ -0,0 +1,129 @@
+"""구조화 MCP 결과 (structuredContent → KisResult) 테스트"""
+import json
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import db as db_module
+from app.services import market_service, mcp_client, order_service
+from app.services.kis_result import KisResult, table_records
+from app.services.mcp_client import MCPClientManager
+
+
+def _content(outputs=None, kis=None, success=True, **extra):
+    data = {"success": success, "api_type": "x", "outputs": outputs or {}, "kis": kis or {"rt_cd": "0"}, **extra}
+    return {"ok": True, "data": data}
+
+
+def _table(**columns):
+    return {"length": len(next(iter(columns.values()))), "columns": columns}
+
+
+@pytest.fixture
+async def temp_db(tmp_path, monkeypatch):
+    path = tmp_path / "trading.db"
+    monkeypatch.setattr(db_module, "DB_PATH", path)
+    await db_module.init_database()
+    return path
+
+
+def _fake_call(monkeypatch, content):
+    async def call_tool_result(name, arguments):
+        return KisResult.from_content(content)
+
+    monkeypatch.setattr(mcp_client.mcp_manager, "call_tool_result", call_tool_result)
+
+
+def test_columnar_tables_become_records():
+    result = KisResult.from_content(_content({
+        "output1": _table(pdno=["005930", "000660"], hldg_qty=["10", "3"]),
+        "output2": _table(tot_evlu_amt=["1000"]),
+    }, timing={"encode_ms": 0.4}))
+    assert result.ok and not result.rejected
+    assert result.records("output1") == [{"pdno": "005930", "hldg_qty": "10"}, {"pdno": "000660", "hldg_qty": "3"}]
+    assert result.records() == result.records("output1")  # 기본은 첫 테이블
+    assert result.first("output2") == {"tot_evlu_amt": "1000"}
+    assert result.records("missing") == [] and result.timing == {"encode_ms": 0.4}
+    assert table_records({"length": 0, "columns": {}}) == []
+
+
+def test_errors_and_rejections():
+    rejected = KisResult.from_content(_content(
+        kis={"rt_cd": "1", "msg_cd": "APBK0919", "msg1": "주문가능금액 부족"}, success=False))
+    assert not rejected.ok and rejected.rejected
+    assert rejected.error == "주문가능금액 부족"
+
+    assert KisResult.from_content({"ok": False, "error": "STOCK_NOT_FOUND"}).error == "STOCK_NOT_FOUND"
+    assert not KisResult.from_content("plain text").ok
+
+    # 서버 내부 처리 결과(find_stock_code 등)는 value로 전달
+    found = KisResult.from_content({"ok": True, "data": {"found": True, "stock_code": "005930"}})
+    assert found.ok and found.value["stock_code"] == "005930" and found.outputs == {}
+
+
+@pytest.mark.asyncio
+async def test_manager_prefers_structured_content(monkeypatch):
+    content = _content({"output": _table(stck_prpr=["70000"])})
+
+    class FakeClient:
+        def __init__(self, url):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def list_tools(self):
+            return []
+
+        async def call_tool(self, name, arguments):
+            if arguments.get("text_only"):  # output schema가 없는 서버
+                return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(content))])
+            return SimpleNamespace(structured_content=content, content=[SimpleNamespace(text="ignored")])
+
+    monkeypatch.setattr(mcp_client, "Client", FakeClient)
+    manager = MCPClientManager(pool_size=1)
+    await manager.connect()
+
+    assert (await manager.call_tool_result("domestic_stock", {})).first() == {"stck_prpr": "70000"}
+    assert (await manager.call_tool_result("domestic_stock", {"text_only": True})).first() == {"stck_prpr": "70000"}
+    assert await manager.call_tool("domestic_stock", {}) == "ignored"
+    await manager.disconnect()
+
+    offline = await manager.call_tool_result("domestic_stock", {})
+    assert not offline.ok and "not connected" in offline.error
+
+
+@pytest.mark.asyncio
+async def test_market_service_reads_tables_directly(monkeypatch):
+    _fake_call(monkeypatch, _content({"output": _table(
+        frgn_ntby_qty=["100", "-30", ""], orgn_ntby_qty=["5", "5", None])}))
+    trend = await market_service.get_investor_trend("005930")
+    assert trend["foreign_net_buy"] == 70 and trend["institution_net_buy"] == 10
+
+    _fake_call(monkeypatch, _content({
+        "output1": _table(stck_prpr=["70000"]),
+        "output2": _table(stck_clpr=["1", "2", "3"]),
+    }))
+    assert len(await market_service.get_daily_chart("005930")) == 3
+
+
+@pytest.mark.asyncio
+async def test_order_uses_kis_status_not_text(temp_db, monkeypatch):
+    _fake_call(monkeypatch, _content(
+        {"output": _table(ODNO=[""])},
+        kis={"rt_cd": "1", "msg_cd": "APBK0919", "msg1": "주문가능금액 부족"}, success=False))
+    rejected = await order_service.place_order("005930", "buy", 10)
+    assert rejected["status"] == "rejected" and rejected["error"] == "주문가능금액 부족"
+
+    _fake_call(monkeypatch, _content({"output": _table(ODNO=["0000123"], ORD_TMD=["091500"])}))
+    filled = await order_service.place_order("005930", "buy", 10, price=70000)
+    assert filled["status"] == "filled" and filled["result"]["order_no"] == "0000123"
+
+    conn = sqlite3.connect(temp_db)
+    statuses = [r[0] for r in conn.execute("SELECT status FROM orders ORDER BY id")]
+    conn.close()
+    assert statuses == ["rejected", "filled"]
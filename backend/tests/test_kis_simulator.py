@@ -0,0 +1,180 @@
+"""로컬 KIS 시뮬레이터 — 응답 형태, 페이지네이션, 주문/잔고, 스로틀링, 웹소켓 테스트"""
+import json
+from datetime import date
+
+import pytest
+from starlette.testclient import TestClient
+
+from kis_simulator import SimConfig, SimMarket, create_app
+from kis_simulator.server import ASKING_COLUMNS, CCNL_COLUMNS, canonical_header_case
+
+Q = "/uapi/domestic-stock/v1/quotations"
+T = "/uapi/domestic-stock/v1/trading"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def sim():
+    clock = FakeClock()
+    market = SimMarket(symbols=40, seed=7, history_days=260, clock=clock, today=date(2026, 3, 10))
+    config = SimConfig(rate_limit=0, ws_interval_sec=0.01, ws_ping_sec=0.05)
+    with TestClient(create_app(config, market)) as client:
+        yield client, market, clock
+
+
+def test_paths_are_deterministic_per_seed_regardless_of_polling():
+    a = SimMarket(symbols=12, seed=3, history_days=60, clock=(ca := FakeClock()), today=date(2026, 3, 10))
+    b = SimMarket(symbols=12, seed=3, history_days=60, clock=(cb := FakeClock()), today=date(2026, 3, 10))
+    for t in range(1, 101):
+        ca.now = t
+        a.advance()
+    cb.now = 100
+    b.advance()
+    assert a.symbols[5].history == b.symbols[5].history
+    assert a.quote("005930")["price"] == b.quote("005930")["price"]
+    assert a.quote("005930")["high"] == b.quote("005930")["high"]
+
+
+def test_auth_and_quote_shapes_parse_like_kis_auth(sim):
+    client, market, clock = sim
+    token = client.post("/oauth2/tokenP", json={"grant_type": "client_credentials"}).json()
+    assert token["access_token"] and token["access_token_token_expired"]
+    assert client.post("/oauth2/Approval", json={}).json()["approval_key"]
+
+    clock.now = 600
+    resp = client.get(f"{Q}/inquire-price", params={"FID_COND_MRKT_DIV_CODE": "J", "FID_INPUT_ISCD": "005930"})
+    body = resp.json()
+    assert body["rt_cd"] == "0" and body["msg_cd"] == "MCA00000"
+    out = body["output"]
+    assert all(isinstance(v, str) for v in out.values())
+    assert int(out["stck_lwpr"]) <= int(out["stck_prpr"]) <= int(out["stck_hgpr"])
+    assert int(out["acml_vol"]) > 0
+    assert resp.headers["tr_id"] == "FHKST01010100" and resp.headers["tr_cont"] == ""
+
+    bad = client.get(f"{Q}/inquire-price", params={"FID_INPUT_ISCD": "999999"}).json()
+    assert bad["rt_cd"] == "1"
+
+    ranks = client.get(f"{Q}/volume-rank", params={"FID_BLNG_CLS_CODE": "0"}).json()["output"]
+    vols = [int(r["acml_vol"]) for r in ranks]
+    assert len(ranks) == 30 and vols == sorted(vols, reverse=True) and ranks[0]["mksc_shrn_iscd"]
+    fluct = client.get("/uapi/domestic-stock/v1/ranking/fluctuation", params={"fid_rank_sort_cls_code": "0"}).json()
+    rates = [float(r["prdy_ctrt"]) for r in fluct["output"]]
+    assert rates == sorted(rates, reverse=True) and fluct["output"][0]["stck_shrn_iscd"]
+
+    investor = client.get(f"{Q}/inquire-investor", params={"FID_INPUT_ISCD": "000660"}).json()["output"]
+    assert len(investor) == 30 and {"frgn_ntby_qty", "orgn_ntby_qty"} <= investor[0].keys()
+
+
+def test_wire_headers_keep_kis_casing():
+    # kis_auth.APIResp 는 islower() 인 헤더 이름을 namedtuple 필드로 쓴다
+    raw = b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\ntr_id: FHKST01010100\r\ncontent-length: 2\r\n\r\n{}"
+    fixed = canonical_header_case(raw)
+    assert fixed == raw.replace(b"content-type", b"Content-Type").replace(b"content-length", b"Content-Length")
+    names = [line.split(b":")[0].decode() for line in fixed.split(b"\r\n\r\n")[0].split(b"\r\n")[1:]]
+    assert all(n.isidentifier() for n in names if n.islower())
+    assert canonical_header_case(b"0|H0STCNT0|001|x") == b"0|H0STCNT0|001|x"
+
+
+def test_daily_chart_pages_back_100_rows_newest_first(sim):
+    client, market, _ = sim
+    params = {"FID_INPUT_ISCD": "005930", "FID_INPUT_DATE_1": "20250101", "FID_INPUT_DATE_2": "20260310",
+              "FID_PERIOD_DIV_CODE": "D"}
+    first = client.get(f"{Q}/inquire-daily-itemchartprice", params=params).json()
+    rows = first["output2"]
+    assert len(rows) == 100 and rows[0]["stck_bsop_date"] == "20260310"
+    assert [r["stck_bsop_date"] for r in rows] == sorted((r["stck_bsop_date"] for r in rows), reverse=True)
+    assert first["output1"]["hts_kor_isnm"] == "삼성전자"
+
+    params["FID_INPUT_DATE_2"] = str(int(rows[-1]["stck_bsop_date"]) - 1)
+    second = client.get(f"{Q}/inquire-daily-itemchartprice", params=params).json()["output2"]
+    assert second[0]["stck_bsop_date"] < rows[-1]["stck_bsop_date"]
+
+    weekly = client.get(f"{Q}/inquire-daily-itemchartprice", params={**params, "FID_PERIOD_DIV_CODE": "W"}).json()
+    assert len(weekly["output2"]) < len(second)
+
+
+def test_orders_move_cash_and_balance(sim):
+    client, market, clock = sim
+    clock.now = 30
+    price = int(client.get(f"{Q}/inquire-price", params={"FID_INPUT_ISCD": "005930"}).json()["output"]["stck_prpr"])
+    psbl = client.get(f"{T}/inquire-psbl-order", params={"PDNO": "005930", "ORD_UNPR": str(price)}).json()["output"]
+    assert int(psbl["nrcvb_buy_qty"]) == int(100_000_000 // (price * 1.00015))
+
+    order = {"CANO": "12345678", "ACNT_PRDT_CD": "01", "PDNO": "005930", "ORD_DVSN": "01", "ORD_QTY": "10", "ORD_UNPR": "0"}
+    resp = client.post(f"{T}/order-cash", json=order, headers={"tr_id": "VTTC0012U"}).json()
+    assert resp["rt_cd"] == "0" and resp["output"]["ODNO"]
+
+    balance = client.get(f"{T}/inquire-balance", headers={"tr_id": "VTTC8434R"}).json()
+    (held,) = balance["output1"]
+    assert held["pdno"] == "005930" and held["hldg_qty"] == "10"
+    assert float(balance["output2"][0]["dnca_tot_amt"]) == pytest.approx(100_000_000 - 10 * price * 1.00015, abs=1)
+    assert client.get(f"{T}/inquire-psbl-sell", params={"PDNO": "005930"}).json()["output"]["ord_psbl_qty"] == "10"
+
+    oversell = client.post(f"{T}/order-cash", json={**order, "ORD_QTY": "11"}, headers={"tr_id": "VTTC0011U"}).json()
+    assert oversell["rt_cd"] == "1"
+    sold = client.post(f"{T}/order-cash", json=order, headers={"tr_id": "VTTC0011U"}).json()
+    assert sold["rt_cd"] == "0"
+    assert client.get(f"{T}/inquire-balance").json()["output1"] == []
+
+
+def test_resting_limit_order_fills_when_price_crosses():
+    clock = FakeClock()
+    market = SimMarket(symbols=5, seed=11, history_days=30, clock=clock, today=date(2026, 3, 10))
+    price = market.quote("005930")["price"]
+    odno, err = market.place_order("005930", "buy", 1, int(price * 0.999), market=False)
+    assert odno and not err and market.resting and "005930" not in market.holdings
+    for t in range(1, 50_000, 500):
+        clock.now = t
+        market.advance()
+        if not market.resting:
+            break
+    assert market.holdings["005930"].qty == 1
+
+
+def test_throttle_returns_kis_rate_limit_error():
+    market = SimMarket(symbols=5, seed=1, history_days=30, clock=FakeClock(), today=date(2026, 3, 10))
+    with TestClient(create_app(SimConfig(rate_limit=3), market)) as client:
+        codes = [client.get(f"{Q}/inquire-price", params={"FID_INPUT_ISCD": "005930"}, headers={"appkey": "a"})
+                 for _ in range(5)]
+        assert [r.status_code for r in codes] == [200, 200, 200, 500, 500]
+        assert codes[-1].json()["msg_cd"] == "EGW00201"
+        other = client.get(f"{Q}/inquire-price", params={"FID_INPUT_ISCD": "005930"}, headers={"appkey": "b"})
+        assert other.status_code == 200
+        assert client.get("/sim/stats").json()["requests"]["throttled"] == 2
+
+
+def test_websocket_subscribe_frames_and_pingpong(sim):
+    client, market, clock = sim
+    with client.websocket_connect("/tryitout/H0STCNT0") as ws:
+        for tr_id in ("H0STCNT0", "H0STASP0"):
+            ws.send_text(json.dumps({"header": {"approval_key": "k", "custtype": "P", "tr_type": "1"},
+                                     "body": {"input": {"tr_id": tr_id, "tr_key": "005930"}}}))
+            ack = json.loads(ws.receive_text())
+            assert ack["body"]["msg1"] == "SUBSCRIBE SUCCESS" and ack["header"]["tr_id"] == tr_id
+
+        seen, ping = {}, False
+        while len(seen) < 2 or not ping:
+            clock.now += 1
+            msg = ws.receive_text()
+            if msg[0] == "0":
+                _, tr_id, count, data = msg.split("|")
+                seen[tr_id] = data.split("^")
+            else:
+                ping = json.loads(msg)["header"]["tr_id"] == "PINGPONG"
+        assert len(seen["H0STCNT0"]) == len(CCNL_COLUMNS) == 46
+        assert len(seen["H0STASP0"]) == len(ASKING_COLUMNS) == 59
+        assert seen["H0STCNT0"][0] == "005930"
+
+        ws.send_text(json.dumps({"header": {"tr_type": "2"}, "body": {"input": {"tr_id": "H0STCNT0", "tr_key": "005930"}}}))
+        while True:
+            msg = ws.receive_text()
+            if msg[0] != "0" and json.loads(msg)["header"]["tr_id"] != "PINGPONG":
+                break
+        assert json.loads(msg)["body"]["msg1"] == "UNSUBSCRIBE SUCCESS"
@@ -0,0 +1,95 @@
+"""메모 렌더링 (프로세스 풀 + 캐시 + zip 스트리밍) 테스트"""
+import io
+import json
+import sqlite3
+import zipfile
+
+import pytest
+
+from app.models import db as db_module
+from app.services import memo_service
+from app.services.memo_service import MemoRenderer, render_memo_docx, render_memo_html
+
+
+@pytest.fixture
+async def temp_db(tmp_path, monkeypatch):
+    path = tmp_path / "trading.db"
+    monkeypatch.setattr(db_module, "DB_PATH", path)
+    await db_module.init_database()
+    conn = sqlite3.connect(path)
+    for code, name in (("005930", "삼성전자"), ("000660", "SK하이닉스")):
+        conn.execute(
+            """INSERT INTO signals (agent_id, stock_code, stock_name, direction, confidence, rr_score,
+               scenarios_json, expert_stances_json) VALUES ('market_scanner', ?, ?, 'buy', 0.7, 1.8, ?, ?)""",
+            (code, name,
+             json.dumps({"bull": {"label": "강세", "price_target": 90000, "upside_pct": 20.0, "probability": 0.3}}),
+             json.dumps({"기술적분석가": "bullish"})),
+        )
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def renderer(tmp_path):
+    r = MemoRenderer(max_workers=1, cache_dir=tmp_path / "memos")
+    yield r
+    r.shutdown()
+
+
+def test_renderers_are_pure():
+    signal = {"id": 1, "stock_code": "005930", "stock_name": "삼성전자", "direction": "sell", "rr_score": 1.2}
+    html = render_memo_html(signal, "2026-01-02 09:00")
+    assert "삼성전자 (005930)" in html and "2026-01-02 09:00" in html and "매도" in html
+    assert render_memo_docx(signal, "2026-01-02 09:00")[:2] == b"PK"
+
+
+@pytest.mark.asyncio
+async def test_render_in_pool_is_cached_by_content_hash(temp_db, renderer):
+    first = await renderer.render_signal(1, "docx")
+    assert first.cached is False and first.render_ms > 0
+    assert first.content[:2] == b"PK"
+
+    again = await renderer.render_signal(1, "docx")
+    assert again.cached is True
+    assert again.content == first.content
+
+    # 시그널 내용이 바뀌면 새로 렌더링
+    conn = sqlite3.connect(temp_db)
+    conn.execute("UPDATE signals SET status = 'approved' WHERE id = 1")
+    conn.commit()
+    rows = conn.execute("SELECT content_hash, size_bytes, render_ms FROM memo_exports WHERE signal_id = 1").fetchall()
+    conn.close()
+    assert len(rows) == 1 and rows[0][1] == len(first.content) and rows[0][2] > 0
+    first_hash = rows[0][0]
+    assert (await renderer.render_signal(1, "docx")).cached is False
+
+    # 이전 버전의 파일과 행은 정리 (다른 포맷은 유지)
+    await renderer.render_signal(1, "html")
+    conn = sqlite3.connect(temp_db)
+    rows = conn.execute("SELECT format, content_hash FROM memo_exports WHERE signal_id = 1").fetchall()
+    conn.close()
+    assert sorted(r[0] for r in rows) == ["docx", "html"] and rows[0][1] != first_hash
+    assert sorted(p.name for p in renderer.cache_dir.iterdir()) == sorted(
+        f"1_{h}.{f}" for f, h in rows)
+
+    stats = renderer.stats()["docx"]
+    assert stats["renders"] == 2 and stats["cache_hits"] == 1 and stats["avg_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_zip_export_streams_all_memos(temp_db, renderer):
+    chunks = [chunk async for chunk in renderer.stream_zip([1, 2, 99, 1], "html")]
+    assert len([c for c in chunks if c]) >= 2  # 멤버별로 흘려보냄
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+        assert zf.namelist() == ["memo_1.html", "memo_2.html", "missing.txt"]
+        assert "SK하이닉스" in zf.read("memo_2.html").decode("utf-8")
+        assert zf.read("missing.txt") == b"99"
+
+
+@pytest.mark.asyncio
+async def test_legacy_helpers_use_singleton(temp_db, renderer, monkeypatch):
+    monkeypatch.setattr(memo_service, "memo_renderer", renderer)
+    assert "삼성전자" in await memo_service.generate_memo_html(1)
+    assert await memo_service.generate_memo_docx(404) is None
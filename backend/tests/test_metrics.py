@@ -0,0 +1,90 @@
+"""Prometheus 메트릭 레지스트리 / 계측 지점 테스트"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.agents.event_bus import AgentEvent, EventBus
+from app.models import db as db_module
+from app.routers.health import prometheus_metrics
+from app.services import metrics as metrics_module
+from app.services.metrics import MetricsRegistry, observe_claude, sql_statement_label
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry("t")
+    hist = registry.histogram("latency_seconds", "demo", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        hist.observe(value, op='a"b')
+    registry.counter("calls_total", "demo", ("op",)).inc(op="x")
+    registry.gauge("depth", "demo").set_function(lambda: 7)
+
+    text = registry.render()
+    assert '# TYPE t_latency_seconds histogram' in text
+    assert 't_latency_seconds_bucket{op="a\\"b",le="0.1"} 1' in text
+    assert 't_latency_seconds_bucket{op="a\\"b",le="1"} 3' in text
+    assert 't_latency_seconds_bucket{op="a\\"b",le="+Inf"} 4' in text
+    assert 't_latency_seconds_count{op="a\\"b"} 4' in text
+    assert 't_calls_total{op="x"} 1' in text and "t_depth 7" in text
+    assert hist.count(op='a"b') == 4 and hist.sum(op='a"b') == pytest.approx(4.05)
+
+    with pytest.raises(ValueError):
+        registry.counter("latency_seconds", "clash")
+
+
+def test_sql_statement_label_is_low_cardinality():
+    assert sql_statement_label("SELECT * FROM signals WHERE id = ?") == "SELECT signals"
+    assert sql_statement_label("  insert into orders (a) values (?)") == "INSERT orders"
+    assert sql_statement_label("UPDATE signals SET status='executed' WHERE id=?") == "UPDATE signals"
+    assert sql_statement_label("PRAGMA journal_mode=WAL") == "PRAGMA"
+
+
+@pytest.mark.asyncio
+async def test_db_and_event_bus_are_instrumented(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_module, "DB_PATH", tmp_path / "trading.db")
+    await db_module.init_database()
+    before = metrics_module.DB_QUERY_SECONDS.count(statement="SELECT risk_config")
+    await db_module.load_risk_config()
+    assert metrics_module.DB_QUERY_SECONDS.count(statement="SELECT risk_config") == before + 1
+
+    bus = EventBus()
+
+    async def failing(event):
+        raise RuntimeError("boom")
+
+    bus.subscribe("metrics.test", failing)
+    await bus.publish(AgentEvent(event_type="metrics.test", agent_id="t"))
+    assert metrics_module.EVENT_HANDLER_SECONDS.count(
+        event_type="metrics.test", handler=failing.__qualname__, outcome="error") == 1
+    assert metrics_module.EVENT_BUS_IN_FLIGHT.value() == 0
+
+    # fire-and-forget 저장 태스크를 테스트 루프가 닫히기 전에 마무리
+    await bus.drain()
+    assert not bus._persist_tasks
+
+
+@pytest.mark.asyncio
+async def test_claude_calls_record_latency_and_tokens():
+    async def create():
+        return SimpleNamespace(model="m1", usage=SimpleNamespace(input_tokens=120, output_tokens=30))
+
+    await observe_claude("test_persona", create())
+    assert metrics_module.CLAUDE_SECONDS.count(persona="test_persona", model="m1", outcome="ok") == 1
+    assert metrics_module.CLAUDE_TOKENS.value(persona="test_persona", model="m1", kind="input") == 120
+
+    async def fail():
+        raise RuntimeError("overloaded")
+
+    with pytest.raises(RuntimeError):
+        await observe_claude("test_persona", fail())
+    assert metrics_module.CLAUDE_SECONDS.count(persona="test_persona", model="", outcome="error") == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_serves_prometheus_text():
+    from app.services.ws_manager import ws_manager  # noqa: F401 — 게이지 콜백 등록
+
+    response = await prometheus_metrics()
+    assert response.media_type.startswith("text/plain; version=0.0.4")
+    body = response.body.decode()
+    assert "# TYPE trading_mcp_call_duration_seconds histogram" in body
+    assert "trading_ws_clients 0" in body
@@ -0,0 +1,133 @@
+"""배치 뉴스 파이프라인 테스트"""
+import asyncio
+import json
+import sqlite3
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.models import db as db_module
+from app.services import news_service
+
+RSS = """<rss><channel>
+<item><title>{name} 신고가 경신 - 한국경제</title></item>
+<item><title>반도체 업황 회복 기대 - 매일경제</title></item>
+</channel></rss>"""
+
+
+@pytest.fixture
+async def temp_db(tmp_path, monkeypatch):
+    path = tmp_path / "trading.db"
+    monkeypatch.setattr(db_module, "DB_PATH", path)
+    await db_module.init_database()
+    return path
+
+
+@pytest.fixture
+def fake_net(monkeypatch):
+    state = {"requests": [], "active": 0, "peak": 0, "llm_calls": []}
+
+    async def handler(request: httpx.Request):
+        state["requests"].append(request)
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        if request.url.host == "search.naver.com":
+            return httpx.Response(200, text="")  # NAVER 결과 없음 → RSS 사용
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        name = request.url.params["q"].split()[0]
+        return httpx.Response(200, text=RSS.format(name=name), headers={"ETag": '"v1"'})
+
+    async def create(**kwargs):
+        prompt = kwargs["messages"][0]["content"]
+        state["llm_calls"].append(prompt)
+        codes = [line.split()[1] for line in prompt.splitlines() if line.startswith("- ")]
+        body = {code: {"sentiment": "positive", "summary": f"{code} 요약"} for code in codes}
+        return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(body))])
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(news_service, "_get_http", lambda: client)
+    monkeypatch.setattr(news_service, "_get_anthropic", lambda: SimpleNamespace(messages=SimpleNamespace(create=create)))
+    monkeypatch.setattr(news_service, "_host_limits", {})
+    monkeypatch.setattr(news_service, "HOST_CONCURRENCY", {"news.google.com": 2, "search.naver.com": 2})
+    monkeypatch.setattr(news_service, "_conditional_cache", news_service.OrderedDict())
+    return state
+
+
+STOCKS = [("삼성전자", "005930"), ("SK하이닉스", "000660"), ("한미반도체", "042700"), ("LG전자", "066570")]
+
+
+@pytest.mark.asyncio
+async def test_batch_dedupes_classifies_once_and_writes(temp_db, fake_net):
+    results = await news_service.fetch_news_batch(STOCKS)
+
+    assert set(results) == {code for _, code in STOCKS}
+    assert results["005930"]["source"] == "google_rss"
+    assert results["005930"]["headlines"] == ["삼성전자 신고가 경신", "반도체 업황 회복 기대"]
+    assert results["000660"]["sentiment"] == "positive"
+
+    # 종목 4개 → LLM 1회, 공통 헤드라인은 한 번만 포함
+    assert len(fake_net["llm_calls"]) == 1
+    assert fake_net["llm_calls"][0].count("반도체 업황 회복 기대") == 1
+    # 호스트별 동시성 제한
+    assert fake_net["peak"] <= 4
+
+    conn = sqlite3.connect(temp_db)
+    assert conn.execute("SELECT COUNT(*) FROM news_cache").fetchone()[0] == 8
+    conn.close()
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_network(temp_db, fake_net):
+    await news_service.fetch_news_batch(STOCKS[:2])
+    fake_net["requests"].clear()
+
+    results = await news_service.fetch_news_batch(STOCKS[:2])
+    assert fake_net["requests"] == []
+    assert results["005930"]["source"] == "cache"
+    assert results["005930"]["summary"] == "005930 요약"
+
+
+@pytest.mark.asyncio
+async def test_conditional_request_reuses_titles_on_304(fake_net):
+    first = await news_service._fetch_google_news_rss("삼성전자")
+    second = await news_service._fetch_google_news_rss("삼성전자")
+    assert first == second
+    assert fake_net["requests"][-1].headers["If-None-Match"] == '"v1"'
+
+
+def test_headline_hash_normalizes():
+    assert news_service.headline_hash("삼성전자, 신고가!") == news_service.headline_hash("삼성전자 신고가")
+    assert news_service.headline_hash("삼성전자 신고가") != news_service.headline_hash("삼성전자 신저가")
+
+
+@pytest.mark.asyncio
+async def test_rss_only_when_naver_empty_and_failed_chunks_not_cached(temp_db, fake_net, monkeypatch):
+    monkeypatch.setattr(news_service, "MAX_HEADLINES_PER_CALL", 2)  # 종목별 청크
+    create = news_service._get_anthropic().messages.create
+
+    async def flaky_create(**kwargs):
+        if "000660" in kwargs["messages"][0]["content"]:
+            raise RuntimeError("overloaded")
+        return await create(**kwargs)
+
+    monkeypatch.setattr(news_service, "_get_anthropic",
+                        lambda: SimpleNamespace(messages=SimpleNamespace(create=flaky_create)))
+    results = await news_service.fetch_news_batch(STOCKS[:2])
+    assert results["000660"]["sentiment"] == "neutral" and results["000660"]["summary"] == ""
+    assert results["005930"]["sentiment"] == "positive"
+
+    conn = sqlite3.connect(temp_db)
+    assert {r[0] for r in conn.execute("SELECT stock_code FROM news_cache")} == {"005930"}
+    conn.close()
+
+    # NAVER 결과가 있으면 Google RSS 는 요청하지 않는다
+    fake_net["requests"].clear()
+    monkeypatch.setattr(news_service, "_parse_naver", lambda text: ["SK하이닉스 실적 발표"])
+    results = await news_service.fetch_news_batch(STOCKS[:2])
+    assert results["005930"]["source"] == "cache"
+    assert results["000660"]["source"] == "naver"
+    assert [r.url.host for r in fake_net["requests"]] == ["search.naver.com"]
@@ -1,17 +1,21 @@
 """포트폴리오 리스크 서비스 테스트"""
+import numpy as np
 import pytest
-from app.services.portfolio_risk_service import (
-    calculate_historical_var,
-    calculate_beta,
-    compute_correlation_matrix,
-    _compute_returns,
-)
+from app.services.portfolio_risk_service import calculate_historical_var
+from app.services.risk_engine import build_returns_matrix, compute_risk_metrics
+
+
+def _dated(values: list[float]) -> dict[str, float]:
+    return {f"202603{i + 1:02d}": v for i, v in enumerate(values)}
+
+
+def _closes_from_returns(returns: list[float]) -> dict[str, float]:
+    return _dated(list(100 * np.cumprod([1.0] + [1 + r for r in returns])))
 
 
 def test_compute_returns_basic():
     """일일 수익률 계산 검증"""
-    closes = [100, 105, 103, 110]
-    returns = _compute_returns(closes)
+    returns = build_returns_matrix({"A": _dated([100, 105, 103, 110])}).column("A")
     assert len(returns) == 3
     assert abs(returns[0] - 0.05) < 0.001   # (105-100)/100
     assert abs(returns[1] - (-0.019047)) < 0.001  # (103-105)/105
@@ -20,8 +24,8 @@ def test_compute_returns_basic():
 
 def test_compute_returns_empty():
     """빈 배열 처리"""
-    assert _compute_returns([]) == []
-    assert _compute_returns([100]) == []
+    assert build_returns_matrix({}).codes == []
+    assert build_returns_matrix({"A": _dated([100])}).codes == []
 
 
 def test_var_basic():
@@ -50,23 +54,52 @@ def test_var_99_higher_than_95():
 
 def test_beta_perfect_correlation():
     """완벽한 상관관계 시 베타 = 1"""
-    returns = [0.01, -0.02, 0.015, -0.005, 0.03, -0.01, 0.02, -0.015, 0.01, 0.005]
-    beta = calculate_beta(returns, returns)
-    assert abs(beta - 1.0) < 0.01
+    closes = _closes_from_returns([0.01, -0.02, 0.015, -0.005, 0.03, -0.01, 0.02, -0.015, 0.01, 0.005])
+    metrics = compute_risk_metrics({"A": closes, "069500": closes}, {"A": 1.0})
+    assert abs(metrics["betas"]["A"] - 1.0) < 0.01
 
 
 def test_beta_insufficient_data():
     """데이터 부족 시 기본값 1.0"""
-    assert calculate_beta([0.01], [0.01]) == 1.0
+    closes = _closes_from_returns([0.01])
+    assert compute_risk_metrics({"A": closes, "069500": closes}, {"A": 1.0})["betas"]["A"] == 1.0
 
 
 def test_correlation_matrix_diagonal():
     """대각선은 모두 1.0"""
-    returns_map = {
-        "A": [0.01, -0.02, 0.015, -0.005, 0.03, -0.01, 0.02, -0.015, 0.01, 0.005],
-        "B": [0.02, -0.01, 0.01, -0.01, 0.02, -0.02, 0.015, -0.01, 0.005, 0.01],
+    closes = {
+        "A": _closes_from_returns([0.01, -0.02, 0.015, -0.005, 0.03, -0.01, 0.02, -0.015, 0.01, 0.005]),
+        "B": _closes_from_returns([0.02, -0.01, 0.01, -0.01, 0.02, -0.02, 0.015, -0.01, 0.005, 0.01]),
     }
-    result = compute_correlation_matrix(returns_map)
+    result = compute_risk_metrics(closes, {"A": 0.5, "B": 0.5})["correlation"]
     assert len(result["matrix"]) == 2
     assert result["matrix"][0][0] == 1.0
     assert result["matrix"][1][1] == 1.0
+
+
+async def test_daily_closes_fetched_concurrently_and_cache_pruned(monkeypatch):
+    import asyncio
+
+    from app.services import portfolio_risk_service as svc
+
+    active = peak = 0
+
+    async def fake_chart(code):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return [{"stck_bsop_date": f"202603{d:02d}", "stck_clpr": str(1000 + d)} for d in range(1, 21)]
+
+    monkeypatch.setattr(svc, "get_daily_chart", fake_chart)
+    monkeypatch.setattr(svc.mcp_manager, "_pool_size", 3)
+    monkeypatch.setattr(svc, "_closes_cache", {"SOLD": ("20000101", {"20000101": 1.0})})
+
+    codes = [f"{i:06d}" for i in range(8)]
+    closes = await svc.get_daily_closes_for(codes + ["000000"])
+    assert list(closes) == codes and all(len(c) == 20 for c in closes.values())
+    assert peak == 3  # MCP 풀 크기만큼만 동시 조회
+
+    svc.prune_closes_cache(set(codes[:2]))
+    assert set(svc._closes_cache) == set(codes[:2])
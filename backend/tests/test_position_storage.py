@@ -0,0 +1,87 @@
+"""Compact 포지션 저장 테스트"""
+import sqlite3
+
+import pytest
+
+from app.models import db as db_module
+from app.services import portfolio_service
+
+
+def _pos(code, qty, avg, price):
+    return {
+        "stock_code": code, "stock_name": code, "quantity": qty, "avg_buy_price": avg,
+        "current_price": price, "market_value": price * qty,
+        "unrealized_pnl": (price - avg) * qty, "unrealized_pnl_pct": round((price - avg) / avg * 100, 2),
+    }
+
+
+@pytest.fixture
+async def temp_db(tmp_path, monkeypatch):
+    path = tmp_path / "trading.db"
+    monkeypatch.setattr(db_module, "DB_PATH", path)
+    monkeypatch.setattr(portfolio_service, "_current_positions", None)
+    await db_module.init_database()
+    return path
+
+
+def _count(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.mark.asyncio
+async def test_compact_writes_lots_only_on_change(temp_db):
+    ids = []
+    for price in (70000, 70000, 70500):
+        ids.append(await portfolio_service.save_snapshot(
+            1e7, 5e6, 0, 0, [_pos("005930", 10, 69000, price), _pos("000660", 5, 180000, 181000)],
+        ))
+    assert _count(temp_db, "position_lots") == 2
+    assert _count(temp_db, "positions") == 0
+    # 가격 변화분만 기록: 최초 2건 + 005930 가격 변경 1건
+    assert _count(temp_db, "position_prices") == 3
+
+    # 추가 매수(수량/평단 변경) + 000660 청산
+    ids.append(await portfolio_service.save_snapshot(1e7, 4e6, 0, 0, [_pos("005930", 20, 69500, 70500)]))
+    assert _count(temp_db, "position_lots") == 3
+
+    latest = await portfolio_service.get_latest_positions()
+    assert [(p["stock_code"], p["quantity"]) for p in latest] == [("005930", 20)]
+
+    second = await portfolio_service.get_positions_at(ids[1])
+    assert {p["stock_code"]: (p["quantity"], p["current_price"]) for p in second} == {
+        "005930": (10, 70000), "000660": (5, 181000),
+    }
+    third = await portfolio_service.get_positions_at(ids[2])
+    assert {p["stock_code"]: p["current_price"] for p in third}["005930"] == 70500
+
+
+@pytest.mark.asyncio
+async def test_latest_positions_survive_restart_and_are_copies(temp_db, monkeypatch):
+    await portfolio_service.save_snapshot(1e7, 5e6, 0, 0, [_pos("005930", 10, 69000, 70000)])
+    monkeypatch.setattr(portfolio_service, "_current_positions", None)  # 프로세스 재시작
+
+    first = await portfolio_service.get_latest_positions()
+    assert first[0]["quantity"] == 10
+    first[0]["stop_loss_pct"] = -3.0
+    assert "stop_loss_pct" not in (await portfolio_service.get_latest_positions())[0]
+
+
+@pytest.mark.asyncio
+async def test_legacy_mode_keeps_per_snapshot_rows(temp_db):
+    sid = await portfolio_service.save_snapshot(1e7, 5e6, 0, 0, [_pos("005930", 10, 69000, 70000)], compact=False)
+    assert _count(temp_db, "positions") == 1
+    assert _count(temp_db, "position_lots") == 0
+    assert (await portfolio_service.get_positions_at(sid))[0]["stock_code"] == "005930"
+    assert (await portfolio_service.get_latest_positions())[0]["snapshot_id"] == sid
+
+
+@pytest.mark.asyncio
+async def test_compact_price_dedup_compares_latest_price(temp_db):
+    # A → B → A: 세 번째도 직전(B) 대비 변경이므로 기록
+    for price in (70000, 70500, 70000, 70000):
+        await portfolio_service.save_snapshot(1e7, 5e6, 0, 0, [_pos("005930", 10, 69000, price), _pos("000660", 5, 180000, 181000)])
+    assert _count(temp_db, "position_prices") == 4
@@ -0,0 +1,195 @@
+"""보존 정책(retention) 테스트"""
+import gzip
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import db as db_module
+from app.services.retention_service import RetentionPolicy, RetentionService
+
+NOW = datetime(2026, 3, 31, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def temp_db(tmp_path, monkeypatch):
+    path = tmp_path / "trading.db"
+    monkeypatch.setattr(db_module, "DB_PATH", path)
+    await db_module.init_database()
+    return path
+
+
+def _fill(path):
+    conn = sqlite3.connect(path)
+    for i in range(120):
+        ts = NOW - timedelta(days=i)
+        conn.execute(
+            "INSERT INTO agent_events (event_type, agent_id, data, timestamp) VALUES (?, ?, ?, ?)",
+            ("test.event", "t", "{}", ts.isoformat()),
+        )
+    # 20일 전 하루치 1분 스냅샷 3시간 + 최근 스냅샷
+    for minute in range(180):
+        ts = (NOW - timedelta(days=20) + timedelta(minutes=minute)).strftime("%Y-%m-%d %H:%M:%S")
+        cur = conn.execute(
+            """INSERT INTO portfolio_snapshots (timestamp, total_value, cash_balance, total_pnl, total_pnl_pct)
+               VALUES (?, ?, 0, 0, 0)""",
+            (ts, 1e7 + minute),
+        )
+        conn.execute(
+            """INSERT INTO positions (snapshot_id, stock_code, stock_name, quantity, avg_buy_price,
+               current_price, market_value, unrealized_pnl, unrealized_pnl_pct)
+               VALUES (?, '005930', 'x', 1, 1, 1, 1, 0, 0)""",
+            (cur.lastrowid,),
+        )
+    conn.execute(
+        """INSERT INTO portfolio_snapshots (timestamp, total_value, cash_balance, total_pnl, total_pnl_pct)
+           VALUES (?, 1e7, 0, 0, 0)""",
+        (NOW.strftime("%Y-%m-%d %H:%M:%S"),),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _count(path, sql):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql).fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.mark.asyncio
+async def test_age_limit_archives_and_deletes(temp_db, tmp_path):
+    _fill(temp_db)
+    svc = RetentionService(
+        [RetentionPolicy("agent_events", "timestamp", "iso", max_age_days=30)],
+        archive_dir=tmp_path / "archive",
+        batch_size=25,
+    )
+    report = await svc.run(now=NOW)
+    assert report["complete"] is True
+    assert _count(temp_db, "SELECT COUNT(*) FROM agent_events") == 31
+    assert report["tables"]["agent_events"]["archived"] == 89
+
+    archived = []
+    for f in (tmp_path / "archive" / "agent_events").glob("*.jsonl.gz"):
+        with gzip.open(f, "rt", encoding="utf-8") as fh:
+            archived += [json.loads(line) for line in fh]
+    assert len(archived) == 89
+    assert all(a["timestamp"] < (NOW - timedelta(days=30)).isoformat() for a in archived)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_downsample_keeps_hourly_and_rollups(temp_db, tmp_path):
+    _fill(temp_db)
+    rollup_before = _count(temp_db, "SELECT SUM(snapshot_count) FROM portfolio_rollup_hourly")
+    svc = RetentionService(
+        [RetentionPolicy("portfolio_snapshots", "timestamp", max_age_days=365, downsample_after_days=14,
+                         children=(("positions", "snapshot_id"),))],
+        archive_dir=tmp_path / "archive",
+        batch_size=50,
+    )
+    await svc.run(now=NOW)
+    # 3시간치 → 시간당 1건 + 최근 1건
+    assert _count(temp_db, "SELECT COUNT(*) FROM portfolio_snapshots") == 4
+    assert _count(temp_db, "SELECT COUNT(*) FROM positions") == 3
+    assert _count(temp_db, "SELECT SUM(snapshot_count) FROM portfolio_rollup_hourly") == rollup_before
+
+
+@pytest.mark.asyncio
+async def test_time_budget_leaves_work_pending(temp_db, tmp_path):
+    _fill(temp_db)
+    svc = RetentionService(
+        [RetentionPolicy("agent_events", "timestamp", "iso", max_rows=10)],
+        archive_dir=tmp_path / "archive",
+        batch_size=10,
+    )
+    report = await svc.run(time_budget_sec=0, now=NOW)
+    assert report["complete"] is False
+    report = await svc.run(now=NOW)
+    assert report["complete"] is True
+    assert _count(temp_db, "SELECT COUNT(*) FROM agent_events") == 10
+    assert "wal_checkpoint" in report["maintenance"]
+
+
+@pytest.mark.asyncio
+async def test_init_database_converts_existing_db_to_incremental(tmp_path, monkeypatch):
+    path = tmp_path / "legacy.db"
+    sqlite3.connect(path).execute("CREATE TABLE legacy (x)").connection.close()
+    monkeypatch.setattr(db_module, "DB_PATH", path)
+
+    # 보존 작업은 전체 VACUUM 없이 체크포인트만 수행 (모드 전환은 시작 시에만)
+    report = await RetentionService([], archive_dir=tmp_path / "archive").run(now=NOW)
+    assert report["maintenance"]["auto_vacuum"] == 0 and "wal_checkpoint" in report["maintenance"]
+
+    await db_module.init_database()
+    assert _count(path, "PRAGMA auto_vacuum") == 2
+
+
+@pytest.mark.asyncio
+async def test_table_stats(temp_db, tmp_path):
+    _fill(temp_db)
+    svc = RetentionService(archive_dir=tmp_path / "archive")
+    stats = await svc.table_stats()
+    assert stats["tables"]["agent_events"]["rows"] == 120
+    assert stats["tables"]["portfolio_snapshots"]["oldest"].startswith("2026-03-11")
+    assert stats["database_bytes"] > 0
+
+
+def _pos(code, qty, price, avg=100):
+    return {"stock_code": code, "stock_name": code, "quantity": qty, "avg_buy_price": avg,
+            "current_price": price, "market_value": qty * price, "unrealized_pnl": 0, "unrealized_pnl_pct": 0}
+
+
+@pytest.mark.asyncio
+async def test_downsample_keeps_compact_position_history(temp_db, tmp_path, monkeypatch):
+    from app.services import portfolio_service
+
+    monkeypatch.setattr(portfolio_service, "_current_positions", None)
+    # 20일 전 두 시간 동안의 스냅샷 (compact 저장) + 현재 스냅샷
+    history = [
+        [_pos("A", 10, 100), _pos("B", 5, 200)],
+        [_pos("A", 10, 101), _pos("B", 5, 200)],
+        [_pos("A", 10, 101)],                    # B 청산
+        [_pos("A", 10, 102), _pos("C", 3, 50)],  # C 매수 …
+        [_pos("A", 10, 102)],                    # … 같은 시간 안에 청산
+        [_pos("A", 10, 102)],                    # 시간의 마지막 스냅샷
+        [_pos("A", 10, 103)],
+        [_pos("A", 20, 103, avg=101)],           # 추가 매수 (lot 교체)
+        [_pos("A", 20, 104, avg=101)],
+    ]
+    start = NOW - timedelta(days=20)
+    stamps = [start + timedelta(minutes=10 * i) for i in range(6)] + [
+        start + timedelta(hours=1, minutes=10 * i) for i in range(2)] + [NOW]
+    ids = []
+    conn = sqlite3.connect(temp_db)
+    for positions, ts in zip(history, stamps):
+        sid = await portfolio_service.save_snapshot(1e7, 0, 0, 0, positions)
+        conn.execute("UPDATE portfolio_snapshots SET timestamp = ? WHERE id = ?",
+                     (ts.strftime("%Y-%m-%d %H:%M:%S"), sid))
+        conn.commit()
+        ids.append(sid)
+    conn.close()
+    survivors = [ids[5], ids[7], ids[8]]
+    before = {sid: await portfolio_service.get_positions_at(sid) for sid in survivors}
+
+    policy = RetentionPolicy("portfolio_snapshots", "timestamp", downsample_after_days=14,
+                             children=(("positions", "snapshot_id"),), position_history=True)
+    await RetentionService([policy], archive_dir=tmp_path / "archive", batch_size=2).run(now=NOW)
+
+    assert _count(temp_db, "SELECT COUNT(*) FROM portfolio_snapshots") == 3
+    assert {sid: await portfolio_service.get_positions_at(sid) for sid in survivors} == before
+    # 남은 스냅샷에서 보이지 않는 lot(B, C)과 가격 행은 정리, 나머지는 남은 스냅샷을 가리킴
+    assert _count(temp_db, "SELECT COUNT(*) FROM position_lots WHERE stock_code IN ('B', 'C')") == 0
+    assert _count(temp_db, "SELECT COUNT(*) FROM position_prices WHERE snapshot_id NOT IN "
+                           "(SELECT id FROM portfolio_snapshots)") == 0
+    assert _count(temp_db, "SELECT COUNT(*) FROM position_lots WHERE opened_snapshot_id NOT IN "
+                           "(SELECT id FROM portfolio_snapshots)") == 0
+
+    # 보존 기간 초과 삭제 후에도 최신 스냅샷과 다음 저장의 가격 비교가 유지된다
+    policy = RetentionPolicy("portfolio_snapshots", "timestamp", max_age_days=14, position_history=True)
+    await RetentionService([policy], archive_dir=tmp_path / "archive").run(now=NOW)
+    assert await portfolio_service.get_positions_at(ids[8]) == before[ids[8]]
+    assert _count(temp_db, "SELECT COUNT(*) FROM position_lots") == 1
+    assert _count(temp_db, "SELECT COUNT(*) FROM position_prices") == 1
@@ -0,0 +1,55 @@
+"""타입 RiskConfig + 캐시/변경 알림 테스트"""
+import pytest
+
+from app.agents.event_bus import EventBus
+from app.models import db as db_module
+from app.models.risk_config import RiskConfig
+from app.routers.agents import RiskConfigUpdate, get_risk_config, update_risk_config
+from app.services import metrics as metrics_module
+from app.services.risk_config_service import CONFIG_UPDATED_EVENT, RiskConfigService
+
+
+def test_from_mapping_parses_types_and_falls_back():
+    config = RiskConfig.from_mapping({
+        "stop_loss_pct": "-2.5",
+        "max_positions": "7",
+        "critic_check_dissent": "False",
+        "dart_per_required": "true",
+        "max_buy_qty": "oops",
+        "custom_flag": "x",
+    })
+    assert config.stop_loss_pct == -2.5 and config.max_positions == 7
+    assert config.critic_check_dissent is False and config.dart_per_required is True
+    assert config.max_buy_qty == 10  # 파싱 실패 → 기본값
+    assert config.extra == {"custom_flag": "x"} and "custom_flag" not in config.to_dict()
+    assert config.multiplier_for("long") == 3.0 and config.multiplier_for("short") == 2.0
+
+
+@pytest.mark.asyncio
+async def test_cache_reloads_only_on_change_event(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_module, "DB_PATH", tmp_path / "trading.db")
+    await db_module.init_database()
+
+    service, bus = RiskConfigService(), EventBus()
+    monkeypatch.setattr("app.routers.agents.risk_config_service", service)
+    monkeypatch.setattr("app.services.risk_config_service.event_bus", bus)
+    bus.subscribe(CONFIG_UPDATED_EVENT, service.on_config_updated)
+    assert service.current == RiskConfig()  # 로드 전에는 기본값
+    await service.get()
+    await service.get()
+    reads = metrics_module.DB_QUERY_SECONDS.count(statement="SELECT risk_config")
+    for _ in range(5):
+        assert service.current.stop_loss_pct == -3.0
+    assert service.loads == 1
+
+    updated = await update_risk_config(RiskConfigUpdate(stop_loss_pct=-4.0, critic_check_variant=False))
+    assert updated["stop_loss_pct"] == -4.0 and updated["critic_check_variant"] is False
+    assert service.current.stop_loss_pct == -4.0 and service.loads == 2
+    assert metrics_module.DB_QUERY_SECONDS.count(statement="SELECT risk_config") == reads + 1
+    assert (await get_risk_config())["max_positions"] == 5
+
+    # 기존 값이 있으면 only_missing 갱신은 무시
+    await service.update({"stop_loss_pct": -9.0}, only_missing=True)
+    assert service.current.stop_loss_pct == -4.0
+    stored = await db_module.load_risk_config()
+    assert stored["critic_check_variant"] == "false"
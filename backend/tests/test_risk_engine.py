@@ -0,0 +1,77 @@
+"""NumPy 리스크 엔진 테스트"""
+import numpy as np
+import pytest
+
+from app.services.risk_engine import (
+    build_returns_matrix,
+    compute_risk_metrics,
+    historical_var_cvar,
+    pairwise_covariance,
+    parametric_var_cvar,
+)
+from app.services.portfolio_risk_service import calculate_historical_var
+
+DATES = [f"2025{m:02d}{d:02d}" for m in range(1, 13) for d in range(1, 22)]
+
+
+def _series(seed: int, beta: float = 1.0, start: int = 0):
+    rng = np.random.default_rng(seed)
+    market = np.cumprod(1 + rng.normal(0, 0.01, len(DATES))) * 100
+    mret = np.diff(market, prepend=market[0]) / market
+    out = {"069500": dict(zip(DATES, market))}
+    stock = np.cumprod(1 + beta * mret + rng.normal(0, 0.002, len(DATES))) * 1000
+    out["A"] = dict(zip(DATES[start:], stock[start:]))
+    return out
+
+
+def test_returns_matrix_aligns_by_date():
+    closes = {
+        "A": {"20250102": 100, "20250103": 110, "20250106": 121},
+        "B": {"20250103": 50, "20250106": 55},
+    }
+    m = build_returns_matrix(closes)
+    assert m.dates == ["20250103", "20250106"]
+    assert m.column("A") == pytest.approx([0.1, 0.1])
+    assert np.isnan(m.column("B")[0])
+    assert m.column("B")[1] == pytest.approx(0.1)
+
+
+def test_pairwise_covariance_matches_numpy():
+    values = np.random.default_rng(1).normal(size=(200, 4))
+    cov, corr, counts = pairwise_covariance(values)
+    assert np.allclose(cov, np.cov(values.T, bias=True))
+    assert np.allclose(corr, np.corrcoef(values.T))
+    assert counts[0, 1] == 200
+
+
+def test_beta_uses_overlapping_dates():
+    # 늦게 상장된 종목도 겹치는 구간으로 베타 계산
+    metrics = compute_risk_metrics(_series(3, beta=1.5, start=100), {"A": 1.0})
+    assert metrics["betas"]["A"] == pytest.approx(1.5, abs=0.05)
+    assert metrics["observations"] == len(DATES) - 101
+
+
+def test_historical_var_matches_legacy():
+    returns = [0.01] * 80 + [-0.03] * 15 + [-0.08] * 5
+    var, cvar = historical_var_cvar(np.array(returns), 0.95)
+    assert var == pytest.approx(calculate_historical_var(returns, 0.95))
+    assert cvar >= var
+
+
+def test_parametric_and_monte_carlo_agree():
+    metrics = compute_risk_metrics(_series(5), {"A": 1.0}, mc_sims=50000, seed=7)
+    p = metrics["parametric"]["99"]["var"]
+    mc = metrics["monte_carlo"]["99"]["var"]
+    assert p > 0
+    assert mc == pytest.approx(p, rel=0.05)
+    assert metrics["monte_carlo"]["99"]["cvar"] >= mc
+
+
+def test_monte_carlo_is_seeded():
+    a = compute_risk_metrics(_series(5), {"A": 1.0}, seed=11)
+    b = compute_risk_metrics(_series(5), {"A": 1.0}, seed=11)
+    assert a["monte_carlo"] == b["monte_carlo"]
+
+
+def test_parametric_zero_sigma():
+    assert parametric_var_cvar(0.0, 0.0, 0.95) == (0.0, 0.0)
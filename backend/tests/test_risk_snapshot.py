@@ -0,0 +1,99 @@
+"""리스크 스냅샷 캐시 테스트"""
+import asyncio
+
+import pytest
+
+from app.agents.event_bus import AgentEvent
+from app.services import risk_snapshot_service as rss
+from app.services.risk_snapshot_service import RiskSnapshotService, risk_fingerprint
+
+POSITIONS = [
+    {"stock_code": "005930", "quantity": 10, "current_price": 70000},
+    {"stock_code": "000660", "quantity": 5, "current_price": 180000},
+]
+
+
+@pytest.fixture
+def env(monkeypatch):
+    state = {"positions": list(POSITIONS), "computes": 0, "rows": []}
+
+    async def fake_positions():
+        return state["positions"]
+
+    async def fake_compute(positions):
+        state["computes"] += 1
+        return {"var_95": 1.5, "var_99": 2.5, "portfolio_beta": 1.1, "positions": len(positions)}
+
+    async def fake_insert(sql, params=()):
+        state["rows"].append(params)
+        return len(state["rows"])
+
+    async def fake_query(sql, params=(), fetch_one=False):
+        return None
+
+    monkeypatch.setattr(rss.portfolio_service, "get_latest_positions", fake_positions)
+    monkeypatch.setattr(rss, "compute_portfolio_risk", fake_compute)
+    monkeypatch.setattr(rss, "execute_insert", fake_insert)
+    monkeypatch.setattr(rss, "execute_query", fake_query)
+    return state
+
+
+def test_fingerprint_ignores_prices_and_order():
+    moved = [{**POSITIONS[1], "current_price": 1}, {**POSITIONS[0], "current_price": 2}]
+    assert risk_fingerprint(POSITIONS) == risk_fingerprint(moved)
+    changed = [{**POSITIONS[0], "quantity": 11}, POSITIONS[1]]
+    assert risk_fingerprint(POSITIONS) != risk_fingerprint(changed)
+
+
+@pytest.mark.asyncio
+async def test_serves_cached_until_holdings_change(env):
+    svc = RiskSnapshotService()
+    first = await svc.get()
+    assert first["snapshot"]["cached"] is False
+    assert first["var_95"] == 1.5
+
+    second = await svc.get()
+    assert second["snapshot"]["cached"] is True
+    assert env["computes"] == 1
+
+    env["positions"] = POSITIONS[:1]
+    third = await svc.get()
+    assert third["snapshot"]["cached"] is False
+    assert third["positions"] == 1
+    assert env["computes"] == 2
+    assert len(env["rows"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_max_age_forces_recompute(env):
+    svc = RiskSnapshotService()
+    await svc.get()
+    await svc.get(max_age=3600)
+    assert env["computes"] == 1
+    fresh = await svc.get(max_age=0)
+    assert fresh["snapshot"]["cached"] is False
+    assert env["computes"] == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_compute_once(env):
+    svc = RiskSnapshotService()
+    results = await asyncio.gather(*(svc.get() for _ in range(5)))
+    assert env["computes"] == 1
+    assert sum(not r["snapshot"]["cached"] for r in results) == 1
+
+
+@pytest.mark.asyncio
+async def test_portfolio_event_triggers_background_refresh(env):
+    svc = RiskSnapshotService()
+    await svc.get()
+
+    # 같은 보유 수량 → 재계산 없음
+    await svc.on_portfolio_updated(AgentEvent("portfolio.updated", "portfolio_monitor", {"positions": POSITIONS}))
+    assert svc._refresh_task is None
+
+    env["positions"] = POSITIONS[:1]
+    await svc.on_portfolio_updated(AgentEvent("portfolio.updated", "portfolio_monitor", {"positions": POSITIONS[:1]}))
+    await svc._refresh_task
+    assert env["computes"] == 2
+    assert (await svc.get())["snapshot"]["cached"] is True
@@ -2,6 +2,8 @@
 import pytest
 from unittest.mock import MagicMock
 
+from app.models.risk_config import RiskConfig
+
 
 class FakePortfolio:
     def __init__(self, positions=None, total_value=10_000_000, cash_balance=10_000_000, total_pnl=0):
@@ -21,7 +23,7 @@ def _make_risk_config(**overrides):
         "min_hold_minutes": "0",
     }
     defaults.update(overrides)
-    return defaults
+    return RiskConfig.from_mapping(defaults)
 
 
 from app.agents.risk_manager import RiskManagerAgent
@@ -82,7 +84,7 @@ async def test_composite_score_rejection(risk_agent):
         "direction": "buy",
         "confidence": 0.05,  # 5% composite score
     }
-    risk_config = {"min_composite_score": "15"}
+    risk_config = RiskConfig.from_mapping({"min_composite_score": "15"})
     reason = await risk_agent._validate_signal(signal, risk_config, FakePortfolio(positions=[]))
     assert reason is not None
     assert "복합 점수 미달" in reason
@@ -96,7 +98,7 @@ async def test_sell_rejected_when_composite_too_low(risk_agent, mock_portfolio_w
         "direction": "sell",
         "confidence": 0.05,  # 5% composite score
     }
-    risk_config = {"min_composite_score": "15"}
+    risk_config = RiskConfig.from_mapping({"min_composite_score": "15"})
     reason = await risk_agent._validate_signal(signal, risk_config, mock_portfolio_with_position)
     assert reason is not None
     assert "복합 점수 미달" in reason
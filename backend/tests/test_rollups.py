@@ -0,0 +1,128 @@
+"""포트폴리오/주문 롤업 테이블 테스트"""
+import random
+import sqlite3
+
+import pytest
+
+from app.models import db as db_module
+from app.models.database import ROLLUP_REBUILD_SQL, SCHEMA_SQL
+from app.services import portfolio_service
+
+
+def _insert_snapshots(conn, n=600, seed=3):
+    rng = random.Random(seed)
+    value = 10_000_000.0
+    values = []
+    for i in range(n):
+        value *= 1 + rng.gauss(0, 0.004)
+        ts = f"2025-03-{1 + i // 240:02d} {(i // 10) % 24:02d}:{i % 10 * 5:02d}:00"
+        conn.execute(
+            """INSERT INTO portfolio_snapshots (timestamp, total_value, cash_balance, total_pnl, total_pnl_pct)
+               VALUES (?, ?, ?, ?, ?)""",
+            (ts, value, 1000.0, value - 10_000_000, (value / 10_000_000 - 1) * 100),
+        )
+        values.append(value)
+    return values
+
+
+def _raw_drawdown(values):
+    peak, max_dd = values[0], 0.0
+    for v in values:
+        peak = max(peak, v)
+        max_dd = max(max_dd, (peak - v) / peak * 100)
+    return max_dd
+
+
+def _rows(conn, table):
+    conn.row_factory = sqlite3.Row
+    return [dict(r) for r in conn.execute(f"SELECT * FROM {table} ORDER BY bucket")]
+
+
+def test_triggers_match_rebuild_and_exact_drawdown():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA_SQL)
+    values = _insert_snapshots(conn)
+
+    hourly = _rows(conn, "portfolio_rollup_hourly")
+    daily = _rows(conn, "portfolio_rollup_daily")
+    assert sum(r["snapshot_count"] for r in hourly) == len(values)
+    assert hourly[0]["open_value"] == pytest.approx(values[0])
+    assert daily[-1]["close_value"] == pytest.approx(values[-1])
+
+    expected = _raw_drawdown(values)
+    assert portfolio_service.max_drawdown_pct(hourly) == pytest.approx(expected)
+    assert portfolio_service.max_drawdown_pct(daily) == pytest.approx(expected)
+
+    conn.executescript(ROLLUP_REBUILD_SQL)
+    rebuilt = _rows(conn, "portfolio_rollup_hourly")
+    assert len(rebuilt) == len(hourly)
+    for a, b in zip(hourly, rebuilt):
+        assert a["max_dd_pct"] == pytest.approx(b["max_dd_pct"])
+        assert (a["open_value"], a["close_value"], a["snapshot_count"]) == (
+            b["open_value"], b["close_value"], b["snapshot_count"]
+        )
+
+
+def test_order_rollup_follows_status_updates():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA_SQL)
+    conn.execute(
+        """INSERT INTO orders (timestamp, agent_id, stock_code, side, quantity, price)
+           VALUES ('2025-03-01 10:00:00', 'trading_executor', '005930', 'buy', 10, 70000)"""
+    )
+    conn.execute("UPDATE orders SET status='filled', fill_price=70100, fill_quantity=10")
+    rows = {(r["status"]): r for r in _rows(conn, "order_rollup_daily")}
+    assert rows["submitted"]["order_count"] == 0
+    assert rows["filled"]["order_count"] == 1
+    assert rows["filled"]["filled_value"] == pytest.approx(701_000)
+
+
+def test_max_drawdown_accepts_raw_snapshots():
+    rows = [{"total_value": 100}, {"total_value": 120}, {"total_value": 90}, {"total_value": 130}]
+    assert portfolio_service.max_drawdown_pct(rows) == pytest.approx(25.0)
+
+
+@pytest.mark.asyncio
+async def test_value_rollups_and_backfill(tmp_path, monkeypatch):
+    path = tmp_path / "trading.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_SQL)
+    values = _insert_snapshots(conn)
+    conn.execute("DELETE FROM portfolio_rollup_hourly")
+    conn.execute("DELETE FROM portfolio_rollup_daily")
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(db_module, "DB_PATH", path)
+    await db_module.init_database()  # 기존 DB → 롤업 백필
+
+    rows = await portfolio_service.get_value_rollups(start="2025-03-02", end="2025-03-02")
+    assert rows and all(r["bucket"].startswith("2025-03-02") for r in rows)
+    assert sum(r["snapshot_count"] for r in rows) == 240
+
+    everything = await portfolio_service.get_value_rollups(bucket="day")
+    assert portfolio_service.max_drawdown_pct(everything) == pytest.approx(_raw_drawdown(values))
+
+
+@pytest.mark.asyncio
+async def test_each_rollup_backfills_from_its_own_source(tmp_path, monkeypatch):
+    path = tmp_path / "trading.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_SQL)
+    _insert_snapshots(conn, n=20)
+    conn.execute(
+        """INSERT INTO orders (timestamp, agent_id, stock_code, side, quantity, price, status)
+           VALUES ('2025-03-01 10:00:00', 'trading_executor', '005930', 'buy', 10, 70000, 'submitted')"""
+    )
+    # 주문 롤업만 비어 있는 DB (포트폴리오 롤업은 채워져 있음)
+    conn.execute("DELETE FROM order_rollup_daily")
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(db_module, "DB_PATH", path)
+    await db_module.init_database()
+
+    conn = sqlite3.connect(path)
+    assert _rows(conn, "order_rollup_daily")[0]["order_count"] == 1
+    assert sum(r["snapshot_count"] for r in _rows(conn, "portfolio_rollup_hourly")) == 20
+    conn.close()
@@ -0,0 +1,113 @@
+"""실시간 체결 피드 — 프레임 파싱, 구독 우선순위/동기화, 시뮬레이터 웹소켓으로 집계기 공급 테스트"""
+import asyncio
+import socket
+from datetime import date, datetime
+
+import pytest
+import uvicorn
+
+from app.services import tick_feed as tick_feed_module
+from app.services.intraday_bars import IntradayBarAggregator
+from app.services.tick_feed import CCNL_COLUMNS, MAX_SUBSCRIPTIONS, TickFeed, parse_frame
+from app.services.universe_snapshot import UniverseSnapshot
+from kis_simulator import SimConfig, SimMarket, create_app
+from kis_simulator import market as sim_market_module
+from kis_simulator.server import CCNL_COLUMNS as SIM_CCNL_COLUMNS
+
+
+class _SessionClock(datetime):
+    """시뮬레이터 체결 시각을 장중(10:00:00)으로 고정"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return datetime(2026, 3, 10, 10, 0, 0, tzinfo=tz)
+
+
+async def until(predicate, timeout: float = 5.0):
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+@pytest.fixture
+async def simulator(monkeypatch):
+    monkeypatch.setattr(sim_market_module, "datetime", _SessionClock)
+    market = SimMarket(symbols=60, seed=7, history_days=30, today=date(2026, 3, 10))
+    config = SimConfig(rate_limit=0, ws_interval_sec=0.01, ws_ping_sec=0.05)
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(create_app(config, market), log_level="warning", lifespan="off"))
+    task = asyncio.create_task(server.serve(sockets=[sock]))
+    await until(lambda: server.started)
+    monkeypatch.setattr(tick_feed_module.settings, "kis_url_rest_paper", f"http://127.0.0.1:{port}")
+    monkeypatch.setattr(tick_feed_module.settings, "kis_url_ws_paper", f"ws://127.0.0.1:{port}")
+    yield market
+    server.should_exit = True
+    await task
+
+
+def test_columns_match_simulator_and_multi_record_frames():
+    assert CCNL_COLUMNS == SIM_CCNL_COLUMNS
+    rec = ["0"] * len(CCNL_COLUMNS)
+    a, b = list(rec), list(rec)
+    a[0], b[0] = "005930", "000660"
+    tr_id, rows = parse_frame(f"0|H0STCNT0|002|{'^'.join(a + b)}")
+    assert tr_id == "H0STCNT0" and [r["MKSC_SHRN_ISCD"] for r in rows] == ["005930", "000660"]
+    assert parse_frame("0|H0STASP0|001|x") is None
+    assert parse_frame("1|H0STCNI0|001|cipher") is None
+
+
+def test_watchlist_prefers_held_codes_within_session_limit():
+    feed = TickFeed(consumers=[])
+    feed._held = ["H1", "H2"]
+    feed._candidates = ["H2"] + [f"C{i}" for i in range(MAX_SUBSCRIPTIONS)]
+    assert feed.watchlist[:3] == ["H1", "H2", "C0"]
+    assert len(feed.watchlist) == MAX_SUBSCRIPTIONS
+
+
+async def test_quote_listeners_get_latest_row_per_code():
+    feed, got = TickFeed(consumers=[]), []
+
+    async def broken(code, row):
+        raise RuntimeError("ws down")
+
+    async def listener(code, row):
+        got.append((code, row["STCK_PRPR"]))
+
+    feed.quote_listeners += [broken, listener]
+    recs = []
+    for code, price in (("005930", "70000"), ("000660", "150000"), ("005930", "70100")):
+        rec = ["0"] * len(CCNL_COLUMNS)
+        rec[0], rec[2] = code, price
+        recs += rec
+    await feed._handle(None, f"0|H0STCNT0|003|{'^'.join(recs)}")
+    assert got == [("005930", "70100"), ("000660", "150000")]
+
+
+async def test_feed_streams_simulator_ticks_into_bars_and_snapshot(simulator):
+    bars, snap = IntradayBarAggregator(timeframes=(1,)), UniverseSnapshot()
+    feed = TickFeed(consumers=[bars, snap])
+    codes = [s.code for s in simulator.symbols]
+    await feed.set_held(codes[:2])  # 접속 전: 접속 시 일괄 등록
+    await feed.set_candidates(codes[2:6])
+    feed.start()
+    try:
+        await until(lambda: feed.stats()["subscribed"] == 6 and bars.stats()["symbols"] == 6)
+        assert bars.bars(codes[0], 1) is not None and bars.stats()["off_session"] == 0
+        await until(lambda: len(snap) == 6)
+        assert snap.rank("change_pct:1", top=6)[0]["stock_code"] in codes[:6]
+
+        # 후보 교체 → 빠진 종목은 해제, 새 종목만 등록
+        await feed.set_candidates(codes[5:8])
+        assert feed._subscribed == set(codes[:2]) | set(codes[5:8])
+        await until(lambda: codes[7] in snap)  # 이후 프레임에는 해제된 종목이 없다
+        dropped_vol = bars.bars(codes[2], 1)["volume"][-1]
+        before = bars.stats()["trades"]
+        await until(lambda: bars.stats()["trades"] > before + 20)
+        assert bars.bars(codes[2], 1)["volume"][-1] == dropped_vol
+        assert feed.stats()["rejected"] == 0 and feed.stats()["reconnects"] == 0
+    finally:
+        await feed.stop()
+    assert not feed.stats()["running"] and not feed.stats()["connected"]
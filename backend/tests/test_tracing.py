@@ -0,0 +1,104 @@
+"""에이전트 실행 트레이스 (contextvars 스팬, 저장, /trace API) 테스트"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.agents.base import AgentContext, AgentResult, BaseAgent
+from app.models import db as db_module
+from app.routers.agents import get_agent_run_trace
+from app.services import mcp_client
+from app.services.mcp_client import MCPClientManager
+from app.services.tracing import current_span, span, start_trace
+
+
+def test_spans_nest_across_tasks_and_noop_outside_trace():
+    with span("orphan") as orphan:
+        assert orphan is None
+
+    async def child(name):
+        with span(name, "llm"):
+            await asyncio.sleep(0)
+
+    async def run():
+        with start_trace("agent.run") as trace:
+            with span("stage3.expert_panel") as panel:
+                await asyncio.gather(child("a"), child("b"))
+            with pytest.raises(ValueError):
+                with span("stage5.critic"):
+                    raise ValueError("bad")
+        return trace, panel
+
+    trace, panel = asyncio.run(run())
+    spans = {s["name"]: s for s in trace.to_dict()["spans"]}
+    assert spans["a"]["parent_id"] == spans["b"]["parent_id"] == panel.span_id
+    assert spans["a"]["depth"] == 2 and spans["agent.run"]["depth"] == 0
+    assert spans["stage5.critic"]["status"] == "error" and spans["stage5.critic"]["attrs"]["error"] == "bad"
+    assert current_span() is None
+
+
+@pytest.mark.asyncio
+async def test_mcp_server_spans_link_under_call(monkeypatch):
+    content = {"ok": True, "data": {"success": True, "outputs": {}, "kis": {"rt_cd": "0"}, "trace": {
+        "request_id": "req123",
+        "spans": [{"name": "mcp.subprocess", "start_ms": 5.0, "duration_ms": 40.0, "ok": True},
+                  {"name": "kis.http", "start_ms": 20.0, "duration_ms": 15.0}],
+    }}}
+
+    class FakeClient:
+        def __init__(self, url):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def list_tools(self):
+            return []
+
+        async def call_tool(self, name, arguments):
+            return SimpleNamespace(structured_content=content, content=[])
+
+    monkeypatch.setattr(mcp_client, "Client", FakeClient)
+    manager = MCPClientManager(pool_size=1)
+    await manager.connect()
+    with start_trace("t") as trace:
+        await manager.call_tool_result("domestic_stock", {"api_type": "inquire_price"})
+    await manager.disconnect()
+
+    spans = {s["name"]: s for s in trace.to_dict()["spans"]}
+    call = spans["mcp.domestic_stock"]
+    assert call["attrs"] == {"api_type": "inquire_price", "request_id": "req123"}
+    assert spans["kis.http"]["parent_id"] == call["id"] and spans["kis.http"]["kind"] == "remote"
+    assert spans["kis.http"]["start_ms"] == pytest.approx(call["start_ms"] + 20.0, abs=0.01)
+
+
+class _TracedAgent(BaseAgent):
+    agent_id = "traced_agent"
+    name = "traced"
+
+    async def execute(self, context: AgentContext) -> AgentResult:
+        with span("stage1.screening"):
+            await db_module.load_risk_config()
+        return AgentResult(summary="done")
+
+
+@pytest.mark.asyncio
+async def test_agent_run_persists_trace(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_module, "DB_PATH", tmp_path / "trading.db")
+    await db_module.init_database()
+
+    result = await _TracedAgent().run(AgentContext())
+    assert result.success and result.run_id
+
+    trace = await get_agent_run_trace("traced_agent", result.run_id)
+    names = [(s["name"], s["depth"]) for s in trace["spans"]]
+    assert names == [("traced_agent.run", 0), ("stage1.screening", 1), ("db", 2)]
+    assert trace["spans"][2]["attrs"] == {"statement": "SELECT risk_config"}
+    assert trace["success"] and trace["summary"] == "done"
+
+    from fastapi import HTTPException
+    with pytest.raises(HTTPException):
+        await get_agent_run_trace("other_agent", result.run_id)
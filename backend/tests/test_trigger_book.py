@@ -0,0 +1,103 @@
+"""Stop-loss / take-profit trigger book tests."""
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.agents.trigger_book import TriggerBook
+
+
+def _pos(code="005930", qty=10, avg=70000.0, price=70000.0):
+    return {
+        "stock_code": code,
+        "stock_name": "삼성전자",
+        "quantity": qty,
+        "avg_buy_price": avg,
+        "current_price": price,
+    }
+
+
+def test_trigger_prices_from_global_thresholds():
+    book = TriggerBook()
+    book.set_global_thresholds(-3.0, 5.0)
+    book.sync_positions([_pos()])
+    entry = book.get("005930")
+    assert entry.stops[0].price == pytest.approx(67900)
+    assert entry.targets[0].price == pytest.approx(73500)
+
+
+def test_check_hits_nearest_trigger():
+    book = TriggerBook()
+    book.set_global_thresholds(-3.0, 5.0)
+    book.sync_positions([_pos()])
+    assert book.check("005930", 70000) is None
+    assert book.check("005930", 67900).kind == "stop_loss"
+    assert book.check("005930", 74000).kind == "take_profit"
+    assert book.check("000660", 1) is None
+
+
+def test_recompute_only_on_change():
+    book = TriggerBook()
+    book.sync_positions([_pos()])
+    assert book.recomputes == 1
+    book.sync_positions([_pos(price=69000)])  # 가격만 변동
+    assert book.recomputes == 1
+    book.sync_positions([_pos(qty=20, avg=69000)])  # 추가 체결
+    assert book.recomputes == 2
+    book.set_global_thresholds(-3.0, 5.0)  # 동일 값
+    assert book.recomputes == 2
+    book.sync_positions([])
+    assert book.get("005930") is None
+
+
+@pytest.mark.asyncio
+@patch("app.agents.trigger_book.execute_query", new_callable=AsyncMock)
+async def test_override_reload_for_single_stock(mock_query):
+    book = TriggerBook()
+    book.sync_positions([_pos(), _pos(code="000660", avg=100000)])
+    before = book.recomputes
+
+    mock_query.return_value = {"stop_loss_pct": -1.5, "take_profit_pct": None}
+    await book.load_overrides("005930")
+
+    assert book.recomputes == before + 1
+    assert book.effective_thresholds("005930") == (-1.5, 5.0)
+    assert book.check("005930", 68950).kind == "stop_loss"
+    assert book.check("000660", 98000) is None
+
+
+def test_latency_stats():
+    book = TriggerBook()
+    assert book.latency_stats() == {"count": 0}
+    t0 = book.now()
+    assert book.record_latency(t0) >= 0
+    assert book.latency_stats()["count"] == 1
+
+
+@pytest.mark.asyncio
+@patch("app.agents.trigger_book.execute_query", new_callable=AsyncMock)
+async def test_threshold_update_keeps_fired_trigger_while_still_crossed(mock_query, monkeypatch):
+    from types import SimpleNamespace
+
+    from app.agents import risk_manager as risk_manager_module
+    from app.agents.event_bus import AgentEvent
+    from app.agents.risk_manager import RiskManagerAgent
+
+    book = TriggerBook()
+    book.set_global_thresholds(-3.0, 5.0)
+    book.sync_positions([_pos()])
+    positions = [_pos(price=67000)]  # -4.3%: 손절 발동 상태
+    monkeypatch.setattr(risk_manager_module, "trigger_book", book)
+    monkeypatch.setattr(risk_manager_module.shared_state, "get_portfolio",
+                        AsyncMock(return_value=SimpleNamespace(positions=positions)))
+    agent = RiskManagerAgent()
+    agent._emitted_risk_events.add(("005930", "stop_loss"))
+    event = AgentEvent(event_type="risk.thresholds_updated", agent_id="market_scanner", data={"stock_code": "005930"})
+
+    # ATR/트레일링 갱신 후에도 여전히 손절선 아래 → 매도 진행 중이므로 재무장하지 않는다
+    mock_query.return_value = {"stop_loss_pct": -4.0, "take_profit_pct": None}
+    await agent.handle_event(event)
+    assert ("005930", "stop_loss") in agent._emitted_risk_events
+
+    # 손절선이 가격 아래로 내려가면 더 이상 발동 상태가 아니므로 재무장
+    mock_query.return_value = {"stop_loss_pct": -6.0, "take_profit_pct": None}
+    await agent.handle_event(event)
+    assert ("005930", "stop_loss") not in agent._emitted_risk_events
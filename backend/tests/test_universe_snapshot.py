@@ -0,0 +1,143 @@
+"""전 종목 스냅샷 기반 stage-1 — 피드(멀티시세/체결), 기준선, 벡터 점수, 스캐너 연동 테스트"""
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services import universe_snapshot as universe_snapshot_module
+from app.services.universe_snapshot import UniverseSnapshot, parse_formula
+
+
+def _multprice(code, price, change, vol, turnover, name=""):
+    return {"inter_shrn_iscd": code, "inter_kor_isnm": name, "inter2_prpr": str(price),
+            "prdy_ctrt": str(change), "acml_vol": str(vol), "acml_tr_pbmn": str(turnover)}
+
+
+def test_parse_formula():
+    assert parse_formula("volume_ratio:0.5, change_pct:-0.25,turnover") == {
+        "volume_ratio": 0.5, "change_pct": -0.25, "turnover": 1.0}
+    with pytest.raises(ValueError):
+        parse_formula("rsi:1")
+    with pytest.raises(ValueError):
+        parse_formula("volume:0")
+
+
+def test_feeds_baseline_and_ranking():
+    snap = UniverseSnapshot(capacity=2)  # 용량 초과 시 배열 확장
+    rows = [
+        _multprice("000001", 1000, 1.0, 500, 5e5, "가"),
+        _multprice("000002", 2000, 5.0, 100, 2e5, "나"),
+        _multprice("000003", 3000, -2.0, 900, 2.7e6, "다"),
+        _multprice("000004", 0, 0, 0, 0),  # 시세 없음 → 무시
+    ]
+    assert snap.update_multprice(rows, ts=100.0) == 3
+    # 일봉(최신 순): 당일 봉은 기준선에서 제외
+    chart = [{"stck_bsop_date": "20260310", "acml_vol": "99999"}] + [
+        {"stck_bsop_date": f"202603{d:02d}", "acml_vol": "100"} for d in range(9, 0, -1)]
+    assert snap.set_baseline_from_chart("000002", chart, "20260310")
+    snap.set_volume_baseline("000001", 1000, "20260310")
+
+    assert snap.stale(["000001", "000009"], max_age_sec=30, now=120.0) == ["000009"]
+    assert snap.stale(["000001"], max_age_sec=30, now=200.0) == ["000001"]
+    assert snap.missing_baseline(["000001", "000002", "000003"], "20260310") == ["000003"]
+
+    codes, cols = snap.features()
+    assert codes == ["000001", "000002", "000003"]
+    assert cols["volume_ratio"][:2].tolist() == [0.5, 1.0] and cols["abs_change_pct"][2] == 2.0
+
+    top = snap.rank("change_pct:1")
+    assert [c["stock_code"] for c in top] == ["000002", "000001", "000003"]
+    assert top[0]["score"] == 100.0 and top[-1]["score"] == 0.0 and top[0]["stock_name"] == "나"
+    # 기준선 없는 종목의 volume_ratio 는 중립(0.5) 순위
+    assert [c["stock_code"] for c in snap.rank("volume_ratio:1")] == ["000002", "000003", "000001"]
+    # 음수 가중치 = 역방향 선호, 유니버스 지정 시 그 안에서만 순위
+    assert snap.rank("change_pct:-1", codes=["000001", "000002", "000009"], top=1)[0]["stock_code"] == "000001"
+
+    # 실시간 체결은 같은 슬롯을 갱신
+    tick = {"MKSC_SHRN_ISCD": "000003", "STCK_PRPR": "3300", "PRDY_CTRT": "8.00",
+            "ACML_VOL": "1200", "ACML_TR_PBMN": "3.9e6"}
+    assert snap.ingest("H0STCNT0", [tick, {"MKSC_SHRN_ISCD": "000001"}]) == 1
+    assert snap.ingest("H0STASP0", [tick]) == 0
+    assert snap.rank("change_pct:1", top=1)[0]["stock_code"] == "000003"
+    assert snap.stats()["ticks"] == 1 and len(snap) == 3
+
+
+async def test_refresh_keys_baselines_by_kst_trading_day(monkeypatch):
+    from app.services import market_service
+
+    class _LateUtc(datetime):
+        """UTC 3월 10일 23:30 = KST 3월 11일 08:30"""
+
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2026, 3, 10, 23, 30, tzinfo=timezone.utc).astimezone(tz)
+
+    async def charts(codes):
+        return {c: [{"stck_bsop_date": "20260310", "acml_vol": "300"}] for c in codes}
+
+    async def multi_price(codes):
+        return [_multprice(c, 1000, 1.0, 100, 1e5) for c in codes]
+
+    monkeypatch.setattr(universe_snapshot_module, "datetime", _LateUtc)
+    monkeypatch.setattr(market_service, "get_batch_charts", charts)
+    monkeypatch.setattr(market_service, "get_multi_price", multi_price)
+    snap = UniverseSnapshot()
+    assert await snap.refresh(["000001"]) == {"quotes": 1, "baselines": 1}
+    # 3월 10일 봉은 (KST 기준) 전일 봉이므로 기준선에 들어가고, 당일 키는 20260311
+    assert snap.missing_baseline(["000001"], "20260311") == []
+    assert await snap.refresh(["000001"]) == {"quotes": 0, "baselines": 0}
+
+
+async def test_scanner_universe_mode_sees_whole_kospi200(tmp_path, monkeypatch):
+    from app.agents.market_scanner import MarketScannerAgent
+    from app.agents import market_scanner
+    from app.models import db as db_module
+    from app.models.risk_config import RiskConfig
+    from benchmarks.stubs import session_market, stubbed_backends
+
+    monkeypatch.setattr(db_module, "DB_PATH", tmp_path / "trading.db")
+    monkeypatch.setattr(market_scanner, "universe_snapshot", UniverseSnapshot())
+    await db_module.init_database()
+    market = session_market(symbols=70)
+    for sym in market.symbols:
+        await db_module.execute_insert(
+            "INSERT INTO kospi200_components (stock_code, stock_name, sector, updated_at) VALUES (?, ?, ?, datetime('now'))",
+            (sym.code, sym.name, sym.sector),
+        )
+
+    agent = MarketScannerAgent()
+    agent._risk_config = RiskConfig(stage1_mode="universe", stage1_score_formula="abs_change_pct:1", max_candidates=5)
+    async with stubbed_backends(market) as mcp:
+        candidates = await agent._stage1_screening()
+        assert mcp.calls == 3 + 70  # 멀티시세 30종목 × 3회 + 종목별 기준선 일봉 1회
+        again = await agent._stage1_screening()
+        assert mcp.calls == 3 + 70  # 시세 신선 + 당일 기준선 있음 → 추가 호출 없음
+
+    moves = sorted((abs(market.quote(s.code)["change_pct"]), s.code) for s in market.symbols)
+    assert [c["stock_code"] for c in candidates] == [c["stock_code"] for c in again]
+    assert {c["stock_code"] for c in candidates} == {code for _, code in moves[-5:]}
+    assert all(c["volume_ratio"] > 0 for c in candidates)
+
+
+async def test_scanner_survives_tick_feed_candidate_failure(monkeypatch):
+    from app.agents import market_scanner
+    from app.agents.base import AgentContext
+    from app.agents.market_scanner import MarketScannerAgent
+    from app.models.risk_config import RiskConfig
+
+    async def no_candidates():
+        return []
+
+    async def send_failed(codes):
+        raise ConnectionError("websocket closed")
+
+    async def config():
+        return RiskConfig()
+
+    monkeypatch.setattr(market_scanner.settings, "tick_feed_enabled", True)
+    monkeypatch.setattr(market_scanner.tick_feed, "set_candidates", send_failed)
+    monkeypatch.setattr(market_scanner.risk_config_service, "get", config)
+    agent = MarketScannerAgent()
+    monkeypatch.setattr(agent, "_stage1_screening", no_candidates)
+
+    result = await agent.execute(AgentContext())
+    assert result.error == "no_candidates"  # 구독 실패와 무관하게 스캔은 계속
@@ -0,0 +1,231 @@
+"""WebSocket manager fan-out tests."""
+import asyncio
+import json
+
+import pytest
+
+from app.agents.event_bus import AgentEvent
+from app.services.ws_manager import WebSocketManager
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent: list[str] = []
+        self.closed_code = None
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        await self.gate.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000):
+        self.closed_code = code
+
+
+def _event(event_type: str, n: int) -> AgentEvent:
+    return AgentEvent(event_type=event_type, agent_id="test", data={"n": n})
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_block_broadcast():
+    manager = WebSocketManager(max_queue=10)
+    fast, slow = FakeWebSocket(), FakeWebSocket()
+    slow.gate.clear()  # 전송이 멈춘 클라이언트
+    await manager.connect(fast)
+    await manager.connect(slow)
+
+    await asyncio.wait_for(manager.on_agent_event(_event("signal.generated", 1)), 0.1)
+    await asyncio.sleep(0.01)
+    assert len(fast.sent) == 1
+    assert slow.sent == []
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_portfolio_updates_are_coalesced():
+    manager = WebSocketManager(max_queue=10)
+    ws = FakeWebSocket()
+    ws.gate.clear()
+    client = await manager.connect(ws)
+    await asyncio.sleep(0)
+
+    for n in range(5):
+        await manager.on_agent_event(_event("portfolio.updated", n))
+    assert client.queue_depth <= 2  # 전송 중 1건 + 최신 1건
+    ws.gate.set()
+    await asyncio.sleep(0.01)
+
+    last = json.loads(ws.sent[-1])
+    assert last["data"]["data"] == {"n": 4}
+    assert client.coalesced >= 3
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_lagging_client_is_dropped():
+    manager = WebSocketManager(max_queue=3)
+    ws = FakeWebSocket()
+    ws.gate.clear()
+    await manager.connect(ws)
+
+    for n in range(10):
+        await manager.on_agent_event(_event("signal.generated", n))
+    assert manager.client_count == 0
+    assert manager.dropped_clients == 1
+    assert ws.closed_code == 1013
+
+
+@pytest.mark.asyncio
+async def test_client_stats_report_lag():
+    manager = WebSocketManager()
+    ws = FakeWebSocket(delay=0.01)
+    await manager.connect(ws)
+    await manager.broadcast("agent_event", {"x": 1})
+    await asyncio.sleep(0.05)
+    stats = manager.client_stats()[0]
+    assert stats["sent"] == 1
+    assert stats["last_lag_ms"] >= 10
+    await manager.shutdown()
+
+
+def _portfolio(price: float, positions=None) -> AgentEvent:
+    positions = positions if positions is not None else [
+        {"stock_code": "005930", "stock_name": "삼성전자", "quantity": 10, "current_price": price},
+        {"stock_code": "000660", "stock_name": "SK하이닉스", "quantity": 5, "current_price": 150000},
+    ]
+    return AgentEvent(
+        event_type="portfolio.updated",
+        agent_id="portfolio_monitor",
+        data={"total_value": price * 10 + 750000, "positions": positions},
+    )
+
+
+@pytest.mark.asyncio
+async def test_topic_subscription_filters_events():
+    manager = WebSocketManager()
+    ws = FakeWebSocket()
+    await manager.connect(ws)
+    await manager.handle_client_message(ws, json.dumps({"action": "subscribe", "topics": ["signals"]}))
+
+    await manager.on_agent_event(_event("agent.started", 1))
+    await manager.on_agent_event(_event("signal.generated", 2))
+    await asyncio.sleep(0.01)
+
+    types = [json.loads(m)["type"] for m in ws.sent]
+    assert types == ["subscription", "agent_event"]
+    assert json.loads(ws.sent[-1])["data"]["event_type"] == "signal.generated"
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_portfolio_stream_sends_snapshot_then_deltas():
+    from app.services.ws_topics import apply_portfolio_delta
+
+    manager = WebSocketManager(snapshot_every=2)
+    ws = FakeWebSocket()
+    await manager.connect(ws)
+    await manager.on_agent_event(_portfolio(70000))
+    await manager.handle_client_message(
+        ws, json.dumps({"action": "subscribe", "topics": ["portfolio", "quotes:005930"]})
+    )
+    await asyncio.sleep(0.01)
+    for price in (70100, 70200, 70300):
+        await manager.on_agent_event(_portfolio(price))
+        await asyncio.sleep(0.01)
+
+    portfolio_msgs = [json.loads(m) for m in ws.sent if json.loads(m)["type"] == "portfolio"]
+    assert [m["mode"] for m in portfolio_msgs] == ["snapshot", "delta", "delta", "snapshot"]
+    delta = portfolio_msgs[1]["data"]
+    assert delta["positions"]["upsert"] == [{"stock_code": "005930", "current_price": 70100}]
+
+    state = portfolio_msgs[0]["data"]
+    for m in portfolio_msgs[1:3]:
+        state = apply_portfolio_delta(state, m["data"])
+    assert state == _portfolio(70200).data
+
+    quotes = [json.loads(m) for m in ws.sent if json.loads(m)["type"] == "quotes"]
+    assert quotes[0]["mode"] == "snapshot"
+    assert quotes[1]["data"] == {"price": 70100}
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_resync_after_coalesced_delta():
+    manager = WebSocketManager()
+    ws = FakeWebSocket()
+    client = await manager.connect(ws)
+    await manager.handle_client_message(ws, json.dumps({"action": "subscribe", "topics": ["portfolio"]}))
+    await asyncio.sleep(0.01)
+    ws.gate.clear()
+    for price in (70000, 70100, 70200, 70300):
+        await manager.on_agent_event(_portfolio(price))
+    ws.gate.set()
+    await asyncio.sleep(0.01)
+
+    msgs = [json.loads(m) for m in ws.sent if json.loads(m)["type"] == "portfolio"]
+    # 대기 중 메시지가 대체되면 delta 대신 snapshot 으로 재동기화
+    assert msgs[-1]["mode"] == "snapshot"
+    assert msgs[-1]["data"]["positions"][0]["current_price"] == 70300
+    assert client.coalesced >= 1
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_streams_tracked_only_for_subscribers_and_sold_quotes_evicted():
+    manager = WebSocketManager()
+    ws = FakeWebSocket()
+    await manager.connect(ws)  # 구독 메시지 없는 기존 클라이언트
+    await manager.on_agent_event(_portfolio(70000))
+    assert manager._streams == {}
+
+    await manager.handle_client_message(ws, json.dumps({"action": "subscribe", "topics": ["quotes"]}))
+    assert set(manager._streams) == {"quotes:005930", "quotes:000660"}  # 최신 portfolio 로 시작
+    await asyncio.sleep(0.01)
+    await manager.publish_state("quotes:035420", {"price": 1})
+    await manager.publish_state("portfolio", {"total_value": 1})
+    assert "portfolio" not in manager._streams
+
+    # 000660 매도 → 해당 quotes stream 제거, 재매수 시 snapshot 부터 다시
+    sold = [{"stock_code": "005930", "stock_name": "삼성전자", "quantity": 10, "current_price": 70100}]
+    await manager.on_agent_event(_portfolio(70100, sold))
+    assert set(manager._streams) == {"quotes:005930"}
+    await asyncio.sleep(0.01)
+    await manager.on_agent_event(_portfolio(70200))
+    await asyncio.sleep(0.01)
+    quotes = [json.loads(m) for m in ws.sent if json.loads(m)["type"] == "quotes"]
+    assert [(q["topic"], q["mode"]) for q in quotes if q["topic"] == "quotes:000660"] == [
+        ("quotes:000660", "snapshot"), ("quotes:000660", "snapshot")]
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_tick_quotes_stream_and_survive_portfolio_updates():
+    manager = WebSocketManager()
+    ws = FakeWebSocket()
+    await manager.connect(ws)
+    await manager.on_agent_event(_portfolio(70000))
+    await manager.handle_client_message(ws, json.dumps({"action": "subscribe", "topics": ["quotes"]}))
+    await asyncio.sleep(0.01)
+
+    # 보유 종목: 체결가가 잔고 평가가보다 우선, 종목명은 portfolio 에서
+    await manager.on_tick("005930", {"MKSC_SHRN_ISCD": "005930", "STCK_PRPR": "70500", "PRDY_CTRT": "1.2"})
+    await manager.on_agent_event(_portfolio(70100))
+    # 후보 종목: 보유하지 않아도 tick 이 오는 동안 stream 유지
+    await manager.on_tick("035420", {"MKSC_SHRN_ISCD": "035420", "STCK_PRPR": "200000"})
+    await manager.on_agent_event(_portfolio(70200))
+    await asyncio.sleep(0.01)
+
+    assert manager._streams["quotes:005930"].state["price"] == 70500.0
+    assert manager._streams["quotes:005930"].state["stock_name"] == "삼성전자"
+    assert manager._streams["quotes:035420"].state["price"] == 200000.0
+    quotes = [json.loads(m) for m in ws.sent if json.loads(m)["type"] == "quotes"]
+    assert [q["data"] for q in quotes if q["topic"] == "quotes:005930"][1] == {
+        "price": 70500.0, "change_pct": 1.2, "volume": None, "time": None}
+    await manager.shutdown()
@@ -5,12 +5,35 @@ interface UseWebSocketReturn {
   connected: boolean;
   lastEvent: AgentEvent | null;
   events: AgentEvent[];
+  portfolio: PortfolioState | null;
 }
 
+type PortfolioPosition = Record<string, unknown> & { stock_code: string };
+type PortfolioState = Record<string, unknown> & { positions: PortfolioPosition[] };
+
+interface PortfolioDelta {
+  changed?: Record<string, unknown>;
+  positions?: { upsert: PortfolioPosition[]; remove: string[] };
+}
+
+// 서버는 portfolio 를 stream 으로 보낸다: snapshot 후 직전 seq 대비 delta (ws_topics.apply_portfolio_delta 와 동일)
+function applyPortfolioDelta(state: PortfolioState, delta: PortfolioDelta): PortfolioState {
+  const positions = new Map(state.positions.map((p) => [p.stock_code, { ...p }]));
+  for (const code of delta.positions?.remove ?? []) positions.delete(code);
+  for (const upd of delta.positions?.upsert ?? []) {
+    positions.set(upd.stock_code, { ...(positions.get(upd.stock_code) ?? {}), ...upd });
+  }
+  return { ...state, ...delta.changed, positions: [...positions.values()] };
+}
+
+const SUBSCRIBE_TOPICS = ['agent_events', 'portfolio'];
+
 export function useWebSocket(): UseWebSocketReturn {
   const [connected, setConnected] = useState(false);
   const [lastEvent, setLastEvent] = useState<AgentEvent | null>(null);
   const [events, setEvents] = useState<AgentEvent[]>([]);
+  const [portfolio, setPortfolio] = useState<PortfolioState | null>(null);
+  const portfolioRef = useRef<{ seq: number; state: PortfolioState } | null>(null);
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimer = useRef<ReturnType<typeof setTimeout>>();
 
@@ -40,9 +63,17 @@ export function useWebSocket(): UseWebSocketReturn {
       wsRef.current = ws;
 
       ws.onopen = () => {
+        portfolioRef.current = null;
+        ws.send(JSON.stringify({ action: 'subscribe', topics: SUBSCRIBE_TOPICS }));
         if (!unmounted) setConnected(true);
       };
 
+      const pushEvent = (event: AgentEvent) => {
+        if (unmounted) return;
+        setLastEvent(event);
+        setEvents((prev) => [...prev.slice(-99), event]);
+      };
+
       ws.onmessage = (ev) => {
         try {
           const msg = JSON.parse(ev.data);
@@ -53,10 +84,27 @@ export function useWebSocket(): UseWebSocketReturn {
               data: msg.data.data,
               timestamp: msg.data.timestamp,
             };
-            if (!unmounted) {
-              setLastEvent(event);
-              setEvents((prev) => [...prev.slice(-99), event]);
+            pushEvent(event);
+          } else if (msg.type === 'portfolio') {
+            const current = portfolioRef.current;
+            let state: PortfolioState;
+            if (msg.mode === 'snapshot') {
+              state = msg.data;
+            } else if (current && msg.base === current.seq) {
+              state = applyPortfolioDelta(current.state, msg.data);
+            } else {
+              // seq 가 어긋난 delta — 다음 snapshot 을 요청하고 버린다
+              ws.send(JSON.stringify({ action: 'resync', topics: ['portfolio'] }));
+              return;
             }
+            portfolioRef.current = { seq: msg.seq, state };
+            if (!unmounted) setPortfolio(state);
+            pushEvent({
+              event_type: 'portfolio.updated',
+              agent_id: 'portfolio_monitor',
+              data: state,
+              timestamp: new Date().toISOString(),
+            });
           }
         } catch {
           // ignore
@@ -84,5 +132,5 @@ export function useWebSocket(): UseWebSocketReturn {
     };
   }, []);
 
-  return { connected, lastEvent, events };
+  return { connected, lastEvent, events, portfolio };
 }
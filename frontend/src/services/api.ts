@@ -167,7 +167,7 @@ export async function getAgents(): Promise<{ agents: import('../types').Agent[]
   return res.json();
 }
 
-export async function runAgent(agentId: string): Promise<{ success: boolean; summary: string }> {
+export async function runAgent(agentId: string): Promise<{ success: boolean; summary: string; run_id: number | null }> {
   const res = await fetch(`/api/agents/${agentId}/run`, { method: 'POST' });
   if (!res.ok) throw new Error('Failed to run agent');
   return res.json();
@@ -189,6 +189,12 @@ export async function getAgentLogs(agentId?: string, limit = 50): Promise<{ logs
   return res.json();
 }
 
+export async function getAgentRunTrace(agentId: string, runId: number): Promise<import('../types').AgentRunTrace> {
+  const res = await fetch(`/api/agents/${agentId}/runs/${runId}/trace`);
+  if (!res.ok) throw new Error('Failed to fetch agent run trace');
+  return res.json();
+}
+
 export async function getAgentEvents(limit = 100): Promise<{ events: import('../types').AgentEvent[] }> {
   const res = await fetch(`/api/agents/events?limit=${limit}`);
   if (!res.ok) throw new Error('Failed to fetch events');
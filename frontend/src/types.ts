@@ -39,6 +39,9 @@ export interface RiskConfig {
   // Scanner settings
   max_candidates?: number;
   max_expert_stocks?: number;
+  stage1_mode?: 'rank' | 'universe';
+  stage1_score_formula?: string;
+  stage1_max_quote_age_sec?: number;
   // Critic settings
   critic_check_dissent?: boolean;
   critic_check_variant?: boolean;
@@ -169,6 +172,31 @@ export interface AgentLog {
   error_message: string | null;
 }
 
+export interface AgentTraceSpan {
+  id: number;
+  parent_id: number | null;
+  name: string;
+  kind: 'agent' | 'internal' | 'mcp' | 'remote' | 'http' | 'llm' | 'db';
+  depth: number;
+  start_ms: number;
+  duration_ms: number | null;
+  status: 'ok' | 'error' | 'cancelled' | 'open';
+  attrs: Record<string, unknown>;
+}
+
+export interface AgentRunTrace {
+  agent_id: string;
+  run_id: number;
+  trace_id: string;
+  started_at: string;
+  duration_ms: number;
+  success: boolean;
+  summary: string | null;
+  error: string | null;
+  span_count: number;
+  spans: AgentTraceSpan[];
+}
+
 export interface AgentEvent {
   event_type: string;
   agent_id: string;
@@ -5,6 +5,7 @@ import time
 from fastmcp.server.middleware import Middleware, MiddlewareContext
 
 import module.factory as factory
+from module.metrics import TOOL_CALL_SECONDS, TOOL_CALLS_IN_FLIGHT
 
 # 기본 미들웨어
 class EnvironmentMiddleware(Middleware):
@@ -28,12 +29,24 @@ class EnvironmentMiddleware(Middleware):
         # context setup
         await ctx.set_state(factory.CONTEXT_ENVIRONMENT, self.environment)
 
+        # metrics labels
+        arguments = getattr(context.message, "arguments", None) or {}
+        labels = {
+            "tool": getattr(context.message, "name", ""),
+            "api_type": arguments.get("api_type", "") if isinstance(arguments, dict) else "",
+        }
+        outcome = "error"
+        TOOL_CALLS_IN_FLIGHT.inc()
+
         try:
             result = await call_next(context)
+            outcome = "ok"
             return result
         except Exception as e:
             raise e
         finally:
+            TOOL_CALLS_IN_FLIGHT.dec()
+
             # ended at
             ended_at = datetime.now()
             await ctx.set_state(factory.CONTEXT_ENDED_AT, ended_at.strftime("%Y-%m-%d %H:%M:%S"))
@@ -41,6 +54,7 @@ class EnvironmentMiddleware(Middleware):
             # time counter end
             elapsed_sec = time.perf_counter() - t0
             await ctx.set_state(factory.CONTEXT_ELAPSED_SECONDS, round(elapsed_sec, 2))
+            TOOL_CALL_SECONDS.observe(elapsed_sec, outcome=outcome, **labels)
 
 
 
@@ -4,8 +4,11 @@ import platform
 import sys
 
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import Response
 
 from module import setup_environment, EnvironmentMiddleware, EnvironmentConfig, setup_kis_config
+from module.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, metrics
 from module.plugin import Database
 from tools import *
 
@@ -52,6 +55,11 @@ def main():
     # middleware
     mcp_server.add_middleware(EnvironmentMiddleware(environment=env_config))
 
+    # Prometheus 메트릭 (HTTP 계열 전송 모드에서만 노출)
+    @mcp_server.custom_route("/metrics", methods=["GET"])
+    async def prometheus_metrics(request: Request) -> Response:
+        return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
     # tools 등록
     DomesticStockTool().register(mcp_server=mcp_server)
     DomesticFutureOptionTool().register(mcp_server=mcp_server)
@@ -11,6 +11,122 @@ from fastmcp import FastMCP, Context
 from module.plugin import MasterFileManager
 from module.plugin.database import Database
 import module.factory as factory
+from module.metrics import API_RUN_SECONDS, KIS_HTTP_SECONDS, KIS_RESPONSES
+
+# 하위 프로세스가 구조화 결과(JSON 한 줄) 앞에 붙이는 표식
+RESULT_MARKER = "__KIS_MCP_RESULT__"
+
+# 실행 코드에 덧붙이는 결과 인코더 — DataFrame은 열 단위(columnar)로 한 번만 직렬화
+STRUCTURED_RESULT_CODE = f"""
+# 구조화 결과 출력 (MCP structuredContent)
+_RESULT_MARKER = {RESULT_MARKER!r}
+""" + '''import json as _json
+import time as _time
+
+_KIS_STATUS = {}
+_KIS_HTTP_MS = []
+_KIS_HTTP_AT = []  # 요청 시작 시각 (epoch ms) — 서버가 트레이스 스팬으로 변환
+_kis_url_fetch = ka._url_fetch
+
+
+def _tracking_url_fetch(*args, **kwargs):
+    """KIS HTTP 요청 시간과 마지막 응답의 rt_cd/msg_cd/msg1을 기록"""
+    started = _time.perf_counter()
+    _KIS_HTTP_AT.append(round(_time.time() * 1000, 3))
+    res = _kis_url_fetch(*args, **kwargs)
+    _KIS_HTTP_MS.append(round((_time.perf_counter() - started) * 1000, 3))
+    try:
+        _KIS_STATUS.update(
+            rt_cd="0" if res.isOK() else (str(getattr(res.getBody(), "rt_cd", None) or "1")),
+            msg_cd=str(res.getErrorCode() or ""),
+            msg1=str(res.getErrorMessage() or "").strip(),
+        )
+    except Exception:
+        pass
+    return res
+
+
+ka._url_fetch = _tracking_url_fetch
+
+
+def _columnar(frame):
+    """DataFrame → {"length": n, "columns": {컬럼: [값...]}}"""
+    frame = frame.astype(object).where(frame.notna(), None)
+    return {"length": len(frame), "columns": {str(c): frame[c].tolist() for c in frame.columns}}
+
+
+def _emit_result(result):
+    started = _time.perf_counter()
+    payload = {}
+    if isinstance(result, tuple):
+        # N개 튜플 반환 함수 (예: inquire_balance는 (df1, df2) 반환)
+        payload["outputs"] = {}
+        for i, item in enumerate(result):
+            name = f"output{i + 1}"
+            if hasattr(item, "to_dict"):
+                payload["outputs"][name] = _columnar(item)
+            else:
+                payload.setdefault("value", {})[name] = item
+    elif hasattr(result, "to_dict"):
+        payload["outputs"] = {"output": _columnar(result)}
+    else:
+        payload["value"] = result
+    payload["kis"] = _KIS_STATUS
+    payload["http_ms"] = _KIS_HTTP_MS
+    payload["http_at"] = _KIS_HTTP_AT
+    payload["encode_ms"] = round((_time.perf_counter() - started) * 1000, 3)
+    print(_RESULT_MARKER + _json.dumps(payload, ensure_ascii=False, default=str))
+'''
+
+# MCP 도구 출력 스키마 (structuredContent)
+TABLE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "length": {"type": "integer"},
+        "columns": {"type": "object", "additionalProperties": {"type": "array"}},
+    },
+    "required": ["length", "columns"],
+}
+
+TOOL_OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "ok": {"type": "boolean"},
+        "error": {},
+        "data": {
+            "type": "object",
+            "description": "API 실행 결과. outputs는 KIS 응답 테이블(열 단위), kis는 마지막 응답 상태",
+            "properties": {
+                "success": {"type": "boolean"},
+                "api_type": {"type": "string"},
+                "outputs": {"type": "object", "additionalProperties": TABLE_SCHEMA},
+                "value": {},
+                "kis": {
+                    "type": "object",
+                    "properties": {
+                        "rt_cd": {"type": "string"},
+                        "msg_cd": {"type": "string"},
+                        "msg1": {"type": "string"},
+                    },
+                },
+                "log": {"type": "string"},
+                "timing": {"type": "object", "additionalProperties": {"type": "number"}},
+                "trace": {
+                    "type": "object",
+                    "description": "request_id + 서버 측 단계 스팬 (호출 시작 기준 ms)",
+                    "properties": {
+                        "request_id": {"type": "string"},
+                        "spans": {"type": "array", "items": {"type": "object"}},
+                    },
+                },
+                "error": {},
+            },
+            "additionalProperties": True,
+        },
+    },
+    "required": ["ok"],
+    "additionalProperties": True,
+}
 
 
 class ApiExecutor:
@@ -215,37 +331,13 @@ if __name__ == "__main__":
         sys.exit(1)
     
     try:
-        
-        # N개 튜플 반환 함수 처리 (예: inquire_balance는 (df1, df2) 반환)
-        if isinstance(result, tuple):
-            # 튜플인 경우 - N개의 DataFrame 처리
-            output = {{}}
-            for i, item in enumerate(result):
-                if hasattr(item, 'to_dict'):
-                    # DataFrame인 경우
-                    output[f"output{{i+1}}"] = item.to_dict('records') if not item.empty else []
-                else:
-                    # 일반 객체인 경우
-                    output[f"output{{i+1}}"] = str(item)
-            
-            import json
-            print(json.dumps(output, ensure_ascii=False, indent=2))
-        elif hasattr(result, 'empty') and not result.empty:
-            print(result.to_json(orient='records', force_ascii=False))
-        elif isinstance(result, dict):
-            import json
-            print(json.dumps(result, ensure_ascii=False))
-        elif isinstance(result, (list, tuple)):
-            import json
-            print(json.dumps(result, ensure_ascii=False))
-        else:
-            print(str(result))
+        _emit_result(result)
     except Exception as e:
         print(f"오류 발생: {{str(e)}}")
 """
 
-            # 6. 코드 끝에 함수 호출 추가
-            modified_code = code + call_code
+            # 6. 코드 끝에 결과 인코더 + 함수 호출 추가
+            modified_code = code + STRUCTURED_RESULT_CODE + call_code
 
             # 7. 수정된 코드 저장
             with open(api_code_path, 'w', encoding='utf-8') as f:
@@ -297,6 +389,43 @@ if __name__ == "__main__":
                 "error": f"실행 중 오류: {str(e)}"
             }
 
+    @classmethod
+    def _parse_output(cls, stdout: str) -> Dict[str, Any]:
+        """stdout에서 구조화 결과(표식 줄)를 분리 — 나머지 출력은 log로 보존"""
+        started = time.perf_counter()
+        payload = None
+        log_lines = []
+        for line in stdout.splitlines():
+            if line.startswith(RESULT_MARKER):
+                payload = json.loads(line[len(RESULT_MARKER):])
+            else:
+                log_lines.append(line)
+        log = "\n".join(log_lines).strip()
+
+        if payload is None:
+            # 구조화 결과가 없으면(인코더 이전 코드 등) 원문 텍스트를 그대로 전달
+            return {"value": stdout, "kis": {}, "log": "", "timing": {}, "http_ms": [], "http_at": []}
+
+        return {
+            "outputs": payload.get("outputs", {}),
+            "value": payload.get("value"),
+            "kis": payload.get("kis", {}),
+            "log": log[-2000:],
+            "timing": {
+                "encode_ms": payload.get("encode_ms", 0.0),
+                "decode_ms": round((time.perf_counter() - started) * 1000, 3),
+                "kis_http_ms": round(sum(payload.get("http_ms", [])), 3),
+            },
+            "http_ms": payload.get("http_ms", []),
+            "http_at": payload.get("http_at", []),
+        }
+
+    @staticmethod
+    def _trace_span(name: str, started: float, ended: float, origin: float, **attrs) -> Dict[str, Any]:
+        """time.time() 구간 → 호출 시작(origin) 기준 스팬 (백엔드 트레이스의 자식 스팬)"""
+        return {"name": name, "start_ms": round((started - origin) * 1000, 3),
+                "duration_ms": round((ended - started) * 1000, 3), **attrs}
+
     def _cleanup_temp_directory(self, temp_dir: str):
         """임시 디렉토리 정리"""
         try:
@@ -309,6 +438,8 @@ if __name__ == "__main__":
         """API 실행 메인 함수"""
         temp_dir = None
         start_time = time.time()
+        request_id = "unknown"
+        spans = []
 
         try:
             await ctx.info(f"API 실행 시작: {api_type}")
@@ -318,7 +449,7 @@ if __name__ == "__main__":
             try:
                 request_id = await ctx.get_state(factory.CONTEXT_REQUEST_ID)
             except:
-                request_id = "unknown"
+                pass
             temp_dir = self._create_temp_directory(request_id)
 
             # 2. kis_auth.py 다운로드
@@ -330,12 +461,17 @@ if __name__ == "__main__":
 
             # 4. 코드 수정
             self._modify_api_code(api_code_path, params, api_type)
+            prepared_at = time.time()
+            spans.append(self._trace_span("mcp.prepare", start_time, prepared_at, start_time))
 
             # 5. 코드 실행
             execution_result = self._execute_code(temp_dir)
+            spans.append(self._trace_span("mcp.subprocess", prepared_at, time.time(), start_time,
+                                          ok=execution_result["success"]))
 
             # 6. 실행 시간 계산
             execution_time = time.time() - start_time
+            API_RUN_SECONDS.observe(execution_time, tool=self.tool_name, api_type=api_type)
 
             # 7. 결과 반환
             result = {
@@ -346,11 +482,24 @@ if __name__ == "__main__":
                 "execution_time": f"{execution_time:.2f}s",
                 "temp_dir": temp_dir,
                 "venv_used": True,
-                "cleanup_success": True
+                "cleanup_success": True,
+                "trace": {"request_id": request_id, "spans": spans},
             }
 
             if execution_result["success"]:
-                result["data"] = execution_result["output"]
+                result.update(self._parse_output(execution_result["output"]))
+                for at_ms, http_ms in zip(result.pop("http_at"), result["http_ms"]):
+                    spans.append(self._trace_span("kis.http", at_ms / 1000, (at_ms + http_ms) / 1000, start_time))
+                for http_ms in result["http_ms"]:
+                    KIS_HTTP_SECONDS.observe(http_ms / 1000, api_type=api_type)
+                if result["kis"].get("rt_cd"):
+                    KIS_RESPONSES.inc(api_type=api_type, rt_cd=result["kis"]["rt_cd"],
+                                      msg_cd=result["kis"].get("msg_cd", ""))
+                # KIS 거절(rt_cd != "0")도 실패로 표시 — 호출측이 문자열을 검사하지 않도록
+                rt_cd = result["kis"].get("rt_cd", "")
+                if rt_cd and rt_cd != "0":
+                    result["success"] = False
+                    result["error"] = f"[{result['kis'].get('msg_cd', '')}] {result['kis'].get('msg1', '')}".strip()
             else:
                 result["error"] = execution_result["error"]
 
@@ -366,7 +515,8 @@ if __name__ == "__main__":
                 "execution_time": f"{time.time() - start_time:.2f}s",
                 "temp_dir": temp_dir,
                 "venv_used": True,
-                "cleanup_success": False
+                "cleanup_success": False,
+                "trace": {"request_id": request_id, "spans": spans},
             }
         finally:
             # 8. 임시 디렉토리 정리
@@ -409,6 +559,7 @@ class BaseTool(ABC):
             self._run,
             name=self.tool_name,
             description=self.description,
+            output_schema=TOOL_OUTPUT_SCHEMA,
         )
 
     # ========== Protected Methods ==========
@@ -94,15 +94,6 @@ def avg_unit(
         logger.error("vrfc_kind_cd is required. (e.g. '00')")
         raise ValueError("vrfc_kind_cd is required. (e.g. '00')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return (
-            dataframe1 if dataframe1 is not None else pd.DataFrame(),
-            dataframe2 if dataframe2 is not None else pd.DataFrame(),
-            dataframe3 if dataframe3 is not None else pd.DataFrame()
-        )
-
     tr_id = "CTPF2005R"
 
     params = {
@@ -115,57 +106,13 @@ def avg_unit(
         "CTX_AREA_FK100": FK100,
     }
 
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    if res.isOK():
-        # 연속조회 정보 업데이트
-        tr_cont = res.getHeader().tr_cont
-        NK30 = res.getBody().ctx_area_nk30
-        FK100 = res.getBody().ctx_area_fk100
-
-        # output1 데이터 처리
-        current_data1 = pd.DataFrame(res.getBody().output1)
-        if dataframe1 is not None:
-            dataframe1 = pd.concat([dataframe1, current_data1], ignore_index=True)
-        else:
-            dataframe1 = current_data1
-
-        # output2 데이터 처리
-        current_data2 = pd.DataFrame(res.getBody().output2)
-        if dataframe2 is not None:
-            dataframe2 = pd.concat([dataframe2, current_data2], ignore_index=True)
-        else:
-            dataframe2 = current_data2
-
-        # output3 데이터 처리
-        current_data3 = pd.DataFrame(res.getBody().output3)
-        if dataframe3 is not None:
-            dataframe3 = pd.concat([dataframe3, current_data3], ignore_index=True)
-        else:
-            dataframe3 = current_data3
-
-        if tr_cont in ["M", "F"]:  # 다음 페이지 존재
-            logger.info("Call Next page...")
-            ka.smart_sleep()  # 시스템 안정적 운영을 위한 지연
-            return avg_unit(
-                inqr_strt_dt,
-                inqr_end_dt,
-                pdno,
-                prdt_type_cd,
-                vrfc_kind_cd,
-                NK30,
-                FK100,
-                dataframe1,
-                dataframe2,
-                dataframe3,
-                "N",
-                depth + 1,
-                max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe1, dataframe2, dataframe3
-    else:
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output1", "output2", "output3"),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        cont_keys={"CTX_AREA_NK30": "ctx_area_nk30", "CTX_AREA_FK100": "ctx_area_fk100"},
+        max_pages=max_depth - depth,
+        initial=(dataframe1, dataframe2, dataframe3),
+    )
@@ -65,11 +65,6 @@ def inquire_ccnl(
         logger.error("fid_input_iscd is required. (e.g. 'KR2033022D33')")
         raise ValueError("fid_input_iscd is required. (e.g. 'KR2033022D33')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe if dataframe is not None else pd.DataFrame()
-
     tr_id = "FHKBJ773403C0"
 
     # API 요청 파라미터 설정
@@ -78,40 +73,12 @@ def inquire_ccnl(
         "FID_INPUT_ISCD": fid_input_iscd,
     }
 
-    # API 호출
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    # API 응답 처리
-    if res.isOK():
-        if hasattr(res.getBody(), 'output'):
-            output_data = res.getBody().output
-            if not isinstance(output_data, list):
-                output_data = [output_data]
-            current_data = pd.DataFrame(output_data)
-        else:
-            current_data = pd.DataFrame()
-
-        # 데이터프레임 병합
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-
-        # 연속 거래 여부 확인
-        tr_cont = res.getHeader().tr_cont
-
-        if tr_cont == "M":
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return inquire_ccnl(
-                fid_cond_mrkt_div_code,
-                fid_input_iscd,
-                "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe
-    else:
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M",),
+        max_pages=max_depth - depth,
+        initial=(dataframe,),
+    )
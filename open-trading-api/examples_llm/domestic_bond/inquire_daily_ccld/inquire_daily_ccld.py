@@ -108,11 +108,6 @@ def inquire_daily_ccld(
         logger.error("nccs_yn is required. (e.g. 'N')")
         raise ValueError("nccs_yn is required. (e.g. 'N')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe1 if dataframe1 is not None else pd.DataFrame(), dataframe2 if dataframe2 is not None else pd.DataFrame()
-
     tr_id = "CTSC8013R"
 
     params = {
@@ -128,75 +123,13 @@ def inquire_daily_ccld(
         "CTX_AREA_FK200": ctx_area_fk200,
     }
 
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    if res.isOK():
-        # output1 처리
-        if hasattr(res.getBody(), 'output1'):
-            output_data = res.getBody().output1
-            if output_data:
-                # output1은 단일 객체, output2는 배열일 수 있음
-                if isinstance(output_data, list):
-                    current_data1 = pd.DataFrame(output_data)
-                else:
-                    # 단일 객체인 경우 리스트로 감싸서 DataFrame 생성
-                    current_data1 = pd.DataFrame([output_data])
-
-                if dataframe1 is not None:
-                    dataframe1 = pd.concat([dataframe1, current_data1], ignore_index=True)
-                else:
-                    dataframe1 = current_data1
-            else:
-                if dataframe1 is None:
-                    dataframe1 = pd.DataFrame()
-        else:
-            if dataframe1 is None:
-                dataframe1 = pd.DataFrame()
-        # output2 처리
-        if hasattr(res.getBody(), 'output2'):
-            output_data = res.getBody().output2
-            if output_data:
-                # output1은 단일 객체, output2는 배열일 수 있음
-                if isinstance(output_data, list):
-                    current_data2 = pd.DataFrame(output_data)
-                else:
-                    # 단일 객체인 경우 리스트로 감싸서 DataFrame 생성
-                    current_data2 = pd.DataFrame([output_data])
-
-                if dataframe2 is not None:
-                    dataframe2 = pd.concat([dataframe2, current_data2], ignore_index=True)
-                else:
-                    dataframe2 = current_data2
-            else:
-                if dataframe2 is None:
-                    dataframe2 = pd.DataFrame()
-        else:
-            if dataframe2 is None:
-                dataframe2 = pd.DataFrame()
-        tr_cont = res.getHeader().tr_cont
-        ctx_area_nk200 = res.getBody().ctx_area_nk200
-        ctx_area_fk200 = res.getBody().ctx_area_fk200
-
-        if tr_cont in ["M", "F"]:
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return inquire_daily_ccld(
-                cano,
-                acnt_prdt_cd,
-                inqr_strt_dt,
-                inqr_end_dt,
-                sll_buy_dvsn_cd,
-                sort_sqn_dvsn,
-                pdno,
-                nccs_yn,
-                ctx_area_nk200,
-                ctx_area_fk200,
-                "N", dataframe1, dataframe2, depth + 1, max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe1, dataframe2
-    else:
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        return pd.DataFrame(), pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output1", "output2"),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        cont_keys={"CTX_AREA_NK200": "ctx_area_nk200", "CTX_AREA_FK200": "ctx_area_fk200"},
+        max_pages=max_depth - depth,
+        initial=(dataframe1, dataframe2),
+    )
@@ -79,11 +79,6 @@ def inquire_psbl_rvsecncl(
         raise ValueError("acnt_prdt_cd is required. (e.g. '01')")
 
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe if dataframe is not None else pd.DataFrame()
-    
     tr_id = "CTSC8035R"
 
     params = {
@@ -95,42 +90,13 @@ def inquire_psbl_rvsecncl(
         "CTX_AREA_NK200": ctx_area_nk200,
     }
 
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    if res.isOK():
-        if hasattr(res.getBody(), 'output'):
-            output_data = res.getBody().output
-            if not isinstance(output_data, list):
-                output_data = [output_data]
-            current_data = pd.DataFrame(output_data)
-        else:
-            current_data = pd.DataFrame()
-            
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-            
-        tr_cont = res.getHeader().tr_cont
-        ctx_area_nk200 = res.getBody().ctx_area_nk200
-        ctx_area_fk200 = res.getBody().ctx_area_fk200
-        
-        if tr_cont == "M":
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return inquire_psbl_rvsecncl(
-                cano,
-                acnt_prdt_cd,
-                ord_dt,
-                odno,
-                ctx_area_fk200,
-                ctx_area_nk200,
-                "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe
-    else:
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M",),
+        cont_keys={"CTX_AREA_NK200": "ctx_area_nk200", "CTX_AREA_FK200": "ctx_area_fk200"},
+        max_pages=max_depth - depth,
+        initial=(dataframe,),
+    )
@@ -74,14 +74,6 @@ def inquire_balance_valuation_pl(
     if excc_stat_cd == "":
         raise ValueError("excc_stat_cd is required (e.g. '1:정산, 2:본정산')")
 
-    if depth > max_depth:
-        logging.warning("Max recursive depth reached.")
-        if dataframe1 is None:
-            dataframe1 = pd.DataFrame()
-        if dataframe2 is None:
-            dataframe2 = pd.DataFrame()
-        return dataframe1, dataframe2
-
     tr_id = "CTFO6159R"  # 선물옵션 잔고평가손익내역
 
     params = {
@@ -93,37 +85,13 @@ def inquire_balance_valuation_pl(
         "CTX_AREA_NK200": NK200
     }
 
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    if res.isOK():
-        # output1 처리 (array)
-        current_data1 = pd.DataFrame(res.getBody().output1)
-        if dataframe1 is not None:
-            dataframe1 = pd.concat([dataframe1, current_data1], ignore_index=True)
-        else:
-            dataframe1 = current_data1
-
-        # output2 처리 (object)
-        current_data2 = pd.DataFrame([res.getBody().output2])
-        if dataframe2 is not None:
-            dataframe2 = pd.concat([dataframe2, current_data2], ignore_index=True)
-        else:
-            dataframe2 = current_data2
-
-        tr_cont = res.getHeader().tr_cont
-        FK200 = res.getBody().ctx_area_fk200
-        NK200 = res.getBody().ctx_area_nk200
-
-        if tr_cont in ["M", "F"]:  # 다음 페이지 존재
-            logging.info("Call Next page...")
-            ka.smart_sleep()  # 시스템 안정적 운영을 위한 지연
-            return inquire_balance_valuation_pl(
-                cano, acnt_prdt_cd, mgna_dvsn, excc_stat_cd, FK200, NK200, "N", dataframe1, dataframe2, depth + 1,
-                max_depth
-            )
-        else:
-            logging.info("Data fetch complete.")
-            return dataframe1, dataframe2
-    else:
-        res.printError(url=API_URL)
-        return pd.DataFrame(), pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output1", "output2"),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        cont_keys={"CTX_AREA_FK200": "ctx_area_fk200", "CTX_AREA_NK200": "ctx_area_nk200"},
+        max_pages=max_depth - depth + 1,
+        initial=(dataframe1, dataframe2),
+    )
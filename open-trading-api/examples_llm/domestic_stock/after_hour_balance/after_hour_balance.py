@@ -103,11 +103,6 @@ def after_hour_balance(
         logger.error("fid_input_iscd is required. (e.g. '0000')")
         raise ValueError("fid_input_iscd is required. (e.g. '0000')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe if dataframe is not None else pd.DataFrame()
-
     # API 호출 URL 및 거래 ID 설정
 
     tr_id = "FHPST01760000"
@@ -126,47 +121,12 @@ def after_hour_balance(
         "fid_input_price_2": fid_input_price_2,
     }
 
-    # API 호출
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    # API 호출 성공 시 데이터 처리
-    if res.isOK():
-        if hasattr(res.getBody(), 'output'):
-            current_data = pd.DataFrame(res.getBody().output)
-        else:
-            current_data = pd.DataFrame()
-
-        # 기존 데이터프레임과 병합
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-
-        # 연속 거래 여부 확인
-        tr_cont = res.getHeader().tr_cont
-
-        # 다음 페이지 호출
-        if tr_cont == "M":
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return after_hour_balance(
-                fid_input_price_1,
-                fid_cond_mrkt_div_code,
-                fid_cond_scr_div_code,
-                fid_rank_sort_cls_code,
-                fid_div_cls_code,
-                fid_input_iscd,
-                fid_trgt_exls_cls_code,
-                fid_trgt_cls_code,
-                fid_vol_cnt,
-                fid_input_price_2,
-                "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe
-    else:
-        # API 호출 실패 시 에러 로그 출력
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M",),
+        max_pages=max_depth - depth,
+        initial=(dataframe,),
+    )
@@ -117,11 +117,6 @@ def bulk_trans_num(
         logger.error("fid_trgt_cls_code is required. (e.g. '0')")
         raise ValueError("fid_trgt_cls_code is required. (e.g. '0')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe if dataframe is not None else pd.DataFrame()
-
 
     tr_id = "FHKST190900C0"
 
@@ -140,48 +135,12 @@ def bulk_trans_num(
         "fid_vol_cnt": fid_vol_cnt,
     }
 
-    # API 호출
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    if res.isOK():
-        # 응답 데이터 처리
-        if hasattr(res.getBody(), 'output'):
-            current_data = pd.DataFrame(res.getBody().output)
-        else:
-            current_data = pd.DataFrame()
-
-        # 데이터프레임 병합
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-
-        # 다음 페이지 여부 확인
-        tr_cont = res.getHeader().tr_cont
-
-        if tr_cont == "M":
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return bulk_trans_num(
-                fid_aply_rang_prc_2,
-                fid_cond_mrkt_div_code,
-                fid_cond_scr_div_code,
-                fid_input_iscd,
-                fid_rank_sort_cls_code,
-                fid_div_cls_code,
-                fid_input_price_1,
-                fid_aply_rang_prc_1,
-                fid_input_iscd_2,
-                fid_trgt_exls_cls_code,
-                fid_trgt_cls_code,
-                fid_vol_cnt,
-                "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe
-    else:
-        # API 호출 실패 시 에러 로그
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M",),
+        max_pages=max_depth - depth,
+        initial=(dataframe,),
+    )
@@ -60,13 +60,6 @@ def chk_holiday(
     if bass_dt == "":
         raise ValueError("bass_dt is required (e.g. 'YYYYMMDD')")
 
-    if depth > max_depth:
-        logging.warning("Max recursive depth reached.")
-        if dataframe is None:
-            return pd.DataFrame()
-        else:
-            return dataframe
-
     tr_id = "CTCA0903R"  # 국내휴장일조회
 
     params = {
@@ -75,35 +68,13 @@ def chk_holiday(
         "CTX_AREA_NK": NK100
     }
 
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    if res.isOK():
-        if hasattr(res.getBody(), 'output'):
-            output_data = res.getBody().output
-            if not isinstance(output_data, list):
-                output_data = [output_data]
-            current_data = pd.DataFrame(output_data)
-        else:
-            current_data = pd.DataFrame()
-
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-
-        tr_cont = res.getHeader().tr_cont
-        FK100 = res.getBody().ctx_area_fk
-        NK100 = res.getBody().ctx_area_nk
-
-        if tr_cont in ["M", "F"]:  # 다음 페이지 존재
-            logging.info("Call Next page...")
-            ka.smart_sleep()  # 시스템 안정적 운영을 위한 지연
-            return chk_holiday(
-                bass_dt, NK100, FK100, "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logging.info("Data fetch complete.")
-            return dataframe
-    else:
-        res.printError(url=API_URL)
-        return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        cont_keys={"CTX_AREA_FK": "ctx_area_fk", "CTX_AREA_NK": "ctx_area_nk"},
+        max_pages=max_depth - depth + 1,
+        initial=(dataframe,),
+    )
@@ -70,13 +70,6 @@ def daily_credit_balance(
     if fid_input_date_1 == "":
         raise ValueError("fid_input_date_1 is required (e.g. '20240313')")
 
-    if depth > max_depth:
-        logging.warning("Max recursive depth reached.")
-        if dataframe is None:
-            return pd.DataFrame()
-        else:
-            return dataframe
-
     tr_id = "FHPST04760000"  # 국내주식 신용잔고 일별추이
 
     params = {
@@ -86,27 +79,12 @@ def daily_credit_balance(
         "FID_INPUT_DATE_1": fid_input_date_1               # 결제일자
     }
     
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-    
-    if res.isOK():
-        current_data = pd.DataFrame(res.getBody().output)
-            
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-            
-        tr_cont = res.getHeader().tr_cont
-        
-        if tr_cont in ["M", "F"]:  # 다음 페이지 존재
-            logging.info("Call Next page...")
-            ka.smart_sleep()  # 시스템 안정적 운영을 위한 지연
-            return daily_credit_balance(
-                fid_cond_mrkt_div_code, fid_cond_scr_div_code, fid_input_iscd, fid_input_date_1, "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logging.info("Data fetch complete.")
-            return dataframe
-    else:
-        res.printError(url=API_URL)
-        return pd.DataFrame() 
\ No newline at end of file
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        max_pages=max_depth - depth + 1,
+        initial=(dataframe,),
+    )
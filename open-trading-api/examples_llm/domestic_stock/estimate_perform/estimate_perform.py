@@ -62,77 +62,18 @@ def estimate_perform(
         logger.error("sht_cd is required. (e.g. '265520')")
         raise ValueError("sht_cd is required. (e.g. '265520')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return (
-            dataframe1 if dataframe1 is not None else pd.DataFrame(),
-            dataframe2 if dataframe2 is not None else pd.DataFrame(),
-            dataframe3 if dataframe3 is not None else pd.DataFrame(),
-            dataframe4 if dataframe4 is not None else pd.DataFrame()
-        )
-
     tr_id = "HHKST668300C0"
 
     params = {
         "SHT_CD": sht_cd,
     }
 
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    if res.isOK():
-        # output1 처리
-        if hasattr(res.getBody(), 'output1'):
-            output_data = res.getBody().output1
-            if output_data:
-                current_data1 = pd.DataFrame(output_data if isinstance(output_data, list) else [output_data])
-                dataframe1 = pd.concat([dataframe1, current_data1],
-                                       ignore_index=True) if dataframe1 is not None else current_data1
-            else:
-                dataframe1 = pd.DataFrame() if dataframe1 is None else dataframe1
-
-        # output2 처리
-        if hasattr(res.getBody(), 'output2'):
-            output_data = res.getBody().output2
-            if output_data:
-                current_data2 = pd.DataFrame(output_data if isinstance(output_data, list) else [output_data])
-                dataframe2 = pd.concat([dataframe2, current_data2],
-                                       ignore_index=True) if dataframe2 is not None else current_data2
-            else:
-                dataframe2 = pd.DataFrame() if dataframe2 is None else dataframe2
-
-        # output3 처리
-        if hasattr(res.getBody(), 'output3'):
-            output_data = res.getBody().output3
-            if output_data:
-                current_data3 = pd.DataFrame(output_data if isinstance(output_data, list) else [output_data])
-                dataframe3 = pd.concat([dataframe3, current_data3],
-                                       ignore_index=True) if dataframe3 is not None else current_data3
-            else:
-                dataframe3 = pd.DataFrame() if dataframe3 is None else dataframe3
-
-        # output4 처리
-        if hasattr(res.getBody(), 'output4'):
-            output_data = res.getBody().output4
-            if output_data:
-                current_data4 = pd.DataFrame(output_data if isinstance(output_data, list) else [output_data])
-                dataframe4 = pd.concat([dataframe4, current_data4],
-                                       ignore_index=True) if dataframe4 is not None else current_data4
-            else:
-                dataframe4 = pd.DataFrame() if dataframe4 is None else dataframe4
-
-        tr_cont = res.getHeader().tr_cont
-
-        if tr_cont in ["M", "F"]:
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return estimate_perform(
-                sht_cd, dataframe1, dataframe2, dataframe3, dataframe4, "N", depth + 1, max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe1, dataframe2, dataframe3, dataframe4
-    else:
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output1", "output2", "output3", "output4"),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        max_pages=max_depth - depth,
+        initial=(dataframe1, dataframe2, dataframe3, dataframe4),
+    )
@@ -92,11 +92,6 @@ def exp_total_index(
         logger.error("fid_mkop_cls_code is required. (e.g. '1')")
         raise ValueError("fid_mkop_cls_code is required. (e.g. '1')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe1 if dataframe1 is not None else pd.DataFrame(), dataframe2 if dataframe2 is not None else pd.DataFrame()
-
 
     tr_id = "FHKUP11750000"
 
@@ -108,51 +103,12 @@ def exp_total_index(
         "fid_mkop_cls_code": fid_mkop_cls_code,
     }
 
-    # API 호출
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    if res.isOK():
-        # output1 처리
-        if hasattr(res.getBody(), 'output1'):
-            output_data = res.getBody().output1
-            if output_data:
-                current_data1 = pd.DataFrame(output_data if isinstance(output_data, list) else [output_data])
-                dataframe1 = pd.concat([dataframe1, current_data1],
-                                       ignore_index=True) if dataframe1 is not None else current_data1
-            else:
-                dataframe1 = pd.DataFrame() if dataframe1 is None else dataframe1
-        else:
-            dataframe1 = pd.DataFrame() if dataframe1 is None else dataframe1
-
-        # output2 처리
-        if hasattr(res.getBody(), 'output2'):
-            output_data = res.getBody().output2
-            if output_data:
-                current_data2 = pd.DataFrame(output_data if isinstance(output_data, list) else [output_data])
-                dataframe2 = pd.concat([dataframe2, current_data2],
-                                       ignore_index=True) if dataframe2 is not None else current_data2
-            else:
-                dataframe2 = pd.DataFrame() if dataframe2 is None else dataframe2
-        else:
-            dataframe2 = pd.DataFrame() if dataframe2 is None else dataframe2
-
-        tr_cont = res.getHeader().tr_cont
-
-        if tr_cont in ["M", "F"]:
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return exp_total_index(
-                fid_mrkt_cls_code,
-                fid_cond_mrkt_div_code,
-                fid_cond_scr_div_code,
-                fid_input_iscd,
-                fid_mkop_cls_code,
-                "N", dataframe1, dataframe2, depth + 1, max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe1, dataframe2
-    else:
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        return pd.DataFrame(), pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output1", "output2"),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        max_pages=max_depth - depth,
+        initial=(dataframe1, dataframe2),
+    )
@@ -112,11 +112,6 @@ def exp_trans_updown(
         logger.error("fid_mkop_cls_code is required. (e.g. '0')")
         raise ValueError("fid_mkop_cls_code is required. (e.g. '0')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe if dataframe is not None else pd.DataFrame()
-
 
     tr_id = "FHPST01820000"
 
@@ -133,45 +128,12 @@ def exp_trans_updown(
         "fid_mkop_cls_code": fid_mkop_cls_code,
     }
 
-    # API 호출
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    if res.isOK():
-        if hasattr(res.getBody(), 'output'):
-            output_data = res.getBody().output
-            if not isinstance(output_data, list):
-                output_data = [output_data]
-            current_data = pd.DataFrame(output_data)
-        else:
-            current_data = pd.DataFrame()
-
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-
-        tr_cont = res.getHeader().tr_cont
-
-        if tr_cont == "M":
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return exp_trans_updown(
-                fid_rank_sort_cls_code,
-                fid_cond_mrkt_div_code,
-                fid_cond_scr_div_code,
-                fid_input_iscd,
-                fid_div_cls_code,
-                fid_aply_rang_prc_1,
-                fid_vol_cnt,
-                fid_pbmn,
-                fid_blng_cls_code,
-                fid_mkop_cls_code,
-                "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe
-    else:
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M",),
+        max_pages=max_depth - depth,
+        initial=(dataframe,),
+    )
@@ -93,34 +93,11 @@ def fluctuation(
         "fid_rsfl_rate1": fid_rsfl_rate1
     }
 
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    if res.isOK():
-        if hasattr(res.getBody(), 'output'):
-            current_data = pd.DataFrame(res.getBody().output)
-        else:
-            current_data = pd.DataFrame()
-
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-
-        tr_cont = res.getHeader().tr_cont
-
-        if tr_cont == "M":  # 다음 페이지 존재
-            print("Call Next")
-            ka.smart_sleep()  # 시스템 안정적 운영을 위한 지연
-            return fluctuation(
-                fid_rsfl_rate2, fid_cond_mrkt_div_code, fid_cond_scr_div_code,
-                fid_input_iscd, fid_rank_sort_cls_code, fid_input_cnt_1,
-                fid_prc_cls_code, fid_input_price_1, fid_input_price_2,
-                fid_vol_cnt, fid_trgt_cls_code, fid_trgt_exls_cls_code,
-                fid_div_cls_code, fid_rsfl_rate1, "N", dataframe
-            )
-        else:
-            print("The End")
-            return dataframe
-    else:
-        res.printError(API_URL)
-        return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M",),
+        initial=(dataframe,),
+    )
@@ -97,37 +97,11 @@ def market_cap(
         "fid_vol_cnt": fid_vol_cnt,
     }
 
-    # API 호출
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    if res.isOK():
-        # 응답 데이터 처리
-        current_data = pd.DataFrame(res.getBody().output) if hasattr(res.getBody(), 'output') else pd.DataFrame()
-
-        # 기존 데이터프레임과 병합
-        dataframe = pd.concat([dataframe, current_data], ignore_index=True) if dataframe is not None else current_data
-
-        # 연속 거래 여부 확인
-        tr_cont = res.getHeader().tr_cont
-        if tr_cont == "M":
-            print("Call Next")
-            ka.smart_sleep()
-            return market_cap(
-                fid_input_price_2,
-                fid_cond_mrkt_div_code,
-                fid_cond_scr_div_code,
-                fid_div_cls_code,
-                fid_input_iscd,
-                fid_trgt_cls_code,
-                fid_trgt_exls_cls_code,
-                fid_input_price_1,
-                fid_vol_cnt,
-                "N", dataframe
-            )
-        else:
-            print("The End")
-            return dataframe
-    else:
-        # 오류 출력
-        res.printError(API_URL)
-        return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M",),
+        initial=(dataframe,),
+    )
@@ -114,47 +114,11 @@ def near_new_highlow(
         "fid_aply_rang_prc_2": fid_aply_rang_prc_2,
     }
 
-    # API 호출
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    if res.isOK():
-        # 응답 데이터 처리
-        if hasattr(res.getBody(), 'output'):
-            current_data = pd.DataFrame(res.getBody().output)
-        else:
-            current_data = pd.DataFrame()
-
-        # 기존 데이터프레임과 병합
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-
-        # 연속 거래 여부 확인
-        tr_cont = res.getHeader().tr_cont
-
-        if tr_cont == "M":
-            print("Call Next")
-            ka.smart_sleep()
-            return near_new_highlow(
-                fid_aply_rang_vol,
-                fid_cond_mrkt_div_code,
-                fid_cond_scr_div_code,
-                fid_div_cls_code,
-                fid_input_cnt_1,
-                fid_input_cnt_2,
-                fid_prc_cls_code,
-                fid_input_iscd,
-                fid_trgt_cls_code,
-                fid_trgt_exls_cls_code,
-                fid_aply_rang_prc_1,
-                fid_aply_rang_prc_2,
-                "N", dataframe
-            )
-        else:
-            print("The End")
-            return dataframe
-    else:
-        # 오류 발생 시 처리
-        res.printError(API_URL)
-        return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M",),
+        initial=(dataframe,),
+    )
@@ -100,13 +100,6 @@ def order_resv_ccnl(
     if cncl_yn == "":
         raise ValueError("cncl_yn is required (e.g. 'Y')")
 
-    if depth > max_depth:
-        logging.warning("Max recursive depth reached.")
-        if dataframe is None:
-            return pd.DataFrame()
-        else:
-            return dataframe
-
     tr_id = "CTSC0004R"  # 주식예약주문조회
 
     params = {
@@ -124,31 +117,13 @@ def order_resv_ccnl(
         "CTX_AREA_NK200": NK200                     # 연속조회키200
     }
     
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-    
-    if res.isOK():
-        current_data = pd.DataFrame(res.getBody().output)
-            
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-            
-        tr_cont = res.getHeader().tr_cont
-        FK200 = res.getBody().ctx_area_fk200
-        NK200 = res.getBody().ctx_area_nk200
-        
-        if tr_cont in ["M", "F"]:  # 다음 페이지 존재
-            logging.info("Call Next page...")
-            ka.smart_sleep()  # 시스템 안정적 운영을 위한 지연
-            return order_resv_ccnl(
-                rsvn_ord_ord_dt, rsvn_ord_end_dt, tmnl_mdia_kind_cd, cano, acnt_prdt_cd, 
-                prcs_dvsn_cd, cncl_yn, rsvn_ord_seq, pdno, sll_buy_dvsn_cd,
-                FK200, NK200, "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logging.info("Data fetch complete.")
-            return dataframe
-    else:
-        res.printError(url=API_URL)
-        return pd.DataFrame() 
\ No newline at end of file
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        cont_keys={"CTX_AREA_FK200": "ctx_area_fk200", "CTX_AREA_NK200": "ctx_area_nk200"},
+        max_pages=max_depth - depth + 1,
+        initial=(dataframe,),
+    )
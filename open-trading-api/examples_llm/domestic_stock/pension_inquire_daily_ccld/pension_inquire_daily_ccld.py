@@ -81,13 +81,6 @@ def pension_inquire_daily_ccld(
     if inqr_dvsn_3 == "":
         raise ValueError("inqr_dvsn_3 is required (e.g. '00: 전체')")
 
-    if depth > max_depth:
-        logging.warning("Max recursive depth reached.")
-        if dataframe is None:
-            return pd.DataFrame()
-        else:
-            return dataframe
-
     tr_id = "TTTC2201R"  # 퇴직연금 미체결내역
 
     params = {
@@ -101,29 +94,13 @@ def pension_inquire_daily_ccld(
         "CTX_AREA_NK100": NK100
     }
     
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-    
-    if res.isOK():
-        current_data = pd.DataFrame(res.getBody().output)
-            
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-            
-        tr_cont = res.getHeader().tr_cont
-        FK100 = res.getBody().ctx_area_fk100
-        NK100 = res.getBody().ctx_area_nk100
-        
-        if tr_cont in ["M", "F"]:  # 다음 페이지 존재
-            logging.info("Call Next page...")
-            ka.smart_sleep()  # 시스템 안정적 운영을 위한 지연
-            return pension_inquire_daily_ccld(
-                cano, acnt_prdt_cd, user_dvsn_cd, sll_buy_dvsn_cd, ccld_nccs_dvsn, inqr_dvsn_3, FK100, NK100, "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logging.info("Data fetch complete.")
-            return dataframe
-    else:
-        res.printError(url=API_URL)
-        return pd.DataFrame() 
\ No newline at end of file
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        cont_keys={"CTX_AREA_FK100": "ctx_area_fk100", "CTX_AREA_NK100": "ctx_area_nk100"},
+        max_pages=max_depth - depth + 1,
+        initial=(dataframe,),
+    )
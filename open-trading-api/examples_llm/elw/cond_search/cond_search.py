@@ -172,11 +172,6 @@ def cond_search(
         logger.error("fid_input_cnt_1 is required. (e.g. '1')")
         raise ValueError("fid_input_cnt_1 is required. (e.g. '1')")
     
-    # 최대 재귀 깊이 체크 (무한 재귀 방지)
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe if dataframe is not None else pd.DataFrame()
-    
     # API 호출 정보 설정
     tr_id = "FHKEW15100000"
 
@@ -244,106 +239,12 @@ def cond_search(
     # API 호출 정보 로그
     logger.info("ELW 종목검색 API 호출 시작 (depth: %d)", depth)
     
-    # API 호출 실행
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    # API 응답 처리
-    if res.isOK():
-        # 응답 데이터 처리
-        if hasattr(res.getBody(), 'output'):
-            output_data = res.getBody().output
-            # 단일 객체인 경우 리스트로 변환
-            if not isinstance(output_data, list):
-                output_data = [output_data]
-            current_data = pd.DataFrame(output_data)
-            logger.info("API 호출 성공: %d건의 데이터를 수신했습니다.", len(current_data))
-        else:
-            current_data = pd.DataFrame()
-            logger.warning("API 응답에서 output 데이터를 찾을 수 없습니다.")
-            
-        # 데이터프레임 누적 처리
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-            
-        # 연속 조회 여부 확인
-        tr_cont = res.getHeader().tr_cont
-        
-        # 연속 데이터가 있는 경우 재귀 호출
-        if tr_cont == "M":
-            logger.info("Calling next page...")
-            ka.smart_sleep()  # API 호출 간격 조절
-            return cond_search(
-                fid_cond_mrkt_div_code,
-                fid_cond_scr_div_code,
-                fid_rank_sort_cls_code,
-                fid_input_cnt_1,
-                fid_rank_sort_cls_code_2,
-                fid_input_cnt_2,
-                fid_rank_sort_cls_code_3,
-                fid_input_cnt_3,
-                fid_trgt_cls_code,
-                fid_input_iscd,
-                fid_unas_input_iscd,
-                fid_mrkt_cls_code,
-                fid_input_date_1,
-                fid_input_date_2,
-                fid_input_iscd_2,
-                fid_etc_cls_code,
-                fid_input_rmnn_dynu_1,
-                fid_input_rmnn_dynu_2,
-                fid_prpr_cnt1,
-                fid_prpr_cnt2,
-                fid_rsfl_rate1,
-                fid_rsfl_rate2,
-                fid_vol1,
-                fid_vol2,
-                fid_aply_rang_prc_1,
-                fid_aply_rang_prc_2,
-                fid_lvrg_val1,
-                fid_lvrg_val2,
-                fid_vol3,
-                fid_vol4,
-                fid_ints_vltl1,
-                fid_ints_vltl2,
-                fid_prmm_val1,
-                fid_prmm_val2,
-                fid_gear1,
-                fid_gear2,
-                fid_prls_qryr_rate1,
-                fid_prls_qryr_rate2,
-                fid_delta1,
-                fid_delta2,
-                fid_acpr1,
-                fid_acpr2,
-                fid_stck_cnvr_rate1,
-                fid_stck_cnvr_rate2,
-                fid_div_cls_code,
-                fid_prit1,
-                fid_prit2,
-                fid_cfp1,
-                fid_cfp2,
-                fid_input_nmix_price_1,
-                fid_input_nmix_price_2,
-                fid_egea_val1,
-                fid_egea_val2,
-                fid_input_dvdn_ert,
-                fid_input_hist_vltl,
-                fid_theta1,
-                fid_theta2,
-                "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            # 데이터 수집 완료
-            logger.info("Data fetch complete.")
-            total_records = len(dataframe) if dataframe is not None else 0
-            logger.info("총 %d건의 ELW 종목 데이터를 수집했습니다.", total_records)
-            return dataframe
-    else:
-        # API 호출 실패 처리
-        error_code = res.getErrorCode()
-        error_message = res.getErrorMessage()
-        logger.error("API call failed: %s - %s", error_code, error_message)
-        res.printError(API_URL)
-        return pd.DataFrame()  # 빈 데이터프레임 반환
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M",),
+        max_pages=max_depth - depth,
+        initial=(dataframe,),
+    )
@@ -121,11 +121,6 @@ def quick_change(
         logger.error("fid_blng_cls_code is required. (e.g. '0')")
         raise ValueError("fid_blng_cls_code is required. (e.g. '0')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe if dataframe is not None else pd.DataFrame()
-
     tr_id = "FHPEW02870000"
 
     params = {
@@ -145,49 +140,12 @@ def quick_change(
         "FID_BLNG_CLS_CODE": fid_blng_cls_code,
     }
 
-    # API 호출
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-
-    if res.isOK():
-        if hasattr(res.getBody(), 'output'):
-            output_data = res.getBody().output
-            if not isinstance(output_data, list):
-                output_data = [output_data]
-            current_data = pd.DataFrame(output_data)
-        else:
-            current_data = pd.DataFrame()
-
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-
-        tr_cont = res.getHeader().tr_cont
-
-        if tr_cont == "M":
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return quick_change(
-                fid_cond_mrkt_div_code,
-                fid_cond_scr_div_code,
-                fid_unas_input_iscd,
-                fid_input_iscd,
-                fid_mrkt_cls_code,
-                fid_input_price_1,
-                fid_input_price_2,
-                fid_input_vol_1,
-                fid_input_vol_2,
-                fid_hour_cls_code,
-                fid_input_hour_1,
-                fid_input_hour_2,
-                fid_rank_sort_cls_code,
-                fid_blng_cls_code,
-                "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe
-    else:
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M",),
+        max_pages=max_depth - depth,
+        initial=(dataframe,),
+    )
@@ -84,11 +84,6 @@ def volatility_trend_minute(
         logger.error("fid_pw_data_incu_yn is required. (e.g. 'N')")
         raise ValueError("fid_pw_data_incu_yn is required. (e.g. 'N')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe if dataframe is not None else pd.DataFrame()
-    
     # API 호출 URL 및 거래 ID 설정
     url = API_URL
     tr_id = "FHPEW02840300"
@@ -101,42 +96,12 @@ def volatility_trend_minute(
         "FID_PW_DATA_INCU_YN": fid_pw_data_incu_yn,
     }
 
-    # API 호출
-    res = ka._url_fetch(url, tr_id, tr_cont, params)
-
-    # API 응답 처리
-    if res.isOK():
-        if hasattr(res.getBody(), 'output'):
-            output_data = res.getBody().output
-            if not isinstance(output_data, list):
-                output_data = [output_data]
-            current_data = pd.DataFrame(output_data)
-        else:
-            current_data = pd.DataFrame()
-        
-        # 데이터프레임 병합
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-        
-        # 연속 거래 여부 확인
-        tr_cont = res.getHeader().tr_cont
-        
-        if tr_cont == "M":
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return volatility_trend_minute(
-                fid_cond_mrkt_div_code,
-                fid_input_iscd,
-                fid_hour_cls_code,
-                fid_pw_data_incu_yn,
-                "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe
-    else:
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        url, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M",),
+        max_pages=max_depth - depth,
+        initial=(dataframe,),
+    )
@@ -124,11 +124,6 @@ def volume_rank(
         logger.error("fid_input_iscd_2 is required. (e.g. '0000')")
         raise ValueError("fid_input_iscd_2 is required. (e.g. '0000')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe if dataframe is not None else pd.DataFrame()
-
     url = API_URL
     tr_id = "FHPEW02780000"
 
@@ -150,54 +145,12 @@ def volume_rank(
         "FID_INPUT_DATE_2": fid_input_date_2,
     }
 
-    # API 호출
-    res = ka._url_fetch(url, tr_id, tr_cont, params)
-
-    if res.isOK():
-        # 응답 데이터 처리
-        if hasattr(res.getBody(), 'output'):
-            output_data = res.getBody().output
-            if not isinstance(output_data, list):
-                output_data = [output_data]
-            current_data = pd.DataFrame(output_data)
-        else:
-            current_data = pd.DataFrame()
-
-        # 데이터프레임 병합
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-
-        # 연속 거래 여부 확인
-        tr_cont = res.getHeader().tr_cont
-
-        if tr_cont == "M":
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return volume_rank(
-                fid_cond_mrkt_div_code,
-                fid_cond_scr_div_code,
-                fid_unas_input_iscd,
-                fid_input_iscd,
-                fid_input_rmnn_dynu_1,
-                fid_div_cls_code,
-                fid_input_price_1,
-                fid_input_price_2,
-                fid_input_vol_1,
-                fid_input_vol_2,
-                fid_input_date_1,
-                fid_rank_sort_cls_code,
-                fid_blng_cls_code,
-                fid_input_iscd_2,
-                fid_input_date_2,
-                "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe
-    else:
-        # API 에러 처리
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        url, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M",),
+        max_pages=max_depth - depth,
+        initial=(dataframe,),
+    )
@@ -7,6 +7,8 @@ import copy
 import json
 import logging
 import os
+import random
+import threading
 import time
 from base64 import b64decode
 from collections import namedtuple
@@ -138,7 +140,7 @@ def isPaperTrading():  # 모의투자 매매
 def changeTREnv(token_key, svr="prod", product=_cfg["my_prod"]):
     cfg = dict()
 
-    global _isPaper
+    global _isPaper, _smartSleep
     if svr == "prod":  # 실전투자
         ak1 = "my_app"  # 실전투자용 앱키
         ak2 = "my_sec"  # 실전투자용 앱시크리트
@@ -150,6 +152,8 @@ def changeTREnv(token_key, svr="prod", product=_cfg["my_prod"]):
         _isPaper = True
         _smartSleep = 0.5
 
+    _rate_limiter.set_interval(_smartSleep)
+
     cfg["my_app"] = _cfg[ak1]
     cfg["my_sec"] = _cfg[ak2]
 
@@ -262,6 +266,129 @@ def smart_sleep():
     time.sleep(_smartSleep)
 
 
+class RateLimiter:
+    """REST 호출 간 최소 간격 유지 (실전 0.05초, 모의 0.5초).
+
+    직전 호출 이후 간격이 이미 지났으면 대기하지 않는다. 고정 지연(smart_sleep)
+    대신 _url_fetch 가 매 호출 전에 acquire() 한다.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def set_interval(self, interval: float):
+        self.interval = interval
+
+    def acquire(self) -> float:
+        """호출 슬롯을 예약하고 필요한 만큼만 대기. 대기한 시간(초)을 반환."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._next_at - now)
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            if _DEBUG:
+                print(f"[RateLimit] Waiting {wait:.3f}s ")
+            time.sleep(wait)
+        return wait
+
+
+_rate_limiter = RateLimiter(_smartSleep)
+
+
+def iter_pages(
+        api_url: str,
+        tr_id: str,
+        params: dict,
+        tr_cont: str = "",
+        cont_codes: tuple = ("M", "F"),
+        cont_keys: dict | None = None,
+        max_pages: int = 10,
+        post: bool = False,
+        next_params=None,
+):
+    """tr_cont 연속조회 API 를 반복문으로 페이지 단위 조회 (generator).
+
+    Args:
+        params: 요청 파라미터 (연속조회 키는 페이지마다 갱신됨, 원본은 변경하지 않음)
+        tr_cont: 첫 요청의 연속 거래 여부 ("" 또는 "N")
+        cont_codes: 다음 페이지가 있음을 뜻하는 응답 헤더 tr_cont 값
+        cont_keys: {요청 파라미터명: 응답 body 필드명}, 예) {"CTX_AREA_FK100": "ctx_area_fk100"}
+        max_pages: 최대 조회 페이지 수
+        next_params: 응답 필드로 표현되지 않는 연속 상태용 hook. (body, params) 를 받아
+            다음 요청에 덮어쓸 파라미터 dict 를 반환, 예) output1 안의 INDEX_KEY + QRY_TP="P"
+
+    Yields:
+        APIResp: 성공한 페이지 응답. 실패 시 APIRespError 를 yield 하고 종료한다.
+    """
+    params = dict(params)
+    for page in range(max_pages):
+        if page:
+            logging.info("Calling next page... (%d/%d)", page + 1, max_pages)
+        res = _url_fetch(api_url, tr_id, tr_cont, params, postFlag=post)
+        yield res
+        if not res.isOK():
+            return
+        next_cont = getattr(res.getHeader(), "tr_cont", "")
+        if next_cont not in cont_codes:
+            return
+        body = res.getBody()
+        for param_name, field in (cont_keys or {}).items():
+            params[param_name] = getattr(body, field, "")
+        if next_params is not None:
+            params.update(next_params(body, params))
+        tr_cont = "N"
+    # 마지막 페이지도 연속 데이터가 있다고 응답했지만 페이지 한도로 중단
+    logging.warning("Max recursive depth reached. (%d pages) Stopping further requests.", max_pages)
+
+
+def fetch_pages(
+        api_url: str,
+        tr_id: str,
+        params: dict,
+        outputs: tuple = ("output",),
+        tr_cont: str = "",
+        cont_codes: tuple = ("M", "F"),
+        cont_keys: dict | None = None,
+        max_pages: int = 10,
+        initial: tuple | None = None,
+        post: bool = False,
+        next_params=None,
+):
+    """iter_pages 로 모든 페이지를 모은 뒤 output 별 DataFrame 을 한 번에 생성.
+
+    페이지마다 pd.concat 하지 않고 레코드 리스트에 누적하므로 페이지 수에 선형이다.
+    outputs 가 하나면 DataFrame, 여러 개면 같은 순서의 DataFrame 튜플을 반환한다.
+    API 오류 시 (기존 함수들과 동일하게) 빈 DataFrame 을 반환한다.
+
+    Args:
+        initial: 앞에 이어 붙일 기존 DataFrame (output 순서, None 허용)
+    """
+    records = {name: [] for name in outputs}
+    for res in iter_pages(api_url, tr_id, params, tr_cont, cont_codes, cont_keys, max_pages, post, next_params):
+        if not res.isOK():
+            logging.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
+            res.printError(api_url)
+            empty = tuple(pd.DataFrame() for _ in outputs)
+            return empty[0] if len(outputs) == 1 else empty
+        body = res.getBody()
+        for name in outputs:
+            data = getattr(body, name, None)
+            if data:
+                records[name].extend(data if isinstance(data, list) else [data])
+    logging.info("Data fetch complete.")
+
+    frames = []
+    for i, name in enumerate(outputs):
+        frame = pd.DataFrame(records[name])
+        prev = initial[i] if initial and i < len(initial) else None
+        if prev is not None and not prev.empty:
+            frame = pd.concat([prev, frame], ignore_index=True)
+        frames.append(frame)
+    return frames[0] if len(frames) == 1 else tuple(frames)
+
+
 def getTREnv():
     return _TRENV
 
@@ -438,6 +565,7 @@ def _url_fetch(
         print(f"<header>\n{headers}")
         print(f"<body>\n{params}")
 
+    _rate_limiter.acquire()
     if postFlag:
         # if (hashFlag): set_order_hash_key(headers, params)
         res = requests.post(url, headers=headers, data=json.dumps(params))
@@ -646,6 +774,40 @@ def add_data_map(
         data_map[tr_id]["iv"] = iv
 
 
+def _ws_backoff_delay(retry_count: int, base: float = 1.0, max_delay: float = 60.0) -> float:
+    """재접속 대기시간 (지수 백오프 + jitter)"""
+    delay = min(max_delay, base * (2 ** max(retry_count - 1, 0)))
+    return delay * (0.5 + random.random() / 2)
+
+
+def _decode_ws_frame(raw: str):
+    """웹소켓 수신 메시지 해석
+
+    실시간 데이터("0"/"1"로 시작)는 (tr_id, DataFrame, None),
+    시스템 응답(JSON)은 (tr_id, 빈 DataFrame, SysMsg) 를 반환한다.
+    """
+    if raw[0] in ["0", "1"]:
+        d1 = raw.split("|")
+        if len(d1) < 4:
+            raise ValueError("data not found...")
+
+        tr_id = d1[1]
+
+        dm = data_map[tr_id]
+        d = d1[3]
+        if dm.get("encrypt", None) == "Y":
+            d = aes_cbc_base64_dec(dm["key"], dm["iv"], d)
+
+        df = pd.read_csv(
+            StringIO(d), header=None, sep="^", names=dm["columns"], dtype=object
+        )
+        return tr_id, df, None
+
+    rsp = system_resp(raw)
+    add_data_map(tr_id=rsp.tr_id, encrypt=rsp.encrypt, key=rsp.ekey, iv=rsp.iv)
+    return rsp.tr_id, pd.DataFrame(), rsp
+
+
 class KISWebSocket:
     api_url: str = ""
     on_result: Callable[
@@ -665,36 +827,11 @@ class KISWebSocket:
     async def __subscriber(self, ws: websockets.ClientConnection):
         async for raw in ws:
             logging.info("received message >> %s" % raw)
-            show_result = False
-
-            df = pd.DataFrame()
-
-            if raw[0] in ["0", "1"]:
-                d1 = raw.split("|")
-                if len(d1) < 4:
-                    raise ValueError("data not found...")
 
-                tr_id = d1[1]
-
-                dm = data_map[tr_id]
-                d = d1[3]
-                if dm.get("encrypt", None) == "Y":
-                    d = aes_cbc_base64_dec(dm["key"], dm["iv"], d)
-
-                df = pd.read_csv(
-                    StringIO(d), header=None, sep="^", names=dm["columns"], dtype=object
-                )
-
-                show_result = True
-
-            else:
-                rsp = system_resp(raw)
-
-                tr_id = rsp.tr_id
-                add_data_map(
-                    tr_id=rsp.tr_id, encrypt=rsp.encrypt, key=rsp.ekey, iv=rsp.iv
-                )
+            tr_id, df, rsp = _decode_ws_frame(raw)
+            show_result = rsp is None
 
+            if rsp is not None:
                 if rsp.isPingPong:
                     print(f"### RECV [PINGPONG] [{raw}]")
                     await ws.pong(raw)
@@ -721,6 +858,9 @@ class KISWebSocket:
                             ws, obj["func"], "1", obj["items"], obj["kwargs"]
                         )
 
+                    # 접속/구독 성공 시 재시도 횟수 초기화
+                    self.retry_count = 0
+
                     # subscriber
                     await asyncio.gather(
                         self.__subscriber(ws),
@@ -728,7 +868,7 @@ class KISWebSocket:
             except Exception as e:
                 print("Connection exception >> ", e)
                 self.retry_count += 1
-                await asyncio.sleep(1)
+                await asyncio.sleep(_ws_backoff_delay(self.retry_count))
 
     # func
     @classmethod
@@ -797,3 +937,321 @@ class KISWebSocket:
             asyncio.run(self.__runner())
         except KeyboardInterrupt:
             print("Closing by KeyboardInterrupt")
+
+
+########### 다중 세션 웹소켓 (구독 분산)
+
+
+def issue_approval_key(svr="prod", app_key: str = None, app_secret: str = None):
+    """웹소켓 접속키 발급 (전역 헤더를 변경하지 않고 키만 반환)
+
+    app_key/app_secret 미지정 시 kis_devlp.yaml 의 실전/모의 앱키를 사용한다.
+    """
+    if app_key is None or app_secret is None:
+        ak1, ak2 = ("my_app", "my_sec") if svr == "prod" else ("paper_app", "paper_sec")
+        app_key, app_secret = _cfg[ak1], _cfg[ak2]
+
+    p = {
+        "grant_type": "client_credentials",
+        "appkey": app_key,
+        "secretkey": app_secret,
+    }
+    url = f"{_cfg[svr]}/oauth2/Approval"
+    res = requests.post(url, data=json.dumps(p), headers=_getBaseHeader())
+    if res.status_code != 200:
+        print(f"Get Approval token fail! [{res.status_code}]")
+        return None
+
+    return _getResultObject(res.json()).approval_key
+
+
+class _ApprovalRejected(ConnectionError):
+    """서버가 접속키를 거부함 (만료/무효) — 새 키를 발급받아 재접속해야 한다"""
+
+
+def _is_approval_error(rsp) -> bool:
+    """구독 응답이 접속키 오류인지 (예: "invalid approval : NOT FOUND")"""
+    return not rsp.isOk and "approval" in (rsp.tr_msg or "").lower()
+
+
+class _KISWebSocketShard:
+    """구독 분산용 단일 웹소켓 세션 (KISWebSocketPool 내부용)"""
+
+    def __init__(self, pool: "KISWebSocketPool", index: int, credential: tuple | None):
+        self.pool = pool
+        self.index = index
+        self.credential = credential
+        self.approval_key: str | None = None
+        self.items: set[tuple[str, str]] = set()
+        self.ws: websockets.ClientConnection | None = None
+        self.task: asyncio.Task | None = None
+        self.retry_count = 0
+        self.connected = asyncio.Event()
+        self._send_lock = asyncio.Lock()
+
+    @property
+    def free(self) -> int:
+        return self.pool.max_per_session - len(self.items)
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self.task = None
+        self.ws = None
+        self.connected.clear()
+
+    async def send(self, name: str, tr_type: str, item: str):
+        """구독 등록("1")/해제("2") 요청. 미접속 상태면 재접속 시 일괄 처리된다."""
+        if self.ws is None or not self.connected.is_set():
+            return
+        await self._send(self.ws, name, tr_type, item)
+
+    async def _send(self, ws, name: str, tr_type: str, item: str):
+        request, kwargs = self.pool.requests[name]
+        msg, columns = request(tr_type, item, **(kwargs or {}))
+        add_data_map(tr_id=msg["body"]["input"]["tr_id"], columns=columns)
+        if self.approval_key is not None:
+            msg["header"]["approval_key"] = self.approval_key
+
+        logging.info("[shard %d] send message >> %s" % (self.index, json.dumps(msg)))
+        async with self._send_lock:
+            await ws.send(json.dumps(msg))
+            await asyncio.sleep(_smartSleep)
+
+    async def _run(self):
+        pool = self.pool
+        url = f"{getTREnv().my_url_ws}{pool.api_url}"
+
+        while pool.max_retries is None or self.retry_count < pool.max_retries:
+            try:
+                if self.approval_key is None:
+                    app_key, app_secret = self.credential or (None, None)
+                    self.approval_key = await asyncio.to_thread(
+                        issue_approval_key, pool.svr, app_key, app_secret
+                    )
+                    if self.approval_key is None:
+                        raise ConnectionError("approval key not issued")
+
+                async with websockets.connect(url) as ws:
+                    self.ws = ws
+                    # 일괄 구독 중에 추가/해제된 종목까지 맞춘 뒤에야 접속 완료로 본다
+                    sent: set[tuple[str, str]] = set()
+                    while pending := sorted(self.items - sent):
+                        for name, item in pending:
+                            await self._send(ws, name, "1", item)
+                            sent.add((name, item))
+                    for name, item in sorted(sent - self.items):
+                        await self._send(ws, name, "2", item)
+
+                    # 접속/구독 성공 시 재시도 횟수 초기화
+                    self.retry_count = 0
+                    self.connected.set()
+
+                    async for raw in ws:
+                        tr_id, df, rsp = _decode_ws_frame(raw)
+                        if rsp is not None:
+                            if rsp.isPingPong:
+                                await ws.pong(raw)
+                            elif _is_approval_error(rsp):
+                                raise _ApprovalRejected(rsp.tr_msg)
+                            continue
+                        pool._publish(self.index, tr_id, df)
+
+                    # 서버가 정상 종료해도 백오프 후 재접속
+                    raise ConnectionError("connection closed by server")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[shard {self.index}] Connection exception >> ", e)
+                if isinstance(e, (_ApprovalRejected, websockets.InvalidStatus)):
+                    # 거부된/만료된 접속키로 계속 재시도하지 않도록 다음 접속 때 재발급
+                    self.approval_key = None
+                self.retry_count += 1
+                await asyncio.sleep(
+                    _ws_backoff_delay(self.retry_count, pool.base_delay, pool.max_delay)
+                )
+            finally:
+                self.ws = None
+                self.connected.clear()
+
+        print(f"[shard {self.index}] max retries exceeded, giving up")
+
+
+class KISWebSocketPool:
+    """여러 웹소켓 세션/접속키에 구독을 분산하는 구독 관리자
+
+    세션당 구독 한도(max_per_session)를 넘으면 새 세션을 열고, 구독이 줄면
+    세션을 정리한다. 각 세션은 지수 백오프로 독립적으로 재접속하며, 모든
+    세션의 실시간 데이터는 하나의 async iterator 로 합쳐진다.
+
+    Example:
+        >>> pool = ka.KISWebSocketPool(api_url="/tryitout")
+        >>> await pool.subscribe(ccnl_krx, kospi200_codes)
+        >>> async for tr_id, df in pool:
+        ...     print(tr_id, df)
+    """
+
+    def __init__(
+            self,
+            api_url: str,
+            max_per_session: int = 40,
+            max_sessions: int | None = None,
+            credentials: list[tuple[str, str]] | None = None,
+            svr: str = "prod",
+            max_retries: int | None = None,
+            base_delay: float = 1.0,
+            max_delay: float = 60.0,
+            queue_size: int = 10000,
+    ):
+        self.api_url = api_url
+        self.max_per_session = max_per_session
+        self.max_sessions = max_sessions
+        self.credentials = credentials or []
+        self.svr = svr
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.requests: dict[str, tuple[Callable, dict | None]] = {}
+        self.shards: list[_KISWebSocketShard] = []
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._started = False
+        self._lock = asyncio.Lock()
+
+    # ── 구독 관리 ──
+
+    @property
+    def subscriptions(self) -> dict[tuple[str, str], int]:
+        """(함수명, 종목) → 세션 index"""
+        return {item: s.index for s in self.shards for item in s.items}
+
+    def _normalize(self, data: list | str) -> list[str]:
+        if type(data) is str:
+            return [data]
+        elif type(data) is list:
+            return data
+        raise ValueError("data must be str or list")
+
+    def _new_shard(self) -> _KISWebSocketShard:
+        if self.max_sessions is not None and len(self.shards) >= self.max_sessions:
+            raise ValueError(
+                f"Subscription's max is {self.max_per_session * self.max_sessions}"
+            )
+        index = max((s.index for s in self.shards), default=-1) + 1
+        credential = self.credentials[index % len(self.credentials)] if self.credentials else None
+        shard = _KISWebSocketShard(self, index, credential)
+        self.shards.append(shard)
+        if self._started:
+            shard.start()
+        return shard
+
+    async def subscribe(
+            self,
+            request: Callable[[str, str, ...], (dict, list[str])],
+            data: list | str,
+            kwargs: dict = None,
+    ):
+        """구독 추가 — 여유가 가장 큰 세션에 배정, 모두 찼으면 새 세션 생성"""
+        name = request.__name__
+        async with self._lock:
+            self.requests.setdefault(name, (request, kwargs))
+            current = self.subscriptions
+            for item in self._normalize(data):
+                key = (name, item)
+                if key in current:
+                    continue
+                shard = max(self.shards, key=lambda s: s.free, default=None)
+                if shard is None or shard.free <= 0:
+                    shard = self._new_shard()
+                shard.items.add(key)
+                current[key] = shard.index
+                await shard.send(name, "1", item)
+
+    async def unsubscribe(
+            self,
+            request: Callable[[str, str, ...], (dict, list[str])],
+            data: list | str,
+    ):
+        """구독 해제 후 세션 수를 줄일 수 있으면 재분배"""
+        name = request.__name__
+        async with self._lock:
+            for item in self._normalize(data):
+                key = (name, item)
+                for shard in self.shards:
+                    if key in shard.items:
+                        shard.items.discard(key)
+                        await shard.send(name, "2", item)
+                        break
+            await self._rebalance()
+
+    async def rebalance(self):
+        async with self._lock:
+            await self._rebalance()
+
+    async def _rebalance(self):
+        # 빈 세션 정리
+        for shard in [s for s in self.shards if not s.items]:
+            self.shards.remove(shard)
+            await shard.close()
+
+        # 가장 적게 쓰는 세션을 다른 세션으로 흡수할 수 있으면 이동 후 종료
+        while len(self.shards) > 1:
+            total = sum(len(s.items) for s in self.shards)
+            if total > self.max_per_session * (len(self.shards) - 1):
+                break
+            victim = min(self.shards, key=lambda s: len(s.items))
+            self.shards.remove(victim)
+            for name, item in sorted(victim.items):
+                await victim.send(name, "2", item)
+                target = max(self.shards, key=lambda s: s.free)
+                target.items.add((name, item))
+                await target.send(name, "1", item)
+            victim.items.clear()
+            await victim.close()
+
+    # ── 실행 ──
+
+    async def start(self):
+        self._started = True
+        for shard in self.shards:
+            shard.start()
+
+    async def close(self):
+        self._started = False
+        for shard in self.shards:
+            await shard.close()
+
+    def _publish(self, shard_index: int, tr_id: str, df: pd.DataFrame):
+        if self._queue.full():
+            # 소비가 느리면 가장 오래된 데이터를 버린다 (수신 루프/PINGPONG 지연 방지)
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait((tr_id, df))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> tuple[str, pd.DataFrame]:
+        if not self._started:
+            await self.start()
+        return await self._queue.get()
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self.shards),
+            "subscriptions": sum(len(s.items) for s in self.shards),
+            "connected": sum(1 for s in self.shards if s.connected.is_set()),
+            "per_session": {s.index: len(s.items) for s in self.shards},
+            "retries": {s.index: s.retry_count for s in self.shards},
+            "queued": self._queue.qsize(),
+            "dropped": self.dropped,
+        }
@@ -98,14 +98,6 @@ def opt_tick_ccnl(
     if qry_cnt == "":
         raise ValueError("qry_cnt is required (e.g. '20')")
 
-    if depth > max_depth:
-        logging.warning("Max recursive depth reached.")
-        if dataframe1 is None:
-            dataframe1 = pd.DataFrame()
-        if dataframe2 is None:
-            dataframe2 = pd.DataFrame()
-        return dataframe1, dataframe2
-
     tr_id = "HHDFO55020200"
 
     params = {
@@ -119,36 +111,13 @@ def opt_tick_ccnl(
         "INDEX_KEY": index_key
     }
     
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-    
-    if res.isOK():
-        # output1 처리 (object 타입)
-        current_data1 = pd.DataFrame([res.getBody().output1])
-        if dataframe1 is not None:
-            dataframe1 = pd.concat([dataframe1, current_data1], ignore_index=True)
-        else:
-            dataframe1 = current_data1
-            
-        # output2 처리 (array 타입)
-        current_data2 = pd.DataFrame(res.getBody().output2)
-        if dataframe2 is not None:
-            dataframe2 = pd.concat([dataframe2, current_data2], ignore_index=True)
-        else:
-            dataframe2 = current_data2
-            
-        tr_cont = res.getHeader().tr_cont
-        index_key = res.getBody().output1["index_key"]
-        
-        if tr_cont in ["M", "F"]:  # 다음 페이지 존재
-            logging.info("Call Next page...")
-            ka.smart_sleep()  # 시스템 안정적 운영을 위한 지연
-            return opt_tick_ccnl(
-                srs_cd, exch_cd, qry_cnt, start_date_time, close_date_time,
-                qry_gap, qry_tp, index_key, "N", dataframe1, dataframe2, depth + 1, max_depth
-            )
-        else:
-            logging.info("Data fetch complete.")
-            return dataframe1, dataframe2
-    else:
-        res.printError(url=API_URL)
-        return pd.DataFrame(), pd.DataFrame() 
\ No newline at end of file
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output1", "output2"),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        next_params=lambda body, params: {"INDEX_KEY": body.output1["index_key"]},
+        max_pages=max_depth - depth + 1,
+        initial=(dataframe1, dataframe2),
+    )
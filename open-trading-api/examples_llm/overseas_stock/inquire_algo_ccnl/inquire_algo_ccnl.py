@@ -71,14 +71,6 @@ def inquire_algo_ccnl(
     if acnt_prdt_cd == "":
         raise ValueError("acnt_prdt_cd is required")
 
-    if depth > max_depth:
-        logging.warning("Max recursive depth reached.")
-        if dataframe is None:
-            dataframe = pd.DataFrame()
-        if dataframe3 is None:
-            dataframe3 = pd.DataFrame()
-        return dataframe, dataframe3
-
     tr_id = "TTTS6059R"  # 해외주식 지정가체결내역조회
 
     params = {
@@ -92,36 +84,13 @@ def inquire_algo_ccnl(
         "CTX_AREA_FK200": FK200  # 연속조회조건200
     }
     
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-    
-    if res.isOK():
-        current_data = pd.DataFrame(res.getBody().output)
-        current_data3 = pd.DataFrame(res.getBody().output3)
-            
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-            
-        if dataframe3 is not None:
-            dataframe3 = pd.concat([dataframe3, current_data3], ignore_index=True)
-        else:
-            dataframe3 = current_data3
-            
-        tr_cont = res.getHeader().tr_cont
-        NK200 = res.getBody().ctx_area_nk200
-        FK200 = res.getBody().ctx_area_fk200
-        
-        if tr_cont in ["M", "F"]:  # 다음 페이지 존재
-            logging.info("Call Next page...")
-            ka.smart_sleep()  # 시스템 안정적 운영을 위한 지연
-            return inquire_algo_ccnl(
-                cano, acnt_prdt_cd, ord_dt, ord_gno_brno, odno, ttlz_icld_yn, 
-                NK200, FK200, "N", dataframe, dataframe3, depth + 1, max_depth
-            )
-        else:
-            logging.info("Data fetch complete.")
-            return dataframe, dataframe3
-    else:
-        res.printError(url=API_URL)
-        return pd.DataFrame(), pd.DataFrame() 
\ No newline at end of file
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output", "output3"),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        cont_keys={"CTX_AREA_NK200": "ctx_area_nk200", "CTX_AREA_FK200": "ctx_area_fk200"},
+        max_pages=max_depth - depth + 1,
+        initial=(dataframe, dataframe3),
+    )
@@ -119,11 +119,6 @@ def inquire_ccnl(
         logger.error("sort_sqn is required. (e.g. 'DS')")
         raise ValueError("sort_sqn is required. (e.g. 'DS')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe if dataframe is not None else pd.DataFrame()
-
     # TR ID 설정 (모의투자 지원 로직)
     if env_dv == "real":
         tr_id = "TTTS3035R"  # 실전투자용 TR ID
@@ -149,52 +144,13 @@ def inquire_ccnl(
         "CTX_AREA_FK200": FK200,
     }
 
-    res = ka._url_fetch(api_url=API_URL, ptr_id=tr_id, tr_cont=tr_cont, params=params)
-
-    if res.isOK():
-        if hasattr(res.getBody(), 'output'):
-            output_data = res.getBody().output
-            if not isinstance(output_data, list):
-                output_data = [output_data]
-            current_data = pd.DataFrame(output_data)
-        else:
-            current_data = pd.DataFrame()
-
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-
-        tr_cont, NK200, FK200 = res.getHeader().tr_cont, res.getBody().ctx_area_nk200, res.getBody().ctx_area_fk200
-
-        if tr_cont in ["M", "F"]:
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return inquire_ccnl(
-                cano=cano,
-                acnt_prdt_cd=acnt_prdt_cd,
-                pdno=pdno,
-                ord_strt_dt=ord_strt_dt,
-                ord_end_dt=ord_end_dt,
-                sll_buy_dvsn=sll_buy_dvsn,
-                ccld_nccs_dvsn=ccld_nccs_dvsn,
-                ovrs_excg_cd=ovrs_excg_cd,
-                sort_sqn=sort_sqn,
-                ord_dt=ord_dt,
-                ord_gno_brno=ord_gno_brno,
-                odno=odno,
-                NK200=NK200,
-                FK200=FK200,
-                env_dv=env_dv,
-                tr_cont="N",
-                dataframe=dataframe,
-                depth=depth + 1,
-                max_depth=max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe
-    else:
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        cont_keys={"CTX_AREA_NK200": "ctx_area_nk200", "CTX_AREA_FK200": "ctx_area_fk200"},
+        max_pages=max_depth - depth,
+        initial=(dataframe,),
+    )
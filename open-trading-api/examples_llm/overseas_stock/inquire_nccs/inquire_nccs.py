@@ -84,11 +84,6 @@ def inquire_nccs(
         logger.error("sort_sqn is required. (e.g. 'DS')")
         raise ValueError("sort_sqn is required. (e.g. 'DS')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe if dataframe is not None else pd.DataFrame()
-    
     tr_id = "TTTS3018R"
 
     params = {
@@ -100,49 +95,13 @@ def inquire_nccs(
         "CTX_AREA_NK200": NK200,
     }
 
-    res = ka._url_fetch(api_url=API_URL, ptr_id=tr_id, tr_cont=tr_cont, params=params)
-
-    if res.isOK():
-        if hasattr(res.getBody(), 'output'):
-            output_data = res.getBody().output
-            if not isinstance(output_data, list):
-                output_data = [output_data]
-            current_data = pd.DataFrame(output_data)
-        else:
-            current_data = pd.DataFrame()
-            
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-            
-        tr_cont, NK200, FK200 = res.getHeader().tr_cont, res.getBody().ctx_area_nk200, res.getBody().ctx_area_fk200
-        
-        if tr_cont in ["M", "F"]:
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return inquire_nccs(
-                cano=cano,
-                acnt_prdt_cd=acnt_prdt_cd,
-                ovrs_excg_cd=ovrs_excg_cd,
-                sort_sqn=sort_sqn,
-                FK200=FK200,
-                NK200=NK200,
-                env_dv=env_dv,
-                tr_cont="N",
-                dataframe=dataframe,
-                depth=depth + 1,
-                max_depth=max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe
-    else:
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        # 이미 수집된 데이터가 있으면 그것을 반환, 없으면 빈 DataFrame 반환
-        if dataframe is not None and not dataframe.empty:
-            logger.info("Returning already collected data due to API error.")
-            return dataframe
-        else:
-            return pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        cont_keys={"CTX_AREA_NK200": "ctx_area_nk200", "CTX_AREA_FK200": "ctx_area_fk200"},
+        max_pages=max_depth - depth,
+        initial=(dataframe,),
+    )
@@ -87,11 +87,6 @@ def inquire_paymt_stdr_balance(
         logger.error("inqr_dvsn_cd is required. (e.g. '00')")
         raise ValueError("inqr_dvsn_cd is required. (e.g. '00')")
 
-    # 최대 재귀 깊이 체크
-    if depth >= max_depth:
-        logger.warning("Maximum recursion depth (%d) reached. Stopping further requests.", max_depth)
-        return dataframe1 if dataframe1 is not None else pd.DataFrame(), dataframe2 if dataframe2 is not None else pd.DataFrame(), dataframe3 if dataframe3 is not None else pd.DataFrame()
-    
     tr_id = "CTRP6010R"
 
     params = {
@@ -102,99 +97,12 @@ def inquire_paymt_stdr_balance(
         "INQR_DVSN_CD": inqr_dvsn_cd,
     }
 
-    res = ka._url_fetch(api_url=API_URL, ptr_id=tr_id, tr_cont=tr_cont, params=params)
-
-    if res.isOK():
-        # output1 처리
-        if hasattr(res.getBody(), 'output1'):
-            output_data = res.getBody().output1
-            if output_data:
-                # output1은 단일 객체, output2는 배열일 수 있음
-                if isinstance(output_data, list):
-                    current_data1 = pd.DataFrame(output_data)
-                else:
-                    # 단일 객체인 경우 리스트로 감싸서 DataFrame 생성
-                    current_data1 = pd.DataFrame([output_data])
-                
-                if dataframe1 is not None:
-                    dataframe1 = pd.concat([dataframe1, current_data1], ignore_index=True)
-                else:
-                    dataframe1 = current_data1
-            else:
-                if dataframe1 is None:
-                    dataframe1 = pd.DataFrame()
-        else:
-            if dataframe1 is None:
-                dataframe1 = pd.DataFrame()
-        # output2 처리
-        if hasattr(res.getBody(), 'output2'):
-            output_data = res.getBody().output2
-            if output_data:
-                # output1은 단일 객체, output2는 배열일 수 있음
-                if isinstance(output_data, list):
-                    current_data2 = pd.DataFrame(output_data)
-                else:
-                    # 단일 객체인 경우 리스트로 감싸서 DataFrame 생성
-                    current_data2 = pd.DataFrame([output_data])
-                
-                if dataframe2 is not None:
-                    dataframe2 = pd.concat([dataframe2, current_data2], ignore_index=True)
-                else:
-                    dataframe2 = current_data2
-            else:
-                if dataframe2 is None:
-                    dataframe2 = pd.DataFrame()
-        else:
-            if dataframe2 is None:
-                dataframe2 = pd.DataFrame()
-        # output3 처리
-        if hasattr(res.getBody(), 'output3'):
-            output_data = res.getBody().output3
-            if output_data:
-                # output1은 단일 객체, output2는 배열일 수 있음
-                if isinstance(output_data, list):
-                    current_data3 = pd.DataFrame(output_data)
-                else:
-                    # 단일 객체인 경우 리스트로 감싸서 DataFrame 생성
-                    current_data3 = pd.DataFrame([output_data])
-                
-                if dataframe3 is not None:
-                    dataframe3 = pd.concat([dataframe3, current_data3], ignore_index=True)
-                else:
-                    dataframe3 = current_data3
-            else:
-                if dataframe3 is None:
-                    dataframe3 = pd.DataFrame()
-        else:
-            if dataframe3 is None:
-                dataframe3 = pd.DataFrame()
-        tr_cont = res.getHeader().tr_cont
-        
-        if tr_cont in ["M", "F"]:
-            logger.info("Calling next page...")
-            ka.smart_sleep()
-            return inquire_paymt_stdr_balance(
-                cano=cano,
-                acnt_prdt_cd=acnt_prdt_cd,
-                bass_dt=bass_dt,
-                wcrc_frcr_dvsn_cd=wcrc_frcr_dvsn_cd,
-                inqr_dvsn_cd=inqr_dvsn_cd,
-                dataframe1=dataframe1,
-                dataframe2=dataframe2,
-                dataframe3=dataframe3,
-                tr_cont="N",
-                depth=depth + 1,
-                max_depth=max_depth
-            )
-        else:
-            logger.info("Data fetch complete.")
-            return dataframe1, dataframe2, dataframe3
-    else:
-        logger.error("API call failed: %s - %s", res.getErrorCode(), res.getErrorMessage())
-        res.printError(API_URL)
-        # 이미 수집된 데이터가 있으면 그것을 반환, 없으면 빈 DataFrame 반환
-        if dataframe1 is not None and not dataframe1.empty:
-            logger.info("Returning already collected data due to API error.")
-            return dataframe1, dataframe2 if dataframe2 is not None else pd.DataFrame(), dataframe3 if dataframe3 is not None else pd.DataFrame()
-        else:
-            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output1", "output2", "output3"),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        max_pages=max_depth - depth,
+        initial=(dataframe1, dataframe2, dataframe3),
+    )
@@ -79,13 +79,6 @@ def period_rights(
     if inqr_end_dt == "":
         raise ValueError("inqr_end_dt is required (e.g. '20250131')")
 
-    if depth > max_depth:
-        logging.warning("Max recursive depth reached.")
-        if dataframe is None:
-            return pd.DataFrame()
-        else:
-            return dataframe
-
     tr_id = "CTRGT011R"  # 해외주식 기간별권리조회
 
     params = {
@@ -99,30 +92,13 @@ def period_rights(
         "CTX_AREA_FK50": FK50              # 연속조회검색조건50
     }
     
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-    
-    if res.isOK():
-        current_data = pd.DataFrame(res.getBody().output)
-            
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-            
-        tr_cont = res.getHeader().tr_cont
-        NK50 = res.getBody().ctx_area_nk50
-        FK50 = res.getBody().ctx_area_fk50
-        
-        if tr_cont in ["M", "F"]:  # 다음 페이지 존재
-            logging.info("Call Next page...")
-            ka.smart_sleep()  # 시스템 안정적 운영을 위한 지연
-            return period_rights(
-                rght_type_cd, inqr_dvsn_cd, inqr_strt_dt, inqr_end_dt, 
-                pdno, prdt_type_cd, NK50, FK50, "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logging.info("Data fetch complete.")
-            return dataframe
-    else:
-        res.printError(url=API_URL)
-        return pd.DataFrame() 
\ No newline at end of file
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output",),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        cont_keys={"CTX_AREA_NK50": "ctx_area_nk50", "CTX_AREA_FK50": "ctx_area_fk50"},
+        max_pages=max_depth - depth + 1,
+        initial=(dataframe,),
+    )
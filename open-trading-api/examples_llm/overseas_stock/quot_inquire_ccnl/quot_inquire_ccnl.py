@@ -66,13 +66,6 @@ def quot_inquire_ccnl(
     if symb == "":
         raise ValueError("symb is required (e.g. 'TSLA')")
 
-    if depth > max_depth:
-        logging.warning("Max recursive depth reached.")
-        if dataframe is None:
-            return pd.DataFrame()
-        else:
-            return dataframe
-
     tr_id = "HHDFS76200300"
 
     params = {
@@ -83,28 +76,13 @@ def quot_inquire_ccnl(
         "KEYB": keyb
     }
     
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-    
-    if res.isOK():
-        current_data = pd.DataFrame(res.getBody().output1)
-            
-        if dataframe is not None:
-            dataframe = pd.concat([dataframe, current_data], ignore_index=True)
-        else:
-            dataframe = current_data
-            
-        tr_cont = res.getHeader().tr_cont
-        keyb = res.getBody().keyb if hasattr(res.getBody(), 'keyb') else ""
-        
-        if tr_cont in ["M", "F"]:  # 다음 페이지 존재
-            logging.info("Call Next page...")
-            ka.smart_sleep()  # 시스템 안정적 운영을 위한 지연
-            return quot_inquire_ccnl(
-                excd, tday, symb, auth, keyb, "N", dataframe, depth + 1, max_depth
-            )
-        else:
-            logging.info("Data fetch complete.")
-            return dataframe
-    else:
-        res.printError(url=API_URL)
-        return pd.DataFrame() 
\ No newline at end of file
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output1",),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        cont_keys={"KEYB": "keyb"},
+        max_pages=max_depth - depth + 1,
+        initial=(dataframe,),
+    )
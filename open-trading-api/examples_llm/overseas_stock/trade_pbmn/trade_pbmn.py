@@ -72,13 +72,6 @@ def trade_pbmn(
     if vol_rang == "":
         raise ValueError("vol_rang is required (e.g. '0:전체, 1:1백주이상, 2:1천주이상, 3:1만주이상, 4:10만주이상, 5:100만주이상, 6:1000만주이상')")
 
-    if depth > max_depth:
-        logging.warning("Max recursive depth reached.")
-        if dataframe1 is None or dataframe2 is None:
-            return pd.DataFrame(), pd.DataFrame()
-        else:
-            return dataframe1, dataframe2
-
     tr_id = "HHDFS76320010"  # 해외주식 거래대금순위
 
     params = {
@@ -91,37 +84,13 @@ def trade_pbmn(
         "PRC2": prc2,  # 현재가 필터범위 끝
     }
     
-    res = ka._url_fetch(API_URL, tr_id, tr_cont, params)
-    
-    if res.isOK():
-        # output1 처리 (object 타입)
-        current_data1 = pd.DataFrame([res.getBody().output1])
-        
-        # output2 처리 (array 타입)
-        current_data2 = pd.DataFrame(res.getBody().output2)
-            
-        if dataframe1 is not None:
-            dataframe1 = pd.concat([dataframe1, current_data1], ignore_index=True)
-        else:
-            dataframe1 = current_data1
-            
-        if dataframe2 is not None:
-            dataframe2 = pd.concat([dataframe2, current_data2], ignore_index=True)
-        else:
-            dataframe2 = current_data2
-            
-        tr_cont = res.getHeader().tr_cont
-        keyb = res.getBody().keyb if hasattr(res.getBody(), 'keyb') else ""
-        
-        if tr_cont in ["M", "F"]:  # 다음 페이지 존재
-            logging.info("Call Next page...")
-            ka.smart_sleep()  # 시스템 안정적 운영을 위한 지연
-            return trade_pbmn(
-                excd, nday, vol_rang, auth, keyb, prc1, prc2, "N", dataframe1, dataframe2, depth + 1, max_depth
-            )
-        else:
-            logging.info("Data fetch complete.")
-            return dataframe1, dataframe2
-    else:
-        res.printError(url=API_URL)
-        return pd.DataFrame(), pd.DataFrame() 
\ No newline at end of file
+    # 연속조회(tr_cont)는 공통 페이지네이터가 반복 처리
+    return ka.fetch_pages(
+        API_URL, tr_id, params,
+        outputs=("output1", "output2"),
+        tr_cont=tr_cont,
+        cont_codes=("M", "F"),
+        cont_keys={"KEYB": "keyb"},
+        max_pages=max_depth - depth + 1,
+        initial=(dataframe1, dataframe2),
+    )
@@ -0,0 +1,42 @@
+"""kis_auth 테스트 공통 — 임시 HOME 에 가짜 kis_devlp.yaml 을 두고 import 한다.
+
+kis_auth 는 import 시점에 ~/KIS/config 의 설정/토큰 파일을 읽으므로, 실제 설정을
+건드리지 않도록 테스트 세션 동안 HOME 을 임시 디렉터리로 바꾼다.
+"""
+import os
+import sys
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+
+import pytest
+
+_HOME = tempfile.mkdtemp(prefix="kis-test-home-")
+_CONFIG = Path(_HOME, "KIS", "config")
+_CONFIG.mkdir(parents=True)
+(_CONFIG / "kis_devlp.yaml").write_text(
+    "\n".join([
+        "my_app: test-app", "my_sec: test-sec", "paper_app: test-paper-app", "paper_sec: test-paper-sec",
+        "my_htsid: tester", "my_acct_stock: '12345678'", "my_paper_stock: '87654321'", "my_prod: '01'",
+        "my_agent: pytest", "prod: https://kis.invalid:9443", "vps: https://kis.invalid:29443",
+        "ops: ws://kis.invalid:21000", "vops: ws://kis.invalid:31000",
+    ]) + "\n",
+    encoding="utf-8",
+)
+os.environ["HOME"] = _HOME
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "examples_user"))
+
+import kis_auth as ka  # noqa: E402
+
+KISEnv = namedtuple("KISEnv", ["my_app", "my_sec", "my_acct", "my_prod", "my_htsid", "my_token", "my_url", "my_url_ws"])
+
+
+@pytest.fixture
+def kis_env(monkeypatch):
+    """REST/WS 도메인을 가짜 값으로 지정하고, 호출 간 대기를 없앤다."""
+    env = KISEnv("app", "sec", "12345678", "01", "tester", "token", "https://kis.invalid", "ws://kis.invalid")
+    monkeypatch.setattr(ka, "_TRENV", env)
+    monkeypatch.setattr(ka, "_smartSleep", 0)
+    monkeypatch.setattr(ka, "_rate_limiter", ka.RateLimiter(0))
+    monkeypatch.setattr(ka, "data_map", {})
+    return env
@@ -0,0 +1,135 @@
+"""iter_pages / fetch_pages / RateLimiter — _url_fetch 를 가짜 응답으로 바꿔 연속조회, 누적, 호출 간격 테스트"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import kis_auth as ka
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "examples_user" / "overseas_futureoption"))
+
+
+class _HTTP:
+    """APIResp 가 읽는 requests.Response 의 최소 형태"""
+
+    def __init__(self, body: dict, tr_cont: str):
+        self.status_code = 200
+        self.headers = {"tr_cont": tr_cont}
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+def page(tr_cont: str, **body) -> ka.APIResp:
+    return ka.APIResp(_HTTP({"rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리", **body}, tr_cont))
+
+
+@pytest.fixture
+def fetch(kis_env, monkeypatch):
+    """응답 목록을 순서대로 돌려주고, 요청마다 (tr_cont, params, postFlag) 를 기록"""
+    calls, responses = [], []
+
+    def _url_fetch(api_url, ptr_id, tr_cont, params, appendHeaders=None, postFlag=False, hashFlag=True):
+        calls.append((tr_cont, dict(params), postFlag))
+        return responses.pop(0)
+
+    monkeypatch.setattr(ka, "_url_fetch", _url_fetch)
+    return SimpleNamespace(calls=calls, responses=responses)
+
+
+def test_iter_pages_carries_cont_keys_and_next_params(fetch):
+    fetch.responses[:] = [
+        page("M", output=[{"n": 1}], ctx_area_fk100="F1", ctx_area_nk100="N1", output1={"index_key": "K1"}),
+        page("F", output=[{"n": 2}], ctx_area_fk100="F2", ctx_area_nk100="N2", output1={"index_key": "K2"}),
+        page("D", output=[{"n": 3}]),
+    ]
+    params = {"CTX_AREA_FK100": "", "CTX_AREA_NK100": "", "QRY_TP": "Q", "INDEX_KEY": ""}
+    pages = list(ka.iter_pages(
+        "/x", "TR", params, post=True,
+        cont_keys={"CTX_AREA_FK100": "ctx_area_fk100", "CTX_AREA_NK100": "ctx_area_nk100"},
+        next_params=lambda body, p: {"QRY_TP": "P", "INDEX_KEY": body.output1["index_key"]},
+    ))
+    assert [p.getBody().output[0]["n"] for p in pages] == [1, 2, 3]
+    assert [c[0] for c in fetch.calls] == ["", "N", "N"] and all(c[2] for c in fetch.calls)
+    assert fetch.calls[0][1] == params
+    assert fetch.calls[2][1] == {"CTX_AREA_FK100": "F2", "CTX_AREA_NK100": "N2", "QRY_TP": "P", "INDEX_KEY": "K2"}
+    assert params["INDEX_KEY"] == ""  # 호출자의 params 는 그대로
+
+
+def test_iter_pages_stops_on_error_and_page_budget(fetch):
+    fetch.responses[:] = [page("M", output=[]), ka.APIRespError(500, "boom"), page("M")]
+    pages = list(ka.iter_pages("/x", "TR", {}))
+    assert len(pages) == 2 and not pages[-1].isOK()
+
+    fetch.calls.clear()
+    fetch.responses[:] = [page("M", output=[]) for _ in range(5)]
+    assert len(list(ka.iter_pages("/x", "TR", {}, cont_codes=("M",), max_pages=3))) == 3
+    assert len(fetch.calls) == 3
+
+
+def test_fetch_pages_builds_frames_once_and_prepends_initial(fetch):
+    fetch.responses[:] = [
+        page("M", output1={"tot": "1"}, output2=[{"p": 1}, {"p": 2}]),
+        page("D", output1={"tot": "2"}, output2=[{"p": 3}]),
+    ]
+    prev = pd.DataFrame([{"p": 0}])
+    df1, df2 = ka.fetch_pages("/x", "TR", {}, outputs=("output1", "output2"), initial=(None, prev))
+    assert df1["tot"].tolist() == ["1", "2"]
+    assert df2["p"].tolist() == [0, 1, 2, 3]
+
+    fetch.responses[:] = [page("M", output=[{"p": 1}]), ka.APIRespError(500, "boom")]
+    assert ka.fetch_pages("/x", "TR", {}).empty
+    fetch.responses[:] = [ka.APIRespError(500, "boom")]
+    empty = ka.fetch_pages("/x", "TR", {}, outputs=("output1", "output2"))
+    assert len(empty) == 2 and all(df.empty for df in empty)
+
+
+def test_converted_function_follows_index_key(fetch):
+    import overseas_futureoption_functions as off
+
+    fetch.responses[:] = [
+        page("M", output1={"index_key": "20240906       221"}, output2=[{"px": "1"}]),
+        page("D", output1={"index_key": ""}, output2=[{"px": "2"}]),
+    ]
+    df1, df2 = off.opt_daily_ccnl("OESU24 C5500", "CME", "40", max_depth=5)
+    assert df2["px"].tolist() == ["1", "2"] and len(df1) == 2
+    assert fetch.calls[1][0] == "N" and fetch.calls[1][1]["INDEX_KEY"] == "20240906       221"
+
+
+def test_page_cap_matches_recursive_depth_and_warns(fetch, caplog):
+    import overseas_futureoption_functions as off
+
+    # 기존 재귀(depth > max_depth 에서 중단)는 depth 0..max_depth 까지 조회
+    fetch.responses[:] = [page("M", output1={"index_key": "K"}, output2=[{"px": str(i)}]) for i in range(3)]
+    with caplog.at_level("WARNING"):
+        _, df2 = off.opt_daily_ccnl("OESU24 C5500", "CME", "40", max_depth=1)
+    assert df2["px"].tolist() == ["0", "1"] and len(fetch.responses) == 1
+    assert "Max recursive depth reached." in caplog.text
+
+    caplog.clear()
+    fetch.responses[:] = [page("M", output=[{"p": 1}]), page("D", output=[{"p": 2}])]
+    with caplog.at_level("WARNING"):
+        assert len(ka.fetch_pages("/x", "TR", {}, max_pages=2)) == 2
+    assert "Max recursive depth" not in caplog.text  # 한도 안에서 끝나면 경고 없음
+
+
+def test_rate_limiter_waits_only_for_remaining_interval(monkeypatch):
+    clock, slept = [100.0], []
+    monkeypatch.setattr(ka.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(ka.time, "sleep", slept.append)
+    limiter = ka.RateLimiter(0.5)
+
+    assert limiter.acquire() == 0.0  # 첫 호출은 바로
+    clock[0] += 0.2
+    assert limiter.acquire() == pytest.approx(0.3)  # 직전 예약 슬롯까지 남은 시간만
+    assert limiter.acquire() == pytest.approx(0.8)  # 대기 중인 호출 뒤로 줄을 선다
+    clock[0] += 5
+    assert limiter.acquire() == 0.0  # 간격이 이미 지났으면 대기 없음
+    assert slept == pytest.approx([0.3, 0.8])
+
+    limiter.set_interval(0.05)
+    clock[0] += 0.01
+    assert limiter.acquire() == pytest.approx(0.49)  # 이미 예약된 슬롯은 유지
@@ -0,0 +1,212 @@
+"""KISWebSocketPool / _decode_ws_frame — 가짜 웹소켓 서버로 구독 분산, 재분배, 수신, 접속키 재발급 테스트"""
+import asyncio
+import json
+from base64 import b64encode
+from pathlib import Path
+
+import pytest
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad
+
+import kis_auth as ka
+
+COLUMNS = ["MKSC_SHRN_ISCD", "STCK_PRPR"]
+
+
+def ccnl_fake(tr_type: str, tr_key: str, env_dv: str = "real"):
+    msg = {
+        "header": {"approval_key": "", "custtype": "P", "tr_type": tr_type, "content-type": "utf-8"},
+        "body": {"input": {"tr_id": "H0STCNT0", "tr_key": tr_key}},
+    }
+    return msg, COLUMNS
+
+
+def _system(tr_key: str, rt_cd: str, msg1: str) -> str:
+    return json.dumps({"header": {"tr_id": "H0STCNT0", "tr_key": tr_key, "encrypt": "N"},
+                       "body": {"rt_cd": rt_cd, "msg_cd": "OPSP0000" if rt_cd == "0" else "OPSP0011", "msg1": msg1}})
+
+
+class FakeWebSocket:
+    def __init__(self, server: "FakeServer", url: str):
+        self.server = server
+        self.url = url
+        self.sent: list[dict] = []
+        self.pongs: list[str] = []
+        self.incoming: asyncio.Queue = asyncio.Queue()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, raw: str):
+        msg = json.loads(raw)
+        self.sent.append(msg)
+        self.server.reply(self, msg)
+
+    async def pong(self, data: str):
+        self.pongs.append(data)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        raw = await self.incoming.get()
+        if raw is None:
+            raise StopAsyncIteration
+        return raw
+
+
+class FakeServer:
+    """접속키가 valid_keys 에 있으면 SUBSCRIBE SUCCESS, 아니면 접속키 오류로 응답."""
+
+    def __init__(self):
+        self.sockets: list[FakeWebSocket] = []
+        self.valid_keys: set[str] | None = None  # None = 모든 키 허용
+
+    def connect(self, url: str) -> FakeWebSocket:
+        ws = FakeWebSocket(self, url)
+        self.sockets.append(ws)
+        return ws
+
+    def reply(self, ws: FakeWebSocket, msg: dict):
+        key = msg["header"]["approval_key"]
+        tr_key = msg["body"]["input"]["tr_key"]
+        if self.valid_keys is not None and key not in self.valid_keys:
+            ws.incoming.put_nowait(_system(tr_key, "1", "invalid approval : NOT FOUND"))
+        elif msg["header"]["tr_type"] == "1":
+            ws.incoming.put_nowait(_system(tr_key, "0", "SUBSCRIBE SUCCESS"))
+        else:
+            ws.incoming.put_nowait(_system(tr_key, "0", "UNSUBSCRIBE SUCCESS"))
+
+    def live(self, tr_type: str = "1") -> dict[str, FakeWebSocket]:
+        """종목 → 마지막으로 등록(tr_type=1)/해제(2) 요청을 받은 소켓"""
+        out = {}
+        for ws in self.sockets:
+            for msg in ws.sent:
+                if msg["header"]["tr_type"] == tr_type:
+                    out[msg["body"]["input"]["tr_key"]] = ws
+        return out
+
+
+async def until(predicate, timeout: float = 2.0):
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.001)
+    await asyncio.wait_for(poll(), timeout)
+
+
+@pytest.fixture
+def server(kis_env, monkeypatch):
+    fake = FakeServer()
+    issued: list[str] = []
+
+    def issue_approval_key(svr="prod", app_key=None, app_secret=None):
+        issued.append(app_key)
+        return f"key-{len(issued)}"
+
+    monkeypatch.setattr(ka.websockets, "connect", fake.connect)
+    monkeypatch.setattr(ka, "issue_approval_key", issue_approval_key)
+    fake.issued = issued
+    return fake
+
+
+def test_decode_ws_frame_plain_encrypted_and_system(kis_env):
+    ka.add_data_map(tr_id="H0STCNT0", columns=COLUMNS)
+    tr_id, df, rsp = ka._decode_ws_frame("0|H0STCNT0|001|005930^71000")
+    assert tr_id == "H0STCNT0" and rsp is None
+    assert df.to_dict("records") == [{"MKSC_SHRN_ISCD": "005930", "STCK_PRPR": "71000"}]
+
+    key, iv = "k" * 32, "i" * 16
+    ack = json.dumps({"header": {"tr_id": "H0STCNP0", "tr_key": "HTS01", "encrypt": "Y"},
+                      "body": {"rt_cd": "0", "msg_cd": "OPSP0000", "msg1": "SUBSCRIBE SUCCESS",
+                               "output": {"iv": iv, "key": key}}})
+    tr_id, df, rsp = ka._decode_ws_frame(ack)
+    assert rsp.isOk and not rsp.isPingPong and df.empty
+    assert ka.data_map["H0STCNP0"]["key"] == key and ka.data_map["H0STCNP0"]["encrypt"] == "Y"
+
+    ka.add_data_map(tr_id="H0STCNP0", columns=["ODER_NO", "QTY"])
+    cipher = AES.new(key.encode(), AES.MODE_CBC, iv.encode())
+    body = b64encode(cipher.encrypt(pad("0000123^10".encode(), AES.block_size))).decode()
+    _, df, _ = ka._decode_ws_frame(f"1|H0STCNP0|001|{body}")
+    assert df.iloc[0].tolist() == ["0000123", "10"]
+
+    _, _, rsp = ka._decode_ws_frame(json.dumps({"header": {"tr_id": "PINGPONG", "datetime": "20260310090000"}}))
+    assert rsp.isPingPong
+    with pytest.raises(ValueError):
+        ka._decode_ws_frame("0|H0STCNT0")
+
+
+async def test_pool_spreads_subscriptions_publishes_and_rebalances(server):
+    pool = ka.KISWebSocketPool("/tryitout", max_per_session=2, max_retries=3, base_delay=0,
+                               credentials=[("app-a", "sec-a"), ("app-b", "sec-b")])
+    await pool.subscribe(ccnl_fake, ["A", "B", "C", "D", "E"])
+    await pool.subscribe(ccnl_fake, "A")  # 중복 구독은 무시
+    assert pool.stats()["per_session"] == {0: 2, 1: 2, 2: 1}
+
+    await pool.start()
+    await until(lambda: len(server.live()) == 5)
+    live = server.live()
+    assert live["A"] is live["B"] and live["C"] is live["D"] and live["E"] not in (live["A"], live["C"])
+    assert all(ws.url == "ws://kis.invalid/tryitout" for ws in server.sockets)
+    # 세션별로 자격증명을 번갈아 쓰고, 각자 발급받은 접속키로 구독한다
+    assert sorted(server.issued) == ["app-a", "app-a", "app-b"]
+    assert {m["header"]["approval_key"] for m in live["A"].sent} != {m["header"]["approval_key"] for m in live["C"].sent}
+    await until(lambda: pool.stats()["connected"] == 3)
+
+    live["E"].incoming.put_nowait("0|H0STCNT0|001|E^1500")
+    live["E"].incoming.put_nowait(json.dumps({"header": {"tr_id": "PINGPONG", "datetime": "x"}}))
+    tr_id, df = await asyncio.wait_for(pool.__anext__(), 1)
+    assert tr_id == "H0STCNT0" and df.iloc[0].tolist() == ["E", "1500"]
+    await until(lambda: live["E"].pongs)
+
+    # A, B, C 해제 → 빈 세션 정리, 남은 D 를 E 의 세션으로 흡수
+    await pool.unsubscribe(ccnl_fake, ["A", "B", "C"])
+    assert pool.stats()["sessions"] == 1
+    assert pool.subscriptions == {("ccnl_fake", "D"): 2, ("ccnl_fake", "E"): 2}
+    assert server.live("2")["D"] is live["C"]
+    assert server.live()["D"] is live["E"]
+    await pool.close()
+    assert pool.stats()["connected"] == 0
+
+
+async def test_pool_drops_oldest_when_consumer_is_slow(kis_env):
+    pool = ka.KISWebSocketPool("/tryitout", queue_size=2)
+    pool._started = True
+    for n in range(3):
+        pool._publish(0, f"TR{n}", None)
+    assert pool.stats()["dropped"] == 1
+    assert [(await pool.__anext__())[0] for _ in range(2)] == ["TR1", "TR2"]
+
+
+async def test_shard_reissues_approval_key_after_rejection(server):
+    server.valid_keys = {"key-2"}  # 처음 발급된 key-1 은 만료된 것으로 거부
+    pool = ka.KISWebSocketPool("/tryitout", max_retries=5, base_delay=0)
+    await pool.subscribe(ccnl_fake, "005930")
+    await pool.start()
+
+    await until(lambda: len(server.sockets) == 2 and server.sockets[1].sent)
+    first, second = server.sockets
+    assert first.sent[0]["header"]["approval_key"] == "key-1"
+    assert second.sent[0]["header"]["approval_key"] == "key-2"
+    assert len(server.issued) == 2 and pool.shards[0].approval_key == "key-2"
+    # 접속 완료(connected)는 구독을 마치고 재시도 횟수를 초기화한 뒤에만 켜진다
+    await until(lambda: pool.stats()["connected"] == 1)
+    assert pool.shards[0].retry_count == 0
+    await pool.close()
+
+
+async def test_shard_gives_up_after_max_retries(server, monkeypatch):
+    monkeypatch.setattr(ka, "issue_approval_key", lambda *a: None)  # 접속키 발급 자체가 실패
+    pool = ka.KISWebSocketPool("/tryitout", max_retries=2, base_delay=0)
+    await pool.subscribe(ccnl_fake, "005930")
+    await pool.start()
+    await asyncio.wait_for(pool.shards[0].task, 1)
+    assert pool.shards[0].retry_count == 2 and not server.sockets
+
+
+def test_examples_llm_kis_auth_matches_examples_user():
+    """두 예제 트리의 kis_auth.py 는 같은 파일 — 한쪽에만 고친 수정이 없도록"""
+    root = Path(__file__).resolve().parents[1]
+    assert (root / "examples_llm" / "kis_auth.py").read_bytes() == (root / "examples_user" / "kis_auth.py").read_bytes()